@@ -112,6 +112,25 @@ class CameraManager(object):
             os.remove(imageLocation)
         self._logger.info("Snapshot '" + imageLocation + "' deleted")
 
+    # e.g. after a bulk delete of print jobs, the request doesn't wait for the file system
+    def deleteSnapshots(self, allSnapshotFilenames):
+        deletedCount = 0
+        for snapshotFilename in allSnapshotFilenames:
+            try:
+                imageLocation = self.buildSnapshotFilenameLocation(snapshotFilename, False)
+                if os.path.isfile(imageLocation):
+                    os.remove(imageLocation)
+                    deletedCount += 1
+            except (Exception) as error:
+                self._logger.error("Could not delete snapshot '" + str(snapshotFilename) + "': " + str(error))
+        self._logger.info("Deleted " + str(deletedCount) + " of " + str(len(allSnapshotFilenames)) + " snapshots")
+
+    def deleteSnapshotsAsync(self, allSnapshotFilenames):
+        thread = threading.Thread(name='DeleteSnapshots', target=self.deleteSnapshots, args=(list(allSnapshotFilenames),))
+        thread.daemon = True
+        thread.start()
+        return thread
+
 
     def backupAllSnapshots(self, targetBackupFolder):
 
@@ -1,31 +1,274 @@
 # coding=utf-8
 from __future__ import absolute_import
 
+import base64
+import contextlib
 import datetime
+import heapq
+import itertools
+import json
 import logging
+import operator
 import os
-import shutil
+import re
 import sqlite3
+import threading
+import time
 
+from octoprint_PrintJobHistory.DatabaseMigrator import DatabaseMigrator, MigrationStep
+from octoprint_PrintJobHistory.QueryResultCache import QueryResultCache
 from octoprint_PrintJobHistory.WrappedLoggingHandler import WrappedLoggingHandler
 from octoprint_PrintJobHistory.api import TransformPrintJob2JSON
-from octoprint_PrintJobHistory.common import StringUtils
+from octoprint_PrintJobHistory.common import SlicerSettingsParser, StringUtils, TextCompression
 from octoprint_PrintJobHistory.models.CostModel import CostModel
+from octoprint_PrintJobHistory.models.DailyRollupModel import DailyRollupModel
 from octoprint_PrintJobHistory.models.FilamentModel import FilamentModel
+from octoprint_PrintJobHistory.models.FileRollupModel import FileRollupModel
 from octoprint_PrintJobHistory.models.PrintJobModel import PrintJobModel
+from octoprint_PrintJobHistory.models.PrintJobTextModel import PrintJobTextModel
 from octoprint_PrintJobHistory.models.PluginMetaDataModel import PluginMetaDataModel
+from octoprint_PrintJobHistory.models.SlicerSettingKeyModel import SlicerSettingKeyModel
+from octoprint_PrintJobHistory.models.SlicerSettingValueModel import SlicerSettingValueModel
+from octoprint_PrintJobHistory.models.SlicerSettingsBlobModel import SlicerSettingsBlobModel
 # from octoprint_PrintJobHistory.models.PrintJobSpoolMapModel import PrintJobSpoolMapModel
-from octoprint_PrintJobHistory.models.TemperatureModel import TemperatureModel
+from octoprint_PrintJobHistory.models.TemperatureModel import TemperatureModel, normalizeSensorName
+from octoprint_PrintJobHistory.services.SlicerSettingsService import SlicerSettingsService
 from peewee import *
 
 
 FORCE_CREATE_TABLES = False
 SQL_LOGGING = False
 
-CURRENT_DATABASE_SCHEME_VERSION = 8
+CURRENT_DATABASE_SCHEME_VERSION = 19
 
 # List all Models
-MODELS = [PluginMetaDataModel, PrintJobModel, FilamentModel, TemperatureModel, CostModel]
+MODELS = [PluginMetaDataModel, PrintJobModel, FilamentModel, TemperatureModel, CostModel, SlicerSettingsBlobModel, PrintJobTextModel, DailyRollupModel, FileRollupModel, SlicerSettingKeyModel, SlicerSettingValueModel]
+
+# Indexes for the filter/sorting of the table query and the relation lookups (since V11)
+# Names of the foreign-key indexes are the same as peewee creates them for new databases.
+DATABASE_INDEXES_SQL = [
+	'CREATE INDEX IF NOT EXISTS "printjobmodel_printStartDateTime" ON "pjh_printjobmodel" ("printStartDateTime")',
+	'CREATE INDEX IF NOT EXISTS "printjobmodel_printStatusResult_printStartDateTime" ON "pjh_printjobmodel" ("printStatusResult", "printStartDateTime")',
+	'CREATE INDEX IF NOT EXISTS "printjobmodel_lower_fileName" ON "pjh_printjobmodel" (lower("fileName"))',
+	'CREATE INDEX IF NOT EXISTS "filamentmodel_printJob_id" ON "pjh_filamentmodel" ("printJob_id")',
+	'CREATE INDEX IF NOT EXISTS "temperaturemodel_printJob_id" ON "pjh_temperaturemodel" ("printJob_id")',
+	'CREATE INDEX IF NOT EXISTS "temperaturemodel_sensorName_sensorValue_printJob_id" ON "pjh_temperaturemodel" ("sensorName", "sensorValue", "printJob_id")',
+	'CREATE INDEX IF NOT EXISTS "costmodel_printJob_id" ON "pjh_costmodel" ("printJob_id")',
+]
+
+# Connection defaults, could be overwritten by the plugin settings
+DEFAULT_CONNECTION_SETTINGS = {
+	"journalMode": "wal",
+	"busyTimeout": 5000,	# milliseconds to wait for a lock
+	"busyRetries": 3,		# retries of a single statement after the busy timeout
+	"cacheSize": 8192,		# KiB page-cache per connection
+	"mmapSize": 64,			# MiB memory-mapped I/O per connection
+	"queryCacheSize": 64,	# table pages/counts kept in memory, 0 = off
+	# external PostgreSQL database, shared by several OctoPrint instances
+	"databaseType": "sqlite",	# sqlite, postgres
+	"host": "localhost",
+	"port": 5432,
+	"databaseName": "PrintJobDatabase",
+	"user": None,
+	"password": None,
+	"maxConnections": 8,	# connections in the pool
+	"staleTimeout": 300		# seconds, an idle pooled connection is reopened after that time
+}
+
+# Values of the table query which select the jobs (count) and additionally the page, part of the cache key
+TABLE_QUERY_FILTER_KEYS = ["filterName", "startDate", "endDate", "searchQuery", "temperatureSensor", "minTemperature", "maxTemperature", "slicerSettingsFilter", "includeArchive"]
+TABLE_QUERY_PAGE_KEYS = ["from", "to", "sortColumn", "sortOrder", "cursor", "cursorDirection"]
+TABLE_QUERY_DEFAULTS = {"filterName": "all", "includeArchive": "false"}
+# backrefs filled by the prefetch of the table
+PREFETCHED_RELATIONS = ["filaments", "temperatures", "costs", "texts"]
+
+# Maintenance: free pages given back to the file system per run (64MiB with 4KiB pages). An old database without
+# auto_vacuum INCREMENTAL is converted with a full VACUUM, if at least that part of the file is free.
+MAINTENANCE_VACUUM_PAGES = 16384
+MAINTENANCE_FULL_VACUUM_FREE_RATIO = 0.1
+
+# Filter of the table by the parsed slicer settings, e.g. "layer_height = 0.2 AND infill_sparse_density > 30%", every
+# condition must match. Numbers are compared by value, strings only with = and !=
+SLICER_SETTINGS_FILTER_SEPARATOR_PATTERN = re.compile(r"\s+AND\s+", re.IGNORECASE)
+SLICER_SETTINGS_FILTER_CONDITION_PATTERN = re.compile(r"^\s*(.+?)\s*(<=|>=|!=|=|<|>)\s*(.+?)\s*$")
+SLICER_SETTINGS_FILTER_OPERATORS = {"=": operator.eq, "!=": operator.ne, "<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+# Jobs captured before V17, parsed per write transaction after the startup
+SLICER_SETTINGS_PARSE_BATCH_SIZE = 50
+SLICER_SETTINGS_PARSE_BATCH_PAUSE = 0.05
+
+# Compression of the texts stored before V16, rows per write transaction and the pause after each batch
+TEXT_COMPRESSION_BATCH_SIZE = 100
+TEXT_COMPRESSION_BATCH_PAUSE = 0.05
+COMPRESSED_TEXT_COLUMNS = {"pjh_slicersettingsblobmodel": ["slicerSettingsAsText"], "pjh_printjobtextmodel": ["technicalLog"]}
+
+# COUNT(*) OVER () since SQLite 3.25.0
+SQLITE_WINDOW_FUNCTIONS = sqlite3.sqlite_version_info >= (3, 25, 0)
+
+DATABASE_TYPE_SQLITE = "sqlite"
+DATABASE_TYPE_POSTGRES = "postgres"
+
+# Online backup, pages copied per step (~1MiB with 4KiB pages) and the pause after each step for the other threads
+BACKUP_PAGES_PER_STEP = 256
+BACKUP_STEP_PAUSE = 0.01
+
+# Rows per transaction of the scheme migration, each chunk is a resume point
+MIGRATION_CHUNK_SIZE = 5000
+# Seconds a write waits for the (background) scheme migration, e.g. a print finished during the startup
+MIGRATION_WRITE_TIMEOUT = 60
+
+# Cold-storage for old jobs, a second sqlite file with the same tables (and scheme version) as the main file
+ARCHIVE_FILE_NAME = "printJobHistory-archive.db"
+ARCHIVE_SCHEMA_NAME = "archive"
+# the slicer setting keys stay in the main file, they are shared by all jobs. The slicer settings blobs of the archived
+# jobs are copied, the texts of both files are resolved in their own file (e.g. by the full-text index triggers).
+ARCHIVE_MODELS = [PrintJobModel, FilamentModel, TemperatureModel, CostModel, SlicerSettingsBlobModel, PrintJobTextModel, SlicerSettingValueModel]
+
+# Farm aggregation, the history databases of other printers (e.g. on a mounted volume) are read together with this one.
+# The databases are attached in batches, SQLite allows 10 attached databases per connection (SQLITE_MAX_ATTACHED).
+FARM_ATTACH_BATCH_SIZE = 8
+FARM_SCHEMA_PREFIX = "farm"
+# the slicer setting values of a farm database reference the keys of the same file
+FARM_MODELS = ARCHIVE_MODELS + [SlicerSettingKeyModel]
+DEFAULT_LOCAL_PRINTER_NAME = "local"
+# values of the statistic series, added up over the printers
+SERIES_VALUE_NAMES = ["jobCount", "duration", "usedLength", "usedWeight", "filamentCost", "totalCosts"]
+
+# Bind-variables per statement of the bulk insert/delete, the minimum of all supported SQLite releases
+SQL_MAX_VARIABLES = 999
+
+
+# No write during a running (after the timeout) or failed scheme migration, the api answers with 503, the writer
+# spills the job
+class DatabaseNotWritableError(Exception):
+	pass
+
+
+# peewee keeps one connection per thread (flask requests, event-, csv-import-, temperature-thread). A single statement
+# that still runs into "database is locked" after the busy timeout is repeated, inside a transaction the caller
+# needs to handle it.
+class RetryingSqliteDatabase(SqliteDatabase):
+
+	def __init__(self, database, busyRetries=3, **kwargs):
+		super(RetryingSqliteDatabase, self).__init__(database, **kwargs)
+		self._busyRetries = busyRetries
+
+	def execute_sql(self, sql, *args, **kwargs):
+		retryCount = 0
+		while True:
+			try:
+				return super(RetryingSqliteDatabase, self).execute_sql(sql, *args, **kwargs)
+			except OperationalError as e:
+				errorMessage = str(e)
+				isBusyError = "locked" in errorMessage or "busy" in errorMessage
+				if (isBusyError == False or self.in_transaction() or retryCount >= self._busyRetries):
+					raise
+				retryCount += 1
+				time.sleep(0.1 * retryCount)
+
+
+# Daily rollup (since V14), the first fields are the dimensions (unique index), the others the summed metrics
+DAILY_ROLLUP_FIELDS = [DailyRollupModel.created, DailyRollupModel.day, DailyRollupModel.printStatusResult, DailyRollupModel.material, DailyRollupModel.spoolName,
+					   DailyRollupModel.jobCount, DailyRollupModel.duration, DailyRollupModel.usedLength, DailyRollupModel.usedWeight, DailyRollupModel.filamentCost, DailyRollupModel.totalCosts]
+# File rollup (since V19), the key and the summed metrics
+FILE_ROLLUP_FIELDS = [FileRollupModel.created, FileRollupModel.filePathName,
+					  FileRollupModel.jobCount, FileRollupModel.successCount, FileRollupModel.duration, FileRollupModel.usedLength, FileRollupModel.usedWeight, FileRollupModel.totalCosts,
+					  FileRollupModel.successDuration, FileRollupModel.successUsedLength, FileRollupModel.successUsedWeight]
+
+
+# Full-text index for the search query (since V12). External content is a view over the printjob and the text
+# table (since V13), the triggers on both tables keep the index in sync with every insert/update/delete. The slicer
+# settings are read with pjh_text(), the stored value could be compressed (since V16).
+SEARCH_INDEX_TABLE = "pjh_printjobsearch"
+SEARCH_INDEX_CONTENT_VIEW = "pjh_printjobsearchcontent"
+SEARCH_INDEX_TRIGGERS = ["pjh_printjobmodel_search_insert", "pjh_printjobmodel_search_delete", "pjh_printjobmodel_search_update",
+						 "pjh_printjobtextmodel_search_insert", "pjh_printjobtextmodel_search_delete", "pjh_printjobtextmodel_search_update"]
+
+
+# trigram: substring search (SQLite >= 3.34), unicode61: word-prefix search, None: no FTS5 -> LIKE search
+def _evalSearchIndexTokenizer():
+	connection = sqlite3.connect(":memory:")
+	try:
+		for tokenizer in ["trigram", "unicode61"]:
+			try:
+				connection.execute("CREATE VIRTUAL TABLE searchIndexCheck_" + tokenizer + " USING fts5(text, tokenize='" + tokenizer + "')")
+				return tokenizer
+			except sqlite3.OperationalError:
+				pass
+	finally:
+		connection.close()
+	return None
+
+
+def _buildDropSearchIndexSql():
+	dropSql = []
+	for triggerName in SEARCH_INDEX_TRIGGERS:
+		dropSql.append("DROP TRIGGER IF EXISTS " + triggerName)
+	dropSql.append("DROP TABLE IF EXISTS " + SEARCH_INDEX_TABLE)
+	dropSql.append("DROP VIEW IF EXISTS " + SEARCH_INDEX_CONTENT_VIEW)
+	return dropSql
+
+
+# The FTS5 'delete' command needs exactly the values that were indexed, so each trigger reads the current values of
+# the other table.
+# schemeVersion: the older migration steps build the index of their scheme, the slicer settings are in the text table
+# before V18
+def _buildSearchIndexSql(tokenizer, schemeVersion=CURRENT_DATABASE_SCHEME_VERSION):
+	searchTable = SEARCH_INDEX_TABLE
+	deleteColumns = searchTable + "(" + searchTable + ", rowid, fileName, noteText, slicerSettingsAsText)"
+	insertColumns = searchTable + "(rowid, fileName, noteText, slicerSettingsAsText)"
+	textFunction = TextCompression.SQL_TEXT_FUNCTION_NAME
+	if (schemeVersion < 18):
+		slicerSettingsOfNew = "(SELECT " + textFunction + "(slicerSettingsAsText) FROM pjh_printjobtextmodel WHERE printJob_id = new.databaseId)"
+		slicerSettingsOfOld = "(SELECT " + textFunction + "(slicerSettingsAsText) FROM pjh_printjobtextmodel WHERE printJob_id = old.databaseId)"
+		newSlicerSettings = textFunction + "(new.slicerSettingsAsText)"
+		oldSlicerSettings = textFunction + "(old.slicerSettingsAsText)"
+		contentSlicerSettings = textFunction + "(t.slicerSettingsAsText)"
+		contentJoin = "FROM pjh_printjobmodel p LEFT JOIN pjh_printjobtextmodel t ON t.printJob_id = p.databaseId"
+		# the compression of a stored text doesn't change the indexed text
+		textUpdateCondition = "old.slicerSettingsAsText IS NOT new.slicerSettingsAsText AND " + oldSlicerSettings + " IS NOT " + newSlicerSettings
+	else:
+		blobJoin = "FROM pjh_printjobtextmodel t JOIN pjh_slicersettingsblobmodel b ON b.contentHash = t.slicerSettingsHash"
+		slicerSettingsOfNew = "(SELECT " + textFunction + "(b.slicerSettingsAsText) " + blobJoin + " WHERE t.printJob_id = new.databaseId)"
+		slicerSettingsOfOld = "(SELECT " + textFunction + "(b.slicerSettingsAsText) " + blobJoin + " WHERE t.printJob_id = old.databaseId)"
+		newSlicerSettings = "(SELECT " + textFunction + "(slicerSettingsAsText) FROM pjh_slicersettingsblobmodel WHERE contentHash = new.slicerSettingsHash)"
+		oldSlicerSettings = "(SELECT " + textFunction + "(slicerSettingsAsText) FROM pjh_slicersettingsblobmodel WHERE contentHash = old.slicerSettingsHash)"
+		contentSlicerSettings = textFunction + "(b.slicerSettingsAsText)"
+		contentJoin = ("FROM pjh_printjobmodel p LEFT JOIN pjh_printjobtextmodel t ON t.printJob_id = p.databaseId "
+					   "LEFT JOIN pjh_slicersettingsblobmodel b ON b.contentHash = t.slicerSettingsHash")
+		# same hash, same text
+		textUpdateCondition = "old.slicerSettingsHash IS NOT new.slicerSettingsHash"
+	return _buildDropSearchIndexSql() + [
+		"CREATE VIEW " + SEARCH_INDEX_CONTENT_VIEW + " AS SELECT p.databaseId AS databaseId, p.fileName AS fileName, p.noteText AS noteText, " + contentSlicerSettings + " AS slicerSettingsAsText " +
+			contentJoin,
+		"CREATE VIRTUAL TABLE " + searchTable + " USING fts5(fileName, noteText, slicerSettingsAsText, content='" + SEARCH_INDEX_CONTENT_VIEW + "', content_rowid='databaseId', tokenize='" + tokenizer + "')",
+		# - printjob table
+		"CREATE TRIGGER pjh_printjobmodel_search_insert AFTER INSERT ON pjh_printjobmodel BEGIN "
+			"INSERT INTO " + insertColumns + " VALUES (new.databaseId, new.fileName, new.noteText, " + slicerSettingsOfNew + "); "
+		"END",
+		"CREATE TRIGGER pjh_printjobmodel_search_delete AFTER DELETE ON pjh_printjobmodel BEGIN "
+			"INSERT INTO " + deleteColumns + " VALUES ('delete', old.databaseId, old.fileName, old.noteText, " + slicerSettingsOfOld + "); "
+		"END",
+		"CREATE TRIGGER pjh_printjobmodel_search_update AFTER UPDATE ON pjh_printjobmodel "
+		"WHEN old.fileName IS NOT new.fileName OR old.noteText IS NOT new.noteText BEGIN "
+			"INSERT INTO " + deleteColumns + " VALUES ('delete', old.databaseId, old.fileName, old.noteText, " + slicerSettingsOfOld + "); "
+			"INSERT INTO " + insertColumns + " VALUES (new.databaseId, new.fileName, new.noteText, " + slicerSettingsOfNew + "); "
+		"END",
+		# - text table
+		"CREATE TRIGGER pjh_printjobtextmodel_search_insert AFTER INSERT ON pjh_printjobtextmodel BEGIN "
+			"INSERT INTO " + deleteColumns + " SELECT 'delete', databaseId, fileName, noteText, NULL FROM pjh_printjobmodel WHERE databaseId = new.printJob_id; "
+			"INSERT INTO " + insertColumns + " SELECT databaseId, fileName, noteText, " + newSlicerSettings + " FROM pjh_printjobmodel WHERE databaseId = new.printJob_id; "
+		"END",
+		"CREATE TRIGGER pjh_printjobtextmodel_search_delete AFTER DELETE ON pjh_printjobtextmodel BEGIN "
+			"INSERT INTO " + deleteColumns + " SELECT 'delete', databaseId, fileName, noteText, " + oldSlicerSettings + " FROM pjh_printjobmodel WHERE databaseId = old.printJob_id; "
+			"INSERT INTO " + insertColumns + " SELECT databaseId, fileName, noteText, NULL FROM pjh_printjobmodel WHERE databaseId = old.printJob_id; "
+		"END",
+		"CREATE TRIGGER pjh_printjobtextmodel_search_update AFTER UPDATE ON pjh_printjobtextmodel "
+		"WHEN " + textUpdateCondition + " BEGIN "
+			"INSERT INTO " + deleteColumns + " SELECT 'delete', databaseId, fileName, noteText, " + oldSlicerSettings + " FROM pjh_printjobmodel WHERE databaseId = old.printJob_id; "
+			"INSERT INTO " + insertColumns + " SELECT databaseId, fileName, noteText, " + newSlicerSettings + " FROM pjh_printjobmodel WHERE databaseId = new.printJob_id; "
+		"END",
+		"INSERT INTO " + searchTable + "(" + searchTable + ") VALUES ('rebuild')"
+	]
 
 
 class DatabaseManager(object):
@@ -38,41 +281,128 @@ class DatabaseManager(object):
 
 		self._database = None
 		self._databaseFileLocation = None
+		self._searchIndexTokenizer = None
+		self._connectionSettings = dict(DEFAULT_CONNECTION_SETTINGS)
 		self._sendDataToClient = None
+		self._migrateInBackground = False
+		self._migrationChunkSize = MIGRATION_CHUNK_SIZE
+		self._migrationStatusCallback = None
+		self._migrationStatus = None
+		self._migrationDoneEvent = threading.Event()
+		self._migrationDoneEvent.set()
+		self._migrationFailed = False
+		self._migrationWriteTimeout = MIGRATION_WRITE_TIMEOUT
+		# per thread, because the archive is only attached to the connection of the thread
+		self._archiveScopeState = threading.local()
+		self._queryCache = QueryResultCache(0)
+		self._localPrinterName = DEFAULT_LOCAL_PRINTER_NAME
+		self._farmDatabases = []
 
 	################################################################################################## private functions
 
 	def _createOrUpgradeSchemeIfNecessary(self):
 		schemeVersionFromDatabaseModel = None
 		try:
+			# checked before the select, a failed statement aborts the whole postgres transaction
+			if (self._database.table_exists(PluginMetaDataModel._meta.table_name) == False):
+				self._logger.info("Create database-table, because didn't exists")
+				self._createDatabaseTables()
+				return
 			schemeVersionFromDatabaseModel = PluginMetaDataModel.get(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION)
 			pass
 		except Exception as e:
-			errorMessage = str(e)
-			if errorMessage.startswith("no such table"):
-
-				self._logger.info("Create database-table, because didn't exists")
-				self._createDatabaseTables()
-			else:
-				self._logger.error(str(e))
+			self._logger.error(str(e))
 
 		if not schemeVersionFromDatabaseModel == None:
 			currentDatabaseSchemeVersion = int(schemeVersionFromDatabaseModel.value)
+			if (currentDatabaseSchemeVersion < CURRENT_DATABASE_SCHEME_VERSION and self._isPostgres()):
+				# the stores are created with the current scheme (V14), the sqlite3 file migrations are not used for
+				# postgres. Later upgrade steps must be written backend-neutral (peewee query/schema builder).
+				self._logger.error("No database-scheme upgrade from '" + str(currentDatabaseSchemeVersion) + "' to: '" + str(CURRENT_DATABASE_SCHEME_VERSION) + "' available for PostgreSQL")
+				return
 			if (currentDatabaseSchemeVersion < CURRENT_DATABASE_SCHEME_VERSION):
 				# evautate upgrade steps (from 1-2 , 1...6)
 				self._logger.info("We need to upgrade the database scheme from: '" + str(currentDatabaseSchemeVersion) + "' to: '" + str(CURRENT_DATABASE_SCHEME_VERSION) + "'")
-
-				try:
-					self.backupDatabaseFile(self._databasePath)
+				if (self._migrateInBackground):
+					self._startMigrationThread(currentDatabaseSchemeVersion)
+				else:
 					self._upgradeDatabase(currentDatabaseSchemeVersion, CURRENT_DATABASE_SCHEME_VERSION)
-				except Exception as e:
-					self._logger.error("Error during database upgrade!!!!")
-					self._logger.exception(e)
-					return
-				self._logger.info("Database-scheme successfully upgraded.")
 		pass
 
-	def _upgradeDatabase(self,currentDatabaseSchemeVersion, targetDatabaseSchemeVersion):
+	# A large database needs minutes (Raspberry Pi), the plugin startup is not blocked. Until the migration is done
+	# the api rejects all requests and the writes wait, see isMigrationRunning/_writeTransaction
+	def _startMigrationThread(self, currentDatabaseSchemeVersion):
+		self._migrationDoneEvent.clear()
+		migrationThread = threading.Thread(name="DatabaseMigration", target=self._runMigrationThread, args=(currentDatabaseSchemeVersion,))
+		migrationThread.daemon = True
+		migrationThread.start()
+
+	def _runMigrationThread(self, currentDatabaseSchemeVersion):
+		try:
+			self._upgradeDatabase(currentDatabaseSchemeVersion, CURRENT_DATABASE_SCHEME_VERSION)
+			self._searchIndexTokenizer = self._readSearchIndexTokenizer()
+			self._queryCache.invalidate()
+		except Exception as e:
+			self._migrationFailed = True
+			self._logger.exception("Database migration failed:" + str(e))
+		finally:
+			# peewee connection of this thread
+			self._database.close()
+			self._migrationDoneEvent.set()
+
+	def _upgradeDatabase(self, currentDatabaseSchemeVersion, targetDatabaseSchemeVersion):
+		databaseMigrator = DatabaseMigrator(self._logger,
+											self._databaseFileLocation,
+											busyTimeout=int(self._connectionSettings["busyTimeout"]) / 1000.0,
+											chunkSize=self._migrationChunkSize,
+											progressCallback=self._sendMigrationStatus)
+		self._migrationFailed = False
+		self._sendMigrationStatus(dict(status="started", schemeVersion=currentDatabaseSchemeVersion, targetSchemeVersion=targetDatabaseSchemeVersion, tableName=None, progress=0))
+		try:
+			# an interrupted migration was already backed up before the first start
+			if (databaseMigrator.hasInterruptedMigration() == False):
+				self.backupDatabaseFile(self._databasePath)
+			databaseMigrator.migrate(currentDatabaseSchemeVersion, self._buildMigrationSteps(currentDatabaseSchemeVersion, targetDatabaseSchemeVersion))
+			self._upgradeArchiveIfNecessary(targetDatabaseSchemeVersion)
+		except Exception as e:
+			self._logger.error("Error during database upgrade!!!!")
+			self._logger.exception(e)
+			self._migrationFailed = True
+			self._sendMigrationStatus(dict(status="failed", schemeVersion=currentDatabaseSchemeVersion, targetSchemeVersion=targetDatabaseSchemeVersion, tableName=None, progress=0, message=str(e)))
+			return False
+		self._logger.info("Database-scheme successfully upgraded.")
+		self._sendMigrationStatus(dict(status="finished", schemeVersion=targetDatabaseSchemeVersion, targetSchemeVersion=targetDatabaseSchemeVersion, tableName=None, progress=100))
+		return True
+
+	# the archive is migrated with the same steps, only the tables of the jobs are present
+	def _upgradeArchiveIfNecessary(self, targetDatabaseSchemeVersion):
+		if (self.hasArchive() == False):
+			return
+		connection = sqlite3.connect(self._getArchiveFileLocation())
+		try:
+			archiveSchemeVersion = int(connection.execute("SELECT value FROM pjh_pluginmetadatamodel WHERE key=?", (PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION,)).fetchone()[0])
+		finally:
+			connection.close()
+		if (archiveSchemeVersion >= targetDatabaseSchemeVersion):
+			return
+		self._logger.info("Upgrade the archive database scheme from: '" + str(archiveSchemeVersion) + "' to: '" + str(targetDatabaseSchemeVersion) + "'")
+		archiveMigrator = DatabaseMigrator(self._logger,
+										   self._getArchiveFileLocation(),
+										   busyTimeout=int(self._connectionSettings["busyTimeout"]) / 1000.0,
+										   chunkSize=self._migrationChunkSize)
+		archiveMigrator.migrate(archiveSchemeVersion, self._buildMigrationSteps(archiveSchemeVersion, targetDatabaseSchemeVersion))
+
+	def _sendMigrationStatus(self, migrationStatus):
+		self._migrationStatus = migrationStatus
+		if (self._migrationStatusCallback == None):
+			return
+		try:
+			self._migrationStatusCallback(migrationStatus)
+		except Exception as e:
+			# the migration itself must go on
+			self._logger.error("Could not send the migration status:" + str(e))
+
+	def _buildMigrationSteps(self, currentDatabaseSchemeVersion, targetDatabaseSchemeVersion):
 
 		migrationFunctions = [self._upgradeFrom1To2,
 							  self._upgradeFrom2To3,
@@ -82,66 +412,324 @@ class DatabaseManager(object):
 							  self._upgradeFrom6To7,
 							  self._upgradeFrom7To8,
 							  self._upgradeFrom8To9,
-							  self._upgradeFrom9To10
+							  self._upgradeFrom9To10,
+							  self._upgradeFrom10To11,
+							  self._upgradeFrom11To12,
+							  self._upgradeFrom12To13,
+							  self._upgradeFrom13To14,
+							  self._upgradeFrom14To15,
+							  self._upgradeFrom15To16,
+							  self._upgradeFrom16To17,
+							  self._upgradeFrom17To18,
+							  self._upgradeFrom18To19
 							  ]
 
+		allMigrationSteps = []
 		for migrationMethodIndex in range(currentDatabaseSchemeVersion -1, targetDatabaseSchemeVersion -1):
-			self._logger.info("Database migration from '" + str(migrationMethodIndex + 1) + "' to '" + str(migrationMethodIndex + 2) + "'")
-			migrationFunctions[migrationMethodIndex]()
-			pass
-		pass
+			allMigrationSteps.append(migrationFunctions[migrationMethodIndex]())
+		return allMigrationSteps
+
+	# The upgrade steps are executed by the DatabaseMigrator: prepareSql and finishSql in one transaction each, the
+	# batchSql for each databaseId range ({fromId}, {toId}) of the source table in its own transaction.
+
+	def _upgradeFrom18To19(self):
+		# What is changed:
+		# - NEW FileRollupModel, filled with all existing print jobs (chunks are added up with an upsert)
+		return MigrationStep(19,
+			prepareSql="""
+			CREATE TABLE "pjh_filerollupmodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+												"created" DATETIME NOT NULL,
+												"filePathName" TEXT NOT NULL,
+												"jobCount" INTEGER NOT NULL,
+												"successCount" INTEGER NOT NULL,
+												"duration" INTEGER NOT NULL,
+												"usedLength" REAL NOT NULL,
+												"usedWeight" REAL NOT NULL,
+												"totalCosts" REAL NOT NULL,
+												"successDuration" INTEGER NOT NULL,
+												"successUsedLength" REAL NOT NULL,
+												"successUsedWeight" REAL NOT NULL);
+			CREATE UNIQUE INDEX "filerollupmodel_filePathName" ON "pjh_filerollupmodel" ("filePathName");
+			""",
+			batchSql=[("pjh_printjobmodel", """
+			INSERT INTO pjh_filerollupmodel (created, filePathName, jobCount, successCount, duration, usedLength, usedWeight, totalCosts, successDuration, successUsedLength, successUsedWeight)
+				SELECT datetime('now', 'localtime'), COALESCE(NULLIF(p.filePathName, ''), p.fileName, ''),
+					COUNT(*), SUM(CASE WHEN p.printStatusResult = 'success' THEN 1 ELSE 0 END),
+					COALESCE(SUM(p.duration), 0), COALESCE(SUM(f.usedLength), 0), COALESCE(SUM(f.usedWeight), 0), COALESCE(SUM(c.totalCosts), 0),
+					COALESCE(SUM(CASE WHEN p.printStatusResult = 'success' THEN p.duration END), 0),
+					COALESCE(SUM(CASE WHEN p.printStatusResult = 'success' THEN f.usedLength END), 0),
+					COALESCE(SUM(CASE WHEN p.printStatusResult = 'success' THEN f.usedWeight END), 0)
+				FROM pjh_printjobmodel p
+					LEFT JOIN pjh_filamentmodel f ON f.printJob_id = p.databaseId AND f.toolId = 'total'
+					LEFT JOIN pjh_costmodel c ON c.printJob_id = p.databaseId
+				WHERE p.databaseId > {fromId} AND p.databaseId <= {toId}
+				GROUP BY 2
+				ON CONFLICT (filePathName) DO UPDATE SET
+					jobCount = jobCount + excluded.jobCount, successCount = successCount + excluded.successCount,
+					duration = duration + excluded.duration, usedLength = usedLength + excluded.usedLength,
+					usedWeight = usedWeight + excluded.usedWeight, totalCosts = totalCosts + excluded.totalCosts,
+					successDuration = successDuration + excluded.successDuration, successUsedLength = successUsedLength + excluded.successUsedLength,
+					successUsedWeight = successUsedWeight + excluded.successUsedWeight;
+			""")])
+
+	def _upgradeFrom17To18(self):
+		# What is changed:
+		# - NEW SlicerSettingsBlobModel, each slicer settings text once, keyed by the SHA-256 hash of the text
+		# - PrintJobTextModel: REMOVED slicerSettingsAsText, NEW slicerSettingsHash (table rebuild). The texts are
+		#   deduplicated chunk by chunk, the stored (maybe compressed) value is copied as it is.
+		# - full-text search index reads the slicer settings over the hash
+		searchIndexSql = ""
+		tokenizer = _evalSearchIndexTokenizer()
+		if (tokenizer != None):
+			searchIndexSql = ";\n".join(_buildSearchIndexSql(tokenizer, 18)) + ";"
+		return MigrationStep(18,
+			prepareSql=";\n".join(_buildDropSearchIndexSql()) + """;
+
+			CREATE TABLE "pjh_slicersettingsblobmodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+														"created" DATETIME NOT NULL,
+														"contentHash" VARCHAR(255) NOT NULL,
+														"slicerSettingsAsText" TEXT NOT NULL);
+			CREATE UNIQUE INDEX "slicersettingsblobmodel_contentHash" ON "pjh_slicersettingsblobmodel" ("contentHash");
+			CREATE TABLE "pjh_printjobtextmodel_new" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+													  "created" DATETIME NOT NULL,
+													  "printJob_id" INTEGER,
+													  "noteDeltaFormat" TEXT,
+													  "slicerSettingsHash" VARCHAR(255),
+													  "technicalLog" TEXT,
+													  FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE);
+			""",
+			batchSql=[("pjh_printjobtextmodel", """
+			INSERT INTO 'pjh_printjobtextmodel_new' (databaseId, created, printJob_id, noteDeltaFormat, slicerSettingsHash, technicalLog)
+				SELECT databaseId, created, printJob_id, noteDeltaFormat, """ + TextCompression.SQL_CONTENT_HASH_FUNCTION_NAME + """(slicerSettingsAsText), technicalLog
+				FROM 'pjh_printjobtextmodel' WHERE databaseId > {fromId} AND databaseId <= {toId};
+			"""), ("pjh_printjobtextmodel", """
+			INSERT OR IGNORE INTO 'pjh_slicersettingsblobmodel' (created, contentHash, slicerSettingsAsText)
+				SELECT o.created, n.slicerSettingsHash, o.slicerSettingsAsText
+				FROM 'pjh_printjobtextmodel' o JOIN 'pjh_printjobtextmodel_new' n ON n.databaseId = o.databaseId
+				WHERE n.slicerSettingsHash IS NOT NULL AND o.databaseId > {fromId} AND o.databaseId <= {toId};
+			""")],
+			finishSql="""
+			DROP TABLE 'pjh_printjobtextmodel';
+			ALTER TABLE 'pjh_printjobtextmodel_new' RENAME TO 'pjh_printjobtextmodel';
+			CREATE UNIQUE INDEX "printjobtextmodel_printJob_id" ON "pjh_printjobtextmodel" ("printJob_id");
+			CREATE INDEX "printjobtextmodel_slicerSettingsHash" ON "pjh_printjobtextmodel" ("slicerSettingsHash");
+			""" + searchIndexSql)
+
+	def _upgradeFrom16To17(self):
+		# What is changed:
+		# - NEW SlicerSettingKeyModel and SlicerSettingValueModel, the parsed slicer settings of each job. The jobs
+		#   of the older releases are parsed after the startup, see parseStoredSlicerSettings
+		return MigrationStep(17,
+			prepareSql="""
+			CREATE TABLE "pjh_slicersettingkeymodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+													  "created" DATETIME NOT NULL,
+													  "key" VARCHAR(255) NOT NULL);
+			CREATE UNIQUE INDEX "slicersettingkeymodel_key" ON "pjh_slicersettingkeymodel" ("key");
+			CREATE TABLE "pjh_slicersettingvaluemodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+														"created" DATETIME NOT NULL,
+														"printJob_id" INTEGER NOT NULL,
+														"settingKey_id" INTEGER NOT NULL,
+														"valueType" VARCHAR(255) NOT NULL,
+														"numberValue" REAL,
+														"textValue" TEXT,
+														FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE,
+														FOREIGN KEY ("settingKey_id") REFERENCES "pjh_slicersettingkeymodel" ("databaseId") ON DELETE CASCADE);
+			CREATE UNIQUE INDEX "slicersettingvaluemodel_printJob_id_settingKey_id" ON "pjh_slicersettingvaluemodel" ("printJob_id", "settingKey_id");
+			CREATE INDEX "slicersettingvaluemodel_settingKey_id_numberValue" ON "pjh_slicersettingvaluemodel" ("settingKey_id", "numberValue");
+			CREATE INDEX "slicersettingvaluemodel_settingKey_id_textValue" ON "pjh_slicersettingvaluemodel" ("settingKey_id", "textValue");
+			""")
+
+	def _upgradeFrom15To16(self):
+		# What is changed:
+		# - PrintJobTextModel: slicerSettingsAsText and technicalLog compressed (BLOB in the TEXT column), the existing
+		#   rows are compressed after the startup in small batches, see compressPrintJobTexts
+		# - full-text search index reads the slicer settings with pjh_text()
+		searchIndexSql = ""
+		tokenizer = _evalSearchIndexTokenizer()
+		if (tokenizer != None):
+			searchIndexSql = ";\n".join(_buildSearchIndexSql(tokenizer, 16)) + ";"
+		return MigrationStep(16, finishSql=searchIndexSql)
+
+	def _upgradeFrom14To15(self):
+		# What is changed:
+		# - TemperatureModel: sensorValue REAL instead of VARCHAR ('-' and other not numeric values -> NULL),
+		#   sensorName trimmed and in lower case (see TemperatureModel.normalizeSensorName), index for the sensor filter/analytics
+		temperatureIndexSql = ";\n".join([indexSql for indexSql in DATABASE_INDEXES_SQL if "pjh_temperaturemodel" in indexSql]) + ";"
+		return MigrationStep(15,
+			prepareSql="""
+			CREATE TABLE "pjh_temperaturemodel_new" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+													 "created" DATETIME NOT NULL,
+													 "printJob_id" INTEGER NOT NULL,
+													 "sensorName" VARCHAR(255) NOT NULL,
+													 "sensorValue" REAL,
+													 FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE);
+			""",
+			batchSql=[("pjh_temperaturemodel", """
+			INSERT INTO 'pjh_temperaturemodel_new' (databaseId, created, printJob_id, sensorName, sensorValue)
+				SELECT databaseId, created, printJob_id, lower(trim(sensorName)),
+					CASE WHEN trim(sensorValue) GLOB '*[0-9]*' AND trim(sensorValue) NOT GLOB '*[^0-9.+-]*' THEN CAST(trim(sensorValue) AS REAL) END
+				FROM 'pjh_temperaturemodel' WHERE databaseId > {fromId} AND databaseId <= {toId};
+			""")],
+			finishSql="""
+			DROP TABLE 'pjh_temperaturemodel';
+			ALTER TABLE 'pjh_temperaturemodel_new' RENAME TO 'pjh_temperaturemodel';
+			""" + temperatureIndexSql)
+
+	def _upgradeFrom13To14(self):
+		# What is changed:
+		# - NEW DailyRollupModel, filled with all existing print jobs (chunks are added up with an upsert)
+		return MigrationStep(14,
+			prepareSql="""
+			CREATE TABLE "pjh_dailyrollupmodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+												 "created" DATETIME NOT NULL,
+												 "day" DATE NOT NULL,
+												 "printStatusResult" VARCHAR(255) NOT NULL,
+												 "material" VARCHAR(255) NOT NULL,
+												 "spoolName" VARCHAR(255) NOT NULL,
+												 "jobCount" INTEGER NOT NULL,
+												 "duration" INTEGER NOT NULL,
+												 "usedLength" REAL NOT NULL,
+												 "usedWeight" REAL NOT NULL,
+												 "filamentCost" REAL NOT NULL,
+												 "totalCosts" REAL NOT NULL);
+			CREATE UNIQUE INDEX "dailyrollupmodel_day_printStatusResult_material_spoolName" ON "pjh_dailyrollupmodel" ("day", "printStatusResult", "material", "spoolName");
+			""",
+			batchSql=[("pjh_printjobmodel", """
+			INSERT INTO pjh_dailyrollupmodel (created, day, printStatusResult, material, spoolName, jobCount, duration, usedLength, usedWeight, filamentCost, totalCosts)
+				SELECT datetime('now', 'localtime'), date(p.printStartDateTime), COALESCE(p.printStatusResult, ''), COALESCE(f.material, ''), COALESCE(f.spoolName, ''),
+					COUNT(*), COALESCE(SUM(p.duration), 0), COALESCE(SUM(f.usedLength), 0), COALESCE(SUM(f.usedWeight), 0),
+					COALESCE(SUM(f.usedCost), 0), COALESCE(SUM(c.totalCosts), 0)
+				FROM pjh_printjobmodel p
+					LEFT JOIN pjh_filamentmodel f ON f.printJob_id = p.databaseId AND f.toolId = 'total'
+					LEFT JOIN pjh_costmodel c ON c.printJob_id = p.databaseId
+				WHERE p.printStartDateTime IS NOT NULL AND p.databaseId > {fromId} AND p.databaseId <= {toId}
+				GROUP BY 2, 3, 4, 5
+				ON CONFLICT (day, printStatusResult, material, spoolName) DO UPDATE SET
+					jobCount = jobCount + excluded.jobCount, duration = duration + excluded.duration,
+					usedLength = usedLength + excluded.usedLength, usedWeight = usedWeight + excluded.usedWeight,
+					filamentCost = filamentCost + excluded.filamentCost, totalCosts = totalCosts + excluded.totalCosts;
+			""")])
+
+	def _upgradeFrom12To13(self):
+		# What is changed:
+		# - NEW PrintJobTextModel with noteDeltaFormat, slicerSettingsAsText, technicalLog
+		# - PrintJobModel: REMOVED noteDeltaFormat, slicerSettingsAsText, technicalLog (table rebuild, DROP COLUMN needs SQLite 3.35)
+		# - full-text search index reads the slicer settings from the text table
+
+		searchIndexSql = ""
+		tokenizer = _evalSearchIndexTokenizer()
+		if (tokenizer != None):
+			searchIndexSql = ";\n".join(_buildSearchIndexSql(tokenizer, 13)) + ";"
+		printJobIndexSql = ";\n".join([indexSql for indexSql in DATABASE_INDEXES_SQL if "pjh_printjobmodel" in indexSql]) + ";"
+		printJobColumns = "databaseId, created, userName, fileOrigin, fileName, filePathName, fileSize, printStartDateTime, printEndDateTime, duration, printStatusResult, noteText, noteHtml, printedLayers, printedHeight"
+
+		return MigrationStep(13,
+			prepareSql=";\n".join(_buildDropSearchIndexSql()) + """;
+
+			CREATE TABLE "pjh_printjobtextmodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+												  "created" DATETIME NOT NULL,
+												  "printJob_id" INTEGER,
+												  "noteDeltaFormat" TEXT,
+												  "slicerSettingsAsText" TEXT,
+												  "technicalLog" TEXT,
+												  FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE);
+			CREATE UNIQUE INDEX "printjobtextmodel_printJob_id" ON "pjh_printjobtextmodel" ("printJob_id");
+
+			CREATE TABLE "pjh_printjobmodel_new" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
+												  "created" DATETIME NOT NULL,
+												  "userName" VARCHAR(255),
+												  "fileOrigin" VARCHAR(255),
+												  "fileName" VARCHAR(255),
+												  "filePathName" VARCHAR(255),
+												  "fileSize" INTEGER,
+												  "printStartDateTime" DATETIME,
+												  "printEndDateTime" DATETIME,
+												  "duration" INTEGER,
+												  "printStatusResult" VARCHAR(255),
+												  "noteText" VARCHAR(255),
+												  "noteHtml" VARCHAR(255),
+												  "printedLayers" VARCHAR(255),
+												  "printedHeight" VARCHAR(255));
+			""",
+			batchSql=[("pjh_printjobmodel", """
+			INSERT INTO 'pjh_printjobtextmodel' (created, printJob_id, noteDeltaFormat, slicerSettingsAsText, technicalLog)
+				SELECT created, databaseId, noteDeltaFormat, slicerSettingsAsText, technicalLog FROM 'pjh_printjobmodel'
+				WHERE (noteDeltaFormat IS NOT NULL OR slicerSettingsAsText IS NOT NULL OR technicalLog IS NOT NULL)
+					AND databaseId > {fromId} AND databaseId <= {toId};
+			"""), ("pjh_printjobmodel", """
+			INSERT INTO 'pjh_printjobmodel_new' (""" + printJobColumns + """)
+				SELECT """ + printJobColumns + """ FROM 'pjh_printjobmodel' WHERE databaseId > {fromId} AND databaseId <= {toId};
+			""")],
+			finishSql="""
+			DROP TABLE 'pjh_printjobmodel';
+			ALTER TABLE 'pjh_printjobmodel_new' RENAME TO 'pjh_printjobmodel';
+			""" + printJobIndexSql + """
+
+			""" + searchIndexSql)
+
+	def _upgradeFrom11To12(self):
+		# What is changed:
+		# - NEW full-text search index (FTS5) over fileName, noteText, slicerSettingsAsText
+
+		searchIndexSql = ""
+		tokenizer = _evalSearchIndexTokenizer()
+		if (tokenizer != None):
+			# V12 layout, the index content was the printjob table itself (changed in V13)
+			searchIndexSql = """
+			DROP TABLE IF EXISTS pjh_printjobsearch;
+			CREATE VIRTUAL TABLE pjh_printjobsearch USING fts5(fileName, noteText, slicerSettingsAsText, content='pjh_printjobmodel', content_rowid='databaseId', tokenize='""" + tokenizer + """');
+			CREATE TRIGGER IF NOT EXISTS pjh_printjobmodel_search_insert AFTER INSERT ON pjh_printjobmodel BEGIN
+				INSERT INTO pjh_printjobsearch(rowid, fileName, noteText, slicerSettingsAsText) VALUES (new.databaseId, new.fileName, new.noteText, new.slicerSettingsAsText);
+			END;
+			CREATE TRIGGER IF NOT EXISTS pjh_printjobmodel_search_delete AFTER DELETE ON pjh_printjobmodel BEGIN
+				INSERT INTO pjh_printjobsearch(pjh_printjobsearch, rowid, fileName, noteText, slicerSettingsAsText) VALUES ('delete', old.databaseId, old.fileName, old.noteText, old.slicerSettingsAsText);
+			END;
+			CREATE TRIGGER IF NOT EXISTS pjh_printjobmodel_search_update AFTER UPDATE ON pjh_printjobmodel BEGIN
+				INSERT INTO pjh_printjobsearch(pjh_printjobsearch, rowid, fileName, noteText, slicerSettingsAsText) VALUES ('delete', old.databaseId, old.fileName, old.noteText, old.slicerSettingsAsText);
+				INSERT INTO pjh_printjobsearch(rowid, fileName, noteText, slicerSettingsAsText) VALUES (new.databaseId, new.fileName, new.noteText, new.slicerSettingsAsText);
+			END;
+			INSERT INTO pjh_printjobsearch(pjh_printjobsearch) VALUES ('rebuild');
+			"""
+		else:
+			self._logger.warning(" FTS5 not available in this SQLite build, search is done without the full-text index")
+
+		return MigrationStep(12, finishSql=searchIndexSql)
+
+	def _upgradeFrom10To11(self):
+		# What is changed:
+		# - Indexes for all filter, sort and foreign-key columns, see DATABASE_INDEXES_SQL
+		# - PrintJobModel: printStartDateTime/printEndDateTime without fractional seconds, so all dates have the same
+		#   ISO-format 'YYYY-MM-DD HH:MM:SS' and the date-index could be used for range-scans
+		return MigrationStep(11,
+			batchSql=[("pjh_printjobmodel", """
+			UPDATE 'pjh_printjobmodel' SET printStartDateTime = strftime('%Y-%m-%d %H:%M:%S', printStartDateTime)
+				WHERE printStartDateTime LIKE '%.%' AND strftime('%Y-%m-%d %H:%M:%S', printStartDateTime) IS NOT NULL AND databaseId > {fromId} AND databaseId <= {toId};
+			UPDATE 'pjh_printjobmodel' SET printEndDateTime = strftime('%Y-%m-%d %H:%M:%S', printEndDateTime)
+				WHERE printEndDateTime LIKE '%.%' AND strftime('%Y-%m-%d %H:%M:%S', printEndDateTime) IS NOT NULL AND databaseId > {fromId} AND databaseId <= {toId};
+			""")],
+			finishSql=";\n".join(DATABASE_INDEXES_SQL) + ";")
 
 	def _upgradeFrom9To10(self):
-		self._logger.info(" Starting 9 -> 10")
-		self._logger.info(" Successfully 9 -> 10")
-		pass
+		return MigrationStep(10)
 
 	def _upgradeFrom8To9(self):
-		self._logger.info(" Starting 8 -> 9")
-		self._logger.info(" Successfully 8 -> 9")
-		pass
+		return MigrationStep(9)
 
 	def _upgradeFrom7To8(self):
-		self._logger.info(" Starting 7 -> 8")
 		# What is changed:
 		# - PrintJobModel:
 		# 	- Add Column: technicalLog
-
-		connection = sqlite3.connect(self._databaseFileLocation)
-		cursor = connection.cursor()
-
-		sql = """
-		PRAGMA foreign_keys=off;
-		BEGIN TRANSACTION;
-
+		return MigrationStep(8, finishSql="""
 			ALTER TABLE 'pjh_printjobmodel' ADD 'technicalLog' TEXT;
-
-				UPDATE 'pjh_pluginmetadatamodel' SET value=8 WHERE key='databaseSchemeVersion';
-		COMMIT;
-		PRAGMA foreign_keys=on;
-		"""
-		cursor.executescript(sql)
-
-		connection.close()
-
-		self._logger.info(" Successfully 7 -> 8")
-		pass
+			""")
 
 	def _upgradeFrom6To7(self):
-		self._logger.info(" Starting 6 -> 7")
-
-		connection = sqlite3.connect(self._databaseFileLocation)
-		cursor = connection.cursor()
-
 		## Changeset
 		# - NEW CostModel
 		# - Droping costUnit, because now there is a general plugin-setting
 
 		# 			ALTER TABLE "pjh_filamentmodel" DROP COLUMN "spoolCostUnit"; Not working for DB Release < 3.30.0 (offical 3.35.0)
-		sql = """
-		PRAGMA foreign_keys=off;
-		BEGIN TRANSACTION;
-
+		return MigrationStep(7, finishSql="""
 			CREATE TABLE "pjh_costmodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY,
 			"created" DATETIME NOT NULL,
 			"printJob_id" INTEGER NOT NULL,
@@ -153,49 +741,17 @@ class DatabaseManager(object):
 			"otherCost" REAL,
 			"withDefaultSpoolValues" INTEGER,
 			FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE);
-
-			UPDATE 'pjh_pluginmetadatamodel' SET value=7 WHERE key='databaseSchemeVersion';
-		COMMIT;
-		PRAGMA foreign_keys=on;
-		"""
-		cursor.executescript(sql)
-
-		connection.close()
-
-		self._logger.info(" Successfully 6 -> 7")
-		pass
+			""")
 
 	def _upgradeFrom5To6(self):
-		self._logger.info(" Starting 5 -> 6")
 		# What is changed:
-		# - FilamentModel:
-		# 	- renameing:
-		# 		profileVendor -> vendor
-		# 		spoolWeight -> weight
-		#   (ALTER TABLE spo_spoolmodel RENAME COLUMN encloserTemperature to enclosureTemperature; not working SQLite did not support the ALTER TABLE RENAME COLUMN syntax before version 3.25.0.
-		# 	see https://www.sqlitetutorial.net/sqlite-rename-column/#:~:text=SQLite%20did%20not%20support%20the,the%20version%20lower%20than%203.25.)
-
-		connection = sqlite3.connect(self._databaseFileLocation)
-		cursor = connection.cursor()
-
-		sql = """
-		PRAGMA foreign_keys=off;
-		BEGIN TRANSACTION;
-
-			UPDATE 'pjh_filamentmodel' SET toolId='total' where toolId is NULL;
-
-			UPDATE 'pjh_pluginmetadatamodel' SET value=6 WHERE key='databaseSchemeVersion';
-		COMMIT;
-		PRAGMA foreign_keys=on;
-		"""
-		cursor.executescript(sql)
-
-		connection.close()
-		self._logger.info(" Successfully 5 -> 6")
-		pass
+		# - FilamentModel: toolId 'total' for the old values without toolId
+		return MigrationStep(6,
+			batchSql=[("pjh_filamentmodel", """
+			UPDATE 'pjh_filamentmodel' SET toolId='total' where toolId is NULL AND databaseId > {fromId} AND databaseId <= {toId};
+			""")])
 
 	def _upgradeFrom4To5(self):
-		self._logger.info(" Starting 4 -> 5")
 		# What is changed:
 		# - FilamentModel:
 		# 	- renameing:
@@ -203,14 +759,8 @@ class DatabaseManager(object):
 		# 		spoolWeight -> weight
 		#   (ALTER TABLE spo_spoolmodel RENAME COLUMN encloserTemperature to enclosureTemperature; not working SQLite did not support the ALTER TABLE RENAME COLUMN syntax before version 3.25.0.
 		# 	see https://www.sqlitetutorial.net/sqlite-rename-column/#:~:text=SQLite%20did%20not%20support%20the,the%20version%20lower%20than%203.25.)
-
-		connection = sqlite3.connect(self._databaseFileLocation)
-		cursor = connection.cursor()
-
-		sql = """
-		PRAGMA foreign_keys=off;
-		BEGIN TRANSACTION;
-
+		return MigrationStep(5,
+			prepareSql="""
 			ALTER TABLE 'pjh_filamentmodel' RENAME TO 'pjh_filamentmodel_old';
 
 			CREATE TABLE "pjh_filamentmodel" (
@@ -231,87 +781,43 @@ class DatabaseManager(object):
 				"usedCost" REAL,
 				'toolId' VARCHAR(255),
 				FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE);
-
+			""",
+			batchSql=[("pjh_filamentmodel_old", """
 			INSERT INTO 'pjh_filamentmodel'
 			(databaseId, created, printJob_id, vendor, diameter, density, material, spoolName, spoolCost, spoolCostUnit, weight, usedLength, calculatedLength, usedWeight, usedCost, toolId)
 			 SELECT databaseId, created, printJob_id, profileVendor, diameter, density, material, spoolName, spoolCost, spoolCostUnit, spoolWeight, usedLength, calculatedLength, usedWeight, usedCost, toolId
-			 FROM 'pjh_filamentmodel_old';
-
+			 FROM 'pjh_filamentmodel_old' WHERE databaseId > {fromId} AND databaseId <= {toId};
+			""")],
+			finishSql="""
 			DROP TABLE 'pjh_filamentmodel_old';
-
-			UPDATE 'pjh_pluginmetadatamodel' SET value=5 WHERE key='databaseSchemeVersion';
-		COMMIT;
-		PRAGMA foreign_keys=on;
-		"""
-		cursor.executescript(sql)
-
-		connection.close()
-		self._logger.info(" Successfully 4 -> 5")
-		pass
+			""")
 
 	def _upgradeFrom3To4(self):
-		self._logger.info(" Starting 3 -> 4")
 		# What is changed:
 		# - FilamentModel:
 		# 	- add toolId = CharField(null=True) # since V4	--> old values must be total, because no information about single tool
-
-		connection = sqlite3.connect(self._databaseFileLocation)
-		cursor = connection.cursor()
-
-		sql = """
-		PRAGMA foreign_keys=off;
-		BEGIN TRANSACTION;
-
+		return MigrationStep(4,
+			prepareSql="""
 			ALTER TABLE 'pjh_filamentmodel' ADD 'toolId' VARCHAR(255);
-			UPDATE 'pjh_filamentmodel' SET toolId='total';
-
-			UPDATE 'pjh_pluginmetadatamodel' SET value=4 WHERE key='databaseSchemeVersion';
-		COMMIT;
-		PRAGMA foreign_keys=on;
-		"""
-		cursor.executescript(sql)
-
-		connection.close()
-		self._logger.info(" Successfully 3 -> 4")
-		pass
+			""",
+			batchSql=[("pjh_filamentmodel", """
+			UPDATE 'pjh_filamentmodel' SET toolId='total' WHERE databaseId > {fromId} AND databaseId <= {toId};
+			""")])
 
 	def _upgradeFrom2To3(self):
-		self._logger.info(" Starting 2 -> 3")
 		# What is changed:
 		# - PrintJobModel:
 		# 	- Add Column: slicerSettingsAsText
-
-		connection = sqlite3.connect(self._databaseFileLocation)
-		cursor = connection.cursor()
-
-		sql = """
-		PRAGMA foreign_keys=off;
-		BEGIN TRANSACTION;
-
+		return MigrationStep(3, finishSql="""
 			ALTER TABLE 'pjh_printjobmodel' ADD 'slicerSettingsAsText' TEXT;
-
-				UPDATE 'pjh_pluginmetadatamodel' SET value=3 WHERE key='databaseSchemeVersion';
-		COMMIT;
-		PRAGMA foreign_keys=on;
-		"""
-		cursor.executescript(sql)
-
-		connection.close()
-		self._logger.info(" Successfully 2 -> 3")
-		pass
+			""")
 
 	def _upgradeFrom1To2(self):
-		self._logger.info(" Starting 1 -> 2")
 		# What is changed:
 		# - PrintJobModel: Add Column fileOrigin
 		# - FilamentModel: Several ColumnTypes were wrong
-		connection = sqlite3.connect(self._databaseFileLocation)
-		cursor = connection.cursor()
-
-		sql = """
-		PRAGMA foreign_keys=off;
-		BEGIN TRANSACTION;
-
+		return MigrationStep(2,
+			prepareSql="""
 			ALTER TABLE 'pjh_printjobmodel' ADD 'fileOrigin' VARCHAR(255);
 
 			ALTER TABLE 'pjh_filamentmodel' RENAME TO 'pjh_filamentmodel_old';
@@ -332,28 +838,32 @@ class DatabaseManager(object):
 				"usedWeight" REAL,
 				"usedCost" REAL,
 				FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE);
-
-				INSERT INTO 'pjh_filamentmodel' (databaseId, created, printJob_id, profileVendor, diameter, density, material, spoolName, spoolCost, spoolCostUnit, spoolWeight, usedLength, calculatedLength, usedWeight, usedCost)
-				  SELECT databaseId, created, printJob_id, profileVendor, diameter, density, material, spoolName, spoolCost, spoolCostUnit, spoolWeight, usedLength, calculatedLength, usedWeight, usedCost
-				  FROM 'pjh_filamentmodel_old';
-
-				DROP TABLE 'pjh_filamentmodel_old';
-
-				UPDATE 'pjh_pluginmetadatamodel' SET value=2 WHERE key='databaseSchemeVersion';
-		COMMIT;
-		PRAGMA foreign_keys=on;
-		"""
-		cursor.executescript(sql)
-
-		connection.close()
-		pass
+			""",
+			batchSql=[("pjh_filamentmodel_old", """
+			INSERT INTO 'pjh_filamentmodel' (databaseId, created, printJob_id, profileVendor, diameter, density, material, spoolName, spoolCost, spoolCostUnit, spoolWeight, usedLength, calculatedLength, usedWeight, usedCost)
+			  SELECT databaseId, created, printJob_id, profileVendor, diameter, density, material, spoolName, spoolCost, spoolCostUnit, spoolWeight, usedLength, calculatedLength, usedWeight, usedCost
+			  FROM 'pjh_filamentmodel_old' WHERE databaseId > {fromId} AND databaseId <= {toId};
+			""")],
+			finishSql="""
+			DROP TABLE 'pjh_filamentmodel_old';
+			""")
 
 
 
 	def _createDatabaseTables(self):
 		self._database.connect(reuse_if_open=True)
+		if (self._isPostgres() == False):
+			for dropSql in _buildDropSearchIndexSql():
+				self._database.execute_sql(dropSql)
 		self._database.drop_tables(MODELS)
 		self._database.create_tables(MODELS)
+		for indexSql in DATABASE_INDEXES_SQL:
+			self._database.execute_sql(indexSql)
+		# full-text index only for sqlite, postgres searches with ILIKE
+		tokenizer = None if self._isPostgres() else _evalSearchIndexTokenizer()
+		if (tokenizer != None):
+			for searchIndexSql in _buildSearchIndexSql(tokenizer):
+				self._database.execute_sql(searchIndexSql)
 
 		PluginMetaDataModel.create(key=PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION, value=CURRENT_DATABASE_SCHEME_VERSION)
 		self._database.close()
@@ -385,7 +895,6 @@ class DatabaseManager(object):
 			)
 		else:
 			databaseToTest = SqliteDatabase(self._databaseFileLocation)
-		DatabaseManager.db = databaseToTest
 		databaseToTest.bind(MODELS)
 		# self._logger.info("Check if database-scheme upgrade needed.")
 		# self._createOrUpgradeSchemeIfNecessary()
@@ -403,7 +912,7 @@ class DatabaseManager(object):
 				schemeVersionFromDatabaseModel = int(schemeVersionFromDatabaseModel.value)
 
 				# job count
-				jobCount = self.countPrintJobsByQuery({
+				jobCount = self._countPrintJobsByQuery({
 					"filterName" : "all"
 				})
 				pass
@@ -424,6 +933,10 @@ class DatabaseManager(object):
 			return {
 				"error": errorMessage
 			}
+		finally:
+			# the models must be used with the running database again
+			if (self._database != None):
+				self._database.bind(MODELS)
 
 		return {
 			"schemeVersion": schemeVersionFromDatabaseModel,
@@ -432,11 +945,21 @@ class DatabaseManager(object):
 
 
 	# datapasePath '/Users/o0632/Library/Application Support/OctoPrint/data/PrintJobHistory'
-	def initDatabase(self, databasePath, sendErrorMessageToClient):
+	# migrateInBackground: a needed scheme upgrade runs in its own thread, the progress is reported to the migrationStatusCallback
+	def initDatabase(self, databasePath, sendErrorMessageToClient, connectionSettings=None, migrationStatusCallback=None, migrateInBackground=False):
 		self._logger.info("Init DatabaseManager")
 		self.sendErrorMessageToClient = sendErrorMessageToClient
+		self._migrationStatusCallback = migrationStatusCallback
+		self._migrateInBackground = migrateInBackground
 		self._databasePath = databasePath
 		self._databaseFileLocation = os.path.join(databasePath, "printJobHistory.db")
+		self._connectionSettings = dict(DEFAULT_CONNECTION_SETTINGS)
+		if (connectionSettings != None):
+			for settingsKey, settingsValue in connectionSettings.items():
+				if (settingsValue != None):
+					self._connectionSettings[settingsKey] = settingsValue
+		# other OctoPrint instances write into a shared external database without a notice
+		self._queryCache = QueryResultCache(0 if self._isPostgres() else int(self._connectionSettings["queryCacheSize"]))
 
 		self._logger.info("Using database in: " + str(self._databaseFileLocation))
 
@@ -471,6 +994,10 @@ class DatabaseManager(object):
 
 
 	def backupDatabaseFile(self, backupFolder):
+		if (self._isPostgres()):
+			# the server is backed up with the tools of the server (pg_dump), there is no local file
+			self._logger.info("No backup file created, because the database is an external PostgreSQL database")
+			return None
 		now = datetime.datetime.now()
 		currentDate = now.strftime("%Y%m%d-%H%M")
 		currentSchemeVersion = "unknown"
@@ -483,15 +1010,44 @@ class DatabaseManager(object):
 		backupDatabaseFileName = "printJobHistory-backup-"+currentDate+"-V"+currentSchemeVersion +".db"
 		backupDatabaseFilePath = os.path.join(backupFolder, backupDatabaseFileName)
 		if not os.path.exists(backupDatabaseFilePath):
-			shutil.copy(self._databaseFileLocation, backupDatabaseFilePath)
+			self.createDatabaseBackup(backupDatabaseFilePath)
 			self._logger.info("Backup of printjobhistory database created '"+backupDatabaseFilePath+"'")
 		else:
 			self._logger.warning("Backup of printjobhistory database ('" + backupDatabaseFilePath + "') is already present. No backup created.")
 		return backupDatabaseFilePath
 
 
+	# Consistent copy of the running database with the SQLite online backup API (also the content of the
+	# write-ahead-log). The pages are copied in small steps, the database is only locked during a step, so the other
+	# threads could still write. A write in between restarts the copy, the result is always a snapshot.
+	def createDatabaseBackup(self, backupFilePath):
+		sourceConnection = sqlite3.connect(self._databaseFileLocation, timeout=int(self._connectionSettings["busyTimeout"]) / 1000.0)
+		backupConnection = sqlite3.connect(backupFilePath)
+		try:
+			sourceConnection.backup(backupConnection, pages=BACKUP_PAGES_PER_STEP, progress=self._pauseAfterBackupStep)
+			# single file without -wal/-shm, e.g. for the download
+			backupConnection.execute("PRAGMA journal_mode=DELETE")
+		finally:
+			backupConnection.close()
+			sourceConnection.close()
+		return backupFilePath
+
+	def _pauseAfterBackupStep(self, status, remainingPages, totalPages):
+		time.sleep(BACKUP_STEP_PAUSE)
+
 	def _createDatabase(self, forceCreateTables):
-		self._database = SqliteDatabase(self._databaseFileLocation, check_same_thread=False)
+		if (self._database != None):
+			self._database.close()
+		if (self._isPostgres()):
+			self._database = self._createPostgresDatabase()
+		else:
+			self._database = RetryingSqliteDatabase(self._databaseFileLocation,
+													busyRetries=int(self._connectionSettings["busyRetries"]),
+													check_same_thread=False,
+													timeout=int(self._connectionSettings["busyTimeout"]) / 1000.0,
+													pragmas=self._buildConnectionPragmas())
+			# registered for each new (per thread) connection, used by the full-text index triggers and the search
+			self._database.register_function(TextCompression.decompressText, TextCompression.SQL_TEXT_FUNCTION_NAME, 1, deterministic=True)
 		DatabaseManager.db = self._database
 		self._database.bind(MODELS)
 
@@ -502,19 +1058,718 @@ class DatabaseManager(object):
 			# check, if we need an scheme upgrade
 			self._logger.info("Check if database-scheme upgrade needed.")
 			self._createOrUpgradeSchemeIfNecessary()
+		self._searchIndexTokenizer = self._readSearchIndexTokenizer()
+		self._queryCache.invalidate()
 		self._logger.info("Done DatabaseManager.createDatabase")
 
+	# Every thread (flask requests, event-, csv-import-thread) gets its own connection out of the pool, a closed
+	# connection goes back into the pool instead of a new login for each statement
+	def _createPostgresDatabase(self):
+		try:
+			from playhouse.pool import PooledPostgresqlDatabase
+			import psycopg2
+		except ImportError as e:
+			self._logger.error("PostgreSQL selected, but the driver is not installed (pip install psycopg2-binary):" + str(e))
+			raise
+		self._logger.info("Using PostgreSQL database '" + str(self._connectionSettings["databaseName"]) + "' on '" + str(self._connectionSettings["host"]) + ":" + str(self._connectionSettings["port"]) + "'")
+		return PooledPostgresqlDatabase(self._connectionSettings["databaseName"],
+										max_connections=int(self._connectionSettings["maxConnections"]),
+										stale_timeout=int(self._connectionSettings["staleTimeout"]),
+										timeout=int(self._connectionSettings["busyTimeout"]) / 1000.0,
+										user=self._connectionSettings["user"],
+										password=self._connectionSettings["password"],
+										host=self._connectionSettings["host"],
+										port=int(self._connectionSettings["port"]))
+
+	def _isPostgres(self):
+		return str(self._connectionSettings["databaseType"]).lower() == DATABASE_TYPE_POSTGRES
+
+	def _readSearchIndexTokenizer(self):
+		if (self._isPostgres()):
+			return None
+		try:
+			cursor = self._database.execute_sql("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (SEARCH_INDEX_TABLE,))
+			row = cursor.fetchone()
+		except Exception as e:
+			self._logger.error("Could not read the search-index:" + str(e))
+			return None
+		if (row == None):
+			self._logger.info("No full-text search-index available, using LIKE for the search query")
+			return None
+		if ("trigram" in row[0]):
+			return "trigram"
+		return "unicode61"
+
+
+	# applied to every new (per thread) connection
+	def _buildConnectionPragmas(self):
+		pragmas = [
+			# only used for a new database, before the first table is created
+			("auto_vacuum", "incremental"),
+			("journal_mode", self._connectionSettings["journalMode"]),
+			("cache_size", -1 * int(self._connectionSettings["cacheSize"])),
+			("mmap_size", int(self._connectionSettings["mmapSize"]) * 1024 * 1024)
+		]
+		if (self._isWALJournalMode()):
+			# in WAL-Mode NORMAL is still safe against corruption, only the last commits could be lost on power failure
+			pragmas.append(("synchronous", "normal"))
+		return pragmas
+
+	def _isWALJournalMode(self):
+		return str(self._connectionSettings["journalMode"]).lower() == "wal"
+
+	# writes must acquire the write-lock at the beginning (and wait for it), a deferred transaction that
+	# reads first fails immediately, if an other thread has written in between
+	@contextlib.contextmanager
+	def _writeTransaction(self):
+		# e.g. print finished during the startup migration
+		if (self._migrationDoneEvent.wait(self._migrationWriteTimeout) == False):
+			raise DatabaseNotWritableError("Database migration is still running, please try again later")
+		if (self._migrationFailed):
+			raise DatabaseNotWritableError("Database migration failed, no changes are stored. See OctoPrint.log for details!")
+		if (self._isPostgres()):
+			# row-level locking, the rollup rows are serialized by the upsert
+			transactionContext = self._database.atomic()
+		else:
+			transactionContext = self._database.atomic(lock_type="IMMEDIATE")
+		try:
+			with transactionContext as transaction:
+				yield transaction
+		finally:
+			# after the commit, the cached results of the previous generation are never used again
+			self._queryCache.invalidate()
+
+	# the same query with another parameter order or without the default values gets the same key
+	def _buildQueryCacheKey(self, queryName, tableQuery, allQueryKeys):
+		keyValues = [queryName]
+		for queryKey in allQueryKeys:
+			queryValue = tableQuery.get(queryKey, TABLE_QUERY_DEFAULTS.get(queryKey))
+			keyValues.append("" if queryValue == None else str(queryValue))
+		return tuple(keyValues)
+
+	# every caller gets its own instances of a cached page, e.g. getTemperatureModels() appends to the model
+	def _copyPrintJobs(self, allPrintJobModels):
+		allPrintJobCopies = []
+		for printJobModel in allPrintJobModels:
+			printJobCopy = self._copyModel(printJobModel)
+			for relationName in PREFETCHED_RELATIONS:
+				if (relationName in printJobModel.__dict__):
+					setattr(printJobCopy, relationName, [self._copyModel(relationModel) for relationModel in printJobModel.__dict__[relationName]])
+			allPrintJobCopies.append(printJobCopy)
+		return allPrintJobCopies
+
+	def _copyModel(self, model):
+		modelCopy = type(model)()
+		modelCopy.__data__ = dict(model.__data__)
+		modelCopy._dirty = set()
+		return modelCopy
+
+	def _getArchiveFileLocation(self):
+		return os.path.join(self._databasePath, ARCHIVE_FILE_NAME)
+
+	def _isArchiveIncluded(self):
+		return getattr(self._archiveScopeState, "included", False)
+
+	# tableQuery "includeArchive": "true", only for the jobs of this printer
+	def _isArchiveRequested(self, tableQuery):
+		if (self._isArchiveIncluded() or self._isFarmDatabaseIncluded() or self.hasArchive() == False):
+			return False
+		includeArchive = tableQuery.get("includeArchive", False)
+		return includeArchive == True or str(includeArchive).lower() == "true"
+
+	def _attachArchive(self):
+		self._database.connect(reuse_if_open=True)
+		allDatabaseNames = [row[1] for row in self._database.execute_sql("PRAGMA database_list").fetchall()]
+		if (ARCHIVE_SCHEMA_NAME not in allDatabaseNames):
+			self._database.execute_sql("ATTACH DATABASE ? AS " + ARCHIVE_SCHEMA_NAME, (self._getArchiveFileLocation(),))
+
+	def _detachArchive(self):
+		try:
+			self._database.execute_sql("DETACH DATABASE " + ARCHIVE_SCHEMA_NAME)
+		except Exception as e:
+			self._logger.error("Could not detach the archive database:" + str(e))
+
+	def _buildColumnList(self, modelClass):
+		return ", ".join(['"' + field.column_name + '"' for field in modelClass._meta.sorted_fields])
+
+	# Executes the function with the archive attached to the connection of this thread. Temporary views with the names
+	# of the tables (temp is searched before main) return the rows of both files, so the queries of the table,
+	# statistics,... are used unchanged. The other threads still read only the main file.
+	def _runWithArchive(self, function, *args):
+		self._attachArchive()
+		try:
+			for modelClass in ARCHIVE_MODELS:
+				tableName = modelClass._meta.table_name
+				columns = self._buildColumnList(modelClass)
+				self._database.execute_sql('CREATE TEMP VIEW IF NOT EXISTS "' + tableName + '" AS ' +
+										   'SELECT ' + columns + ' FROM main."' + tableName + '" UNION ALL ' +
+										   'SELECT ' + columns + ' FROM ' + ARCHIVE_SCHEMA_NAME + '."' + tableName + '"')
+			self._archiveScopeState.included = True
+			return function(*args)
+		finally:
+			self._archiveScopeState.included = False
+			for modelClass in ARCHIVE_MODELS:
+				self._database.execute_sql('DROP VIEW IF EXISTS temp."' + modelClass._meta.table_name + '"')
+			self._detachArchive()
+
+	def _isFarmDatabaseIncluded(self):
+		return getattr(self._archiveScopeState, "farmSchemaName", None) != None
+
+	# Executes the function for this printer and then for each farm database. The farm databases are attached in
+	# batches to the connection of this thread, temporary views with the names of the tables (like the archive) point
+	# to one of them at a time. So the queries of the table, statistics,... are used unchanged and each database is
+	# read with its own indexes. A farm database which is missing, not readable or not of the current scheme version
+	# is skipped, the other printers are still returned.
+	# return: ([(printerName, result of the function)], allSkippedPrinterNames)
+	def _runForEachPrinter(self, function, *args):
+		allResults = [(self._localPrinterName, function(*args))]
+		allSkippedPrinterNames = []
+		if (self._isPostgres()):
+			# the printers of a farm share the external database
+			return (allResults, [farmDatabase["printerName"] for farmDatabase in self._farmDatabases])
+
+		allFarmDatabases = []
+		for farmDatabase in self._farmDatabases:
+			# ATTACH would create an empty file
+			if (os.path.isfile(farmDatabase["databaseFileLocation"])):
+				allFarmDatabases.append(farmDatabase)
+			else:
+				self._logger.warning("Farm database of printer '" + farmDatabase["printerName"] + "' not found '" + farmDatabase["databaseFileLocation"] + "', skipped")
+				allSkippedPrinterNames.append(farmDatabase["printerName"])
+
+		self._database.connect(reuse_if_open=True)
+		for farmDatabaseBatch in chunked(allFarmDatabases, FARM_ATTACH_BATCH_SIZE):
+			allAttachedDatabases = []
+			try:
+				for farmDatabase in farmDatabaseBatch:
+					schemaName = FARM_SCHEMA_PREFIX + str(len(allAttachedDatabases))
+					try:
+						self._database.execute_sql("ATTACH DATABASE ? AS " + schemaName, (farmDatabase["databaseFileLocation"],))
+						allAttachedDatabases.append((schemaName, farmDatabase))
+					except Exception as e:
+						self._logger.error("Could not attach the farm database of printer '" + farmDatabase["printerName"] + "', skipped:" + str(e))
+						allSkippedPrinterNames.append(farmDatabase["printerName"])
+				for schemaName, farmDatabase in allAttachedDatabases:
+					try:
+						allResults.append((farmDatabase["printerName"], self._runWithFarmDatabase(schemaName, function, *args)))
+					except Exception as e:
+						self._logger.error("Could not read the farm database of printer '" + farmDatabase["printerName"] + "', skipped:" + str(e))
+						allSkippedPrinterNames.append(farmDatabase["printerName"])
+			finally:
+				for schemaName, farmDatabase in allAttachedDatabases:
+					try:
+						self._database.execute_sql("DETACH DATABASE " + schemaName)
+					except Exception as e:
+						self._logger.error("Could not detach the farm database of printer '" + farmDatabase["printerName"] + "':" + str(e))
+		return (allResults, allSkippedPrinterNames)
+
+	def _runWithFarmDatabase(self, schemaName, function, *args):
+		schemeVersion = self._database.execute_sql("SELECT value FROM " + schemaName + ".pjh_pluginmetadatamodel WHERE key = ?",
+												   (PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION,)).fetchone()
+		if (schemeVersion == None or int(schemeVersion[0]) != CURRENT_DATABASE_SCHEME_VERSION):
+			# each printer migrates its own database
+			raise ValueError("Database scheme version " + str(None if schemeVersion == None else schemeVersion[0]) + ", expected " + str(CURRENT_DATABASE_SCHEME_VERSION))
+		try:
+			for modelClass in FARM_MODELS:
+				tableName = modelClass._meta.table_name
+				self._database.execute_sql('CREATE TEMP VIEW "' + tableName + '" AS SELECT ' + self._buildColumnList(modelClass) + ' FROM ' + schemaName + '."' + tableName + '"')
+			self._archiveScopeState.farmSchemaName = schemaName
+			return function(*args)
+		finally:
+			self._archiveScopeState.farmSchemaName = None
+			for modelClass in FARM_MODELS:
+				self._database.execute_sql('DROP VIEW IF EXISTS temp."' + modelClass._meta.table_name + '"')
+
+	# the table query for each printer, sorting like the cursor paging (always a sort column, the merge needs it)
+	def _buildFarmTableQuery(self, tableQuery, **queryValues):
+		farmTableQuery = dict([(queryKey, tableQuery.get(queryKey)) for queryKey in tableQuery.keys()])
+		farmTableQuery["sortColumn"] = "fileName" if tableQuery.get("sortColumn") == "fileName" else "printStartDateTime"
+		farmTableQuery["sortOrder"] = "asc" if tableQuery.get("sortOrder") == "asc" else "desc"
+		farmTableQuery.update(queryValues)
+		return farmTableQuery
+
+	# same order as the sorting of the table query by sqlite, NULL before all values
+	def _buildFarmSortKey(self, sortColumn):
+		if ("fileName" == sortColumn):
+			# same order as lower(fileName) of SQLite (only A-Z), otherwise the lists of the printers are not sorted by the key
+			return lambda printJobModel: (printJobModel.fileName != None, "" if printJobModel.fileName == None else StringUtils.asciiLower(printJobModel.fileName))
+		return lambda printJobModel: (printJobModel.printStartDateTime != None, printJobModel.printStartDateTime or datetime.datetime.min)
+
+	# k-way merge of the sorted job lists of the printers, each job gets the name of its printer
+	def _mergeFarmPrintJobs(self, allPrinterJobs, farmTableQuery):
+		allSortedJobLists = []
+		for printerName, allPrintJobModels in allPrinterJobs:
+			for printJobModel in allPrintJobModels:
+				printJobModel.printerName = printerName
+			allSortedJobLists.append(allPrintJobModels)
+		return heapq.merge(*allSortedJobLists, key=self._buildFarmSortKey(farmTableQuery["sortColumn"]), reverse=(farmTableQuery["sortOrder"] == "desc"))
+
+	def _loadAllPrintJobsByQuery(self, tableQuery):
+		if (self._isArchiveRequested(tableQuery)):
+			return self._runWithArchive(self._loadAllPrintJobsByQuery, tableQuery)
+		return list(self._prefetchRelations(self._addTableQueryToSelect(PrintJobModel.select(), tableQuery)))
+
+	# Tables and indexes with the DDL of the main file, the foreign keys reference the tables of the archive
+	def _createArchiveTablesIfNecessary(self):
+		allTableNames = [modelClass._meta.table_name for modelClass in ARCHIVE_MODELS + [PluginMetaDataModel]]
+		cursor = self._database.execute_sql("SELECT type, sql FROM main.sqlite_master WHERE type IN ('table', 'index') AND sql IS NOT NULL AND tbl_name IN (" +
+											", ".join(["?"] * len(allTableNames)) + ") ORDER BY type DESC", allTableNames)
+		for objectType, objectSql in cursor.fetchall():
+			if (objectType == "table"):
+				objectSql = re.sub(r'^CREATE TABLE (IF NOT EXISTS )?', 'CREATE TABLE IF NOT EXISTS ' + ARCHIVE_SCHEMA_NAME + '.', objectSql, flags=re.IGNORECASE)
+			else:
+				objectSql = re.sub(r'^CREATE (UNIQUE )?INDEX (IF NOT EXISTS )?', lambda match: 'CREATE ' + (match.group(1) or '') + 'INDEX IF NOT EXISTS ' + ARCHIVE_SCHEMA_NAME + '.', objectSql, flags=re.IGNORECASE)
+			self._database.execute_sql(objectSql)
+		self._database.execute_sql("INSERT INTO " + ARCHIVE_SCHEMA_NAME + ".pjh_pluginmetadatamodel (created, key, value) SELECT created, key, value FROM main.pjh_pluginmetadatamodel "
+								   "WHERE key = ? AND NOT EXISTS (SELECT 1 FROM " + ARCHIVE_SCHEMA_NAME + ".pjh_pluginmetadatamodel WHERE key = ?)",
+								   (PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION, PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION))
+
+	# Ids of the chunk which are already in the archive. The same job is a leftover of an interrupted run (the commit
+	# over two WAL-files is not atomic). An other job with the same id (e.g. main file recreated or restored) is never
+	# replaced, the move fails.
+	def _loadArchiveLeftoverIds(self, databaseIdChunk):
+		placeholders = ", ".join(["?"] * len(databaseIdChunk))
+		cursor = self._database.execute_sql('SELECT archiveJob."databaseId", '
+											'archiveJob."created" IS mainJob."created" AND archiveJob."printStartDateTime" IS mainJob."printStartDateTime" AND archiveJob."fileName" IS mainJob."fileName" '
+											'FROM ' + ARCHIVE_SCHEMA_NAME + '."pjh_printjobmodel" AS archiveJob '
+											'JOIN main."pjh_printjobmodel" AS mainJob ON mainJob."databaseId" = archiveJob."databaseId" '
+											'WHERE archiveJob."databaseId" IN (' + placeholders + ')', databaseIdChunk)
+		allLeftoverIds = []
+		allConflictingIds = []
+		for databaseId, isSameJob in cursor.fetchall():
+			(allLeftoverIds if isSameJob else allConflictingIds).append(databaseId)
+		if (len(allConflictingIds) > 0):
+			raise ValueError("DatabaseIds " + str(allConflictingIds) + " already used by other printJobs in the archive '" + self._getArchiveFileLocation() + "'")
+		return allLeftoverIds
+
+	def _moveToArchive(self, databaseIdChunk):
+		placeholders = ", ".join(["?"] * len(databaseIdChunk))
+		allContentHashes = self._loadSlicerSettingsHashes(databaseIdChunk)
+		allLeftoverIds = self._loadArchiveLeftoverIds(databaseIdChunk)
+		leftoverPlaceholders = ", ".join(["?"] * len(allLeftoverIds))
+		for modelClass in ARCHIVE_MODELS:
+			tableName = modelClass._meta.table_name
+			columns = self._buildColumnList(modelClass)
+			if (modelClass == SlicerSettingsBlobModel):
+				# a text could already be in the archive (other job with the same settings), new ids in the archive file
+				columns = ", ".join(['"' + field.column_name + '"' for field in modelClass._meta.sorted_fields if field.primary_key == False])
+				self._database.execute_sql('INSERT OR IGNORE INTO ' + ARCHIVE_SCHEMA_NAME + '."' + tableName + '" (' + columns + ') SELECT ' + columns + ' FROM main."' + tableName + '" '
+										   'WHERE "contentHash" IN (SELECT "slicerSettingsHash" FROM main."pjh_printjobtextmodel" WHERE "printJob_id" IN (' + placeholders + '))', databaseIdChunk)
+				continue
+			idColumn = "databaseId" if modelClass == PrintJobModel else "printJob_id"
+			# leftover of an interrupted run, the rows of the main file win
+			if (len(allLeftoverIds) > 0):
+				self._database.execute_sql('DELETE FROM ' + ARCHIVE_SCHEMA_NAME + '."' + tableName + '" WHERE "' + idColumn + '" IN (' + leftoverPlaceholders + ')', allLeftoverIds)
+			self._database.execute_sql('INSERT INTO ' + ARCHIVE_SCHEMA_NAME + '."' + tableName + '" (' + columns + ') SELECT ' + columns + ' FROM main."' + tableName + '" WHERE "' + idColumn + '" IN (' + placeholders + ')', databaseIdChunk)
+		for relationModelClass in [FilamentModel, TemperatureModel, CostModel, PrintJobTextModel, SlicerSettingValueModel]:
+			relationModelClass.delete().where(relationModelClass.printJob.in_(databaseIdChunk)).execute()
+		PrintJobModel.delete().where(PrintJobModel.databaseId.in_(databaseIdChunk)).execute()
+		self._deleteUnreferencedSlicerSettingsBlobs(allContentHashes)
+
+	# mode: PASSIVE (don't wait for readers/writers), FULL, RESTART, TRUNCATE (also reset the -wal file)
+	def checkpointDatabase(self, mode="PASSIVE"):
+		if (self._isPostgres() or self._isWALJournalMode() == False):
+			return None
+		try:
+			checkpointResult = self._database.execute_sql("PRAGMA wal_checkpoint(" + mode + ")").fetchone()
+			self._logger.debug("Database checkpoint '" + mode + "' done (busy, log-frames, checkpointed-frames):" + str(checkpointResult))
+			return checkpointResult
+		except Exception as e:
+			self._logger.error("Could not checkpoint the database:" + str(e))
+		return None
+
+	def _getDatabaseFilesSize(self):
+		return sum([os.path.getsize(fileLocation) for fileLocation in [self._databaseFileLocation, self._databaseFileLocation + "-wal"] if os.path.exists(fileLocation)])
+
+	# ANALYZE/optimize for the query planner, gives the free pages (e.g. after deletes or a CSV replace-import) back to
+	# the file system and checks the integrity. Should run while the printer is idle, a full VACUUM blocks the writers.
+	# return: dict with the results, None for an external database, during a migration or on error
+	def runDatabaseMaintenance(self):
+		if (self._isPostgres()):
+			self._logger.info("No maintenance for an external PostgreSQL database, done by the server (autovacuum)")
+			return None
+		if (self.isMigrationRunning()):
+			self._logger.info("No maintenance during the database migration")
+			return None
+		startTime = time.time()
+		sizeBefore = self._getDatabaseFilesSize()
+		try:
+			self._database.connect(reuse_if_open=True)
+			pageCount = self._database.execute_sql("PRAGMA page_count").fetchone()[0]
+			freePageCount = self._database.execute_sql("PRAGMA freelist_count").fetchone()[0]
+			# - statistics for the query planner
+			self._database.execute_sql("ANALYZE")
+			self._database.execute_sql("PRAGMA optimize")
+			# - free pages
+			vacuumMode = None
+			if (self._database.execute_sql("PRAGMA auto_vacuum").fetchone()[0] == 2):
+				if (freePageCount > 0):
+					# executescript steps the pragma until all pages are freed, execute() only frees the first page
+					self._database.connection().executescript("PRAGMA incremental_vacuum(" + str(MAINTENANCE_VACUUM_PAGES) + ");")
+					vacuumMode = "incremental"
+			elif (pageCount > 0 and freePageCount >= pageCount * MAINTENANCE_FULL_VACUUM_FREE_RATIO):
+				# the auto_vacuum mode of an existing database changes only with a full VACUUM
+				self._database.execute_sql("PRAGMA auto_vacuum=INCREMENTAL")
+				self._database.execute_sql("VACUUM")
+				vacuumMode = "full"
+			self.checkpointDatabase("TRUNCATE")
+			# - integrity
+			allCheckMessages = [row[0] for row in self._database.execute_sql("PRAGMA quick_check").fetchall()]
+		except Exception as e:
+			self._logger.exception("Database maintenance failed:" + str(e))
+			return None
+
+		integrity = "ok" if allCheckMessages == ["ok"] else "; ".join(allCheckMessages[:10])
+		sizeAfter = self._getDatabaseFilesSize()
+		maintenanceResult = {
+			"dateTime": datetime.datetime.now().replace(microsecond=0),
+			"duration": round(time.time() - startTime, 2),
+			"sizeBefore": sizeBefore,
+			"sizeAfter": sizeAfter,
+			"reclaimedBytes": max(0, sizeBefore - sizeAfter),
+			"vacuumMode": vacuumMode,
+			"integrity": integrity
+		}
+		self._logger.info("Database maintenance done:" + str(maintenanceResult))
+		if (integrity != "ok"):
+			self._logger.error("Database integrity check failed:" + integrity)
+			self.sendErrorMessageToClient("PJH-DatabaseManager", "The database integrity check failed, please restore a backup. See OctoPrint.log for details!")
+		return maintenanceResult
+
+	# The texts stored before V16 (and the slicer settings blobs copied by the migration to V18) are compressed in
+	# small batches, each batch in its own short write transaction. A capture or an edit in between waits only for one
+	# batch. An interrupted run continues with the remaining rows.
+	# return: dict with the count of compressed rows and the bytes before/after, None for postgres or on error
+	def compressPrintJobTexts(self, batchSize=TEXT_COMPRESSION_BATCH_SIZE):
+		if (self._isPostgres()):
+			return None
+		compressionResult = dict(rowCount=0, bytesBefore=0, bytesAfter=0)
+		try:
+			for tableName, allColumnNames in COMPRESSED_TEXT_COLUMNS.items():
+				self._compressTextColumns(tableName, allColumnNames, batchSize, compressionResult)
+		except Exception as e:
+			self._logger.exception("Could not compress the texts of the printJobs:" + str(e))
+			return None
+		self._logger.info("Texts of " + str(compressionResult["rowCount"]) + " rows compressed from " + StringUtils.get_formatted_size(compressionResult["bytesBefore"]) +
+						  " to " + StringUtils.get_formatted_size(compressionResult["bytesAfter"]))
+		return compressionResult
+
+	def _compressTextColumns(self, tableName, allColumnNames, batchSize, compressionResult):
+		textColumns = ", ".join(['"' + columnName + '"' for columnName in allColumnNames])
+		uncompressedCondition = " OR ".join(["typeof(\"" + columnName + "\") = 'text'" for columnName in allColumnNames])
+		updateColumns = ", ".join(['"' + columnName + '" = ?' for columnName in allColumnNames])
+		lastDatabaseId = 0
+		while True:
+			with self._writeTransaction():
+				# read in the write transaction, an edit in between would be overwritten
+				allRows = self._database.execute_sql('SELECT "databaseId", ' + textColumns + ' FROM "' + tableName + '" WHERE "databaseId" > ? AND (' + uncompressedCondition + ') '
+													 'ORDER BY "databaseId" LIMIT ?', (lastDatabaseId, batchSize)).fetchall()
+				for row in allRows:
+					lastDatabaseId = row[0]
+					allValues = list(row[1:])
+					for valueIndex, value in enumerate(allValues):
+						if (isinstance(value, str)):
+							compressedValue = TextCompression.compressText(value)
+							compressionResult["bytesBefore"] += len(value.encode("utf-8"))
+							compressionResult["bytesAfter"] += len(compressedValue) if isinstance(compressedValue, bytes) else len(value.encode("utf-8"))
+							allValues[valueIndex] = compressedValue
+					if (allValues != list(row[1:])):
+						self._database.execute_sql('UPDATE "' + tableName + '" SET ' + updateColumns + ' WHERE "databaseId" = ?', allValues + [lastDatabaseId])
+						compressionResult["rowCount"] += 1
+			if (len(allRows) < batchSize):
+				break
+			time.sleep(TEXT_COMPRESSION_BATCH_PAUSE)
+
+	# Stored size of the compressed columns against the size of the plain texts, a slicer settings text shared by
+	# several jobs counts for each job (textBytes), but is only stored once (deduplicatedBytes)
+	# return: dict with textBytes, storedBytes, compressedCount, savedPercent, deduplicatedBytes, slicerSettingsBlobCount
+	#   and slicerSettingsReferenceCount, None for postgres or on error
+	def getTextStorageStatistic(self):
+		if (self._isPostgres()):
+			return None
+		textFunction = TextCompression.SQL_TEXT_FUNCTION_NAME
+		try:
+			allRows = []
+			for tableName, allColumnNames in COMPRESSED_TEXT_COLUMNS.items():
+				selectColumns = []
+				for columnName in allColumnNames:
+					selectColumns += ['COALESCE(SUM(length(CAST(' + textFunction + '("' + columnName + '") AS BLOB))), 0)',
+									  'COALESCE(SUM(length(CAST("' + columnName + '" AS BLOB))), 0)',
+									  'COALESCE(SUM(typeof("' + columnName + '") = \'blob\'), 0)']
+				allRows.append(self._database.execute_sql('SELECT ' + ", ".join(selectColumns) + ' FROM "' + tableName + '"').fetchone())
+			# decompressed once per blob
+			deduplicatedBytes, blobCount, referenceCount = self._database.execute_sql(
+				'SELECT COALESCE(SUM(length(CAST(' + textFunction + '(b."slicerSettingsAsText") AS BLOB)) * (r.referenceCount - 1)), 0), COUNT(*), COALESCE(SUM(r.referenceCount), 0) '
+				'FROM "pjh_slicersettingsblobmodel" b JOIN (SELECT "slicerSettingsHash", COUNT(*) AS referenceCount FROM "pjh_printjobtextmodel" '
+				'WHERE "slicerSettingsHash" IS NOT NULL GROUP BY "slicerSettingsHash") r ON r."slicerSettingsHash" = b."contentHash"').fetchone()
+		except Exception as e:
+			self._logger.error("Could not read the text storage statistic:" + str(e))
+			return None
+		textBytes = sum([sum(row[0::3]) for row in allRows]) + deduplicatedBytes
+		storedBytes = sum([sum(row[1::3]) for row in allRows])
+		return {
+			"textBytes": textBytes,
+			"storedBytes": storedBytes,
+			"compressedCount": sum([sum(row[2::3]) for row in allRows]),
+			"savedPercent": 0.0 if textBytes == 0 else round(100.0 * (textBytes - storedBytes) / textBytes, 1),
+			"deduplicatedBytes": deduplicatedBytes,
+			"slicerSettingsBlobCount": blobCount,
+			"slicerSettingsReferenceCount": referenceCount
+		}
+
+	# Parsed slicer settings for the compare, instead of running all expressions over the text again
+	# return: {databaseId: {key: value}}, a job without parsed settings is missing
+	def loadSlicerSettings(self, databaseIds):
+		allSlicerSettings = dict()
+		for databaseIdChunk in chunked(list(databaseIds), SQL_MAX_VARIABLES):
+			valueQuery = (SlicerSettingValueModel.select(SlicerSettingValueModel.printJob, SlicerSettingKeyModel.key, SlicerSettingValueModel.textValue)
+						  .join(SlicerSettingKeyModel, on=(SlicerSettingValueModel.settingKey == SlicerSettingKeyModel.databaseId))
+						  .where(SlicerSettingValueModel.printJob.in_(databaseIdChunk))
+						  .order_by(SlicerSettingValueModel.databaseId)
+						  .tuples())
+			for databaseId, key, value in valueQuery:
+				allSlicerSettings.setdefault(databaseId, dict())[key] = value
+		return allSlicerSettings
+
+	# The slicer settings of the jobs captured before V17 (or spilled without them) are parsed out of the stored text
+	# with the current expressions, each batch in its own write transaction.
+	# return: count of parsed jobs, None on error
+	def parseStoredSlicerSettings(self, slicerSettingsExpressions, batchSize=SLICER_SETTINGS_PARSE_BATCH_SIZE):
+		if (slicerSettingsExpressions == None or len(slicerSettingsExpressions) == 0):
+			return 0
+		slicerSettingsService = SlicerSettingsService(self._logger)
+		# jobs with the same text (hash) are parsed once
+		parsedSettingsByHash = dict()
+		parsedJobCount = 0
+		lastDatabaseId = 0
+		try:
+			while True:
+				with self._writeTransaction():
+					parsedSettingsQuery = SlicerSettingValueModel.select(SlicerSettingValueModel.printJob).where(SlicerSettingValueModel.printJob == PrintJobTextModel.printJob)
+					textQuery = (PrintJobTextModel.select(PrintJobTextModel.printJob, PrintJobTextModel.slicerSettingsHash)
+								 .where((PrintJobTextModel.printJob > lastDatabaseId) & PrintJobTextModel.slicerSettingsHash.is_null(False) & ~fn.EXISTS(parsedSettingsQuery))
+								 .order_by(PrintJobTextModel.printJob)
+								 .limit(batchSize)
+								 .tuples())
+					allTexts = list(textQuery)
+					allNewHashes = set([contentHash for databaseId, contentHash in allTexts if contentHash not in parsedSettingsByHash])
+					for hashChunk in chunked(list(allNewHashes), SQL_MAX_VARIABLES):
+						blobQuery = SlicerSettingsBlobModel.select(SlicerSettingsBlobModel.contentHash, SlicerSettingsBlobModel.slicerSettingsAsText).where(SlicerSettingsBlobModel.contentHash.in_(hashChunk)).tuples()
+						for contentHash, slicerSettingsAsText in blobQuery:
+							parsedSettingsByHash[contentHash] = slicerSettingsService.parseSlicerSettings(slicerSettingsAsText, slicerSettingsExpressions)
+					allSlicerSettings = []
+					for databaseId, contentHash in allTexts:
+						lastDatabaseId = databaseId
+						allSlicerSettings.append((databaseId, parsedSettingsByHash.get(contentHash)))
+					self._insertSlicerSettings(allSlicerSettings)
+				parsedJobCount += len(allTexts)
+				if (len(allTexts) < batchSize):
+					break
+				time.sleep(SLICER_SETTINGS_PARSE_BATCH_PAUSE)
+		except Exception as e:
+			self._logger.exception("Could not parse the stored slicer settings:" + str(e))
+			return None
+		if (parsedJobCount > 0):
+			self._logger.info("Slicer settings of " + str(parsedJobCount) + " printJobs parsed")
+		return parsedJobCount
 
 	def getDatabaseFileLocation(self):
 		return self._databaseFileLocation
 
+	# external postgres database instead of the local sqlite file
+	def isExternalDatabase(self):
+		return self._isPostgres()
+
+	def hasArchive(self):
+		return self._isPostgres() == False and self._databasePath != None and os.path.exists(self._getArchiveFileLocation())
+
+	def getArchiveFileLocation(self):
+		return self._getArchiveFileLocation()
+
+	# Moves the jobs started more than olderThanMonths ago with all relations into the archive file, the main file
+	# stays small (queries, backup). The archived jobs are read only with "includeArchive" of the table query.
+	# - the newest job always stays, otherwise sqlite would reuse the databaseIds of the archived jobs
+	# - the daily rollup is not changed, the statistic series still count the archived jobs
+	# return: count of the archived jobs, None on error
+	def archivePrintJobs(self, olderThanMonths):
+		if (self._isPostgres()):
+			self._logger.info("No archive for an external PostgreSQL database")
+			return None
+		now = datetime.datetime.now()
+		monthIndex = now.year * 12 + now.month - 1 - int(olderThanMonths)
+		olderThanDateTime = now.replace(year=monthIndex // 12, month=monthIndex % 12 + 1, day=min(now.day, 28))
+
+		allDatabaseIds = []
+		self._attachArchive()
+		try:
+			self._createArchiveTablesIfNecessary()
+			with self._writeTransaction() as transaction:
+				try:
+					maxDatabaseId = PrintJobModel.select(fn.MAX(PrintJobModel.databaseId)).scalar()
+					archiveQuery = PrintJobModel.select(PrintJobModel.databaseId).where((PrintJobModel.printStartDateTime < olderThanDateTime) &
+																						 (PrintJobModel.databaseId < maxDatabaseId))
+					allDatabaseIds = [databaseId for (databaseId,) in archiveQuery.tuples()]
+					for databaseIdChunk in chunked(allDatabaseIds, SQL_MAX_VARIABLES):
+						self._moveToArchive(databaseIdChunk)
+				except Exception as e:
+					transaction.rollback()
+					self._logger.exception("Could not move the printJobs into the archive:" + str(e))
+					self.sendErrorMessageToClient("PJH-DatabaseManager", "Could not move the old printjobs into the archive. See OctoPrint.log for details!")
+					return None
+		finally:
+			self._detachArchive()
+		self._logger.info("Moved " + str(len(allDatabaseIds)) + " printJobs started before '" + str(olderThanDateTime) + "' into the archive '" + self._getArchiveFileLocation() + "'")
+		return len(allDatabaseIds)
+
+	# Farm aggregation: the history databases (printJobHistory.db) of other OctoPrint instances, e.g. on a mounted
+	# volume, are read together with the database of this printer. The farm databases are only read, never written.
+	# allFarmDatabases: list of {"printerName", "databaseFileLocation"}
+	def setFarmDatabases(self, localPrinterName, allFarmDatabases):
+		self._localPrinterName = localPrinterName if StringUtils.isNotEmpty(localPrinterName) else DEFAULT_LOCAL_PRINTER_NAME
+		self._farmDatabases = []
+		for farmDatabase in allFarmDatabases or []:
+			printerName = farmDatabase.get("printerName")
+			databaseFileLocation = farmDatabase.get("databaseFileLocation")
+			if (StringUtils.isEmpty(printerName) or StringUtils.isEmpty(databaseFileLocation)):
+				self._logger.warning("Farm database without printerName/databaseFileLocation, ignored:" + str(farmDatabase))
+				continue
+			if (self._databaseFileLocation != None and os.path.abspath(databaseFileLocation) == os.path.abspath(self._databaseFileLocation)):
+				# the own jobs would be counted twice
+				continue
+			self._farmDatabases.append({"printerName": printerName, "databaseFileLocation": databaseFileLocation})
+
+	def hasFarmDatabases(self):
+		return len(self._farmDatabases) > 0
+
+	def getLocalPrinterName(self):
+		return self._localPrinterName
+
+	# return: list of {"printerName", "databaseFileLocation", "printJobCount"}, printJobCount None if skipped
+	def getFarmDatabaseStatus(self):
+		allPrinterCounts, allSkippedPrinterNames = self._runForEachPrinter(lambda: PrintJobModel.select().count())
+		printJobCountByPrinter = dict(allPrinterCounts)
+		allFarmDatabaseStatus = [{"printerName": self._localPrinterName, "databaseFileLocation": self._databaseFileLocation,
+								  "printJobCount": printJobCountByPrinter.get(self._localPrinterName)}]
+		for farmDatabase in self._farmDatabases:
+			farmDatabaseStatus = dict(farmDatabase)
+			farmDatabaseStatus["printJobCount"] = None if farmDatabase["printerName"] in allSkippedPrinterNames else printJobCountByPrinter.get(farmDatabase["printerName"])
+			allFarmDatabaseStatus.append(farmDatabaseStatus)
+		return allFarmDatabaseStatus
+
+	# Page of the table over all printers. Each printer returns the first from+to jobs in the order of the table, the
+	# sorted lists are merged with a k-way merge (heap), so the costs grow with the count of printers and not with
+	# the size of the histories. No cursor paging, the databaseIds are only unique per printer.
+	# return: (allPrintJobModels with printerName, totalItemCount, allSkippedPrinterNames)
+	def loadFarmPrintJobsPageByQuery(self, tableQuery):
+		offset = max(StringUtils.transformToIntOrNone(tableQuery.get("from")) or 0, 0)
+		limit = max(StringUtils.transformToIntOrNone(tableQuery.get("to")) or 0, 1)
+		farmTableQuery = self._buildFarmTableQuery(tableQuery, **{"from": 0, "to": offset + limit})
+		allPrinterPages, allSkippedPrinterNames = self._runForEachPrinter(self._loadPrintJobsPageByQuery, farmTableQuery)
+
+		totalItemCount = sum([printerItemCount for printerName, (allPrintJobModels, printerItemCount) in allPrinterPages])
+		allPrinterJobs = [(printerName, allPrintJobModels) for printerName, (allPrintJobModels, printerItemCount) in allPrinterPages]
+		mergedPrintJobs = self._mergeFarmPrintJobs(allPrinterJobs, farmTableQuery)
+		return (list(itertools.islice(mergedPrintJobs, offset, offset + limit)), totalItemCount, allSkippedPrinterNames)
+
+	# All jobs of the table query (filters) of all printers, e.g. for the CSV export with the printer column
+	# return: (allPrintJobModels with printerName, allSkippedPrinterNames)
+	def loadFarmPrintJobsByQuery(self, tableQuery):
+		farmTableQuery = self._buildFarmTableQuery(tableQuery)
+		allPrinterJobs, allSkippedPrinterNames = self._runForEachPrinter(self._loadAllPrintJobsByQuery, farmTableQuery)
+		return (list(self._mergeFarmPrintJobs(allPrinterJobs, farmTableQuery)), allSkippedPrinterNames)
+
+	# Same statistic as calculatePrintJobsStatisticByQuery, the values of the printers are added up
+	def calculateFarmPrintJobsStatisticByQuery(self, tableQuery):
+		allPrinterValues, allSkippedPrinterNames = self._runForEachPrinter(self._calculatePrintJobsStatisticValues, tableQuery)
+		farmValues = {"printJobCount": 0, "firstDate": None, "lastDate": None, "lastStartDate": None, "duration": 0, "fileSize": 0,
+					  "length": 0.0, "weight": 0.0, "statusDict": dict(), "materialDict": dict(), "spoolDict": dict()}
+		printerDict = dict()
+		for printerName, printerValues in allPrinterValues:
+			printerDict[printerName] = printerDict.get(printerName, 0) + printerValues["printJobCount"]
+			for valueName in ["printJobCount", "duration", "fileSize", "length", "weight"]:
+				farmValues[valueName] += printerValues[valueName]
+			for dictName in ["statusDict", "materialDict", "spoolDict"]:
+				for key, count in printerValues[dictName].items():
+					farmValues[dictName][key] = farmValues[dictName].get(key, 0) + count
+			if (printerValues["firstDate"] != None and (farmValues["firstDate"] == None or printerValues["firstDate"] < farmValues["firstDate"])):
+				farmValues["firstDate"] = printerValues["firstDate"]
+			# end of the last started job of all printers
+			if (printerValues["lastStartDate"] != None and (farmValues["lastStartDate"] == None or printerValues["lastStartDate"] > farmValues["lastStartDate"])):
+				farmValues["lastStartDate"] = printerValues["lastStartDate"]
+				farmValues["lastDate"] = printerValues["lastDate"]
+
+		statistic = self._formatPrintJobsStatistic(tableQuery, farmValues)
+		statistic["printers"] = self._buildDictlString(printerDict)
+		statistic["skippedPrinters"] = allSkippedPrinterNames
+		return statistic
+
+	# Same series as calculateStatisticSeriesByQuery over all printers. The series of each printer is sorted by bucket
+	# (and group), the k-way merge adds up the rows with the same key.
+	# groupBy: additionally "printer", a group for each printer
+	# return: (allSeriesValues, allSkippedPrinterNames)
+	def calculateFarmStatisticSeriesByQuery(self, tableQuery, bucketSize="day", groupBy=None):
+		printerGroupBy = None if groupBy == "printer" else groupBy
+		allPrinterSeries, allSkippedPrinterNames = self._runForEachPrinter(self.calculateStatisticSeriesByQuery, tableQuery, bucketSize, printerGroupBy)
+		allSortedSeries = []
+		for printerName, allSeriesValues in allPrinterSeries:
+			if (groupBy == "printer"):
+				for seriesValues in allSeriesValues:
+					seriesValues["group"] = printerName
+			allSortedSeries.append(allSeriesValues)
+
+		# without a group the same key for all rows of a bucket (None is not comparable)
+		seriesKey = lambda seriesValues: (seriesValues["bucket"], seriesValues.get("group", ""))
+		allFarmSeriesValues = []
+		for seriesValues in heapq.merge(*allSortedSeries, key=seriesKey):
+			if (len(allFarmSeriesValues) > 0 and seriesKey(allFarmSeriesValues[-1]) == seriesKey(seriesValues)):
+				for valueName in SERIES_VALUE_NAMES:
+					allFarmSeriesValues[-1][valueName] += seriesValues[valueName]
+			else:
+				allFarmSeriesValues.append(dict(seriesValues))
+		return (allFarmSeriesValues, allSkippedPrinterNames)
+
+	# hits/misses of the table pages and counts
+	def getQueryCacheStatistic(self):
+		return self._queryCache.getStatistic()
+
+	def isMigrationRunning(self):
+		return self._migrationDoneEvent.is_set() == False
+
+	# the scheme is still the old one, no writes until the next successful migration (restart)
+	def isMigrationFailed(self):
+		return self._migrationFailed
+
+	# last status of the scheme migration (status, schemeVersion, targetSchemeVersion, tableName, progress) or None
+	def getMigrationStatus(self):
+		return self._migrationStatus
+
+	def waitForMigration(self, timeout=None):
+		return self._migrationDoneEvent.wait(timeout)
+
 	def reCreateDatabase(self):
 		self._logger.info("ReCreating Database")
+		# the new jobs start again with databaseId 1, the ids of the archived jobs would be used twice
+		self._rotateArchive()
 		self._createDatabase(True)
+		# the tables are created with the current scheme
+		self._migrationFailed = False
+
+	# The archive file is renamed (with the time in the name) and no longer read, the archived jobs are not lost
+	# return: new location of the archive file, None if there is no archive
+	def _rotateArchive(self):
+		if (self.hasArchive() == False):
+			return None
+		archiveFileName, archiveFileExtension = os.path.splitext(ARCHIVE_FILE_NAME)
+		rotatedFileLocation = os.path.join(self._databasePath, archiveFileName + "-" + datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + archiveFileExtension)
+		for fileSuffix in ["", "-wal", "-shm", "-journal"]:
+			if (os.path.exists(self._getArchiveFileLocation() + fileSuffix)):
+				os.replace(self._getArchiveFileLocation() + fileSuffix, rotatedFileLocation + fileSuffix)
+		self._logger.warning("Archive '" + self._getArchiveFileLocation() + "' moved to '" + rotatedFileLocation + "', the archived printJobs are no longer shown")
+		return rotatedFileLocation
 
 	def insertPrintJob(self, printJobModel):
 		databaseId = None
-		with self._database.atomic() as transaction:  # Opens new transaction.
+		with self._writeTransaction() as transaction:  # Opens new transaction.
 			try:
 				printJobModel.save()
 				databaseId = printJobModel.get_id()
@@ -530,6 +1785,14 @@ class DatabaseManager(object):
 				# - Costs
 				if (printJobModel.getCosts() != None):
 					printJobModel.getCosts().save()
+				# - Texts
+				if (printJobModel.getTexts() != None):
+					self._insertSlicerSettingsBlobs([printJobModel.getTexts()])
+					printJobModel.getTexts().save()
+				# - Slicer settings
+				self._insertSlicerSettings([(databaseId, printJobModel.getSlicerSettingsAsDict())])
+				# - Rollups
+				self._updateRollups([databaseId], 1)
 
 				# do expicit commit
 				transaction.commit()
@@ -546,9 +1809,182 @@ class DatabaseManager(object):
 
 		return databaseId
 
+	# Bulk insert (e.g. CSV import), one transaction per chunk of jobs and multi-row inserts for the jobs and each
+	# relation-table, instead of one transaction and a single insert per row.
+	# progressCallback(insertedJobCount) is called after each chunk.
+	# return: count of inserted jobs, on an error the jobs of the failed chunk and all following are not inserted
+	def insertPrintJobs(self, allPrintJobModels, chunkSize=500, progressCallback=None):
+		startTime = time.time()
+		insertedJobCount = 0
+		for jobChunk in chunked(allPrintJobModels, max(1, int(chunkSize))):
+			with self._writeTransaction() as transaction:
+				try:
+					databaseIds = self._insertManyPrintJobs(jobChunk)
+					self._updateRollups(databaseIds, 1)
+				except Exception as e:
+					transaction.rollback()
+					for printJobModel in jobChunk:
+						printJobModel.databaseId = None
+						# e.g. for the technical log of a spilled job
+						printJobModel.insertError = str(e)
+					self._logger.exception("Could not insert printJobs into database:" + str(e))
+					self.sendErrorMessageToClient("PJH-DatabaseManager", "Could not insert the printjobs into the database. See OctoPrint.log for details!")
+					break
+			insertedJobCount += len(jobChunk)
+			if (progressCallback != None):
+				progressCallback(insertedJobCount)
+
+		duration = time.time() - startTime
+		self._logger.info("Bulk insert of " + str(insertedJobCount) + " printJobs in " + "{:.2f}".format(duration) + "s (" +
+						  "{:.0f}".format(insertedJobCount / max(duration, 0.001)) + " jobs/s)")
+		return insertedJobCount
+
+	def _insertManyPrintJobs(self, jobChunk):
+		# a chunk of the import has more bind-variables than a statement allows, see _insertManyRows
+		databaseIds = []
+		rowsPerInsert = max(1, SQL_MAX_VARIABLES // len(PrintJobModel._meta.fields))
+		for printJobGroup in chunked(jobChunk, rowsPerInsert):
+			printJobQuery = PrintJobModel.insert_many([self._toInsertRow(printJobModel) for printJobModel in printJobGroup])
+			if (self._database.returning_clause):
+				# the ids are ascending in the order of the rows, but the order of the returned rows is not defined
+				databaseIds += sorted([row[0] for row in printJobQuery.returning(PrintJobModel.databaseId).tuples().execute()])
+			else:
+				# in the (write-locked) transaction the rowids of a multi-row insert are consecutive
+				lastDatabaseId = printJobQuery.execute()
+				databaseIds += list(range(lastDatabaseId - len(printJobGroup) + 1, lastDatabaseId + 1))
+
+		# map the ids to the relations
+		relationRows = {FilamentModel: [], TemperatureModel: [], CostModel: [], PrintJobTextModel: []}
+		allRelationModels = []
+		for printJobModel, databaseId in zip(jobChunk, databaseIds):
+			# collected before the id is set, otherwise the getters try to load the relations from the database
+			relationModels = list(printJobModel.getFilamentModels()) + list(printJobModel.getTemperatureModels())
+			relationModels += [relationModel for relationModel in [printJobModel.getCosts(), printJobModel.getTexts()] if relationModel != None]
+			printJobModel.databaseId = databaseId
+			allRelationModels += relationModels
+			for relationModel in relationModels:
+				relationModel.printJob = printJobModel
+				relationRows[type(relationModel)].append(self._toInsertRow(relationModel))
+		# referenced by the text rows
+		self._insertSlicerSettingsBlobs([relationModel for relationModel in allRelationModels if isinstance(relationModel, PrintJobTextModel)])
+		for relationModelClass, allRows in relationRows.items():
+			self._insertManyRows(relationModelClass, allRows)
+		self._insertSlicerSettings([(printJobModel.databaseId, printJobModel.getSlicerSettingsAsDict()) for printJobModel in jobChunk])
+		return databaseIds
+
+	# allSlicerSettings: list of (databaseId, {key: value}), the new keys are added to the dictionary
+	def _insertSlicerSettings(self, allSlicerSettings):
+		allSlicerSettings = [(databaseId, slicerSettingsAsDict) for databaseId, slicerSettingsAsDict in allSlicerSettings if slicerSettingsAsDict]
+		if (len(allSlicerSettings) == 0):
+			return
+		allKeys = set()
+		for databaseId, slicerSettingsAsDict in allSlicerSettings:
+			allKeys.update(slicerSettingsAsDict.keys())
+		keyIds = self._getOrCreateSlicerSettingKeyIds(sorted(allKeys))
+
+		created = datetime.datetime.now()
+		allRows = []
+		for databaseId, slicerSettingsAsDict in allSlicerSettings:
+			for key, value in slicerSettingsAsDict.items():
+				valueType, numberValue = SlicerSettingsParser.parseTypedValue(value)
+				allRows.append({"created": created, "printJob": databaseId, "settingKey": keyIds[key], "valueType": valueType, "numberValue": numberValue, "textValue": SlicerSettingsParser.normalizeValue(value)})
+		self._insertManyRows(SlicerSettingValueModel, allRows)
+
+	# Stores the slicer settings texts set by the capture/edit, a text already stored for an other job (same hash) is
+	# not stored (and compressed) again. A loaded text model only keeps its hash.
+	def _insertSlicerSettingsBlobs(self, allTextModels):
+		allTexts = dict()
+		for textModel in allTextModels:
+			if (textModel != None and textModel.slicerSettingsHash != None and textModel._slicerSettingsAsText != None):
+				allTexts[textModel.slicerSettingsHash] = textModel._slicerSettingsAsText
+		for hashChunk in chunked(list(allTexts.keys()), SQL_MAX_VARIABLES):
+			for storedHash, in SlicerSettingsBlobModel.select(SlicerSettingsBlobModel.contentHash).where(SlicerSettingsBlobModel.contentHash.in_(hashChunk)).tuples():
+				del allTexts[storedHash]
+		if (len(allTexts) == 0):
+			return
+		created = datetime.datetime.now()
+		for blobChunk in chunked(list(allTexts.items()), SQL_MAX_VARIABLES // 3):
+			# an other instance (shared postgres database) could have stored the same text in between
+			SlicerSettingsBlobModel.insert_many([{"created": created, "contentHash": contentHash, "slicerSettingsAsText": slicerSettingsAsText}
+												 for contentHash, slicerSettingsAsText in blobChunk]).on_conflict_ignore().execute()
+
+	# The blobs of the deleted/archived jobs which are not referenced by an other job of the main file
+	def _deleteUnreferencedSlicerSettingsBlobs(self, contentHashes):
+		referenceQuery = PrintJobTextModel.select(PrintJobTextModel.databaseId).where(PrintJobTextModel.slicerSettingsHash == SlicerSettingsBlobModel.contentHash)
+		for hashChunk in chunked(list(set(contentHashes)), SQL_MAX_VARIABLES):
+			SlicerSettingsBlobModel.delete().where(SlicerSettingsBlobModel.contentHash.in_(hashChunk) & ~fn.EXISTS(referenceQuery)).execute()
+
+	def _loadSlicerSettingsHashes(self, databaseIds):
+		allContentHashes = []
+		for databaseIdChunk in chunked(list(databaseIds), SQL_MAX_VARIABLES):
+			hashQuery = PrintJobTextModel.select(PrintJobTextModel.slicerSettingsHash).where(PrintJobTextModel.printJob.in_(databaseIdChunk) & PrintJobTextModel.slicerSettingsHash.is_null(False))
+			allContentHashes += [contentHash for contentHash, in hashQuery.tuples()]
+		return allContentHashes
+
+	# One query per chunk for the texts of the loaded text models, instead of one for each job
+	def _loadSlicerSettingsTexts(self, allTextModels):
+		textModelsByHash = dict()
+		for textModel in allTextModels:
+			if (textModel.slicerSettingsHash != None and textModel._slicerSettingsAsText == None):
+				textModelsByHash.setdefault(textModel.slicerSettingsHash, []).append(textModel)
+		for hashChunk in chunked(list(textModelsByHash.keys()), SQL_MAX_VARIABLES):
+			blobQuery = SlicerSettingsBlobModel.select(SlicerSettingsBlobModel.contentHash, SlicerSettingsBlobModel.slicerSettingsAsText).where(SlicerSettingsBlobModel.contentHash.in_(hashChunk))
+			for contentHash, slicerSettingsAsText in blobQuery.tuples():
+				for textModel in textModelsByHash[contentHash]:
+					textModel._slicerSettingsAsText = slicerSettingsAsText
+
+	# return: {key: databaseId}
+	def _getOrCreateSlicerSettingKeyIds(self, allKeys):
+		keyIds = dict()
+		for keyChunk in chunked(allKeys, SQL_MAX_VARIABLES):
+			keyIds.update(SlicerSettingKeyModel.select(SlicerSettingKeyModel.key, SlicerSettingKeyModel.databaseId).where(SlicerSettingKeyModel.key.in_(keyChunk)).tuples())
+		allNewKeys = [key for key in allKeys if key not in keyIds]
+		if (len(allNewKeys) == 0):
+			return keyIds
+		created = datetime.datetime.now()
+		for keyChunk in chunked(allNewKeys, SQL_MAX_VARIABLES // 2):
+			# an other instance (shared postgres database) could have added the key in between
+			SlicerSettingKeyModel.insert_many([{"created": created, "key": key} for key in keyChunk]).on_conflict_ignore().execute()
+		for keyChunk in chunked(allNewKeys, SQL_MAX_VARIABLES):
+			keyIds.update(SlicerSettingKeyModel.select(SlicerSettingKeyModel.key, SlicerSettingKeyModel.databaseId).where(SlicerSettingKeyModel.key.in_(keyChunk)).tuples())
+		return keyIds
+
+	# all field-values without the (auto-increment) databaseId, insert_many takes the columns from the first row
+	def _toInsertRow(self, model):
+		insertRow = dict()
+		for field in model._meta.sorted_fields:
+			if (field.primary_key == False):
+				insertRow[field.name] = model.__data__.get(field.name)
+		return insertRow
+
+	# the rows of a statement are limited by the count of bind-variables (SQLite < 3.32 only 999 per statement)
+	def _insertManyRows(self, modelClass, allRows):
+		if (len(allRows) == 0):
+			return
+		rowsPerInsert = max(1, SQL_MAX_VARIABLES // len(modelClass._meta.fields))
+		for rowChunk in chunked(allRows, rowsPerInsert):
+			modelClass.insert_many(rowChunk).execute()
+
+	# e.g. the log lines of the store step, known after the insert of the job
+	def appendTechnicalLog(self, databaseId, technicalLog):
+		with self._writeTransaction() as transaction:
+			try:
+				textModel = PrintJobTextModel.get_or_none(PrintJobTextModel.printJob == databaseId)
+				if (textModel == None):
+					textModel = PrintJobTextModel(printJob=databaseId)
+				textModel.technicalLog = (textModel.technicalLog or "") + technicalLog
+				textModel.save()
+				return True
+			except Exception as e:
+				transaction.rollback()
+				self._logger.exception("Could not append the technical log of PrintJob '" + str(databaseId) + "':" + str(e))
+				return False
+
 	def updatePrintJob(self, printJobModel, rollbackHandler = None):
-		with self._database.atomic() as transaction:  # Opens new transaction.
+		with self._writeTransaction() as transaction:  # Opens new transaction.
 			try:
+				# remove the stored values from the rollups, add the new values after saving
+				self._updateRollups([printJobModel.databaseId], -1)
 				printJobModel.save()
 				databaseId = printJobModel.get_id()
 				# save all relations
@@ -564,6 +2000,12 @@ class DatabaseManager(object):
 				# - Costs
 				if (printJobModel.getCosts() != None):
 					printJobModel.getCosts().save()
+				# - Texts
+				if (printJobModel.getTexts() != None):
+					self._insertSlicerSettingsBlobs([printJobModel.getTexts()])
+					printJobModel.getTexts().save()
+				# - Rollups
+				self._updateRollups([databaseId], 1)
 			except Exception as e:
 				# Because this block of code is wrapped with "atomic", a
 				# new transaction will begin automatically after the call
@@ -574,90 +2016,315 @@ class DatabaseManager(object):
 				self.sendErrorMessageToClient("PJH-DatabaseManager", "Could not update the printjob ('"+ printJobModel.fileName +"') into the database. See OctoPrint.log for details!")
 			pass
 
+	# sign: 1 add the stored values of the print jobs to all rollups, -1 remove them
+	def _updateRollups(self, databaseIds, sign):
+		self._updateDailyRollup(databaseIds, sign)
+		self._updateFileRollup(databaseIds, sign)
+
+	def _updateDailyRollup(self, databaseIds, sign):
+		self._upsertRollup(DailyRollupModel, DAILY_ROLLUP_FIELDS, 5, self._buildDailyRollupSelect, databaseIds, sign)
+
+	def _updateFileRollup(self, databaseIds, sign):
+		self._upsertRollup(FileRollupModel, FILE_ROLLUP_FIELDS, 2, self._buildFileRollupSelect, databaseIds, sign)
+
+	# rollupFields: created, the dimensions (unique index) up to metricIndex, the summed metrics
+	def _upsertRollup(self, rollupModelClass, rollupFields, metricIndex, buildRollupSelect, databaseIds, sign):
+		databaseIds = [databaseId for databaseId in databaseIds if databaseId != None]
+		if (len(databaseIds) == 0):
+			return
+		updateValues = dict()
+		for metricField in rollupFields[metricIndex:]:
+			updateValues[metricField] = metricField + getattr(EXCLUDED, metricField.name)
+		# the rollup select has ~20 parameters of its own
+		for databaseIdChunk in chunked(databaseIds, SQL_MAX_VARIABLES - 50):
+			rollupQuery = rollupModelClass.insert_from(buildRollupSelect(sign, databaseIdChunk), rollupFields)
+			rollupQuery.on_conflict(conflict_target=rollupFields[1:metricIndex], update=updateValues).execute()
+		if (sign < 0):
+			rollupModelClass.delete().where(rollupModelClass.jobCount <= 0).execute()
+
+	# The contribution of the print jobs to the rollup rows, built with the query builder and therefore the same for
+	# sqlite and postgres. The sign (1/-1) adds or removes the jobs, material/spool are taken from the "total" filament.
+	def _buildDailyRollupSelect(self, sign, databaseIds=None):
+		sign = Value(int(sign))
+		dayExpression = fn.date(PrintJobModel.printStartDateTime)
+		dimensionExpressions = [dayExpression,
+								fn.COALESCE(PrintJobModel.printStatusResult, ""),
+								fn.COALESCE(FilamentModel.material, ""),
+								fn.COALESCE(FilamentModel.spoolName, "")]
+		metricExpressions = [sign * fn.COUNT(PrintJobModel.databaseId),
+							 sign * fn.COALESCE(fn.SUM(PrintJobModel.duration), 0),
+							 sign * fn.COALESCE(fn.SUM(FilamentModel.usedLength), 0),
+							 sign * fn.COALESCE(fn.SUM(FilamentModel.usedWeight), 0),
+							 sign * fn.COALESCE(fn.SUM(FilamentModel.usedCost), 0),
+							 sign * fn.COALESCE(fn.SUM(CostModel.totalCosts), 0)]
+
+		rollupSelect = PrintJobModel.select(Value(datetime.datetime.now()), *(dimensionExpressions + metricExpressions))
+		rollupSelect = rollupSelect.join(FilamentModel, JOIN.LEFT_OUTER, on=((FilamentModel.printJob == PrintJobModel.databaseId) & (FilamentModel.toolId == "total")))
+		rollupSelect = rollupSelect.switch(PrintJobModel).join(CostModel, JOIN.LEFT_OUTER, on=(CostModel.printJob == PrintJobModel.databaseId))
+		rollupSelect = rollupSelect.where(PrintJobModel.printStartDateTime.is_null(False))
+		if (databaseIds != None):
+			rollupSelect = rollupSelect.where(PrintJobModel.databaseId.in_(databaseIds))
+		return rollupSelect.group_by(*dimensionExpressions)
+
+	# Same as the daily rollup, the key is the path of the file (the name if the path is not present) and the successful
+	# jobs are summed up separately for the averages of a file.
+	def _buildFileRollupSelect(self, sign, databaseIds=None):
+		sign = Value(int(sign))
+		isSuccess = (PrintJobModel.printStatusResult == "success")
+		fileExpression = fn.COALESCE(fn.NULLIF(PrintJobModel.filePathName, ""), PrintJobModel.fileName, "")
+		metricExpressions = [sign * fn.COUNT(PrintJobModel.databaseId),
+							 sign * fn.SUM(Case(None, [(isSuccess, 1)], 0)),
+							 sign * fn.COALESCE(fn.SUM(PrintJobModel.duration), 0),
+							 sign * fn.COALESCE(fn.SUM(FilamentModel.usedLength), 0),
+							 sign * fn.COALESCE(fn.SUM(FilamentModel.usedWeight), 0),
+							 sign * fn.COALESCE(fn.SUM(CostModel.totalCosts), 0),
+							 sign * fn.COALESCE(fn.SUM(Case(None, [(isSuccess, PrintJobModel.duration)])), 0),
+							 sign * fn.COALESCE(fn.SUM(Case(None, [(isSuccess, FilamentModel.usedLength)])), 0),
+							 sign * fn.COALESCE(fn.SUM(Case(None, [(isSuccess, FilamentModel.usedWeight)])), 0)]
+
+		rollupSelect = PrintJobModel.select(Value(datetime.datetime.now()), fileExpression, *metricExpressions)
+		rollupSelect = rollupSelect.join(FilamentModel, JOIN.LEFT_OUTER, on=((FilamentModel.printJob == PrintJobModel.databaseId) & (FilamentModel.toolId == "total")))
+		rollupSelect = rollupSelect.switch(PrintJobModel).join(CostModel, JOIN.LEFT_OUTER, on=(CostModel.printJob == PrintJobModel.databaseId))
+		if (databaseIds != None):
+			rollupSelect = rollupSelect.where(PrintJobModel.databaseId.in_(databaseIds))
+		return rollupSelect.group_by(fileExpression)
+
+	def rebuildDailyRollup(self):
+		return self._rebuildRollup(DailyRollupModel, DAILY_ROLLUP_FIELDS, self._buildDailyRollupSelect, self.rebuildDailyRollup)
+
+	def rebuildFileRollup(self):
+		return self._rebuildRollup(FileRollupModel, FILE_ROLLUP_FIELDS, self._buildFileRollupSelect, self.rebuildFileRollup)
+
+	def _rebuildRollup(self, rollupModelClass, rollupFields, buildRollupSelect, rebuildFunction):
+		# the archived jobs are still part of the rollup
+		if (self._isArchiveIncluded() == False and self.hasArchive()):
+			return self._runWithArchive(rebuildFunction)
+		with self._writeTransaction() as transaction:
+			try:
+				rollupModelClass.delete().execute()
+				rollupModelClass.insert_from(buildRollupSelect(1), rollupFields).execute()
+			except Exception as e:
+				transaction.rollback()
+				self._logger.exception("Could not rebuild the rollup '" + rollupModelClass.__name__ + "':" + str(e))
+				self.sendErrorMessageToClient("PJH-DatabaseManager", "Could not rebuild the statistic rollup. See OctoPrint.log for details!")
+				return False
+		return True
+
+	# Success rate and the averages of each file, reads only the rollup rows. Duration and filament are the averages
+	# of the successful jobs (None without one), the real values of a complete print. The sums are maintained by
+	# adding/subtracting, the averages are rounded.
+	# filePathNames: keys of the files (see PrintJobModel.getFileRollupKey), None for all files
+	# return: key -> values
+	def loadFileStatistics(self, filePathNames=None):
+		allRollupModels = []
+		if (filePathNames == None):
+			allRollupModels = list(FileRollupModel.select().order_by(FileRollupModel.jobCount.desc(), FileRollupModel.filePathName))
+		else:
+			for filePathNameChunk in chunked(set(filePathNames), SQL_MAX_VARIABLES):
+				allRollupModels += list(FileRollupModel.select().where(FileRollupModel.filePathName.in_(filePathNameChunk)))
+
+		fileStatistics = dict()
+		for rollupModel in allRollupModels:
+			successCount = rollupModel.successCount
+			averageDuration = None if successCount == 0 else int(round(rollupModel.successDuration / successCount))
+			fileStatistics[rollupModel.filePathName] = {
+				"jobCount": rollupModel.jobCount,
+				"successCount": successCount,
+				"successRate": round(100.0 * successCount / rollupModel.jobCount, 1),
+				"averageDuration": averageDuration,
+				"averageDurationFormatted": "" if averageDuration == None else StringUtils.secondsToText(averageDuration),
+				"averageUsedLength": None if successCount == 0 else round(rollupModel.successUsedLength / successCount, 2),
+				"averageUsedWeight": None if successCount == 0 else round(rollupModel.successUsedWeight / successCount, 2),
+				"averageCosts": round(rollupModel.totalCosts / rollupModel.jobCount, 2)
+			}
+		return fileStatistics
+
+	# bucketSize: day, week (starts monday), month
+	# return: expression of the first day of the bucket for the date/datetime column
+	def _buildDateBucketExpression(self, bucketSize, dateColumn):
+		if (self._isPostgres()):
+			bucketExpressions = {
+				"day": fn.date(dateColumn),
+				"week": fn.date(fn.date_trunc("week", dateColumn)),
+				"month": fn.date(fn.date_trunc("month", dateColumn))
+			}
+		else:
+			bucketExpressions = {
+				"day": fn.date(dateColumn),
+				"week": fn.date(dateColumn, "weekday 0", "-6 days"),
+				"month": fn.strftime("%Y-%m-01", dateColumn)
+			}
+		if (bucketSize not in bucketExpressions):
+			raise ValueError("Unknown bucket '" + str(bucketSize) + "', expected one of " + str(list(bucketExpressions.keys())))
+		# the date string itself, not converted by the (datetime) field of the column
+		return bucketExpressions[bucketSize].coerce(False)
+
+	def _validateSeriesGroupBy(self, groupBy, groupColumns):
+		if (groupBy != None and groupBy not in groupColumns):
+			raise ValueError("Unknown groupBy '" + str(groupBy) + "', expected one of " + str(list(groupColumns.keys())))
+
+	# Series of the rollup values for dashboards, reads only the rollup rows, not the print jobs
+	# bucketSize: day, week (starts monday), month
+	# groupBy: None, status, material, spoolName
+	# startDate/endDate: "%d.%m.%Y" like the table query, both optional
+	def loadStatisticSeries(self, bucketSize, startDate=None, endDate=None, groupBy=None):
+		groupColumns = {
+			"status": DailyRollupModel.printStatusResult,
+			"material": DailyRollupModel.material,
+			"spoolName": DailyRollupModel.spoolName
+		}
+		bucketExpression = self._buildDateBucketExpression(bucketSize, DailyRollupModel.day)
+		self._validateSeriesGroupBy(groupBy, groupColumns)
+
+		selectedColumns = [bucketExpression.alias("bucket")]
+		groupByColumns = [bucketExpression]
+		if (groupBy != None):
+			selectedColumns.append(groupColumns[groupBy].alias("group"))
+			groupByColumns.append(groupColumns[groupBy])
+		selectedColumns = selectedColumns + [fn.SUM(DailyRollupModel.jobCount).alias("jobCount"),
+											 fn.SUM(DailyRollupModel.duration).alias("duration"),
+											 fn.SUM(DailyRollupModel.usedLength).alias("usedLength"),
+											 fn.SUM(DailyRollupModel.usedWeight).alias("usedWeight"),
+											 fn.SUM(DailyRollupModel.filamentCost).alias("filamentCost"),
+											 fn.SUM(DailyRollupModel.totalCosts).alias("totalCosts")]
+
+		myQuery = DailyRollupModel.select(*selectedColumns)
+		if (StringUtils.isNotEmpty(startDate)):
+			myQuery = myQuery.where(DailyRollupModel.day >= datetime.datetime.strptime(startDate, "%d.%m.%Y").date())
+		if (StringUtils.isNotEmpty(endDate)):
+			myQuery = myQuery.where(DailyRollupModel.day <= datetime.datetime.strptime(endDate, "%d.%m.%Y").date())
+		myQuery = myQuery.group_by(*groupByColumns).order_by(*groupByColumns)
+
+		allSeriesValues = []
+		for row in myQuery.dicts():
+			row["bucket"] = str(row["bucket"])
+			allSeriesValues.append(row)
+		return allSeriesValues
+
+	# Same series as loadStatisticSeries, but for the jobs of the table query (status, date range, search, slicer
+	# settings,... filters), grouped inside the database. Material, spool and filament values of the "total" filament.
+	def calculateStatisticSeriesByQuery(self, tableQuery, bucketSize="day", groupBy=None):
+		if (self._isArchiveRequested(tableQuery)):
+			return self._runWithArchive(self.calculateStatisticSeriesByQuery, tableQuery, bucketSize, groupBy)
+		groupColumns = {
+			"status": fn.COALESCE(PrintJobModel.printStatusResult, ""),
+			"material": fn.COALESCE(FilamentModel.material, ""),
+			"spoolName": fn.COALESCE(FilamentModel.spoolName, "")
+		}
+		bucketExpression = self._buildDateBucketExpression(bucketSize, PrintJobModel.printStartDateTime)
+		self._validateSeriesGroupBy(groupBy, groupColumns)
+
+		selectedColumns = [bucketExpression.alias("bucket")]
+		groupByColumns = [bucketExpression]
+		if (groupBy != None):
+			selectedColumns.append(groupColumns[groupBy].alias("group"))
+			groupByColumns.append(groupColumns[groupBy])
+		selectedColumns = selectedColumns + [fn.COUNT(PrintJobModel.databaseId).alias("jobCount"),
+											 fn.COALESCE(fn.SUM(PrintJobModel.duration), 0).alias("duration"),
+											 fn.COALESCE(fn.SUM(FilamentModel.usedLength), 0).alias("usedLength"),
+											 fn.COALESCE(fn.SUM(FilamentModel.usedWeight), 0).alias("usedWeight"),
+											 fn.COALESCE(fn.SUM(FilamentModel.usedCost), 0).alias("filamentCost"),
+											 fn.COALESCE(fn.SUM(CostModel.totalCosts), 0).alias("totalCosts")]
+
+		myQuery = PrintJobModel.select(*selectedColumns)
+		myQuery = myQuery.join(FilamentModel, JOIN.LEFT_OUTER, on=((FilamentModel.printJob == PrintJobModel.databaseId) & (FilamentModel.toolId == "total")))
+		myQuery = myQuery.switch(PrintJobModel).join(CostModel, JOIN.LEFT_OUTER, on=(CostModel.printJob == PrintJobModel.databaseId))
+		myQuery = myQuery.where(PrintJobModel.printStartDateTime.is_null(False))
+		myQuery = self._addTableQueryFilterToSelect(myQuery, tableQuery)
+		myQuery = myQuery.group_by(*groupByColumns).order_by(*groupByColumns)
+
+		allSeriesValues = []
+		for row in myQuery.dicts():
+			row["bucket"] = str(row["bucket"])
+			allSeriesValues.append(row)
+		return allSeriesValues
+
 	#
 	def calculatePrintJobsStatisticByQuery(self, tableQuery):
+		return self._formatPrintJobsStatistic(tableQuery, self._calculatePrintJobsStatisticValues(tableQuery))
+
+	# return: the not formatted values of the statistic, e.g. for the sum over the printers of a farm
+	def _calculatePrintJobsStatisticValues(self, tableQuery):
+		if (self._isArchiveRequested(tableQuery)):
+			return self._runWithArchive(self._calculatePrintJobsStatisticValues, tableQuery)
+		# everything is calculated inside the database (SUM/COUNT/GROUP BY), no job is loaded into python
+
+		# - job values
+		jobQuery = PrintJobModel.select(fn.COUNT(PrintJobModel.databaseId).alias("printJobCount"),
+										fn.MIN(PrintJobModel.printStartDateTime).alias("firstDate"),
+										fn.SUM(PrintJobModel.duration).alias("duration"),
+										fn.SUM(PrintJobModel.fileSize).alias("fileSize"))
+		jobQuery = self._addTableQueryFilterToSelect(jobQuery, tableQuery)
+		jobValues = jobQuery.dicts().get()
+
+		printJobCount = jobValues["printJobCount"]
+		duration = self._noneToZero(jobValues["duration"])
+		fileSize = self._noneToZero(jobValues["fileSize"])
+		firstDate = self._toDateTime(jobValues["firstDate"])
+
+		# end of the last started job
+		lastDate = None
+		lastStartDate = None
+		lastDateQuery = PrintJobModel.select(PrintJobModel.printStartDateTime, PrintJobModel.printEndDateTime).where(PrintJobModel.printEndDateTime.is_null(False))
+		lastDateQuery = self._addTableQueryFilterToSelect(lastDateQuery, tableQuery)
+		lastDateQuery = lastDateQuery.order_by(PrintJobModel.printStartDateTime.desc()).limit(1)
+		lastJob = lastDateQuery.first()
+		if (lastJob != None):
+			lastDate = lastJob.printEndDateTime
+			lastStartDate = lastJob.printStartDateTime
 
-		printJobCount = 0
-		duration = 0
-		length = 0.0
-		weight = 0.0
-		fileSize = 0
 		statusDict = dict()
-		materialDict = dict()
-		spoolDict = dict()
-		firstDate = None
-		lastDate = None
-		newTableQuery = tableQuery.copy()
-		newTableQuery["sortColumn"] = "printStartDateTime"
-		newTableQuery["sortOrder"] = "asc"
-		newTableQuery["from"] = 0
-		newTableQuery["to"] = 999999
-		allJobModels = self.loadPrintJobsByQuery(newTableQuery)
-
-		for job in allJobModels:
-			printJobCount = printJobCount + 1
-			if (firstDate == None):
-				firstDate = job.printStartDateTime
-			if (job.printEndDateTime != None):
-				lastDate = job.printEndDateTime
-			tempJobFileSize = job.fileSize
-			if (tempJobFileSize == None):
-				tempJobFileSize = 0
-			fileSize = fileSize + tempJobFileSize
-			duration = duration + job.duration
-			statusResult = job.printStatusResult
-
-			if (statusResult in statusDict):
-				currentCount = statusDict[statusResult]
-				currentCount = currentCount + 1
-				statusDict[statusResult] = currentCount
-			else:
-				statusDict[statusResult] = 1
-
-			allFilaments = job.getFilamentModels()
-			if allFilaments != None:
-				for filla in allFilaments:
-					if filla.toolId == "total":
-						# exclude totals, otherwise everything is counted twice
-						continue
-					if (StringUtils.isEmpty(filla.usedLength) == False):
-						length = length + filla.usedLength
-					if (StringUtils.isEmpty(filla.usedWeight) == False):
-						weight = weight + filla.usedWeight
-
-					if (StringUtils.isEmpty(filla.spoolName) == False):
-						# spoolsSet.add(filla.spoolName)
-						if (filla.spoolName in spoolDict):
-							currentCount = spoolDict[filla.spoolName]
-							currentCount = currentCount + 1
-							spoolDict[filla.spoolName] = currentCount
-						else:
-							spoolDict[filla.spoolName] = 1
-
-					if (StringUtils.isEmpty(filla.material) == False):
-						# materialsSet.add(filla.material)
-						if (filla.material in materialDict):
-							currentCount = materialDict[filla.material]
-							currentCount = currentCount + 1
-							materialDict[filla.material] = currentCount
-						else:
-							materialDict[filla.material] = 1
-
-		# do formatting
+		statusQuery = PrintJobModel.select(PrintJobModel.printStatusResult, fn.COUNT(PrintJobModel.databaseId).alias("statusCount"))
+		statusQuery = self._addTableQueryFilterToSelect(statusQuery, tableQuery)
+		statusQuery = statusQuery.group_by(PrintJobModel.printStatusResult)
+		for statusRow in statusQuery.dicts():
+			statusDict[statusRow["printStatusResult"]] = statusRow["statusCount"]
+
+		# - filament values, exclude totals, otherwise everything is counted twice
+		filamentQuery = FilamentModel.select(fn.SUM(FilamentModel.usedLength).alias("usedLength"),
+											 fn.SUM(FilamentModel.usedWeight).alias("usedWeight"))
+		filamentQuery = self._addTableQueryFilterToFilamentSelect(filamentQuery, tableQuery)
+		filamentValues = filamentQuery.dicts().get()
+		length = float(self._noneToZero(filamentValues["usedLength"]))
+		weight = float(self._noneToZero(filamentValues["usedWeight"]))
+
+		materialDict = self._countFilamentValues(FilamentModel.material, tableQuery)
+		spoolDict = self._countFilamentValues(FilamentModel.spoolName, tableQuery)
+		return {
+			"printJobCount": printJobCount,
+			"firstDate": firstDate,
+			"lastDate": lastDate,
+			"lastStartDate": lastStartDate,
+			"duration": duration,
+			"fileSize": fileSize,
+			"length": length,
+			"weight": weight,
+			"statusDict": statusDict,
+			"materialDict": materialDict,
+			"spoolDict": spoolDict
+		}
+
+	def _formatPrintJobsStatistic(self, tableQuery, statisticValues):
+		firstDate = statisticValues["firstDate"]
+		lastDate = statisticValues["lastDate"]
+
 		queryString = self._buildQueryString(tableQuery)
 		lastDateString = ""
 		if (lastDate != None):
 			lastDateString = lastDate.strftime('%d.%m.%Y %H:%M')
-		fromToString = firstDate.strftime('%d.%m.%Y %H:%M') + " - " + lastDateString
-		durationString = StringUtils.secondsToText(duration)
-		lengthString = self._buildLengthString(length)
-		weightString = self._buildWeightString(weight)
-		statusString = self._buildStatusString(statusDict)
-		materialString = self._buildDictlString(materialDict)
-		spoolString = self._buildDictlString(spoolDict)
-		fileSizeString = StringUtils.get_formatted_size(fileSize)
+		firstDateString = ""
+		if (firstDate != None):
+			firstDateString = firstDate.strftime('%d.%m.%Y %H:%M')
+		fromToString = firstDateString + " - " + lastDateString
+		durationString = StringUtils.secondsToText(statisticValues["duration"])
+		lengthString = self._buildLengthString(statisticValues["length"])
+		weightString = self._buildWeightString(statisticValues["weight"])
+		statusString = self._buildStatusString(statisticValues["statusDict"])
+		materialString = self._buildDictlString(statisticValues["materialDict"])
+		spoolString = self._buildDictlString(statisticValues["spoolDict"])
+		fileSizeString = StringUtils.get_formatted_size(statisticValues["fileSize"])
 		return {
-			"printJobCount": printJobCount,
+			"printJobCount": statisticValues["printJobCount"],
 			"query": queryString,
 			"fromToDate": fromToString,
 			"duration": durationString,
@@ -669,6 +2336,92 @@ class DatabaseManager(object):
 			"spools": spoolString
 		}
 
+	# "bed", "tool0" or "tool" for all tools
+	def _buildSensorCondition(self, sensorName):
+		sensorName = normalizeSensorName(sensorName)
+		if (sensorName == "tool"):
+			return TemperatureModel.sensorName.startswith("tool")
+		return TemperatureModel.sensorName == sensorName
+
+	# Temperature analytics, calculated inside the database for all jobs of the table query:
+	# groupBy material: temperatures of the sensor per material (total filament of the job)
+	# groupBy band: temperatures of the sensor in bands of bandSize degrees, e.g. 200-205, 205-210
+	# each with the job count and the success rate
+	def calculateTemperatureStatisticByQuery(self, tableQuery, sensorName="bed", groupBy="material", bandSize=5):
+		if (self._isArchiveRequested(tableQuery)):
+			return self._runWithArchive(self.calculateTemperatureStatisticByQuery, tableQuery, sensorName, groupBy, bandSize)
+		if (groupBy not in ["material", "band"]):
+			raise ValueError("Unknown groupBy '" + str(groupBy) + "', expected one of ['material', 'band']")
+		bandSize = float(bandSize)
+		if (bandSize <= 0):
+			raise ValueError("bandSize must be greater than 0")
+
+		if (groupBy == "material"):
+			groupExpression = fn.COALESCE(FilamentModel.material, "")
+		elif (self._isPostgres()):
+			groupExpression = fn.FLOOR(TemperatureModel.sensorValue / bandSize) * bandSize
+		else:
+			# temperatures are positive, the cast truncates like floor
+			groupExpression = Cast(TemperatureModel.sensorValue / bandSize, "INTEGER") * bandSize
+
+		# a job with several tools has more than one temperature row
+		myQuery = TemperatureModel.select(groupExpression.alias("group"),
+										  fn.COUNT(fn.DISTINCT(PrintJobModel.databaseId)).alias("jobCount"),
+										  fn.COUNT(fn.DISTINCT(Case(None, [(PrintJobModel.printStatusResult == "success", PrintJobModel.databaseId)]))).alias("successCount"),
+										  fn.AVG(TemperatureModel.sensorValue).alias("averageTemperature"),
+										  fn.MIN(TemperatureModel.sensorValue).alias("minTemperature"),
+										  fn.MAX(TemperatureModel.sensorValue).alias("maxTemperature"))
+		myQuery = myQuery.join(PrintJobModel)
+		if (groupBy == "material"):
+			myQuery = myQuery.join(FilamentModel, JOIN.LEFT_OUTER, on=((FilamentModel.printJob == PrintJobModel.databaseId) & (FilamentModel.toolId == "total")))
+		myQuery = myQuery.where(self._buildSensorCondition(sensorName) & TemperatureModel.sensorValue.is_null(False))
+		myQuery = self._addTableQueryFilterToSelect(myQuery, tableQuery)
+		myQuery = myQuery.group_by(groupExpression).order_by(groupExpression)
+
+		allStatisticValues = []
+		for row in myQuery.dicts():
+			jobCount = row["jobCount"]
+			statisticValues = {
+				"group": row["group"] if groupBy == "material" else float(row["group"]),
+				"jobCount": jobCount,
+				"successCount": row["successCount"],
+				"successRate": round(100.0 * row["successCount"] / jobCount, 1) if jobCount > 0 else 0.0,
+				"averageTemperature": round(float(row["averageTemperature"]), 1),
+				"minTemperature": float(row["minTemperature"]),
+				"maxTemperature": float(row["maxTemperature"])
+			}
+			if (groupBy == "band"):
+				statisticValues["bandEnd"] = statisticValues["group"] + bandSize
+			allStatisticValues.append(statisticValues)
+		return allStatisticValues
+
+	# count of all used values (e.g. material, spoolName) in order of the first usage
+	def _countFilamentValues(self, filamentField, tableQuery):
+		result = dict()
+		countQuery = FilamentModel.select(filamentField.alias("value"), fn.COUNT(FilamentModel.databaseId).alias("valueCount"))
+		countQuery = self._addTableQueryFilterToFilamentSelect(countQuery, tableQuery)
+		countQuery = countQuery.where(filamentField.is_null(False) & (fn.TRIM(filamentField) != ""))
+		countQuery = countQuery.group_by(filamentField).order_by(fn.MIN(PrintJobModel.printStartDateTime), fn.MIN(FilamentModel.databaseId))
+		for countRow in countQuery.dicts():
+			result[countRow["value"]] = countRow["valueCount"]
+		return result
+
+	def _addTableQueryFilterToFilamentSelect(self, filamentQuery, tableQuery):
+		filamentQuery = filamentQuery.join(PrintJobModel)
+		filamentQuery = filamentQuery.where((FilamentModel.toolId != "total") | (FilamentModel.toolId.is_null()))
+		return self._addTableQueryFilterToSelect(filamentQuery, tableQuery)
+
+	def _noneToZero(self, value):
+		if (value == None):
+			return 0
+		return value
+
+	# aggregate functions return the raw column value, not the python type of the field
+	def _toDateTime(self, value):
+		if (value == None or isinstance(value, datetime.datetime)):
+			return value
+		return PrintJobModel.printStartDateTime.python_value(value)
+
 	def _buildLengthString(self, length):
 		lengthString = StringUtils.formatFloatSave("{:.02f}", TransformPrintJob2JSON.convertMM2M(length), "-")
 		if (lengthString != "-"):
@@ -735,6 +2488,12 @@ class DatabaseManager(object):
 
 
 	def countPrintJobsByQuery(self, tableQuery):
+		cacheKey = self._buildQueryCacheKey("count", tableQuery, TABLE_QUERY_FILTER_KEYS)
+		return self._queryCache.getOrLoad(cacheKey, lambda: self._countPrintJobsByQuery(tableQuery))
+
+	def _countPrintJobsByQuery(self, tableQuery):
+		if (self._isArchiveRequested(tableQuery)):
+			return self._runWithArchive(self._countPrintJobsByQuery, tableQuery)
 
 		# filterName = tableQuery["filterName"]
 
@@ -749,7 +2508,16 @@ class DatabaseManager(object):
 		return myQuery.count()
 
 
-	def loadPrintJobsByQuery(self, tableQuery):
+	# only the pages of the table (without the texts) are cached, not e.g. the export of all jobs
+	def loadPrintJobsByQuery(self, tableQuery, withTexts=False):
+		if (withTexts):
+			return self._loadPrintJobsByQuery(tableQuery, withTexts)
+		cacheKey = self._buildQueryCacheKey("page", tableQuery, TABLE_QUERY_FILTER_KEYS + TABLE_QUERY_PAGE_KEYS)
+		return self._queryCache.getOrLoad(cacheKey, lambda: list(self._loadPrintJobsByQuery(tableQuery)), self._copyPrintJobs)
+
+	def _loadPrintJobsByQuery(self, tableQuery, withTexts=False):
+		if (self._isArchiveRequested(tableQuery)):
+			return self._runWithArchive(self._loadPrintJobsByQuery, tableQuery, withTexts)
 		offset = int(tableQuery["from"])
 		limit = int(tableQuery["to"])
 		# sortColumn = tableQuery["sortColumn"]
@@ -759,6 +2527,7 @@ class DatabaseManager(object):
 		# dont use join "Kartesischs-Produkt" myQuery = PrintJobModel.select().join(FilamentModel).offset(offset).limit(limit)
 		myQuery = PrintJobModel.select().offset(offset).limit(limit)
 		myQuery = self._addTableQueryToSelect(myQuery, tableQuery)
+		myQuery = self._prefetchRelations(myQuery, withTexts)
 		# if (filterName == "onlySuccess"):
 		# 	myQuery = myQuery.where(PrintJobModel.printStatusResult == "success")
 		# elif (filterName == "onlyFailed"):
@@ -790,19 +2559,146 @@ class DatabaseManager(object):
 
 		return myQuery
 
+	# The page and the total count of the filtered jobs with one statement, the window function is evaluated before
+	# LIMIT/OFFSET. The relations are loaded by the ids of the page and not with the filter as sub-select (prefetch),
+	# so the filter (e.g. search, date range) is evaluated only once.
+	# return: (allPrintJobModels, totalItemCount)
+	def loadPrintJobsPageByQuery(self, tableQuery):
+		cacheKey = self._buildQueryCacheKey("pageWithCount", tableQuery, TABLE_QUERY_FILTER_KEYS + TABLE_QUERY_PAGE_KEYS)
+		return self._queryCache.getOrLoad(cacheKey, lambda: self._loadPrintJobsPageByQuery(tableQuery),
+										  lambda page: (self._copyPrintJobs(page[0]), page[1]))
+
+	def _loadPrintJobsPageByQuery(self, tableQuery):
+		if (self._isArchiveRequested(tableQuery)):
+			return self._runWithArchive(self._loadPrintJobsPageByQuery, tableQuery)
+		if (self._isPostgres() == False and SQLITE_WINDOW_FUNCTIONS == False):
+			return (list(self._loadPrintJobsByQuery(tableQuery)), self._countPrintJobsByQuery(tableQuery))
 
+		offset = int(tableQuery["from"])
+		limit = int(tableQuery["to"])
+		myQuery = PrintJobModel.select(PrintJobModel, fn.COUNT(SQL("*")).over().alias("totalItemCount")).offset(offset).limit(limit)
+		myQuery = self._addTableQueryToSelect(myQuery, tableQuery)
+		allPrintJobModels = list(myQuery)
+		if (len(allPrintJobModels) > 0):
+			totalItemCount = allPrintJobModels[0].totalItemCount
+		elif (offset > 0):
+			# no row behind the offset, e.g. the last page after a delete
+			totalItemCount = self._countPrintJobsByQuery(tableQuery)
+		else:
+			totalItemCount = 0
+		self._loadRelationsByIds(allPrintJobModels)
+		return (allPrintJobModels, totalItemCount)
+
+	# same result as the prefetch: the relation-lists of the backrefs and the printJob of each relation
+	def _loadRelationsByIds(self, allPrintJobModels, withTexts=False):
+		printJobsById = dict([(printJobModel.databaseId, printJobModel) for printJobModel in allPrintJobModels])
+		allRelations = [(FilamentModel, "filaments"), (TemperatureModel, "temperatures"), (CostModel, "costs")]
+		if (withTexts):
+			allRelations.append((PrintJobTextModel, "texts"))
+		for relationModelClass, relationName in allRelations:
+			relationsById = {}
+			for databaseIdChunk in chunked(list(printJobsById.keys()), SQL_MAX_VARIABLES):
+				for relationModel in relationModelClass.select().where(relationModelClass.printJob.in_(databaseIdChunk)):
+					relationsById.setdefault(relationModel.printJob_id, []).append(relationModel)
+			for databaseId, printJobModel in printJobsById.items():
+				allRelationModels = relationsById.get(databaseId, [])
+				for relationModel in allRelationModels:
+					relationModel.printJob = printJobModel
+					relationModel._dirty.clear()
+				setattr(printJobModel, relationName, allRelationModels)
+			if (relationModelClass == PrintJobTextModel):
+				self._loadSlicerSettingsTexts([textModel for allTextModels in relationsById.values() for textModel in allTextModels])
+
+	# Keyset pagination, the cost for the next/previous page is constant, because the database could jump with the
+	# sort-index directly to the cursor position instead of walking over all skipped rows (offset).
+	# The cursor is an opaque token of the sort-key (sortValue, databaseId) of the first/last job of a page.
+	# Without a cursor the page is selected by 'from' (e.g. jump to a page number) and the returned cursors could be
+	# used for the following next/previous pages.
+	# return: (allPrintJobModels, nextCursor, previousCursor), cursor is None if there is no page in that direction
+	def loadPrintJobsByCursor(self, tableQuery):
+		cacheKey = self._buildQueryCacheKey("cursorPage", tableQuery, TABLE_QUERY_FILTER_KEYS + TABLE_QUERY_PAGE_KEYS)
+		return self._queryCache.getOrLoad(cacheKey, lambda: self._loadPrintJobsByCursor(tableQuery),
+										  lambda cursorPage: (self._copyPrintJobs(cursorPage[0]), cursorPage[1], cursorPage[2]))
+
+	def _loadPrintJobsByCursor(self, tableQuery):
+		if (self._isArchiveRequested(tableQuery)):
+			return self._runWithArchive(self._loadPrintJobsByCursor, tableQuery)
+		limit = int(tableQuery["to"])
+		sortColumn = tableQuery["sortColumn"] if tableQuery["sortColumn"] == "fileName" else "printStartDateTime"
+		sortOrder = "asc" if tableQuery["sortOrder"] == "asc" else "desc"
+		cursorDirection = "previous" if tableQuery.get("cursorDirection") == "previous" else "next"
+		cursorKey = self._decodeCursor(tableQuery.get("cursor"), sortColumn, sortOrder)
+		offset = 0
+		if (cursorKey == None):
+			offset = max(StringUtils.transformToIntOrNone(tableQuery.get("from")) or 0, 0)
+			cursorDirection = "next"
+
+		sortExpression = self._getCursorSortExpression(sortColumn)
+		scanDescending = (sortOrder == "desc") != (cursorDirection == "previous")
+
+		myQuery = PrintJobModel.select(PrintJobModel, sortExpression.alias("cursorSortValue"))
+		myQuery = self._addTableQueryFilterToSelect(myQuery, tableQuery)
+		if (cursorKey != None):
+			# (sortValue, databaseId) < cursor, written out, because the expression-index (lower(fileName)) is not
+			# used for a row-value comparison
+			sortValue, databaseId = cursorKey
+			if (scanDescending):
+				myQuery = myQuery.where((sortExpression <= sortValue) & ((sortExpression < sortValue) | (PrintJobModel.databaseId < databaseId)))
+			else:
+				myQuery = myQuery.where((sortExpression >= sortValue) & ((sortExpression > sortValue) | (PrintJobModel.databaseId > databaseId)))
+		if (scanDescending):
+			myQuery = myQuery.order_by(sortExpression.desc(), PrintJobModel.databaseId.desc())
+		else:
+			myQuery = myQuery.order_by(sortExpression, PrintJobModel.databaseId)
+		# one more, to know if there is a further page
+		myQuery = myQuery.offset(offset).limit(limit + 1)
+
+		allPrintJobModels = self._prefetchRelations(myQuery)
+		hasMore = len(allPrintJobModels) > limit
+		allPrintJobModels = allPrintJobModels[:limit]
+		if (cursorDirection == "previous"):
+			allPrintJobModels.reverse()
+
+		nextCursor = None
+		previousCursor = None
+		if (len(allPrintJobModels) > 0):
+			if ((cursorDirection == "next" and hasMore) or (cursorDirection == "previous" and cursorKey != None)):
+				nextCursor = self._encodeCursor(allPrintJobModels[-1], sortColumn, sortOrder)
+			if ((cursorDirection == "previous" and hasMore) or (cursorDirection == "next" and (cursorKey != None or offset > 0))):
+				previousCursor = self._encodeCursor(allPrintJobModels[0], sortColumn, sortOrder)
+		return (allPrintJobModels, nextCursor, previousCursor)
+
+	# same expressions as the sorting in _addTableQueryToSelect (and the indexes)
+	def _getCursorSortExpression(self, sortColumn):
+		if ("fileName" == sortColumn):
+			return fn.Lower(PrintJobModel.fileName)
+		return PrintJobModel.printStartDateTime
+
+	def _encodeCursor(self, printJobModel, sortColumn, sortOrder):
+		cursorAsJson = json.dumps([sortColumn, sortOrder, printJobModel.cursorSortValue, printJobModel.databaseId], default=str)
+		return base64.urlsafe_b64encode(cursorAsJson.encode("utf-8")).decode("ascii")
+
+	# return (sortValue, databaseId) or None, if no/invalid cursor or the cursor belongs to another sorting
+	def _decodeCursor(self, cursor, sortColumn, sortOrder):
+		if (StringUtils.isEmpty(cursor)):
+			return None
+		try:
+			cursorSortColumn, cursorSortOrder, sortValue, databaseId = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8"))
+		except Exception as e:
+			self._logger.warning("Invalid table cursor '" + str(cursor) + "', start with the first page:" + str(e))
+			return None
+		if (cursorSortColumn != sortColumn or cursorSortOrder != sortOrder):
+			return None
+		if ("printStartDateTime" == sortColumn):
+			sortValue = PrintJobModel.printStartDateTime.python_value(sortValue)
+		return (sortValue, int(databaseId))
 
 	def _addTableQueryToSelect(self, myQuery, tableQuery):
 
 		sortColumn = tableQuery["sortColumn"]
 		sortOrder = tableQuery["sortOrder"]
-		filterName = tableQuery["filterName"]
 
-		# - status
-		if (filterName == "onlySuccess"):
-			myQuery = myQuery.where(PrintJobModel.printStatusResult == "success")
-		elif (filterName == "onlyFailed"):
-			myQuery = myQuery.where(PrintJobModel.printStatusResult != "success")
+		myQuery = self._addTableQueryFilterToSelect(myQuery, tableQuery)
 		# -sorting
 		if ("printStartDateTime" == sortColumn):
 			if ("desc" == sortOrder):
@@ -814,6 +2710,18 @@ class DatabaseManager(object):
 				myQuery = myQuery.order_by(fn.Lower(PrintJobModel.fileName).desc())
 			else:
 				myQuery = myQuery.order_by(fn.Lower(PrintJobModel.fileName))
+		return myQuery
+
+	# only the where-clauses of the table query, without sorting (also used for aggregations)
+	def _addTableQueryFilterToSelect(self, myQuery, tableQuery):
+
+		filterName = tableQuery.get("filterName", "all")
+
+		# - status
+		if (filterName == "onlySuccess"):
+			myQuery = myQuery.where(PrintJobModel.printStatusResult == "success")
+		elif (filterName == "onlyFailed"):
+			myQuery = myQuery.where(PrintJobModel.printStatusResult != "success")
 		# - date range
 		if ("startDate" in tableQuery):
 			startDate = tableQuery["startDate"]
@@ -828,27 +2736,105 @@ class DatabaseManager(object):
 				# 						 ((PrintJobModel.printStartDateTime == endDate) | ( PrintJobModel.printStartDateTime <  startDate)) )
 				myQuery = myQuery.where( ( ( PrintJobModel.printStartDateTime > startDateTime) & ( PrintJobModel.printStartDateTime < endDateTime))
 										 )
-		# - search query (only filename)
+		# - temperature range of a sensor, e.g. only jobs printed with a nozzle temperature of 200-215
+		temperatureSensor = tableQuery.get("temperatureSensor")
+		if (StringUtils.isNotEmpty(temperatureSensor)):
+			temperatureQuery = TemperatureModel.select(TemperatureModel.printJob).where(self._buildSensorCondition(temperatureSensor))
+			minTemperature = tableQuery.get("minTemperature")
+			if (StringUtils.isNotEmpty(minTemperature)):
+				temperatureQuery = temperatureQuery.where(TemperatureModel.sensorValue >= float(minTemperature))
+			maxTemperature = tableQuery.get("maxTemperature")
+			if (StringUtils.isNotEmpty(maxTemperature)):
+				temperatureQuery = temperatureQuery.where(TemperatureModel.sensorValue <= float(maxTemperature))
+			myQuery = myQuery.where(PrintJobModel.databaseId.in_(temperatureQuery))
+		# - parsed slicer settings, e.g. "layer_height = 0.2 AND infill_sparse_density > 30%"
+		slicerSettingsFilter = tableQuery.get("slicerSettingsFilter")
+		if (StringUtils.isNotEmpty(slicerSettingsFilter)):
+			myQuery = self._addSlicerSettingsFilterToSelect(myQuery, slicerSettingsFilter)
+		# - search query (filename, note, slicer settings), every term must match
 		if ("searchQuery" in tableQuery):
 			searchQueryValue = tableQuery["searchQuery"]
 			if (len(searchQueryValue) > 0):
-				myQuery = myQuery.where(PrintJobModel.fileName.contains(searchQueryValue))
+				myQuery = self._addSearchQueryToSelect(myQuery, searchQueryValue)
 				pass
 		return myQuery
 
+	# each condition is a lookup of the (settingKey, value) index
+	def _addSlicerSettingsFilterToSelect(self, myQuery, slicerSettingsFilter):
+		for condition in SLICER_SETTINGS_FILTER_SEPARATOR_PATTERN.split(slicerSettingsFilter.strip()):
+			matched = SLICER_SETTINGS_FILTER_CONDITION_PATTERN.match(condition)
+			if (matched == None):
+				raise ValueError("Invalid slicer settings filter '" + condition + "', expected e.g. 'layer_height = 0.2'")
+			key = matched.group(1)
+			compareOperator = matched.group(2)
+			value = matched.group(3).strip("'\"")
+			valueType, numberValue = SlicerSettingsParser.parseTypedValue(value)
+			if (numberValue != None):
+				valueCondition = SLICER_SETTINGS_FILTER_OPERATORS[compareOperator](SlicerSettingValueModel.numberValue, numberValue)
+			elif (compareOperator in ["=", "!="]):
+				valueCondition = SLICER_SETTINGS_FILTER_OPERATORS[compareOperator](SlicerSettingValueModel.textValue, value)
+			else:
+				raise ValueError("Invalid slicer settings filter '" + condition + "', '" + compareOperator + "' only for numbers")
+			valueQuery = (SlicerSettingValueModel.select(SlicerSettingValueModel.printJob)
+						  .join(SlicerSettingKeyModel, on=(SlicerSettingValueModel.settingKey == SlicerSettingKeyModel.databaseId))
+						  .where((SlicerSettingKeyModel.key == key) & valueCondition))
+			myQuery = myQuery.where(PrintJobModel.databaseId.in_(valueQuery))
+		return myQuery
+
+	def _addSearchQueryToSelect(self, myQuery, searchQueryValue):
+		# the full-text index contains only the jobs of the main file, not of the archive or a farm database
+		searchIndexTokenizer = None if (self._isArchiveIncluded() or self._isFarmDatabaseIncluded()) else self._searchIndexTokenizer
+		matchTerms = []
+		for searchTerm in searchQueryValue.split():
+			# the trigram-index only knows terms with at least 3 characters
+			if (searchIndexTokenizer == None or (searchIndexTokenizer == "trigram" and len(searchTerm) < 3)):
+				slicerSettingsColumn = SlicerSettingsBlobModel.slicerSettingsAsText
+				if (self._isPostgres() == False):
+					# compressed since V16
+					slicerSettingsColumn = getattr(fn, TextCompression.SQL_TEXT_FUNCTION_NAME)(SlicerSettingsBlobModel.slicerSettingsAsText)
+				# each distinct text is searched once (since V18)
+				blobSelect = SlicerSettingsBlobModel.select(SlicerSettingsBlobModel.contentHash).where(slicerSettingsColumn.contains(searchTerm))
+				slicerSettingsSelect = PrintJobTextModel.select(PrintJobTextModel.printJob).where(PrintJobTextModel.slicerSettingsHash.in_(blobSelect))
+				myQuery = myQuery.where(PrintJobModel.fileName.contains(searchTerm) |
+										PrintJobModel.noteText.contains(searchTerm) |
+										PrintJobModel.databaseId.in_(slicerSettingsSelect))
+				continue
+			matchTerm = '"' + searchTerm.replace('"', '""') + '"'
+			if (searchIndexTokenizer != "trigram"):
+				matchTerm = matchTerm + "*"
+			matchTerms.append(matchTerm)
+
+		if (len(matchTerms) > 0):
+			matchExpression = " AND ".join(matchTerms)
+			searchSelect = SQL("(SELECT rowid FROM " + SEARCH_INDEX_TABLE + " WHERE " + SEARCH_INDEX_TABLE + " MATCH ?)", [matchExpression])
+			myQuery = myQuery.where(PrintJobModel.databaseId.in_(searchSelect))
+		return myQuery
+
 
-	def loadSelectedPrintJobs(self, selectedDatabaseIds):
+	# Loads all relations (filaments, temperatures, costs) of the selected jobs with one query per relation-table,
+	# instead of three queries for each job. The model accessors (getFilamentModels,...) use the prefetched backrefs.
+	# withTexts: also the large text values (edit dialog, compare and report), not needed for the table
+	def _prefetchRelations(self, printJobQuery, withTexts=False):
+		if (withTexts):
+			allPrintJobModels = prefetch(printJobQuery, FilamentModel, TemperatureModel, CostModel, PrintJobTextModel)
+			self._loadSlicerSettingsTexts([textModel for printJobModel in allPrintJobModels for textModel in printJobModel.texts])
+			return allPrintJobModels
+		return prefetch(printJobQuery, FilamentModel, TemperatureModel, CostModel)
+
+	def loadSelectedPrintJobs(self, selectedDatabaseIds, withTexts=False):
 		selectedDatabaseIdsSplitted = selectedDatabaseIds.split(',')
 		databaseArray = []
 
 		for dbId in selectedDatabaseIdsSplitted:
 			databaseArray.append(dbId)
 
-		return PrintJobModel.select().where(PrintJobModel.databaseId << databaseArray).order_by(PrintJobModel.printStartDateTime.desc())
+		myQuery = PrintJobModel.select().where(PrintJobModel.databaseId << databaseArray).order_by(PrintJobModel.printStartDateTime.desc())
+		return self._prefetchRelations(myQuery, withTexts)
 
 
 	def loadAllPrintJobs(self):
-		return PrintJobModel.select().order_by(PrintJobModel.printStartDateTime.desc())
+		myQuery = PrintJobModel.select().order_by(PrintJobModel.printStartDateTime.desc())
+		return self._prefetchRelations(myQuery)
 
 		# return PrintJobModel.select().offset(offset).limit(limit).order_by(PrintJobModel.printStartDateTime.desc())
 		# all = PrintJobModel.select().join(FilamentModel).switch(PrintJobModel).join(TemperatureModel).order_by(PrintJobModel.printStartDateTime.desc())
@@ -870,20 +2856,41 @@ class DatabaseManager(object):
 			self._logger.error("Could not delete PrintJob, because not a valid databaseId '"+str(databaseId)+"' maybe not a number")
 			return None
 
-		with self._database.atomic() as transaction:  # Opens new transaction.
+		self.deletePrintJobs([databaseIdAsInt])
+
+	# Deletes the jobs and all relations in one transaction with a few set-based statements (per chunk of ids),
+	# instead of five statements and a transaction per job.
+	# return: printStartDateTime of each deleted job (for the snapshots), None if nothing was deleted because of an error
+	def deletePrintJobs(self, databaseIds):
+		allDatabaseIds = []
+		for databaseId in databaseIds:
+			databaseIdAsInt = StringUtils.transformToIntOrNone(databaseId)
+			if (databaseIdAsInt == None):
+				self._logger.error("Could not delete PrintJob, because not a valid databaseId '"+str(databaseId)+"' maybe not a number")
+				continue
+			allDatabaseIds.append(databaseIdAsInt)
+
+		allStartDateTimes = []
+		with self._writeTransaction() as transaction:  # Opens new transaction.
 			try:
-				# first delete relations
-				n = FilamentModel.delete().where(FilamentModel.printJob == databaseIdAsInt).execute()
-				n = TemperatureModel.delete().where(TemperatureModel.printJob == databaseIdAsInt).execute()
-				n = CostModel.delete().where(CostModel.printJob == databaseIdAsInt).execute()
-
-				PrintJobModel.delete_by_id(databaseIdAsInt)
+				for databaseIdChunk in chunked(allDatabaseIds, SQL_MAX_VARIABLES):
+					deleteQuery = PrintJobModel.select(PrintJobModel.printStartDateTime).where(PrintJobModel.databaseId.in_(databaseIdChunk))
+					allStartDateTimes += [printJob.printStartDateTime for printJob in deleteQuery]
+				self._updateRollups(allDatabaseIds, -1)
+				allContentHashes = self._loadSlicerSettingsHashes(allDatabaseIds)
+				for databaseIdChunk in chunked(allDatabaseIds, SQL_MAX_VARIABLES):
+					# first delete relations
+					for relationModelClass in [FilamentModel, TemperatureModel, CostModel, PrintJobTextModel, SlicerSettingValueModel]:
+						relationModelClass.delete().where(relationModelClass.printJob.in_(databaseIdChunk)).execute()
+					PrintJobModel.delete().where(PrintJobModel.databaseId.in_(databaseIdChunk)).execute()
+				self._deleteUnreferencedSlicerSettingsBlobs(allContentHashes)
 			except Exception as e:
 				# Because this block of code is wrapped with "atomic", a
 				# new transaction will begin automatically after the call
 				# to rollback().
 				transaction.rollback()
-				self._logger.exception("Could not delete printJob from database:" + str(e))
+				self._logger.exception("Could not delete printJobs from database:" + str(e))
 
-				self.sendErrorMessageToClient("PJH-DatabaseManager", "Could not delete the printjob ('"+ str(databaseId) +"') from the database. See OctoPrint.log for details!")
-			pass
+				self.sendErrorMessageToClient("PJH-DatabaseManager", "Could not delete the printjob(s) '"+ ", ".join([str(databaseId) for databaseId in allDatabaseIds[:10]]) +"' from the database. See OctoPrint.log for details!")
+				return None
+		return allStartDateTimes
@@ -0,0 +1,144 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import json
+import logging
+import sqlite3
+
+from octoprint_PrintJobHistory.common import TextCompression
+
+# Rows (databaseId range) copied/updated per transaction
+DEFAULT_MIGRATION_CHUNK_SIZE = 5000
+
+# Progress of the running step, stored in the metadata table next to the scheme version. Written in the same
+# transaction as the data of a chunk, so after an interruption the migration continues with the next chunk.
+KEY_MIGRATION_STATE = "databaseMigrationState"
+
+
+# One upgrade step of the sqlite database scheme:
+# - prepareSql: executed in one transaction, e.g. create the new table
+# - batchSql: list of (sourceTable, statement), the statement is executed for each databaseId range of the source
+#   table in its own transaction. The range is inserted for {fromId} and {toId}: 'databaseId > {fromId} AND databaseId <= {toId}'
+# - finishSql: executed in one transaction together with the new scheme version, e.g. drop the old table
+class MigrationStep(object):
+
+	def __init__(self, targetSchemeVersion, prepareSql=None, batchSql=None, finishSql=None):
+		self.targetSchemeVersion = targetSchemeVersion
+		self.prepareSql = prepareSql
+		self.batchSql = batchSql if batchSql != None else []
+		self.finishSql = finishSql
+
+
+class DatabaseMigrator(object):
+
+	# progressCallback(statusDict) is called after each chunk with: status, schemeVersion, targetSchemeVersion,
+	# tableName, progress (percent of the current step)
+	def __init__(self, parentLogger, databaseFileLocation, busyTimeout=5.0, chunkSize=DEFAULT_MIGRATION_CHUNK_SIZE, progressCallback=None):
+		self._logger = logging.getLogger(parentLogger.name + "." + self.__class__.__name__)
+		self._databaseFileLocation = databaseFileLocation
+		self._busyTimeout = busyTimeout
+		self._chunkSize = chunkSize
+		self._progressCallback = progressCallback
+
+	################################################################################################## private functions
+
+	def _connect(self):
+		# autocommit, the transactions are in the scripts
+		connection = sqlite3.connect(self._databaseFileLocation, timeout=self._busyTimeout, isolation_level=None)
+		connection.execute("PRAGMA foreign_keys=off")
+		# used by the triggers of the full-text index
+		connection.create_function(TextCompression.SQL_TEXT_FUNCTION_NAME, 1, TextCompression.decompressText)
+		# used by the deduplication of the slicer settings (V18)
+		connection.create_function(TextCompression.SQL_CONTENT_HASH_FUNCTION_NAME, 1, TextCompression.contentHash)
+		return connection
+
+	def _executeInTransaction(self, connection, allSqlScripts):
+		sql = "BEGIN IMMEDIATE;\n" + ";\n".join([sqlScript.strip().rstrip(";") for sqlScript in allSqlScripts if sqlScript != None and sqlScript.strip() != ""]) + ";\nCOMMIT;"
+		try:
+			connection.executescript(sql)
+		except Exception:
+			if (connection.in_transaction):
+				connection.execute("ROLLBACK")
+			raise
+
+	def _buildWriteStateSql(self, migrationState):
+		if (migrationState == None):
+			return "DELETE FROM pjh_pluginmetadatamodel WHERE key='" + KEY_MIGRATION_STATE + "'"
+		# only numbers in the state, no quoting needed
+		return "UPDATE pjh_pluginmetadatamodel SET value='" + json.dumps(migrationState) + "' WHERE key='" + KEY_MIGRATION_STATE + "'"
+
+	def _buildInsertStateSql(self, migrationState):
+		return "INSERT INTO pjh_pluginmetadatamodel (created, key, value) VALUES (datetime('now', 'localtime'), '" + KEY_MIGRATION_STATE + "', '" + json.dumps(migrationState) + "')"
+
+	def _readMigrationState(self, connection):
+		row = connection.execute("SELECT value FROM pjh_pluginmetadatamodel WHERE key=?", (KEY_MIGRATION_STATE,)).fetchone()
+		if (row == None):
+			return None
+		return json.loads(row[0])
+
+	def _readMaxDatabaseId(self, connection, tableName):
+		row = connection.execute('SELECT MAX(databaseId) FROM "' + tableName + '"').fetchone()
+		if (row == None or row[0] == None):
+			return 0
+		return int(row[0])
+
+	def _sendProgress(self, status, schemeVersion, targetSchemeVersion, tableName=None, progress=0):
+		if (self._progressCallback == None):
+			return
+		self._progressCallback(dict(status=status,
+									schemeVersion=schemeVersion,
+									targetSchemeVersion=targetSchemeVersion,
+									tableName=tableName,
+									progress=progress))
+
+	def _runStep(self, connection, migrationStep, migrationState, targetSchemeVersion):
+		schemeVersion = migrationStep.targetSchemeVersion - 1
+		if (migrationState == None or migrationState["targetSchemeVersion"] != migrationStep.targetSchemeVersion):
+			migrationState = dict(targetSchemeVersion=migrationStep.targetSchemeVersion, batchIndex=0, lastId=0)
+			self._executeInTransaction(connection, [migrationStep.prepareSql, self._buildWriteStateSql(None), self._buildInsertStateSql(migrationState)])
+		else:
+			self._logger.info(" Resume migration to '" + str(migrationStep.targetSchemeVersion) + "' with batch " + str(migrationState["batchIndex"]) + " after databaseId " + str(migrationState["lastId"]))
+
+		for batchIndex in range(migrationState["batchIndex"], len(migrationStep.batchSql)):
+			tableName, batchSql = migrationStep.batchSql[batchIndex]
+			lastId = migrationState["lastId"] if batchIndex == migrationState["batchIndex"] else 0
+			maxId = self._readMaxDatabaseId(connection, tableName)
+			while lastId < maxId:
+				toId = min(lastId + self._chunkSize, maxId)
+				chunkState = dict(targetSchemeVersion=migrationStep.targetSchemeVersion, batchIndex=batchIndex, lastId=toId)
+				self._executeInTransaction(connection, [batchSql.format(fromId=lastId, toId=toId), self._buildWriteStateSql(chunkState)])
+				lastId = toId
+				self._sendProgress("running", schemeVersion, targetSchemeVersion, tableName, int(100 * lastId / maxId))
+			if (batchIndex + 1 < len(migrationStep.batchSql)):
+				nextState = dict(targetSchemeVersion=migrationStep.targetSchemeVersion, batchIndex=batchIndex + 1, lastId=0)
+				self._executeInTransaction(connection, [self._buildWriteStateSql(nextState)])
+
+		self._executeInTransaction(connection, [migrationStep.finishSql,
+												"UPDATE pjh_pluginmetadatamodel SET value=" + str(migrationStep.targetSchemeVersion) + " WHERE key='databaseSchemeVersion'",
+												self._buildWriteStateSql(None)])
+
+	################################################################################################### public functions
+
+	# True, if a previous migration was interrupted
+	def hasInterruptedMigration(self):
+		connection = self._connect()
+		try:
+			return self._readMigrationState(connection) != None
+		finally:
+			connection.close()
+
+	def migrate(self, currentSchemeVersion, allMigrationSteps):
+		targetSchemeVersion = allMigrationSteps[-1].targetSchemeVersion
+		connection = self._connect()
+		try:
+			migrationState = self._readMigrationState(connection)
+			for migrationStep in allMigrationSteps:
+				if (migrationStep.targetSchemeVersion <= currentSchemeVersion):
+					continue
+				self._logger.info("Database migration from '" + str(migrationStep.targetSchemeVersion - 1) + "' to '" + str(migrationStep.targetSchemeVersion) + "'")
+				self._runStep(connection, migrationStep, migrationState, targetSchemeVersion)
+				migrationState = None
+				self._sendProgress("running", migrationStep.targetSchemeVersion, targetSchemeVersion, None, 100)
+		finally:
+			connection.close()
+		pass
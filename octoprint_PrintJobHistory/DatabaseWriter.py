@@ -0,0 +1,290 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import datetime
+import json
+import logging
+import os
+import queue
+import threading
+import uuid
+from concurrent.futures import Future
+
+from octoprint_PrintJobHistory.models.CostModel import CostModel
+from octoprint_PrintJobHistory.models.FilamentModel import FilamentModel
+from octoprint_PrintJobHistory.models.PrintJobModel import PrintJobModel
+from octoprint_PrintJobHistory.models.PrintJobTextModel import PrintJobTextModel
+from octoprint_PrintJobHistory.models.TemperatureModel import TemperatureModel
+
+# Write tasks waiting for the writer thread, a captured job is spilled to disk if the queue is full
+DEFAULT_QUEUE_SIZE = 100
+# Inserts already waiting in the queue are stored in one transaction (group commit)
+DEFAULT_GROUP_COMMIT_SIZE = 50
+# Seconds between two attempts to insert the spilled jobs
+DEFAULT_SPILL_RETRY_INTERVAL = 60
+
+SPILL_FILE_EXTENSION = ".json"
+
+# without ids, the spilled job gets new ids during the insert
+SPILL_IGNORED_FIELDS = ["databaseId", "printJob"]
+
+_STOP_WRITER = object()
+
+
+def _modelToDict(model):
+	return dict([(field.name, model.__data__.get(field.name)) for field in model._meta.sorted_fields if field.name not in SPILL_IGNORED_FIELDS])
+
+
+def _modelFromDict(modelClass, modelValues):
+	model = modelClass()
+	for field in modelClass._meta.sorted_fields:
+		if (field.name in modelValues and field.name not in SPILL_IGNORED_FIELDS):
+			value = modelValues[field.name]
+			# e.g. datetime from the string
+			setattr(model, field.name, None if value == None else field.python_value(value))
+	return model
+
+
+def _textModelToDict(textModel):
+	textValues = _modelToDict(textModel)
+	# stored by the hash since V18, the text itself is not a field
+	textValues["slicerSettingsAsText"] = textModel.slicerSettingsAsText
+	return textValues
+
+
+def _textModelFromDict(textValues):
+	textModel = _modelFromDict(PrintJobTextModel, textValues)
+	if (textValues.get("slicerSettingsAsText") != None):
+		textModel.slicerSettingsAsText = textValues["slicerSettingsAsText"]
+	return textModel
+
+
+def printJobToDict(printJobModel):
+	costModel = printJobModel.getCosts()
+	textModel = printJobModel.getTexts()
+	return {
+		"printJob": _modelToDict(printJobModel),
+		"filaments": [_modelToDict(filamentModel) for filamentModel in printJobModel.getFilamentModels()],
+		"temperatures": [_modelToDict(temperatureModel) for temperatureModel in printJobModel.getTemperatureModels()],
+		"costs": None if costModel == None else _modelToDict(costModel),
+		"texts": None if textModel == None else _textModelToDict(textModel),
+		"slicerSettings": printJobModel.getSlicerSettingsAsDict()
+	}
+
+
+def printJobFromDict(printJobValues):
+	printJobModel = _modelFromDict(PrintJobModel, printJobValues["printJob"])
+	for filamentValues in printJobValues["filaments"]:
+		printJobModel.addFilamentModel(_modelFromDict(FilamentModel, filamentValues))
+	for temperatureValues in printJobValues["temperatures"]:
+		printJobModel.addTemperatureModel(_modelFromDict(TemperatureModel, temperatureValues))
+	if (printJobValues["costs"] != None):
+		printJobModel.setCosts(_modelFromDict(CostModel, printJobValues["costs"]))
+	if (printJobValues["texts"] != None):
+		printJobModel.setTexts(_textModelFromDict(printJobValues["texts"]))
+	# spilled before V17 without them, parsed later out of the text
+	printJobModel.setSlicerSettingsAsDict(printJobValues.get("slicerSettings"))
+	return printJobModel
+
+
+class _WriteTask(object):
+
+	# printJobModel: insert of a captured job, otherwise function(*args)
+	def __init__(self, function=None, args=(), printJobModel=None):
+		self.function = function
+		self.args = args
+		self.printJobModel = printJobModel
+		self.future = Future()
+
+
+# Single writer thread for the captured print jobs. The caller (e.g. the event thread of OctoPrint) only gets a Future,
+# a slow or locked database never blocks the event dispatch. If the queue is full or the insert fails, the job is
+# spilled to a file and inserted as soon as the database is writable again.
+class DatabaseWriter(object):
+
+	def __init__(self, parentLogger, databaseManager, spillFolder, queueSize=DEFAULT_QUEUE_SIZE, groupCommitSize=DEFAULT_GROUP_COMMIT_SIZE, spillRetryInterval=DEFAULT_SPILL_RETRY_INTERVAL):
+		self._logger = logging.getLogger(parentLogger.name + "." + self.__class__.__name__)
+		self._databaseManager = databaseManager
+		self._spillFolder = spillFolder
+		self._writeQueue = queue.Queue(maxsize=queueSize)
+		self._groupCommitSize = groupCommitSize
+		self._spillRetryInterval = spillRetryInterval
+		self._writerThread = None
+
+	################################################################################################## private functions
+
+	def _run(self):
+		self._insertSpilledPrintJobs()
+		pendingTask = None
+		while True:
+			if (pendingTask != None):
+				writeTask = pendingTask
+				pendingTask = None
+			else:
+				try:
+					writeTask = self._writeQueue.get(timeout=self._spillRetryInterval)
+				except queue.Empty:
+					self._insertSpilledPrintJobs()
+					continue
+			if (writeTask is _STOP_WRITER):
+				break
+			if (writeTask.printJobModel == None):
+				self._executeTask(writeTask)
+				continue
+			# group commit, the next non-insert task keeps its order
+			allInsertTasks = [writeTask]
+			while (len(allInsertTasks) < self._groupCommitSize):
+				try:
+					nextTask = self._writeQueue.get_nowait()
+				except queue.Empty:
+					break
+				if (nextTask is _STOP_WRITER or nextTask.printJobModel == None):
+					pendingTask = nextTask
+					break
+				allInsertTasks.append(nextTask)
+			self._executeInsertTasks(allInsertTasks)
+		self._logger.info("Database writer stopped")
+
+	def _executeTask(self, writeTask):
+		if (writeTask.future.set_running_or_notify_cancel() == False):
+			return
+		try:
+			writeTask.future.set_result(writeTask.function(*writeTask.args))
+		except Exception as e:
+			self._logger.exception("Database write failed:" + str(e))
+			writeTask.future.set_exception(e)
+
+	def _executeInsertTasks(self, allInsertTasks):
+		allInsertTasks = [insertTask for insertTask in allInsertTasks if insertTask.future.set_running_or_notify_cancel()]
+		insertError = None
+		try:
+			self._databaseManager.insertPrintJobs([insertTask.printJobModel for insertTask in allInsertTasks], len(allInsertTasks))
+		except Exception as e:
+			self._logger.exception("Could not insert the printJobs:" + str(e))
+			insertError = str(e)
+		for insertTask in allInsertTasks:
+			if (insertTask.printJobModel.databaseId == None):
+				# e.g. database locked longer than the busy timeout
+				self._addSpillNoteToTechnicalLog(insertTask.printJobModel, "insert failed, " + (insertError or getattr(insertTask.printJobModel, "insertError", None) or "see OctoPrint.log"))
+				self._spillPrintJob(insertTask.printJobModel)
+			insertTask.future.set_result(insertTask.printJobModel.databaseId)
+
+	# The technical log was taken before the store step, the reason of the spill is added to the job itself
+	def _addSpillNoteToTechnicalLog(self, printJobModel, reason):
+		textModel = printJobModel.getTexts()
+		if (textModel == None):
+			textModel = PrintJobTextModel()
+			printJobModel.setTexts(textModel)
+		textModel.technicalLog = (textModel.technicalLog or "") + datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S") + \
+								 " - Not stored in the database (" + reason + "), spilled to a file and inserted later\n"
+
+	def _spillPrintJob(self, printJobModel):
+		spillFileName = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f") + "-" + uuid.uuid4().hex[:8] + SPILL_FILE_EXTENSION
+		spillFileLocation = os.path.join(self._spillFolder, spillFileName)
+		try:
+			if (os.path.exists(self._spillFolder) == False):
+				os.makedirs(self._spillFolder)
+			# complete or not present after a power loss
+			with open(spillFileLocation + ".tmp", "w") as spillFile:
+				json.dump(printJobToDict(printJobModel), spillFile, default=str)
+				spillFile.flush()
+				os.fsync(spillFile.fileno())
+			os.replace(spillFileLocation + ".tmp", spillFileLocation)
+			self._logger.warning("PrintJob '" + str(printJobModel.fileName) + "' spilled to '" + spillFileLocation + "', inserted as soon as the database is writable")
+			return spillFileLocation
+		except Exception as e:
+			self._logger.exception("Could not spill the printJob '" + str(printJobModel.fileName) + "', the job is lost:" + str(e))
+			return None
+
+	def _getSpillFileNames(self):
+		if (os.path.exists(self._spillFolder) == False):
+			return []
+		return sorted([fileName for fileName in os.listdir(self._spillFolder) if fileName.endswith(SPILL_FILE_EXTENSION)])
+
+	# A crash between the commit and the removal of the file inserts the job twice, a lost job would be worse
+	def _insertSpilledPrintJobs(self):
+		allSpilledPrintJobs = []
+		for spillFileName in self._getSpillFileNames():
+			spillFileLocation = os.path.join(self._spillFolder, spillFileName)
+			try:
+				with open(spillFileLocation) as spillFile:
+					allSpilledPrintJobs.append((spillFileLocation, printJobFromDict(json.load(spillFile))))
+			except Exception as e:
+				self._logger.exception("Invalid spill file '" + spillFileLocation + "', skipped:" + str(e))
+				os.replace(spillFileLocation, spillFileLocation + ".invalid")
+		if (len(allSpilledPrintJobs) == 0):
+			return
+
+		insertedCount = 0
+		try:
+			self._databaseManager.insertPrintJobs([printJobModel for (spillFileLocation, printJobModel) in allSpilledPrintJobs], self._groupCommitSize)
+			for spillFileLocation, printJobModel in allSpilledPrintJobs:
+				if (printJobModel.databaseId != None):
+					os.remove(spillFileLocation)
+					insertedCount += 1
+		except Exception as e:
+			self._logger.exception("Could not insert the spilled printJobs:" + str(e))
+		self._logger.info("Inserted " + str(insertedCount) + " of " + str(len(allSpilledPrintJobs)) + " spilled printJobs")
+
+	def _spillQueuedPrintJobs(self):
+		while True:
+			try:
+				writeTask = self._writeQueue.get_nowait()
+			except queue.Empty:
+				break
+			if (writeTask is _STOP_WRITER):
+				continue
+			if (writeTask.future.set_running_or_notify_cancel() == False):
+				continue
+			if (writeTask.printJobModel != None):
+				self._spillPrintJob(writeTask.printJobModel)
+				writeTask.future.set_result(None)
+			else:
+				writeTask.future.set_exception(RuntimeError("Database writer stopped"))
+
+	################################################################################################### public functions
+
+	def start(self):
+		if (self._writerThread != None):
+			return
+		self._writerThread = threading.Thread(target=self._run, name="DatabaseWriter")
+		self._writerThread.daemon = True
+		self._writerThread.start()
+
+	# The queued tasks are written before the thread stops. If the database is still blocked after the timeout, the
+	# queued jobs are spilled.
+	def stop(self, timeout=None):
+		if (self._writerThread == None):
+			return
+		try:
+			self._writeQueue.put(_STOP_WRITER, timeout=timeout)
+		except queue.Full:
+			pass
+		self._writerThread.join(timeout)
+		if (self._writerThread.is_alive()):
+			self._logger.warning("Database writer still busy, spill the queued printJobs")
+			self._spillQueuedPrintJobs()
+		self._writerThread = None
+
+	# return: Future with the databaseId of the job, None if the job was spilled
+	def insertPrintJob(self, printJobModel):
+		insertTask = _WriteTask(printJobModel=printJobModel)
+		try:
+			self._writeQueue.put_nowait(insertTask)
+		except queue.Full:
+			self._logger.warning("Database writer queue is full")
+			insertTask.future.set_running_or_notify_cancel()
+			self._addSpillNoteToTechnicalLog(printJobModel, "writer queue is full")
+			self._spillPrintJob(printJobModel)
+			insertTask.future.set_result(None)
+		return insertTask.future
+
+	# Any other write in the order of the inserts, waits if the queue is full
+	# return: Future with the result of function(*args)
+	def submit(self, function, *args):
+		writeTask = _WriteTask(function, args)
+		self._writeQueue.put(writeTask)
+		return writeTask.future
+
+	def getSpilledPrintJobCount(self):
+		return len(self._getSpillFileNames())
@@ -0,0 +1,64 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import collections
+import threading
+
+# Results kept in memory, e.g. pages and counts of the table
+DEFAULT_MAX_ENTRIES = 64
+
+
+# LRU-cache of query results. Every write to the database starts a new generation and drops all entries. A result
+# loaded during an older generation is not stored, so a reader which was slower than a writer never caches stale rows.
+class QueryResultCache(object):
+
+	def __init__(self, maxEntries=DEFAULT_MAX_ENTRIES):
+		self._maxEntries = max(0, int(maxEntries))
+		self._lock = threading.Lock()
+		self._entries = collections.OrderedDict()
+		self._generation = 0
+		self._hits = 0
+		self._misses = 0
+
+	# loadFunction() is called on a miss. copyFunction(value) gives each caller its own instance of a cached value,
+	# e.g. model instances which are changed by the caller
+	def getOrLoad(self, cacheKey, loadFunction, copyFunction=None):
+		if (self._maxEntries == 0):
+			return loadFunction()
+		with self._lock:
+			generation = self._generation
+			if (cacheKey in self._entries):
+				self._entries.move_to_end(cacheKey)
+				self._hits += 1
+				cachedValue = self._entries[cacheKey]
+				return cachedValue if copyFunction == None else copyFunction(cachedValue)
+			self._misses += 1
+
+		loadedValue = loadFunction()
+		cachedValue = loadedValue if copyFunction == None else copyFunction(loadedValue)
+		with self._lock:
+			if (generation == self._generation):
+				self._entries[cacheKey] = cachedValue
+				while (len(self._entries) > self._maxEntries):
+					self._entries.popitem(last=False)
+		return loadedValue
+
+	def invalidate(self):
+		with self._lock:
+			self._generation += 1
+			self._entries.clear()
+
+	def getGeneration(self):
+		return self._generation
+
+	def getStatistic(self):
+		with self._lock:
+			requestCount = self._hits + self._misses
+			return {
+				"hits": self._hits,
+				"misses": self._misses,
+				"hitRate": 0.0 if requestCount == 0 else round(100.0 * self._hits / requestCount, 1),
+				"entries": len(self._entries),
+				"maxEntries": self._maxEntries,
+				"generation": self._generation
+			}
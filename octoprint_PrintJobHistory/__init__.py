@@ -8,6 +8,7 @@ from queue import Queue
 
 import octoprint.plugin
 from octoprint.events import Events
+from octoprint.util import RepeatedTimer
 
 import datetime
 import math
@@ -22,6 +23,7 @@ from octoprint_PrintJobHistory.models.FilamentModel import FilamentModel
 from octoprint_PrintJobHistory.models.PrintJobModel import PrintJobModel
 from octoprint_PrintJobHistory.models.TemperatureModel import TemperatureModel
 from octoprint_PrintJobHistory.models.CostModel import CostModel
+from octoprint_PrintJobHistory.models.PrintJobTextModel import PrintJobTextModel
 from peewee import DoesNotExist
 
 from .common.SettingsKeys import SettingsKeys
@@ -30,6 +32,7 @@ from .common.ResetAbleLogFileHandler import ResetAbleLogFileHandler
 from .api.PrintJobHistoryAPI import PrintJobHistoryAPI
 from .api import TransformPrintJob2JSON
 from .DatabaseManager import DatabaseManager
+from .DatabaseWriter import DatabaseWriter
 from .CameraManager import CameraManager
 
 from octoprint_PrintJobHistory.common import StringUtils, DateTimeUtils
@@ -40,6 +43,7 @@ class PrintJobHistoryPlugin(
 	octoprint.plugin.AssetPlugin,
 	octoprint.plugin.TemplatePlugin,
 	octoprint.plugin.StartupPlugin,
+	octoprint.plugin.ShutdownPlugin,
 	octoprint.plugin.EventHandlerPlugin,
 	octoprint.plugin.SimpleApiPlugin
 ):
@@ -68,7 +72,31 @@ class PrintJobHistoryPlugin(
 		# DATABASE
 		sqlLoggingEnabled = self._settings.get_boolean([SettingsKeys.SETTINGS_KEY_SQL_LOGGING_ENABLED])
 		self._databaseManager = DatabaseManager(self._logger, sqlLoggingEnabled)
-		self._databaseManager.initDatabase(pluginDataBaseFolder, self._sendErrorMessageToClient)
+		connectionSettings = {
+			"journalMode": self._settings.get([SettingsKeys.SETTINGS_KEY_DATABASE_JOURNAL_MODE]),
+			"busyTimeout": self._settings.get_int([SettingsKeys.SETTINGS_KEY_DATABASE_BUSY_TIMEOUT]),
+			"busyRetries": self._settings.get_int([SettingsKeys.SETTINGS_KEY_DATABASE_BUSY_RETRIES]),
+			"cacheSize": self._settings.get_int([SettingsKeys.SETTINGS_KEY_DATABASE_CACHE_SIZE]),
+			"mmapSize": self._settings.get_int([SettingsKeys.SETTINGS_KEY_DATABASE_MMAP_SIZE]),
+			"queryCacheSize": self._settings.get_int([SettingsKeys.SETTINGS_KEY_DATABASE_QUERY_CACHE_SIZE])
+		}
+		if (self._settings.get_boolean(["datbaseSettings", "useExternal"])):
+			# shared store for several OctoPrint instances
+			for externalSettingsKey in ["host", "port", "databaseName", "user", "password", "maxConnections", "staleTimeout"]:
+				connectionSettings[externalSettingsKey] = self._settings.get(["datbaseSettings", externalSettingsKey])
+			connectionSettings["databaseType"] = self._settings.get(["datbaseSettings", "type"])
+		# a scheme upgrade of a large database runs in the background, the startup is not blocked
+		self._databaseManager.initDatabase(pluginDataBaseFolder, self._sendErrorMessageToClient, connectionSettings,
+										   migrationStatusCallback=self._sendDatabaseMigrationStatusToClient,
+										   migrateInBackground=True)
+		self._initFarmDatabases()
+		self._databaseCheckpointTimer = None
+		self._databaseMaintenanceTimer = None
+		# between PRINT_STARTED and the capture of the job, no database maintenance
+		self._isPrintJobRunning = False
+		# captured jobs are stored by a single writer thread, the event thread never waits for the database
+		self._databaseWriter = DatabaseWriter(self._logger, self._databaseManager, os.path.join(pluginDataBaseFolder, "spill"))
+		self._databaseWriter.start()
 
 		# CAMERA
 		self._cameraManager = CameraManager(self._logger)
@@ -123,6 +151,47 @@ class PrintJobHistoryPlugin(
 									title=title,
 									message=message))
 
+	# thread: RepeatedTimer
+	def _runDatabaseMaintenanceIfDue(self):
+		maintenanceInterval = self._settings.get_int([SettingsKeys.SETTINGS_KEY_DATABASE_MAINTENANCE_INTERVAL])
+		lastRun = self._settings.get_int([SettingsKeys.SETTINGS_KEY_DATABASE_MAINTENANCE_LAST_RUN])
+		if (maintenanceInterval == None or maintenanceInterval <= 0 or time.time() - (lastRun or 0) < maintenanceInterval * 3600):
+			return
+		if (self._isPrinterBusy()):
+			self._logger.debug("Database maintenance postponed, printer is busy")
+			return
+		self._runDatabaseMaintenance()
+
+	def _isPrinterBusy(self):
+		return self._isPrintJobRunning or self._printer.is_printing() or self._printer.is_paused()
+
+	# return: summary text for the settings, None if not done
+	def _runDatabaseMaintenance(self):
+		maintenanceResult = self._databaseManager.runDatabaseMaintenance()
+		if (maintenanceResult == None):
+			return None
+		maintenanceSummary = (maintenanceResult["dateTime"].strftime("%d.%m.%Y %H:%M") + ": " +
+							  StringUtils.get_formatted_size(maintenanceResult["reclaimedBytes"]) + " reclaimed in " +
+							  str(maintenanceResult["duration"]) + "s, integrity " + maintenanceResult["integrity"])
+		self._settings.set_int([SettingsKeys.SETTINGS_KEY_DATABASE_MAINTENANCE_LAST_RUN], int(time.time()))
+		self._settings.set([SettingsKeys.SETTINGS_KEY_DATABASE_MAINTENANCE_RESULT], maintenanceSummary)
+		self._settings.save()
+		return maintenanceSummary
+
+	def _runDatabaseBackgroundTasks(self):
+		self._databaseManager.waitForMigration()
+		self._databaseManager.compressPrintJobTexts()
+		self._databaseManager.parseStoredSlicerSettings(self._settings.get([SettingsKeys.SETTINGS_KEY_SLICERSETTINGS_KEYVALUE_EXPRESSION]))
+
+	def _archiveOldPrintJobs(self, archiveAfterMonths):
+		self._databaseManager.waitForMigration()
+		self._databaseManager.archivePrintJobs(archiveAfterMonths)
+
+	def _sendDatabaseMigrationStatusToClient(self, migrationStatus):
+		payload = dict(migrationStatus)
+		payload["action"] = "databaseMigrationStatus"
+		self._sendDataToClient(payload)
+
 	def _sendReloadTableToClient(self, shouldSend=True):
 		if (shouldSend == True):
 			payload = {
@@ -607,7 +676,7 @@ class PrintJobHistoryPlugin(
 
 	def _createPrintJobModel(self, payload):
 		self._currentPrintJobModel = PrintJobModel()
-		self._currentPrintJobModel.printStartDateTime = datetime.datetime.now()
+		self._currentPrintJobModel.printStartDateTime = datetime.datetime.now().replace(microsecond=0)
 
 		self._currentPrintJobModel.fileOrigin = payload["origin"]
 		self._currentPrintJobModel.fileName = payload["name"]
@@ -692,13 +761,13 @@ class PrintJobHistoryPlugin(
 	def _addTemperatureToPrintModel(self, printJobModel, bedTemp, toolId, toolTemp):
 		tempModel = TemperatureModel()
 		tempModel.sensorName = "bed"
-		# tempModel.sensorValue = bedTemp if bedTemp != None else"-"
-		tempModel.sensorValue = bedTemp if bedTemp != None else "-"
+		# None, if the printer didn't report a temperature
+		tempModel.sensorValue = bedTemp
 		printJobModel.addTemperatureModel(tempModel)
 
 		tempModel = TemperatureModel()
 		tempModel.sensorName = toolId  # "tool0"
-		tempModel.sensorValue = toolTemp if toolTemp != None else "-"
+		tempModel.sensorValue = toolTemp
 		printJobModel.addTemperatureModel(tempModel)
 
 
@@ -928,6 +997,7 @@ class PrintJobHistoryPlugin(
 		self._logger.info("PrintJob '" + payload["name"] + "' started!")
 
 		self.alreadyCanceled = False
+		self._isPrintJobRunning = True
 		self._createPrintJobModel(payload)
 
 	#### print job finished
@@ -935,7 +1005,10 @@ class PrintJobHistoryPlugin(
 	def _printJobFinished(self, printStatus, payload):
 		self._logger.info("PrintJob finished!")
 
-		self._capturePrintJobData(printStatus, payload)
+		try:
+			self._capturePrintJobData(printStatus, payload)
+		finally:
+			self._isPrintJobRunning = False
 
 	def _capturePrintJobData(self, printStatus, payload):
 		captureMode = self._settings.get([SettingsKeys.SETTINGS_KEY_CAPTURE_PRINTJOBHISTORY_MODE])
@@ -960,7 +1033,7 @@ class PrintJobHistoryPlugin(
 			self._logger.info("----- Start capturing print job data... -----")
 
 			# - Core Data
-			self._currentPrintJobModel.printEndDateTime = datetime.datetime.now()
+			self._currentPrintJobModel.printEndDateTime = datetime.datetime.now().replace(microsecond=0)
 			self._currentPrintJobModel.duration = (
 					self._currentPrintJobModel.printEndDateTime - self._currentPrintJobModel.printStartDateTime).total_seconds()
 			self._currentPrintJobModel.printStatusResult = printStatus
@@ -972,7 +1045,11 @@ class PrintJobHistoryPlugin(
 			if (slicerSettingsExpressions != None and len(slicerSettingsExpressions) != 0):
 				slicerSettings = SlicerSettingsParser(self._logger).extractSlicerSettings(selectedFile, slicerSettingsExpressions)
 				if (slicerSettings.settingsAsText != None and len(slicerSettings.settingsAsText) != 0):
-					self._currentPrintJobModel.slicerSettingsAsText = slicerSettings.settingsAsText
+					textModel = PrintJobTextModel()
+					textModel.slicerSettingsAsText = slicerSettings.settingsAsText
+					self._currentPrintJobModel.setTexts(textModel)
+					# stored as typed key/values for the filter and the compare
+					self._currentPrintJobModel.setSlicerSettingsAsDict(slicerSettings.settingsAsDict)
 
 			# - Image / Thumbnail
 			self._grabImage(payload)
@@ -983,64 +1060,68 @@ class PrintJobHistoryPlugin(
 			# - Costs
 			self._addCostsToPrintModel(self._currentPrintJobModel)
 
+			# the technical log of the capture is stored with the job (also if spilled), the lines of the store step
+			# are appended after the insert, see _printJobStored
+			if (self._currentPrintJobModel.getTexts() == None):
+				self._currentPrintJobModel.setTexts(PrintJobTextModel())
+			capturedTechnicalLog = self._resetableFileLogHandler.readLogContent()
+			self._currentPrintJobModel.getTexts().technicalLog = capturedTechnicalLog
+
 			# store everything in the database
 			self._logger.info("----- Try storing printjob model ----")
-			databaseId = self._databaseManager.insertPrintJob(self._currentPrintJobModel)
-			if (databaseId == None):
-				self._logger.error("PrintJob not captured, see previous error log!")
-				return None
-			printJobItem = None
-			if self._settings.get_boolean([SettingsKeys.SETTINGS_KEY_SHOW_PRINTJOB_DIALOG_AFTER_PRINT]):
+			insertFuture = self._databaseWriter.insertPrintJob(self._currentPrintJobModel)
+			insertFuture.add_done_callback(lambda future: self._printJobStored(future.result(), payload, len(capturedTechnicalLog)))
+			self._logger.info("----- ... End PrintJob captured! -----")
+			return insertFuture
 
-				self._settings.set_int([SettingsKeys.SETTINGS_KEY_SHOW_PRINTJOB_DIALOG_AFTER_PRINT_JOB_ID], databaseId)
-				self._settings.save()
+		self._logger.info("----- ... PrintJob not captured, because not activated! -----")
+		self._resetableFileLogHandler.stopLogging()
+		return None
+
+	# thread: DatabaseWriter (or the caller, if the job was spilled at once)
+	def _printJobStored(self, databaseId, payload, capturedTechnicalLogLength=0):
+		self._resetableFileLogHandler.stopLogging()
+		if (databaseId == None):
+			# the spilled job has a note in its technical log
+			self._logger.error("PrintJob not stored in the database yet, see previous error log!")
+			return
+		# log lines of the store step (e.g. a retried insert), the writer thread is not blocked by a second queued task
+		storeStepTechnicalLog = self._resetableFileLogHandler.readLogContent()[capturedTechnicalLogLength:]
+		if (len(storeStepTechnicalLog) != 0):
+			self._databaseManager.appendTechnicalLog(databaseId, storeStepTechnicalLog)
 
-				# inform client to show job edit dialog
-				printJobModel = self._databaseManager.loadPrintJob(databaseId)
+		printJobItem = None
+		if self._settings.get_boolean([SettingsKeys.SETTINGS_KEY_SHOW_PRINTJOB_DIALOG_AFTER_PRINT]):
 
-				# check the correct status (redundent code, see event client_open)
-				printJobItem = None
-				showDisplayAfterPrintMode = self._settings.get(
-					[SettingsKeys.SETTINGS_KEY_SHOWPRINTJOBDIALOGAFTERPRINT_MODE])
-				printJobModelStatus = printJobModel.printStatusResult
+			self._settings.set_int([SettingsKeys.SETTINGS_KEY_SHOW_PRINTJOB_DIALOG_AFTER_PRINT_JOB_ID], databaseId)
+			self._settings.save()
 
-				if (showDisplayAfterPrintMode == SettingsKeys.KEY_SHOWPRINTJOBDIALOGAFTERPRINT_MODE_SUCCESSFUL):
-					# show only when succesfull
-					if ("success" == printJobModelStatus):
-						printJobItem = TransformPrintJob2JSON.transformPrintJobModel(printJobModel, self._file_manager)
-				elif (showDisplayAfterPrintMode == SettingsKeys.KEY_SHOWPRINTJOBDIALOGAFTERPRINT_MODE_FAILED):
-					if ("failed" == printJobModelStatus or "canceled" == printJobModelStatus):
-						printJobItem = TransformPrintJob2JSON.transformPrintJobModel(printJobModel, self._file_manager)
+			# inform client to show job edit dialog
+			printJobModel = self._databaseManager.loadPrintJob(databaseId)
 
-				else:
-					# always
+			# check the correct status (redundent code, see event client_open)
+			showDisplayAfterPrintMode = self._settings.get(
+				[SettingsKeys.SETTINGS_KEY_SHOWPRINTJOBDIALOGAFTERPRINT_MODE])
+			printJobModelStatus = printJobModel.printStatusResult
+
+			if (showDisplayAfterPrintMode == SettingsKeys.KEY_SHOWPRINTJOBDIALOGAFTERPRINT_MODE_SUCCESSFUL):
+				# show only when succesfull
+				if ("success" == printJobModelStatus):
+					printJobItem = TransformPrintJob2JSON.transformPrintJobModel(printJobModel, self._file_manager)
+			elif (showDisplayAfterPrintMode == SettingsKeys.KEY_SHOWPRINTJOBDIALOGAFTERPRINT_MODE_FAILED):
+				if ("failed" == printJobModelStatus or "canceled" == printJobModelStatus):
 					printJobItem = TransformPrintJob2JSON.transformPrintJobModel(printJobModel, self._file_manager)
 
-			# inform client for a reload (and show dialog)
-			payLoadForClient = {
+			else:
+				# always
+				printJobItem = TransformPrintJob2JSON.transformPrintJobModel(printJobModel, self._file_manager)
+
+		# inform client for a reload (and show dialog)
+		if (payload != None):
+			self._sendDataToClient({
 				"action": "printFinished",
 				"printJobItem": printJobItem  # if present then the editor dialog is shown
-			}
-			# self._sendDataToClient(payLoadForClient)
-			self._logger.info("----- ... End PrintJob captured! -----")
-		else:
-			self._logger.info("----- ... PrintJob not captured, because not activated! -----")
-
-		# capture the technical log and send updated model to browser
-		self._resetableFileLogHandler.stopLogging()
-		if (databaseId != None):
-			techLog = self._resetableFileLogHandler.readLogContent()
-			lastPrintJobModel = self._databaseManager.loadPrintJob(databaseId)
-			lastPrintJobModel.technicalLog = techLog
-			self._databaseManager.updatePrintJob(lastPrintJobModel)
-			if (payload != None):
-				if (payLoadForClient["printJobItem"] != None):
-					printJobItem = TransformPrintJob2JSON.transformPrintJobModel(lastPrintJobModel, self._file_manager)
-					payLoadForClient["printJobItem"] = printJobItem
-				self._sendDataToClient(payLoadForClient)
-			pass
-
-		return databaseId
+			})
 
 
 	def _grabImage(self, payload):
@@ -1156,12 +1237,43 @@ class PrintJobHistoryPlugin(
 		pluginLogger = logging.getLogger(self._logger.name)
 		pluginLogger.addHandler(self._resetableFileLogHandler)
 
+		# move the write-ahead-log back into the database file from time to time
+		checkpointInterval = self._settings.get_int([SettingsKeys.SETTINGS_KEY_DATABASE_CHECKPOINT_INTERVAL])
+		if (checkpointInterval != None and checkpointInterval > 0):
+			self._databaseCheckpointTimer = RepeatedTimer(checkpointInterval, self._databaseManager.checkpointDatabase)
+			self._databaseCheckpointTimer.start()
+
+		# the interval of the maintenance could be changed in the settings, so the timer only checks if it is due
+		self._databaseMaintenanceTimer = RepeatedTimer(600, self._runDatabaseMaintenanceIfDue)
+		self._databaseMaintenanceTimer.start()
+
+		# texts stored before V16 are compressed and the slicer settings stored before V17 are parsed in the background,
+		# after the (background) migration
+		backgroundTasksThread = threading.Thread(target=self._runDatabaseBackgroundTasks, name="DatabaseBackgroundTasks")
+		backgroundTasksThread.daemon = True
+		backgroundTasksThread.start()
+
+		# move the old jobs into the archive file, after the (background) migration
+		archiveAfterMonths = self._settings.get_int([SettingsKeys.SETTINGS_KEY_ARCHIVE_AFTER_MONTHS])
+		if (archiveAfterMonths != None and archiveAfterMonths > 0):
+			archiveThread = threading.Thread(target=self._archiveOldPrintJobs, args=(archiveAfterMonths,), name="DatabaseArchive")
+			archiveThread.daemon = True
+			archiveThread.start()
+
 		self._logger.info("on after startup done")
 		pass
 
 
 
 
+	def on_shutdown(self):
+		# no checkpoint/vacuum while the writer stores the queued jobs
+		for databaseTimer in [self._databaseCheckpointTimer, self._databaseMaintenanceTimer]:
+			if (databaseTimer != None):
+				databaseTimer.cancel()
+		# queued jobs are written (or spilled) before OctoPrint stops
+		self._databaseWriter.stop(10)
+
 	# Listen to all  g-code which where already sent to the printer (thread: comm.sending_thread)
 	def on_sentGCodeHook(self, comm_instance, phase, cmd, cmd_type, gcode, *args, **kwargs):
 		# take snapshot an gcode command
@@ -1261,6 +1373,9 @@ class PrintJobHistoryPlugin(
 											currencySymbol = currencySymbol,
 											currencyFormat = currencyFormat,
 											))
+				migrationStatus = self._databaseManager.getMigrationStatus()
+				if (self._databaseManager.isMigrationRunning() and migrationStatus != None):
+					self._sendDatabaseMigrationStatusToClient(migrationStatus)
 
 			# - Show last Print-Dialog
 			if self._settings.get_boolean([SettingsKeys.SETTINGS_KEY_SHOW_PRINTJOB_DIALOG_AFTER_PRINT]):
@@ -1323,6 +1438,14 @@ class PrintJobHistoryPlugin(
 		# reinitialize some fields
 		sqlLoggingEnabled = self._settings.get_boolean([SettingsKeys.SETTINGS_KEY_SQL_LOGGING_ENABLED])
 		self._databaseManager.showSQLLogging(sqlLoggingEnabled)
+		self._initFarmDatabases()
+
+	# the history databases of the other printers, read together with this one ("includeFarm" of the table query)
+	def _initFarmDatabases(self):
+		farmPrinterName = self._settings.get([SettingsKeys.SETTINGS_KEY_FARM_PRINTER_NAME])
+		if (StringUtils.isEmpty(farmPrinterName)):
+			farmPrinterName = self._settings.global_get(["appearance", "name"])
+		self._databaseManager.setFarmDatabases(farmPrinterName, self._settings.get([SettingsKeys.SETTINGS_KEY_FARM_DATABASES]))
 
 
 
@@ -1380,17 +1503,36 @@ class PrintJobHistoryPlugin(
 
 		## Export / Import
 		settings[SettingsKeys.SETTINGS_KEY_IMPORT_CSV_MODE] = SettingsKeys.KEY_IMPORTCSV_MODE_APPEND
+		settings[SettingsKeys.SETTINGS_KEY_IMPORT_CSV_CHUNK_SIZE] = 500	# print jobs per transaction
 
 		settings["datbaseSettings"] = {
-			"useExternal": "true",
+			"useExternal": False,
 			"type": "postgres",
 			"host": "localhost",
 			"port": 5432,
 			"databaseName": "PrintJobDatabase",
-			"user": "Olli",
-			"password": "illO"
+			"user": None,
+			"password": None,
+			"maxConnections": 8,
+			"staleTimeout": 300		# seconds
 		}
 
+		## Storage
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_JOURNAL_MODE] = "wal"
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_BUSY_TIMEOUT] = 5000		# milliseconds
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_BUSY_RETRIES] = 3
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_CACHE_SIZE] = 8192		# KiB
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_MMAP_SIZE] = 64			# MiB
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_QUERY_CACHE_SIZE] = 64	# table pages/counts, 0 = off
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_CHECKPOINT_INTERVAL] = 300	# seconds, 0 = off
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_MAINTENANCE_INTERVAL] = 24	# hours, 0 = off
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_MAINTENANCE_LAST_RUN] = 0
+		settings[SettingsKeys.SETTINGS_KEY_DATABASE_MAINTENANCE_RESULT] = ""
+		settings[SettingsKeys.SETTINGS_KEY_ARCHIVE_AFTER_MONTHS] = 0			# jobs older than that move into the archive file, 0 = off
+		## Farm
+		settings[SettingsKeys.SETTINGS_KEY_FARM_PRINTER_NAME] = ""		# name of this printer in the farm, default is the instance name
+		settings[SettingsKeys.SETTINGS_KEY_FARM_DATABASES] = []			# list of {"printerName", "databaseFileLocation"}
+
 		## Debugging
 		settings[SettingsKeys.SETTINGS_KEY_SQL_LOGGING_ENABLED] = False
 
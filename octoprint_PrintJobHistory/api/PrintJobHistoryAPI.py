@@ -5,6 +5,8 @@ import shutil
 import sqlite3
 import tempfile
 import threading
+import time
+import zlib
 
 import octoprint.plugin
 from flask import jsonify, request, make_response, Response, send_file
@@ -21,7 +23,7 @@ from werkzeug.datastructures import Headers
 
 from octoprint.filemanager import FileDestinations
 
-from octoprint_PrintJobHistory import PrintJobModel, TemperatureModel, FilamentModel, CostModel
+from octoprint_PrintJobHistory import PrintJobModel, TemperatureModel, FilamentModel, CostModel, PrintJobTextModel
 from octoprint_PrintJobHistory.api import TransformPrintJob2JSON, TransformSlicerSettings2JSON
 
 from octoprint_PrintJobHistory.common import StringUtils
@@ -30,6 +32,7 @@ from octoprint_PrintJobHistory.common import PrintJobUtils
 from octoprint_PrintJobHistory.common.SettingsKeys import SettingsKeys
 
 from octoprint_PrintJobHistory.CameraManager import CameraManager
+from octoprint_PrintJobHistory.DatabaseManager import DatabaseNotWritableError
 from octoprint_PrintJobHistory.common import CSVExportImporter
 from octoprint_PrintJobHistory.services.SlicerSettingsService import SlicerSettingsService
 
@@ -44,6 +47,30 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
     def is_blueprint_csrf_protected(self):
         return True
 
+    def get_blueprint(self):
+        blueprint = octoprint.plugin.BlueprintPlugin.get_blueprint(self)
+        # the blueprint is cached, register the check only once
+        if (self._rejectDuringDatabaseMigration not in blueprint.before_request_funcs.get(None, [])):
+            blueprint.before_request(self._rejectDuringDatabaseMigration)
+            blueprint.register_error_handler(DatabaseNotWritableError, self._rejectNotWritableDatabase)
+        return blueprint
+
+    # the tables are rebuild during the scheme migration (background thread), no access until it is done
+    def _rejectDuringDatabaseMigration(self):
+        if (self._databaseManager.isMigrationRunning() == False):
+            return None
+        return flask.make_response(jsonify(error="Database migration is running, please wait",
+                                           migrationStatus=self._databaseManager.getMigrationStatus()), 503)
+
+    # a write during a running (timeout) or failed migration
+    def _rejectNotWritableDatabase(self, error):
+        return flask.make_response(jsonify(error=str(error),
+                                           migrationStatus=self._databaseManager.getMigrationStatus()), 503)
+
+    # tableQuery "includeFarm": "true", the jobs of all printers of the farm (read only)
+    def _isFarmRequested(self, tableQuery):
+        return str(tableQuery.get("includeFarm", "false")).lower() == "true" and self._databaseManager.hasFarmDatabases()
+
     def _updatePrintJobFromJson(self, printJobModel,  jsonData):
         # transfer header values
         printJobModel.userName = self._getValueFromJSONOrNone("userName", jsonData)
@@ -58,8 +85,10 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
         # changable...
         printJobModel.printStatusResult = self._getValueFromJSONOrNone("printStatusResult", jsonData)
         printJobModel.noteText = self._getValueFromJSONOrNone("noteText", jsonData)
-        printJobModel.noteDeltaFormat = json.dumps(self._getValueFromJSONOrNone("noteDeltaFormat", jsonData))
         printJobModel.noteHtml = self._getValueFromJSONOrNone("noteHtml", jsonData)
+        if (printJobModel.getTexts() == None):
+            printJobModel.setTexts(PrintJobTextModel())
+        printJobModel.getTexts().noteDeltaFormat = json.dumps(self._getValueFromJSONOrNone("noteDeltaFormat", jsonData))
         printJobModel.printedLayers = self._getValueFromJSONOrNone("printedLayers", jsonData)
         printJobModel.printedHeight = self._getValueFromJSONOrNone("printedHeight", jsonData)
 
@@ -81,11 +110,11 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
         for tempModel in allTemperaturesModels:
             sensorName = StringUtils.to_native_str(tempModel.sensorName)
             if (sensorName == "bed"):
-                newBedTemp = self._getValueFromJSONOrNone("temperatureBed", jsonData)
+                newBedTemp = self._toFloatFromJSONOrNone("temperatureBed", jsonData)
                 tempModel.sensorValue = newBedTemp
                 continue
             if (sensorName.startswith("tool")):
-                newToolTemp = self._getValueFromJSONOrNone("temperatureNozzle", jsonData)
+                newToolTemp = self._toFloatFromJSONOrNone("temperatureNozzle", jsonData)
                 tempModel.sensorValue = newToolTemp
 
         # Costs (if present)
@@ -194,11 +223,11 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
 
         t1 = TemperatureModel()
         t1.sensorName = "bed"
-        t1.sensorValue = "53"
+        t1.sensorValue = 53.0
         p1.addTemperatureModel(t1)
         t2 = TemperatureModel()
         t2.sensorName = "tool0"
-        t2.sensorValue = "210"
+        t2.sensorValue = 210.0
         p1.addTemperatureModel(t2)
 
         f1 = FilamentModel()
@@ -262,10 +291,175 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
     def get_statisticByQuery(self):
 
         tableQuery = flask.request.values
-        statistic = self._databaseManager.calculatePrintJobsStatisticByQuery(tableQuery)
+        try:
+            if (self._isFarmRequested(tableQuery)):
+                statistic = self._databaseManager.calculateFarmPrintJobsStatisticByQuery(tableQuery)
+            else:
+                statistic = self._databaseManager.calculatePrintJobsStatisticByQuery(tableQuery)
+        except ValueError as e:
+            return flask.make_response(str(e), 400)
 
         return flask.jsonify(statistic)
 
+    #######################################################################################   LOAD TEMPERATURE STATISTIC
+    # sensor: bed, tool0, tool (all tools); groupBy: material, band (bandSize degrees); filters of the table query
+    @octoprint.plugin.BlueprintPlugin.route("/loadTemperatureStatistic", methods=["GET"])
+    def get_temperatureStatistic(self):
+
+        tableQuery = flask.request.values
+        sensorName = tableQuery.get("sensor", "bed")
+        groupBy = tableQuery.get("groupBy", "material")
+        try:
+            statistic = self._databaseManager.calculateTemperatureStatisticByQuery(tableQuery,
+                                                                                   sensorName,
+                                                                                   groupBy,
+                                                                                   tableQuery.get("bandSize", 5))
+        except ValueError as error:
+            return flask.make_response(str(error), 400)
+
+        return flask.jsonify({
+            "sensor": sensorName,
+            "groupBy": groupBy,
+            "statistic": statistic
+        })
+
+    #######################################################################################   LOAD STATISTIC SERIES
+    # day/week/month series for dashboards, calculated from the daily rollup and not from the print jobs
+    @octoprint.plugin.BlueprintPlugin.route("/loadStatisticSeries", methods=["GET"])
+    def get_statisticSeries(self):
+
+        bucketSize = flask.request.values.get("bucket", "day")
+        groupBy = flask.request.values.get("groupBy")
+        if (StringUtils.isEmpty(groupBy)):
+            groupBy = None
+        try:
+            series = self._databaseManager.loadStatisticSeries(bucketSize,
+                                                               flask.request.values.get("startDate"),
+                                                               flask.request.values.get("endDate"),
+                                                               groupBy)
+        except ValueError as error:
+            return flask.make_response(str(error), 400)
+
+        return flask.jsonify({
+            "bucket": bucketSize,
+            "groupBy": groupBy,
+            "series": series
+        })
+
+    #######################################################################################   LOAD STATISTIC SERIES BY QUERY
+    # day/week/month series of the jobs selected by the table query (filters), calculated inside the database
+    @octoprint.plugin.BlueprintPlugin.route("/loadStatisticSeriesByQuery", methods=["GET"])
+    def get_statisticSeriesByQuery(self):
+
+        tableQuery = flask.request.values
+        bucketSize = tableQuery.get("bucket", "day")
+        groupBy = tableQuery.get("groupBy")
+        if (StringUtils.isEmpty(groupBy)):
+            groupBy = None
+        skippedPrinters = []
+        try:
+            if (self._isFarmRequested(tableQuery)):
+                # groupBy additionally "printer"
+                series, skippedPrinters = self._databaseManager.calculateFarmStatisticSeriesByQuery(tableQuery, bucketSize, groupBy)
+            else:
+                series = self._databaseManager.calculateStatisticSeriesByQuery(tableQuery, bucketSize, groupBy)
+        except ValueError as error:
+            return flask.make_response(str(error), 400)
+
+        return flask.jsonify({
+            "bucket": bucketSize,
+            "groupBy": groupBy,
+            "series": series,
+            "skippedPrinters": skippedPrinters
+        })
+
+    #######################################################################################   REBUILD STATISTIC ROLLUP
+    @octoprint.plugin.BlueprintPlugin.route("/rebuildStatisticRollup", methods=["PUT"])
+    def put_rebuildStatisticRollup(self):
+
+        result = self._databaseManager.rebuildDailyRollup()
+        result = self._databaseManager.rebuildFileRollup() and result
+
+        return flask.jsonify({
+            "success": result
+        })
+
+    #######################################################################################   LOAD FILE STATISTIC
+    # success rate and average duration/filament of each file, from the file rollup (no scan of the history)
+    # filePathName (repeatable): only these files, otherwise all files
+    @octoprint.plugin.BlueprintPlugin.route("/loadFileStatistic", methods=["GET"])
+    def get_fileStatistic(self):
+
+        filePathNames = flask.request.values.getlist("filePathName")
+        if (len(filePathNames) == 0):
+            filePathNames = None
+        fileStatistics = self._databaseManager.loadFileStatistics(filePathNames)
+
+        return flask.jsonify({
+            "fileStatistics": fileStatistics
+        })
+
+    #######################################################################################   FARM DATABASES
+    # this printer and the registered history databases of the other printers (setting farmDatabases), with the
+    # count of jobs or null if the database could not be read
+    @octoprint.plugin.BlueprintPlugin.route("/farmDatabases", methods=["GET"])
+    def get_farmDatabases(self):
+
+        return flask.jsonify({
+            "farmDatabases": self._databaseManager.getFarmDatabaseStatus()
+        })
+
+    #######################################################################################   DATABASE MAINTENANCE
+    @octoprint.plugin.BlueprintPlugin.route("/runDatabaseMaintenance", methods=["PUT"])
+    def put_runDatabaseMaintenance(self):
+
+        # a full vacuum blocks the writers, not during a print
+        if (self._isPrinterBusy()):
+            return flask.make_response("Printer is busy, run the database maintenance after the print", 409)
+        maintenanceSummary = self._runDatabaseMaintenance()
+
+        return flask.jsonify({
+            "success": maintenanceSummary != None,
+            "databaseMaintenanceResult": maintenanceSummary
+        })
+
+    #######################################################################################   QUERY CACHE STATISTIC
+    @octoprint.plugin.BlueprintPlugin.route("/queryCacheStatistic", methods=["GET"])
+    def get_queryCacheStatistic(self):
+
+        return flask.jsonify(self._databaseManager.getQueryCacheStatistic())
+
+    #######################################################################################   TEXT STORAGE STATISTIC
+    # size of the compressed slicer settings and technical logs against the plain texts
+    @octoprint.plugin.BlueprintPlugin.route("/textStorageStatistic", methods=["GET"])
+    def get_textStorageStatistic(self):
+
+        textStorageStatistic = self._databaseManager.getTextStorageStatistic()
+        if (textStorageStatistic == None):
+            return flask.jsonify({"available": False})
+        textStorageStatistic["available"] = True
+        return flask.jsonify(textStorageStatistic)
+
+    #######################################################################################   ARCHIVE OLD PRINTJOBS
+    # months: jobs older than that move into the archive file, default from the settings
+    @octoprint.plugin.BlueprintPlugin.route("/archivePrintJobs", methods=["PUT"])
+    def put_archivePrintJobs(self):
+
+        olderThanMonths = flask.request.values.get("months", self._settings.get_int([SettingsKeys.SETTINGS_KEY_ARCHIVE_AFTER_MONTHS]))
+        try:
+            olderThanMonths = int(olderThanMonths)
+        except (TypeError, ValueError):
+            return flask.make_response("Invalid months '" + str(olderThanMonths) + "'", 400)
+        if (olderThanMonths <= 0):
+            return flask.make_response("Months must be greater than 0", 400)
+
+        archivedCount = self._databaseManager.archivePrintJobs(olderThanMonths)
+
+        return flask.jsonify({
+            "success": archivedCount != None,
+            "archivedCount": archivedCount
+        })
+
     #######################################################################################   COMPARE Slicer Settings
     @octoprint.plugin.BlueprintPlugin.route("/compareSlicerSettings/", methods=["GET"])
     def get_compareSlicerSettings(self):
@@ -274,14 +468,21 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
             selectedDatabaseIds = flask.request.values["databaseIds"]
 
             # selectedDatabaseIds = "21, 17"
-            allJobsModels = self._databaseManager.loadSelectedPrintJobs(selectedDatabaseIds)
+            # texts of all jobs with one query, not one per job
+            allJobsModels = self._databaseManager.loadSelectedPrintJobs(selectedDatabaseIds, withTexts=True)
+            # parsed during the capture, the text is only needed for the jobs which are not parsed yet
+            allParsedSlicerSettings = self._databaseManager.loadSlicerSettings([job.databaseId for job in allJobsModels])
 
             slicerSettingssJobToCompareList = []
             for job in allJobsModels:
                 settingsForCompare = SlicerSettingsService.SlicerSettingsJob()
                 settingsForCompare.databaseId = job.databaseId
                 settingsForCompare.fileName = job.fileName
-                settingsForCompare.slicerSettingsAsText = job.slicerSettingsAsText
+                settingsForCompare.parsedSettings = allParsedSlicerSettings.get(job.databaseId)
+                if (job.getTexts() != None):
+                    settingsForCompare.slicerSettingsHash = job.getTexts().slicerSettingsHash
+                    if (settingsForCompare.parsedSettings == None):
+                        settingsForCompare.slicerSettingsAsText = job.getTexts().slicerSettingsAsText
 
                 slicerSettingssJobToCompareList.append(settingsForCompare)
 
@@ -300,17 +501,54 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
     def get_printjobhistoryByQuery(self):
 
         tableQuery = flask.request.values
-        allJobsModels = self._databaseManager.loadPrintJobsByQuery(tableQuery)
+        nextCursor = None
+        previousCursor = None
+        skippedPrinters = []
+        try:
+            if (self._isFarmRequested(tableQuery)):
+                # merged pages of all printers, paged by 'from'
+                allJobsModels, totalItemCount, skippedPrinters = self._databaseManager.loadFarmPrintJobsPageByQuery(tableQuery)
+            elif (tableQuery.get("pagingMode") == "cursor"):
+                # keyset pagination, constant costs for next/previous page
+                allJobsModels, nextCursor, previousCursor = self._databaseManager.loadPrintJobsByCursor(tableQuery)
+                totalItemCount = self._databaseManager.countPrintJobsByQuery(tableQuery)
+            else:
+                # page and total count with one scan
+                allJobsModels, totalItemCount = self._databaseManager.loadPrintJobsPageByQuery(tableQuery)
+        except ValueError as e:
+            # e.g. invalid slicer settings filter
+            return flask.make_response(str(e), 400)
         # allJobsAsDict = self._convertPrintJobHistoryModelsToDict(allJobsModels)
         # selectedFile = self._file_manager.path_on_disk(fileLocation, selectedFilename)
         allJobsAsDict = TransformPrintJob2JSON.transformAllPrintJobModels(allJobsModels, self._file_manager)
+        # optional column of the table, one query for the files of the page (file rollup of this printer)
+        fileStatistics = self._databaseManager.loadFileStatistics([printJobModel.getFileRollupKey() for printJobModel in allJobsModels])
+        for printJobModel, jobAsDict in zip(allJobsModels, allJobsAsDict):
+            printerName = getattr(printJobModel, "printerName", None)
+            jobAsDict["printerName"] = printerName
+            # jobs of the other printers are read only, their databaseIds belong to the farm database
+            jobAsDict["isFarmPrintJob"] = printerName != None and printerName != self._databaseManager.getLocalPrinterName()
+            jobAsDict["fileStatistic"] = None if jobAsDict["isFarmPrintJob"] else fileStatistics.get(printJobModel.getFileRollupKey())
 
-        totalItemCount = self._databaseManager.countPrintJobsByQuery(tableQuery)
         return flask.jsonify({
                                 "totalItemCount": totalItemCount,
-                                "allPrintJobs": allJobsAsDict
+                                "allPrintJobs": allJobsAsDict,
+                                "nextCursor": nextCursor,
+                                "previousCursor": previousCursor,
+                                "skippedPrinters": skippedPrinters
                             })
 
+    #######################################################################################   LOAD JOB TEXTS
+    # large texts (note, slicer settings, technical log) are not part of the table, only loaded by the edit dialog
+    @octoprint.plugin.BlueprintPlugin.route("/loadPrintJobTexts/<int:databaseId>", methods=["GET"])
+    def get_printjobTexts(self, databaseId):
+
+        printJobModel = self._databaseManager.loadPrintJob(databaseId)
+        if (printJobModel == None):
+            return flask.jsonify({})
+
+        return flask.jsonify(TransformPrintJob2JSON.transformPrintJobTexts(printJobModel))
+
     #######################################################################################   SELECT JOB FOR PRINTING
     @octoprint.plugin.BlueprintPlugin.route("/selectPrintJobForPrint/<int:databaseId>", methods=["PUT"])
     def put_select_printjob(self, databaseId):
@@ -346,19 +584,19 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
     @octoprint.plugin.BlueprintPlugin.route("/removePrintJob/<int:databaseId>", methods=["DELETE"])
     def delete_printjob(self, databaseId):
 
-        allJobsModels = []
+        allDatabaseIds = [databaseId]
         if "databaseIds" in flask.request.values:
-            selectedDatabaseIds = flask.request.values["databaseIds"]
-            allJobsModels = self._databaseManager.loadSelectedPrintJobs(selectedDatabaseIds)
-        else:
-            allJobsModels.append(self._databaseManager.loadPrintJob(databaseId))
-
-        for printJob in allJobsModels:
-            if (printJob == None):
-                continue
-            self._databaseManager.deletePrintJob(printJob.databaseId)
-            snapshotFilename = CameraManager.buildSnapshotFilename(printJob.printStartDateTime)
-            self._cameraManager.deleteSnapshot(snapshotFilename)
+            allDatabaseIds = flask.request.values["databaseIds"].split(",")
+
+        # one transaction for all jobs, the snapshots are deleted afterwards in the background
+        allStartDateTimes = self._databaseManager.deletePrintJobs(allDatabaseIds)
+        if (allStartDateTimes == None):
+            return flask.make_response("Could not delete the print jobs. See OctoPrint.log for details!", 500)
+        allSnapshotFilenames = []
+        for printStartDateTime in allStartDateTimes:
+            if (printStartDateTime != None):
+                allSnapshotFilenames.append(CameraManager.buildSnapshotFilename(printStartDateTime))
+        self._cameraManager.deleteSnapshotsAsync(allSnapshotFilenames)
 
         return flask.jsonify()
 
@@ -483,12 +721,52 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
 
 
     #######################################################################################   DOWNLOAD DATABASE-FILE
-    @octoprint.plugin.BlueprintPlugin.route("/downloadDatabase", methods=["GET"])
-    def get_download_database(self):
-        return send_file(self._databaseManager.getDatabaseFileLocation(),
-                         mimetype='application/octet-stream',
-                         attachment_filename='printJobHistory.db',
-                         as_attachment=True)
+    @octoprint.plugin.BlueprintPlugin.route("/downloadDatabase", methods=["GET"], defaults={"compression": None})
+    @octoprint.plugin.BlueprintPlugin.route("/downloadDatabase/<compression>", methods=["GET"])
+    def get_download_database(self, compression):
+        if (self._databaseManager.isExternalDatabase()):
+            return flask.make_response("The print jobs are stored in an external database, there is no database file to download", 400)
+        if (compression != None and compression != "gzip"):
+            return flask.make_response("Unknown compression '" + compression + "', only gzip is supported", 400)
+
+        # online backup into a temp-file, the running database could be changed during the download
+        backupFile = tempfile.NamedTemporaryFile(prefix="printJobHistory-download-", suffix=".db", delete=False)
+        backupFile.close()
+        try:
+            self._databaseManager.createDatabaseBackup(backupFile.name)
+        except Exception as e:
+            os.remove(backupFile.name)
+            self._logger.exception("Could not create the database backup for the download:" + str(e))
+            return flask.make_response("Could not create the database backup. See OctoPrint.log for details!", 500)
+
+        if (compression == "gzip"):
+            return Response(self._streamFile(backupFile.name, True),
+                            mimetype='application/gzip',
+                            headers={'Content-Disposition': 'attachment; filename=printJobHistory.db.gz'})
+        return Response(self._streamFile(backupFile.name, False),
+                        mimetype='application/octet-stream',
+                        headers={'Content-Disposition': 'attachment; filename=printJobHistory.db',
+                                 'Content-Length': str(os.path.getsize(backupFile.name))})
+
+    # chunk by chunk to the client (gzip on the fly), the file is deleted after the last chunk
+    def _streamFile(self, filePath, compressed, chunkSize=64 * 1024):
+        try:
+            # wbits 31 -> gzip header and trailer
+            compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compressed else None
+            with open(filePath, "rb") as fileToStream:
+                while True:
+                    chunk = fileToStream.read(chunkSize)
+                    if (len(chunk) == 0):
+                        break
+                    if (compressor != None):
+                        chunk = compressor.compress(chunk)
+                        if (len(chunk) == 0):
+                            continue
+                    yield chunk
+            if (compressor != None):
+                yield compressor.flush()
+        finally:
+            os.remove(filePath)
 
 
     #######################################################################################   DELETE DATABASE
@@ -506,6 +784,12 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
     def get_exportPrintJobHistoryData(self, exportType):
 
         if exportType == "CSV":
+            if (self._isFarmRequested(flask.request.values)):
+                # jobs of the table query (filters) of all printers, with the printer column
+                allJobsModels, skippedPrinters = self._databaseManager.loadFarmPrintJobsByQuery(flask.request.values)
+                return Response(CSVExportImporter.transform2CSV(allJobsModels, withPrinterColumn=True),
+                                mimetype='text/csv',
+                                headers={'Content-Disposition': 'attachment; filename=OctoprintPrintJobHistory-Farm.csv'})
             if "databaseIds" in flask.request.values:
                 selectedDatabaseIds = flask.request.values["databaseIds"]
                 allJobsModels = self._databaseManager.loadSelectedPrintJobs(selectedDatabaseIds)
@@ -545,7 +829,7 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
 
     ######################################################################################   UPLOAD CSV FILE (in Thread)
 
-    def _processCSVUploadAsync(self, path, importCSVMode, databaseManager, cameraManager, backupFolder, sendCSVUploadStatusToClient, logger):
+    def _processCSVUploadAsync(self, path, importCSVMode, importChunkSize, databaseManager, cameraManager, backupFolder, sendCSVUploadStatusToClient, logger):
         errorCollection = list()
 
         # - parsing
@@ -582,20 +866,24 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
 
                 importModeText = "fully replaced"
 
-            # - insert all printjobs in database
-            currentPrintJobNumber = 0
-            for printJob in resultOfPrintJobs:
-                currentPrintJobNumber = currentPrintJobNumber + 1
-                updateParsingStatus(currentPrintJobNumber)
-                databaseManager.insertPrintJob(printJob)
-                # print(printJob)
+            # - insert all printjobs in database, chunk by chunk
+            importStartTime = time.time()
+            try:
+                insertedJobCount = databaseManager.insertPrintJobs(resultOfPrintJobs, importChunkSize, updateParsingStatus)
+            except DatabaseNotWritableError as error:
+                insertedJobCount = 0
+                errorCollection.append(str(error))
+            importDuration = time.time() - importStartTime
+            if (insertedJobCount != len(resultOfPrintJobs)):
+                errorCollection.append("Only '" + str(insertedJobCount) + "' of '" + str(len(resultOfPrintJobs)) + "' print jobs imported! See OctoPrint.log for details.")
             pass
         else:
             errorCollection.append("Nothing to import!")
 
         successMessage = ""
         if (len(errorCollection) == 0):
-            successMessage = "All data is successful " + importModeText + " with '" + str(len(resultOfPrintJobs)) + "' print jobs."
+            successMessage = "All data is successful " + importModeText + " with '" + str(len(resultOfPrintJobs)) + "' print jobs" + \
+                             " (" + "{:.0f}".format(len(resultOfPrintJobs) / max(importDuration, 0.001)) + " jobs/s)."
         else:
             successMessage = "Some error(s) occurs! Maybe you need to manually rollback the database!"
 
@@ -625,6 +913,7 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
             thread = threading.Thread(target=self._processCSVUploadAsync,
                                       args=(sourceLocation,
                                             importMode,
+                                            self._settings.get_int([SettingsKeys.SETTINGS_KEY_IMPORT_CSV_CHUNK_SIZE]),
                                             self._databaseManager,
                                             self._cameraManager,
                                             self.get_plugin_data_folder(),
@@ -741,7 +1030,7 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
 
         reportHtmlTemplate = self._loadPrintJobReportTemplateContent("single")
 
-        printJobModelAsJson=TransformPrintJob2JSON.transformPrintJobModel(printJobModel, self._file_manager, False)
+        printJobModelAsJson=TransformPrintJob2JSON.transformPrintJobModel(printJobModel, self._file_manager, False, True)
         # printJobModelAsJson = {
         #   "Hallo": "du"
         # }
@@ -773,12 +1062,12 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
             if ("databaseIds" in tableQuery):
                 selectedDatabaseIds = tableQuery["databaseIds"]
                 # selectedDatabaseIds = "21, 17"
-                allPrintJobModels = self._databaseManager.loadSelectedPrintJobs(selectedDatabaseIds)
+                allPrintJobModels = self._databaseManager.loadSelectedPrintJobs(selectedDatabaseIds, withTexts=True)
             else:
                 # always load all print jobs
                 tableQuery["from"] = 0
                 tableQuery["to"] = 99999
-                allPrintJobModels = self._databaseManager.loadPrintJobsByQuery(tableQuery)
+                allPrintJobModels = self._databaseManager.loadPrintJobsByQuery(tableQuery, withTexts=True)
 
         if (len(allPrintJobModels) == 0):
             # PrintJob was deleted
@@ -792,7 +1081,7 @@ class PrintJobHistoryAPI(octoprint.plugin.BlueprintPlugin):
         # build mulit-page report
         reportHtmlTemplate = self._loadPrintJobReportTemplateContent("multi")
 
-        allJobsAsDict = TransformPrintJob2JSON.transformAllPrintJobModels(allPrintJobModels, self._file_manager, False)
+        allJobsAsDict = TransformPrintJob2JSON.transformAllPrintJobModels(allPrintJobModels, self._file_manager, False, True)
 
         # allPrintJobModelAsJson = TransformPrintJob2JSON.transformPrintJobModel(printJobModel, self._file_manager, False)
         # printJobModelAsJson = {
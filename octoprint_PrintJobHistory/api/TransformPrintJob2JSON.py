@@ -6,7 +6,7 @@ from octoprint_PrintJobHistory.CameraManager import CameraManager
 from octoprint_PrintJobHistory.common import StringUtils
 from octoprint_PrintJobHistory.common import PrintJobUtils
 
-def transformPrintJobModel(job, fileManager, deleteDateTimeFromDict = True):
+def transformPrintJobModel(job, fileManager, deleteDateTimeFromDict = True, withTexts = False):
 	jobAsDict = job.__data__
 
 	jobAsDict["printStartDateTimeFormatted"] = job.printStartDateTime.strftime('%d.%m.%Y %H:%M')
@@ -62,6 +62,9 @@ def transformPrintJobModel(job, fileManager, deleteDateTimeFromDict = True):
 		jobAsDict["costs"] = costsAsDict
 		isCostsAvailable = True
 	jobAsDict["isCostsAvailable"] = isCostsAvailable
+	# -- texts (only for dialog/report, too large for the table)
+	if (withTexts):
+		jobAsDict.update(transformPrintJobTexts(job))
 	# -- images
 	jobAsDict["snapshotFilename"] = CameraManager.buildSnapshotFilename(job.printStartDateTime)
 	# remove timedelta object, because could not transfered to client
@@ -78,15 +81,23 @@ def transformPrintJobModel(job, fileManager, deleteDateTimeFromDict = True):
 
 	return jobAsDict
 
-def transformAllPrintJobModels(allJobsModels, fileManager, deleteDateTimeFromDict = True):
+def transformAllPrintJobModels(allJobsModels, fileManager, deleteDateTimeFromDict = True, withTexts = False):
 
 	result = []
 	for job in allJobsModels:
-		jobAsDict = transformPrintJobModel(job, fileManager, deleteDateTimeFromDict)
+		jobAsDict = transformPrintJobModel(job, fileManager, deleteDateTimeFromDict, withTexts)
 		result.append(jobAsDict)
 
 	return result
 
+def transformPrintJobTexts(job):
+	texts = job.getTexts()
+	return {
+		"noteDeltaFormat": texts.noteDeltaFormat if texts != None else None,
+		"slicerSettingsAsText": texts.slicerSettingsAsText if texts != None else None,
+		"technicalLog": texts.technicalLog if texts != None else None
+	}
+
 #  convert mm to m
 def convertMM2M(value):
 	if (value == None or not isinstance(value, float)):
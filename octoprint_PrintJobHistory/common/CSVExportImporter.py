@@ -40,6 +40,7 @@ COLUMN_ESTIMATED_FILAMENT_COSTS = "Estimated Filament Cost"
 COLUMN_ESTIMATED_ELECTRICITY_COSTS = "Estimated Electricity Cost"
 COLUMN_ESTIMATED_PRINTER_COSTS = "Estimated Printer Cost"
 COLUMN_OTHER_COSTS = "Other Cost [label:value]"
+COLUMN_PRINTER = "Printer"
 
 #############################################################################################################
 class CSVColumn:
@@ -208,7 +209,7 @@ class TemperaturCSVFormattorParser:
 		tempValue = ""
 		for tempValues in valueToFormat:
 			sensorName = tempValues.sensorName
-			sensorValue = str(tempValues.sensorValue)
+			sensorValue = str(tempValues.sensorValue) if tempValues.sensorValue != None else "-"
 			tempValue = tempValue + sensorName + ":" + sensorValue + " "
 		return tempValue
 
@@ -430,11 +431,18 @@ ALL_COLUMNS = {
 
 }
 
+# only exported (farm), ignored by the import
+PRINTER_COLUMN = CSVColumn("printerName", COLUMN_PRINTER, "", DefaultCSVFormattorParser())
+
 
 
 ####################################################################################################### -> EXPORT TO CSV
 
-def transform2CSV(allJobsDict):
+def transform2CSV(allJobsDict, withPrinterColumn=False):
+	allCSVColumns = [ALL_COLUMNS[columnKey] for columnKey in ALL_COLUMNS_SORTED]
+	if (withPrinterColumn):
+		allCSVColumns.insert(0, PRINTER_COLUMN)
+
 	result = None
 	si = StringIO()	#TODO maybe a bad idea to use a internal memory based string, needs to be switched to response stream
 	# si = io.BytesIO()
@@ -443,8 +451,7 @@ def transform2CSV(allJobsDict):
 	#  Write HEADER
 	headerList = list()
 	csvLine = ""
-	for columnKey in ALL_COLUMNS_SORTED:
-		csvColumn = ALL_COLUMNS[columnKey]
+	for csvColumn in allCSVColumns:
 		label = '"' + csvColumn.columnLabel + '"'
 		headerList.append(label)
 
@@ -456,9 +463,7 @@ def transform2CSV(allJobsDict):
 	# Write CSV-Content
 	for job in allJobsDict:
 		csvRow = list()
-		for columnKey in ALL_COLUMNS_SORTED:
-			# print(columnKey)
-			csvColumn = ALL_COLUMNS[columnKey]
+		for csvColumn in allCSVColumns:
 			csvColumnValue = '"' + csvColumn.getCSV(job)  + '"'
 			csvRow.append(csvColumnValue)
 		csvLine = ",".join(csvRow) + "\n"
@@ -61,12 +61,26 @@ class SettingsKeys():
 
 	## Export / Import
 	SETTINGS_KEY_IMPORT_CSV_MODE = "importCSVMode"
+	SETTINGS_KEY_IMPORT_CSV_CHUNK_SIZE = "importCSVChunkSize"
 	KEY_IMPORTCSV_MODE_REPLACE = "replace"
 	KEY_IMPORTCSV_MODE_APPEND = "append"
 
 	## Storage
 	SETTINGS_KEY_DATABASE_PATH = "databaseFileLocation"
 	SETTINGS_KEY_SNAPSHOT_PATH = "snapshotFileLocation"
+	SETTINGS_KEY_DATABASE_JOURNAL_MODE = "databaseJournalMode"
+	SETTINGS_KEY_DATABASE_BUSY_TIMEOUT = "databaseBusyTimeout"
+	SETTINGS_KEY_DATABASE_BUSY_RETRIES = "databaseBusyRetries"
+	SETTINGS_KEY_DATABASE_CACHE_SIZE = "databaseCacheSize"
+	SETTINGS_KEY_DATABASE_MMAP_SIZE = "databaseMmapSize"
+	SETTINGS_KEY_DATABASE_QUERY_CACHE_SIZE = "databaseQueryCacheSize"
+	SETTINGS_KEY_DATABASE_CHECKPOINT_INTERVAL = "databaseCheckpointInterval"
+	SETTINGS_KEY_ARCHIVE_AFTER_MONTHS = "archiveAfterMonths"
+	SETTINGS_KEY_DATABASE_MAINTENANCE_INTERVAL = "databaseMaintenanceInterval"
+	SETTINGS_KEY_DATABASE_MAINTENANCE_LAST_RUN = "databaseMaintenanceLastRun"
+	SETTINGS_KEY_DATABASE_MAINTENANCE_RESULT = "databaseMaintenanceResult"
+	SETTINGS_KEY_FARM_PRINTER_NAME = "farmPrinterName"
+	SETTINGS_KEY_FARM_DATABASES = "farmDatabases"
 
 	## Debugging
 	SETTINGS_KEY_SQL_LOGGING_ENABLED = "sqlLoggingEnabled"
@@ -10,6 +10,28 @@ LINE_RESULT_GCODE = "LR:gcode"
 LINE_RESULT_SETTINGS = "LR:settings"
 LINE_RESULT_OTHERS = "LR:others"
 
+# a percentage (e.g. infill "30%") is stored as number without the "%"
+INT_VALUE_PATTERN = re.compile(r"^[-+]?\d+%?$")
+FLOAT_VALUE_PATTERN = re.compile(r"^[-+]?(\d+\.\d*|\.\d+|\d+)([eE][-+]?\d+)?%?$")
+
+VALUE_TYPE_INT = "int"
+VALUE_TYPE_FLOAT = "float"
+VALUE_TYPE_STRING = "string"
+
+
+# the same value for the stored key/value rows and a value parsed again out of the text, e.g. for the compare
+def normalizeValue(value):
+	return "" if value == None else str(value).strip()
+
+# return: (valueType, numberValue), numberValue is None for a string, e.g. "0.4,0.4" or "PLA"
+def parseTypedValue(value):
+	value = normalizeValue(value)
+	if (INT_VALUE_PATTERN.match(value)):
+		return (VALUE_TYPE_INT, float(value.rstrip("%")))
+	if (FLOAT_VALUE_PATTERN.match(value)):
+		return (VALUE_TYPE_FLOAT, float(value.rstrip("%")))
+	return (VALUE_TYPE_STRING, None)
+
 # Model of Slicer Settings
 class SlicerSettings(object):
 
@@ -149,7 +171,7 @@ class SlicerSettingsParser(object):
 				# 	key = keyValue[0].strip()
 				# 	value = keyValue[1].strip()
 					key = str(matched.group(1)).strip()
-					value = str(matched.group(2)).strip()
+					value = normalizeValue(matched.group(2))
 					if (slicerSettings.isKeyAlreadyExtracted(key) == False):
 						slicerSettings.addKeyValueSetting(key, value)
 						slicerSettings.addKeyValueSettingsAsText(line)
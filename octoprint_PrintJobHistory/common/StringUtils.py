@@ -189,6 +189,12 @@ def formatFloatSave(pattern, value, defaultString):
 	floatValue = float(value)
 	return pattern.format(floatValue)
 
+# lower case like SQLite lower(), only A-Z are changed
+ASCII_LOWER_TABLE = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+def asciiLower(value):
+	return value.translate(ASCII_LOWER_TABLE)
+
 def isEmpty(value):
 	value = to_native_str(value)
 	if (value == None or len(str(value).strip())==0 ):
@@ -0,0 +1,52 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+import hashlib
+import zlib
+
+# Shorter texts are stored as they are, the saving would be eaten up by the zlib header
+COMPRESSION_MIN_LENGTH = 256
+COMPRESSION_LEVEL = 6
+
+# First bytes of a compressed value, the version allows an other algorithm later (e.g. zstd, not part of the standard
+# library). A value without the marker (TEXT in sqlite, e.g. written before V16) is read as it is.
+COMPRESSION_MARKER_ZLIB = b"PJHZ1:"
+
+# SQL function for the full-text index and the LIKE search, registered for each sqlite connection
+SQL_TEXT_FUNCTION_NAME = "pjh_text"
+# SQL function of the migration to V18, the content hash of a stored text
+SQL_CONTENT_HASH_FUNCTION_NAME = "pjh_content_hash"
+
+
+def isCompressed(value):
+	return isinstance(value, bytes) and value.startswith(COMPRESSION_MARKER_ZLIB)
+
+
+# return: the compressed bytes, or the text itself if it is short or not compressible
+def compressText(text):
+	if (text == None or isinstance(text, bytes)):
+		return text
+	encodedText = text.encode("utf-8")
+	if (len(encodedText) < COMPRESSION_MIN_LENGTH):
+		return text
+	compressedText = COMPRESSION_MARKER_ZLIB + zlib.compress(encodedText, COMPRESSION_LEVEL)
+	if (len(compressedText) >= len(encodedText)):
+		return text
+	return compressedText
+
+
+def decompressText(value):
+	if (value == None or isinstance(value, str)):
+		return value
+	value = bytes(value)
+	if (isCompressed(value)):
+		return zlib.decompress(value[len(COMPRESSION_MARKER_ZLIB):]).decode("utf-8")
+	return value.decode("utf-8")
+
+
+# SHA-256 of the plain text (also of a stored, maybe compressed value), the key of a text stored once for all jobs
+# with the same content
+def contentHash(value):
+	if (value == None):
+		return None
+	return hashlib.sha256(decompressText(value).encode("utf-8")).hexdigest()
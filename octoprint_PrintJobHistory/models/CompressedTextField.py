@@ -0,0 +1,19 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+from octoprint_PrintJobHistory.common import TextCompression
+from peewee import TextField, SqliteDatabase
+
+
+# Since V16
+# Large texts (slicer settings, technical log) are stored zlib-compressed as BLOB in the TEXT column, the model always
+# gets the plain text. PostgreSQL compresses large values itself (TOAST) and its TEXT column takes no bytes.
+class CompressedTextField(TextField):
+
+	def db_value(self, value):
+		if (value == None or isinstance(self.model._meta.database, SqliteDatabase) == False):
+			return super(CompressedTextField, self).db_value(value)
+		return TextCompression.compressText(value)
+
+	def python_value(self, value):
+		return TextCompression.decompressText(value)
@@ -0,0 +1,28 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+from octoprint_PrintJobHistory.models.BaseModel import BaseModel
+from peewee import CharField, DateField, FloatField, IntegerField
+
+
+# Since V14
+# Sum of all print jobs of a day, split by status, material and spool (both from the "total" filament, so each job is
+# counted exactly once). Maintained by the DatabaseManager together with every insert/update/delete of a print job.
+class DailyRollupModel(BaseModel):
+
+	day = DateField()
+	printStatusResult = CharField()
+	material = CharField()		# "" if not present
+	spoolName = CharField()		# "" if not present
+
+	jobCount = IntegerField(default=0)
+	duration = IntegerField(default=0)	# seconds
+	usedLength = FloatField(default=0)	# mm
+	usedWeight = FloatField(default=0)	# g
+	filamentCost = FloatField(default=0)
+	totalCosts = FloatField(default=0)
+
+	class Meta:
+		indexes = (
+			(("day", "printStatusResult", "material", "spoolName"), True),
+		)
@@ -0,0 +1,23 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+from octoprint_PrintJobHistory.models.BaseModel import BaseModel
+from peewee import FloatField, IntegerField, TextField
+
+
+# Since V19
+# Sum of all print jobs of a gcode file, for the success rate and the real duration/filament of a file without a scan
+# of the history. Maintained by the DatabaseManager together with the DailyRollupModel.
+class FileRollupModel(BaseModel):
+
+	filePathName = TextField(unique=True)	# fileName if the path is not present
+
+	jobCount = IntegerField(default=0)
+	successCount = IntegerField(default=0)
+	duration = IntegerField(default=0)			# seconds, all jobs
+	usedLength = FloatField(default=0)			# mm, all jobs
+	usedWeight = FloatField(default=0)			# g, all jobs
+	totalCosts = FloatField(default=0)			# all jobs
+	successDuration = IntegerField(default=0)	# seconds, only the successful jobs
+	successUsedLength = FloatField(default=0)	# mm, only the successful jobs
+	successUsedWeight = FloatField(default=0)	# g, only the successful jobs
@@ -14,26 +14,27 @@ class PrintJobModel(BaseModel):
 
 	userName = CharField(null=True)
 	fileOrigin = CharField(null=True)	#new since db-scheme2
-	fileName = CharField(null=True)
-	filePathName = CharField(null=True)
+	fileName = TextField(null=True)
+	filePathName = TextField(null=True)
 	fileSize = IntegerField(null=True)
 	printStartDateTime = DateTimeField(null=True)
 	printEndDateTime = DateTimeField(null=True)
 	duration = IntegerField(null=True)
 	printStatusResult = CharField(null=True)
-	noteText = CharField(null=True)
-	noteDeltaFormat = CharField(null=True)
-	noteHtml = CharField(null=True)
+	noteText = TextField(null=True)	# TextField, postgres enforces the length of VARCHAR(255), sqlite not
+	noteHtml = TextField(null=True)
 	printedLayers = CharField(null=True)
 	printedHeight = CharField(null=True)
-	slicerSettingsAsText = TextField(null=True)
-	technicalLog = TextField(null=True)	#since v8
+	# noteDeltaFormat, slicerSettingsAsText, technicalLog moved to PrintJobTextModel since V13
 
 	allTemperatures = None
 
 	filamentModelsByToolId = {}
 
 	costModel = None
+	textModel = None
+	# key -> value of the capture, stored as SlicerSettingValueModel (since V17)
+	slicerSettingsAsDict = None
 	# def initialize(self):
 	# 	#  initialize with some a default
 	# 	filamentModel = FilamentModel()
@@ -42,7 +43,7 @@ class PrintJobModel(BaseModel):
 	# 	pass
 
 	def getCosts(self):
-		if (self.costModel == None):
+		if (self.costModel == None and self.databaseId != None):
 			# load costs from database
 			if (self.costs != None and len(self.costs) > 0):
 				self.costModel = self.costs[0]
@@ -52,6 +53,30 @@ class PrintJobModel(BaseModel):
 		costModel.printJob = self
 		self.costModel = costModel
 
+	def getTexts(self):
+		if (self.textModel == None and self.databaseId != None):
+			# load texts from database
+			if (self.texts != None and len(self.texts) > 0):
+				self.textModel = self.texts[0]
+		return self.textModel
+
+	def setTexts(self, textModel):
+		textModel.printJob = self
+		self.textModel = textModel
+
+	# key of the FileRollupModel (since V19), the same as the rollup select builds it
+	def getFileRollupKey(self):
+		if (self.filePathName != None and len(self.filePathName) > 0):
+			return self.filePathName
+		return "" if self.fileName == None else self.fileName
+
+	# only the settings of a new job, the stored values are loaded by DatabaseManager.loadSlicerSettings
+	def getSlicerSettingsAsDict(self):
+		return self.slicerSettingsAsDict
+
+	def setSlicerSettingsAsDict(self, slicerSettingsAsDict):
+		self.slicerSettingsAsDict = slicerSettingsAsDict
+
 	def addFilamentModel(self, filamentModel):
 		#  check preconditions
 		if (filamentModel == None):
@@ -93,7 +118,9 @@ class PrintJobModel(BaseModel):
 	def _loadFilamentModels(self):
 		# clear and build up
 		self.filamentModelsByToolId = {}
-		# load from database
+		# load from database, a new job has no stored filaments
+		if (self.databaseId == None):
+			return
 		allFilaments = self._getFilamentModelsFromAsso()
 		if (allFilaments != None and len(allFilaments) > 0):
 			for filament in allFilaments:
@@ -116,9 +143,10 @@ class PrintJobModel(BaseModel):
 		if (self.allTemperatures == None):
 			self.allTemperatures = []
 
-		tempAssos = self._getTemperatureModelsFromAsso()
-		for temps in tempAssos:
-			self.allTemperatures.append(temps)
+		if (self.databaseId != None):
+			tempAssos = self._getTemperatureModelsFromAsso()
+			for temps in tempAssos:
+				self.allTemperatures.append(temps)
 
 		return self.allTemperatures
 
@@ -0,0 +1,38 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+from octoprint_PrintJobHistory.common import TextCompression
+from octoprint_PrintJobHistory.models.PrintJobModel import PrintJobModel
+from octoprint_PrintJobHistory.models.BaseModel import BaseModel
+from octoprint_PrintJobHistory.models.CompressedTextField import CompressedTextField
+from octoprint_PrintJobHistory.models.SlicerSettingsBlobModel import SlicerSettingsBlobModel
+from peewee import CharField, TextField, ForeignKeyField
+
+
+# Since V13
+# The large text values of a print job, only loaded for the edit dialog, the slicer-settings compare and the reports.
+# Keeps the printjob rows (table paging, filtering, statistics) small.
+class PrintJobTextModel(BaseModel):
+
+	printJob = ForeignKeyField(PrintJobModel, backref='texts', on_delete='CASCADE', null=True, unique=True)
+
+	noteDeltaFormat = TextField(null=True)
+	# the slicer settings text is stored once per content in SlicerSettingsBlobModel since V18, see slicerSettingsAsText
+	slicerSettingsHash = CharField(null=True, index=True)
+	# compressed since V16
+	technicalLog = CompressedTextField(null=True)
+
+	# set by the capture/edit or loaded with the text model, otherwise loaded with the first access
+	_slicerSettingsAsText = None
+
+	@property
+	def slicerSettingsAsText(self):
+		if (self._slicerSettingsAsText == None and self.slicerSettingsHash != None):
+			blobModel = SlicerSettingsBlobModel.get_or_none(SlicerSettingsBlobModel.contentHash == self.slicerSettingsHash)
+			self._slicerSettingsAsText = blobModel.slicerSettingsAsText if blobModel != None else None
+		return self._slicerSettingsAsText
+
+	@slicerSettingsAsText.setter
+	def slicerSettingsAsText(self, slicerSettingsAsText):
+		self._slicerSettingsAsText = slicerSettingsAsText
+		self.slicerSettingsHash = TextCompression.contentHash(slicerSettingsAsText)
@@ -0,0 +1,12 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+from octoprint_PrintJobHistory.models.BaseModel import BaseModel
+from peewee import CharField
+
+
+# Since V17
+# Dictionary of all slicer setting keys (e.g. "layer_height"), the values of the jobs only reference the id
+class SlicerSettingKeyModel(BaseModel):
+
+	key = CharField(unique=True)
@@ -0,0 +1,27 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+from octoprint_PrintJobHistory.models.BaseModel import BaseModel
+from octoprint_PrintJobHistory.models.PrintJobModel import PrintJobModel
+from octoprint_PrintJobHistory.models.SlicerSettingKeyModel import SlicerSettingKeyModel
+from peewee import CharField, FloatField, ForeignKeyField, TextField
+
+
+# Since V17
+# Slicer settings of a job, parsed once during the capture. The filter of the table compares numberValue for numbers
+# (e.g. "infill_sparse_density > 30"), textValue for everything else.
+class SlicerSettingValueModel(BaseModel):
+
+	printJob = ForeignKeyField(PrintJobModel, backref='slicerSettingValues', on_delete='CASCADE', index=False)
+	settingKey = ForeignKeyField(SlicerSettingKeyModel, on_delete='CASCADE', index=False)
+
+	valueType = CharField()	# int, float, string see SlicerSettingsParser.parseTypedValue
+	numberValue = FloatField(null=True)	# only for int/float, a percentage without the "%"
+	textValue = TextField(null=True)	# the value as written by the slicer
+
+	class Meta:
+		indexes = (
+			(("printJob", "settingKey"), True),
+			(("settingKey", "numberValue"), False),
+			(("settingKey", "textValue"), False),
+		)
@@ -0,0 +1,15 @@
+# coding=utf-8
+from __future__ import absolute_import
+
+from octoprint_PrintJobHistory.models.BaseModel import BaseModel
+from octoprint_PrintJobHistory.models.CompressedTextField import CompressedTextField
+from peewee import CharField
+
+
+# Since V18
+# Slicer settings text stored once per content, all jobs printed with the same settings (e.g. the same gcode printed
+# again) reference it by the SHA-256 hash of the text, see TextCompression.contentHash
+class SlicerSettingsBlobModel(BaseModel):
+
+	contentHash = CharField(unique=True)
+	slicerSettingsAsText = CompressedTextField()
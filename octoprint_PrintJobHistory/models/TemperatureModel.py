@@ -1,15 +1,30 @@
 # coding=utf-8
 from __future__ import absolute_import
 
+from octoprint_PrintJobHistory.common import StringUtils
 from octoprint_PrintJobHistory.models.BaseModel import BaseModel
 from octoprint_PrintJobHistory.models.PrintJobModel import PrintJobModel
 from peewee import CharField, Model, DecimalField, FloatField, DateField, DateTimeField, TextField, ForeignKeyField
 
 
+# trimmed, lower case ("bed", "tool0"). The same as lower(trim(sensorName)) of the V15 migration: only spaces are
+# trimmed and only A-Z lowered.
+def normalizeSensorName(sensorName):
+	return StringUtils.asciiLower(str(sensorName).strip(" "))
+
+
+# stored normalized, also applied to the values of a where clause
+class SensorNameField(CharField):
+
+	def db_value(self, value):
+		if (value != None):
+			value = normalizeSensorName(value)
+		return super(SensorNameField, self).db_value(value)
+
+
 class TemperatureModel(BaseModel):
 
 	printJob = ForeignKeyField(PrintJobModel, related_name='temperatures', on_delete='CASCADE')
 
-	sensorName = CharField(null=False)
-	sensorValue = CharField(null=False)	# TODO needs to be refactored to float
-
+	sensorName = SensorNameField(null=False)
+	sensorValue = FloatField(null=True)	# since V15, before CharField with '-' for an unknown temperature
@@ -5,12 +5,18 @@ import logging
 import os
 import re
 
+from octoprint_PrintJobHistory.common import SlicerSettingsParser
+
 class SlicerSettingsService(object):
 
 	class SlicerSettingsJob:
 		databaseId = 0
 		fileName = ""
 		slicerSettingsAsText = ""
+		# content hash of the text (since V18), jobs with the same hash have the same settings
+		slicerSettingsHash = None
+		# {key: value} parsed during the capture (since V17), None if only the text is present
+		parsedSettings = None
 		keyValuesSettings = {}
 
 	class SlicerSettingsCompareResult:
@@ -28,14 +34,39 @@ class SlicerSettingsService(object):
 		self._parseSlicerExpressions(slicerSettingsExpressions)
 
 		allKeys = []
+		keyValuesSettingsByHash = {}
 		for slicerSettingsJob in slicerSettingsJobList:
-			slicerSettingsJob.keyValuesSettings = self.parseKeyValues(slicerSettingsJob.slicerSettingsAsText, allKeys)
+			if (slicerSettingsJob.slicerSettingsHash in keyValuesSettingsByHash):
+				# same text, parsed only once (copy, markDiff changes the values of each job)
+				keyValuesSettings = keyValuesSettingsByHash[slicerSettingsJob.slicerSettingsHash]
+				slicerSettingsJob.keyValuesSettings = dict([(key, dict(keyValue)) for key, keyValue in keyValuesSettings.items()])
+				continue
+			if (slicerSettingsJob.parsedSettings != None):
+				slicerSettingsJob.keyValuesSettings = self._toKeyValueSettings(slicerSettingsJob.parsedSettings, allKeys)
+			else:
+				slicerSettingsJob.keyValuesSettings = self.parseKeyValues(slicerSettingsJob.slicerSettingsAsText, allKeys)
+			if (slicerSettingsJob.slicerSettingsHash != None):
+				keyValuesSettingsByHash[slicerSettingsJob.slicerSettingsHash] = slicerSettingsJob.keyValuesSettings
 
 		allKeys = sorted(allKeys)
 		compareResult = self.markDiff(allKeys, slicerSettingsJobList)
 
 		return compareResult
 
+	# return: {key: value} of the slicer settings text
+	def parseSlicerSettings(self, slicerSettingsAsText, slicerSettingsExpressions):
+		self._parseSlicerExpressions(slicerSettingsExpressions)
+		keyValueSettings = self.parseKeyValues(slicerSettingsAsText, [])
+		return dict([(key, keyValue["value"]) for key, keyValue in keyValueSettings.items()])
+
+	def _toKeyValueSettings(self, parsedSettings, allKeys):
+		keyValueSettings = {}
+		for key, value in parsedSettings.items():
+			keyValueSettings[key] = {"key": key, "value": SlicerSettingsParser.normalizeValue(value)}
+			if ((key in allKeys) == False):
+				allKeys.append(key)
+		return keyValueSettings
+
 	def parseKeyValues(self, jobSettings, allKeys):
 		keyValueSettings = {}
 		if (jobSettings != None):
@@ -53,7 +84,7 @@ class SlicerSettingsService(object):
 						# 	key = keyValue[0].strip()
 						# 	value = keyValue[1].strip()
 						key = str(matched.group(1)).strip()
-						value = str(matched.group(2)).strip()
+						value = SlicerSettingsParser.normalizeValue(matched.group(2))
 
 						keyValueSettings[key] = {"key": key, "value":value }
 						# keyValueSettings["value"] = value
@@ -73,6 +104,11 @@ class SlicerSettingsService(object):
 		compareResult = SlicerSettingsService.SlicerSettingsCompareResult()
 		compareResult.allKeys = allKeys
 		compareResult.slicerSettingsJobList = slicerSettingsJobList
+		if (len(slicerSettingsJobList) == 0):
+			return compareResult
+		# same hash as the first job, no value is different
+		firstHash = slicerSettingsJobList[0].slicerSettingsHash
+		sameAsFirstJobs = [firstHash != None and slicerSettingsJob.slicerSettingsHash == firstHash for slicerSettingsJob in slicerSettingsJobList]
 		for currentKey in allKeys:
 
 			diffCount = 0
@@ -95,11 +131,12 @@ class SlicerSettingsService(object):
 						slicerSettingsJob.keyValuesSettings[currentKey] = firstKeyValue
 						index = index + 1
 						continue
+				isSameAsFirst = sameAsFirstJobs[index]
 				index = index + 1
 				isDiffResult = "no"
 				if (currentKey in slicerSettingsJob.keyValuesSettings):
 					currentKeyValue = slicerSettingsJob.keyValuesSettings[currentKey]
-					if (currentKeyValue["value"] != firstKeyValue["value"] ):
+					if (isSameAsFirst == False and currentKeyValue["value"] != firstKeyValue["value"] ):
 						isDiffResult = "yes"
 					slicerSettingsJob.keyValuesSettings[currentKey]["isDifferent"] = isDiffResult
 					pass
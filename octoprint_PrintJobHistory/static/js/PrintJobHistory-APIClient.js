@@ -34,8 +34,12 @@ function PrintJobHistoryAPIClient(pluginId, baseUrl) {
         return urlContext;
     }
 
-    this.getDownloadDatabaseUrl = function(exportType){
-        return _addApiKeyIfNecessary("./plugin/" + this.pluginId + "/downloadDatabase");
+    this.getDownloadDatabaseUrl = function(compression){
+        var urlContext = "./plugin/" + this.pluginId + "/downloadDatabase";
+        if (compression){
+            urlContext = urlContext + "/" + compression;
+        }
+        return _addApiKeyIfNecessary(urlContext);
     }
 
     this.getSampleCSVUrl = function(){
@@ -46,6 +50,12 @@ function PrintJobHistoryAPIClient(pluginId, baseUrl) {
         return _addApiKeyIfNecessary("./plugin/" + this.pluginId + "/exportPrintJobHistory/" + exportType);
     }
 
+    // jobs of all printers (farm), filtered by the table query
+    this.getFarmExportUrl = function(exportType, tableQuery){
+        query = _buildRequestQuery(tableQuery);
+        return _addApiKeyIfNecessary("./plugin/" + this.pluginId + "/exportPrintJobHistory/" + exportType + "?" + query);
+    }
+
     this.getProxiedSnapshotUrl = function(snapshotFilename){
         http://localhost:5000/plugin/PrintJobHistory/mysnapshot
         return _addApiKeyIfNecessary("./plugin/" + this.pluginId + "/mysnapshot");
@@ -95,6 +105,16 @@ function PrintJobHistoryAPIClient(pluginId, baseUrl) {
             //shoud be done by the server to make sure the server is informed countdownDialog.modal('hide');
             //countdownDialog.modal('hide');
             //countdownCircle = null;
+        }).fail(function(jqXHR){
+            if (jqXHR.status == 400){
+                // e.g. invalid slicer settings filter
+                new PNotify({
+                    title: "Filter",
+                    text: jqXHR.responseText,
+                    type: "warning",
+                    hide: true
+                });
+            }
         });
     }
     // load STATISTICS PrintJob-Items
@@ -113,6 +133,46 @@ function PrintJobHistoryAPIClient(pluginId, baseUrl) {
         });
     }
 
+    // load day/week/month SERIES of the PrintJob-Items selected by the table query, e.g. for a chart
+    this.callLoadStatisticSeriesByQuery = function (tableQuery, bucket, groupBy, responseHandler){
+        query = _buildRequestQuery(tableQuery) + "&bucket=" + encodeURIComponent(bucket);
+        if (groupBy){
+            query = query + "&groupBy=" + encodeURIComponent(groupBy);
+        }
+        urlToCall = this.baseUrl + "plugin/"+this.pluginId+"/loadStatisticSeriesByQuery?"+query;
+        $.ajax({
+            url: urlToCall,
+            type: "GET"
+        }).done(function( data ){
+            responseHandler(data)
+        });
+    }
+
+    // load success rate and averages of the files, all files without filePathNames
+    this.callLoadFileStatistic = function (filePathNames, responseHandler){
+        query = (filePathNames || []).map(function(filePathName){
+            return "filePathName=" + encodeURIComponent(filePathName);
+        }).join("&");
+        urlToCall = this.baseUrl + "plugin/"+this.pluginId+"/loadFileStatistic?"+query;
+        $.ajax({
+            url: urlToCall,
+            type: "GET"
+        }).done(function( data ){
+            responseHandler(data)
+        });
+    }
+
+    // load TEXTS (note, slicer settings, technical log) of a PrintJob-Item, not part of the table items
+    this.callLoadPrintJobTexts = function (databaseId, responseHandler){
+        urlToCall = this.baseUrl + "plugin/"+this.pluginId+"/loadPrintJobTexts/"+databaseId;
+        $.ajax({
+            url: urlToCall,
+            type: "GET"
+        }).done(function( data ){
+            responseHandler(data)
+        });
+    }
+
     // load COMPARE SlicerSettigs
     this.callCompareSlicerSettings = function (selectedJobDatabaseIds, responseHandler){
         urlToCall = this.baseUrl + "plugin/"+this.pluginId+"/compareSlicerSettings/?databaseIds="+selectedJobDatabaseIds;
@@ -140,6 +200,22 @@ function PrintJobHistoryAPIClient(pluginId, baseUrl) {
         });
     }
 
+    this.callRunDatabaseMaintenance = function(responseHandler){
+        $.ajax({
+            url: this.baseUrl + "plugin/"+this.pluginId+"/runDatabaseMaintenance",
+            type: "PUT"
+        }).done(function( data ){
+            responseHandler(data)
+        }).fail(function(jqXHR){
+            new PNotify({
+                title: "Database maintenance",
+                text: jqXHR.responseText,
+                type: "warning",
+                hide: true
+            });
+        });
+    }
+
     // remove PrintJob-Item
     this.callStorePrintJob = function (databaseId, printJobItem, responseHandler){
         jsonPayload = ko.toJSON(printJobItem)
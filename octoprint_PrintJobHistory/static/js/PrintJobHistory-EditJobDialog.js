@@ -212,29 +212,8 @@ function PrintJobHistoryEditDialog(){
         this.currentUser = currentUser;
     }
 
-    /////////////////////////////////////////////////////////////////////////////////////////////////// SHOW DIALOG
-    this.showDialog = function(printJobItemForEdit, closeDialogHandler, fullEditMode){
-
-        if (fullEditMode != null){
-            self.fullEditMode(fullEditMode);
-        } else {
-            self.fullEditMode(false);
-        }
-        self.printJobItemForEdit = printJobItemForEdit;
-        self.closeDialogHandler = closeDialogHandler;
-
-        self.shouldPrintJobTableReload = false;
-//        TODO Wieso this statt self????
-        _setSnapshotImageSource(self.apiClient.getSnapshotUrl(printJobItemForEdit.snapshotFilename()));
-        self.captureButtonText.text(reCaptureText);
-
-//        reset message
-        self.snapshotSuccessMessageSpan.hide();
-        self.snapshotErrorMessageSpan.hide();
-        self.imageDisplayMode(IMAGEDISPLAYMODE_SNAPSHOTIMAGE);
-
-        // assign content to the Note-Section
-        var noteContent = null;
+    // assign content to the Note-Section and the slicer settings/technical log buttons
+    self._assignTexts = function(printJobItemForEdit){
         if (printJobItemForEdit.noteDeltaFormat() == null){
             // Fallback is text (if present), not Html
             if (printJobItemForEdit.noteText() != null){
@@ -260,6 +239,47 @@ function PrintJobHistoryEditDialog(){
         } else {
             self.isTechnicalLogPresent(false);
         }
+    }
+
+    /////////////////////////////////////////////////////////////////////////////////////////////////// SHOW DIALOG
+    this.showDialog = function(printJobItemForEdit, closeDialogHandler, fullEditMode){
+
+        if (fullEditMode != null){
+            self.fullEditMode(fullEditMode);
+        } else {
+            self.fullEditMode(false);
+        }
+        self.printJobItemForEdit = printJobItemForEdit;
+        self.closeDialogHandler = closeDialogHandler;
+
+        self.shouldPrintJobTableReload = false;
+//        TODO Wieso this statt self????
+        _setSnapshotImageSource(self.apiClient.getSnapshotUrl(printJobItemForEdit.snapshotFilename()));
+        self.captureButtonText.text(reCaptureText);
+
+//        reset message
+        self.snapshotSuccessMessageSpan.hide();
+        self.snapshotErrorMessageSpan.hide();
+        self.imageDisplayMode(IMAGEDISPLAYMODE_SNAPSHOTIMAGE);
+
+        // the texts are not part of the table items, load them for existing jobs
+        if (printJobItemForEdit.databaseId() != null){
+            self.noteEditor.setContents(null, 'api');
+            self.isSlicerSettingsPresent(false);
+            self.isTechnicalLogPresent(false);
+            self.apiClient.callLoadPrintJobTexts(printJobItemForEdit.databaseId(), function(responseData){
+                // dialog could be opened for an other job in the meantime
+                if (self.printJobItemForEdit != printJobItemForEdit){
+                    return;
+                }
+                printJobItemForEdit.noteDeltaFormat(responseData.noteDeltaFormat);
+                printJobItemForEdit.slicerSettingsAsText(responseData.slicerSettingsAsText);
+                printJobItemForEdit.technicalLog(responseData.technicalLog);
+                self._assignTexts(printJobItemForEdit);
+            });
+        } else {
+            self._assignTexts(printJobItemForEdit);
+        }
         // some magic, if in edit mode
 
 
@@ -36,11 +36,14 @@ $(function() {
         self = this;
         // Init Item
 		this.databaseId = ko.observable();
+		this.printerName = ko.observable();
+		this.isFarmPrintJob = ko.observable(false);
 		this.userName = ko.observable();
 		this.fileName = ko.observable();
 		this.filePathName = ko.observable();
 		this.fileSize = ko.observable();
 		this.fileSizeFormatted = ko.observable();
+		this.fileStatisticText = ko.observable();
 
         var printStartDateTimeViewModel = global.componentFactory.createDateTimePicker("printStartDateTime-picker");
 		this.printStartDateTimeFormatted = printStartDateTimeViewModel.currentDateTime;
@@ -126,11 +129,24 @@ $(function() {
         var updateData = data || {}
 
         this.databaseId(updateData.databaseId);
+        this.printerName(updateData.printerName);
+        this.isFarmPrintJob(updateData.isFarmPrintJob == true);
         this.userName(updateData.userName);
         this.fileName(updateData.fileName);
         this.filePathName(updateData.filePathName);
         this.fileSize(updateData.fileSize)
         this.fileSizeFormatted(updateData.fileSizeFormatted)
+        // success rate and average duration of all jobs of the file (file rollup)
+        var fileStatistic = updateData.fileStatistic;
+        if (fileStatistic != null){
+            var fileStatisticText = fileStatistic.successRate + "% of " + fileStatistic.jobCount;
+            if (fileStatistic.averageDurationFormatted){
+                fileStatisticText = fileStatisticText + ", avg. " + fileStatistic.averageDurationFormatted;
+            }
+            this.fileStatisticText(fileStatisticText);
+        } else {
+            this.fileStatisticText("");
+        }
         this.printStartDateTime(updateData.printStartDateTime);
         this.printEndDateTime(updateData.printEndDateTime);
         this.printStartDateTimeFormatted(updateData.printStartDateTimeFormatted);
@@ -239,6 +255,7 @@ $(function() {
         this.file = ko.observable(true);
         this.fileName = ko.observable(true);
         this.fileSize = ko.observable(true);
+        this.fileStatistic = ko.observable(false);
         this.tempBed = ko.observable(true);
         this.tempTool = ko.observable(true);
         this.height = ko.observable(true);
@@ -366,6 +383,7 @@ $(function() {
         self.accessViewModel = parameters[2];
 
         self.pluginSettings = null;
+        self.isFarmAvailable = ko.observable(false);
 
         self.apiClient = new PrintJobHistoryAPIClient(PLUGIN_ID, BASEURL);
         self.componentFactory = new PrintJobComponentFactory(PLUGIN_ID);
@@ -446,12 +464,44 @@ $(function() {
             }
         };
 
+        // one notification, updated with each progress message of the scheme migration
+        self.databaseMigrationNotify = null;
+        self.showDatabaseMigrationStatus = function(migrationStatus){
+            var title = "PJH: Database migration";
+            var text = "Upgrade database scheme " + migrationStatus.schemeVersion + " -> " + migrationStatus.targetSchemeVersion;
+            var notifyOptions = {
+                title: title,
+                type: "info",
+                hide: false
+            };
+            if ("finished" == migrationStatus.status){
+                notifyOptions.text = "Database scheme upgraded to " + migrationStatus.targetSchemeVersion;
+                notifyOptions.type = "success";
+                notifyOptions.hide = true;
+                self.printJobHistoryTableHelper.reloadItems();
+            } else if ("failed" == migrationStatus.status){
+                notifyOptions.text = "Database upgrade failed, see octoprint.log: " + migrationStatus.message;
+                notifyOptions.type = "error";
+            } else {
+                notifyOptions.text = text;
+                if (migrationStatus.tableName != null){
+                    notifyOptions.text += "<br/>" + migrationStatus.tableName + ": " + migrationStatus.progress + "%";
+                }
+            }
+            if (self.databaseMigrationNotify == null || self.databaseMigrationNotify.state == "closed"){
+                self.databaseMigrationNotify = new PNotify(notifyOptions);
+            } else {
+                self.databaseMigrationNotify.update(notifyOptions);
+            }
+        };
+
         ///////////////////////////////////////////////////// END: HELPER
 
         ///////////////////////////////////////////////////// START: SETTINGS
         self.busyIndicatorActive = ko.observable(false);
 
         self.downloadDatabaseUrl = ko.observable();
+        self.downloadCompressedDatabaseUrl = ko.observable();
         self.cameraSnapShotURLAvailable = ko.observable(false);
 
         isSnapshotUrlPresent = function(snapshotUrl){
@@ -498,6 +548,17 @@ $(function() {
             }
         };
 
+        self.databaseMaintenanceInProgress = ko.observable(false);
+        self.runDatabaseMaintenanceAction = function() {
+            self.databaseMaintenanceInProgress(true);
+            self.apiClient.callRunDatabaseMaintenance(function(responseData) {
+                self.databaseMaintenanceInProgress(false);
+                if (responseData.success == true){
+                    self.pluginSettings.databaseMaintenanceResult(responseData.databaseMaintenanceResult);
+                }
+            });
+        };
+
         self.csvImportUploadButton = $("#settings-pjh-importcsv-upload");
         self.csvImportUploadData = undefined;
         self.csvImportUploadButton.fileupload({
@@ -681,6 +742,7 @@ $(function() {
         self.onBeforeBinding = function() {
             // assign current pluginSettings
             self.pluginSettings = self.settingsViewModel.settings.plugins[PLUGIN_ID];
+            self.isFarmAvailable(self.pluginSettings.farmDatabases != null && self.pluginSettings.farmDatabases().length > 0);
             self.printJobEditDialog.init(self.apiClient, self.settingsViewModel.settings.webcam);
             self.pluginCheckDialog.init(self.apiClient, self.pluginSettings);
             self.messageConfirmDialog.init(self.apiClient, self.pluginSettings);
@@ -711,6 +773,7 @@ $(function() {
             // debugger
             // all inits were done
             self.downloadDatabaseUrl(self.apiClient.getDownloadDatabaseUrl());
+            self.downloadCompressedDatabaseUrl(self.apiClient.getDownloadDatabaseUrl("gzip"));
 
             // to bring up dialogs the binding must be already done
             if (self.printJobToShowAfterStartup != null){
@@ -814,6 +877,11 @@ $(function() {
                 return;
             }
 
+            if ("databaseMigrationStatus" == data.action){
+                self.showDatabaseMigrationStatus(data);
+                return;
+            }
+
             if ("showPrintJobDialogAfterClientConnection" == data.action){
                 if (data.printJobItem != null){
                     self.printJobToShowAfterStartup = data.printJobItem;
@@ -878,6 +946,10 @@ $(function() {
 
         self.showPrintJobDetailsDialogAction = function(selectedPrintJobItem, forceCloseDialog) {
 
+            if (selectedPrintJobItem.isFarmPrintJob()){
+                // job of another printer, the databaseId belongs to its database
+                return;
+            }
             if (forceCloseDialog == null){
                 forceCloseDialog = false;
             }
@@ -909,7 +981,7 @@ $(function() {
             assignVisibility = function(attributeName){
                 var storageKey = "pjh.table.visible." + attributeName;
                 if (localStorage[storageKey] == null){
-                    localStorage[storageKey] = true
+                    localStorage[storageKey] = self.tableAttributeVisibility[attributeName]()
                 } else {
                     self.tableAttributeVisibility[attributeName]( "true" == localStorage[storageKey]);
                 }
@@ -927,6 +999,7 @@ $(function() {
             assignVisibility("file");
             assignVisibility("fileName");
             assignVisibility("fileSize");
+            assignVisibility("fileStatistic");
             assignVisibility("tempBed");
             assignVisibility("tempTool");
             assignVisibility("height");
@@ -960,7 +1033,7 @@ $(function() {
         }
 
 
-        loadJobFunction = function(tableQuery, observableTableModel, observableTotalItemCount, observableCurrentItemCount){
+        loadJobFunction = function(tableQuery, observableTableModel, observableTotalItemCount, observableCurrentItemCount, cursorHandler){
             // api-call
             self.apiClient.callLoadPrintJobsByQuery(tableQuery, function(responseData){
                 // handle response
@@ -969,6 +1042,7 @@ $(function() {
                 var dataRows = ko.utils.arrayMap(allPrintJobs, function (data) {
                     return new PrintJobItem(data);
                 });
+                cursorHandler(responseData["nextCursor"], responseData["previousCursor"]);
                 observableTotalItemCount(totalItemCount);
                 observableCurrentItemCount(dataRows.length);
                 observableTableModel(dataRows);
@@ -1051,6 +1125,10 @@ $(function() {
         // - export csv data
         self.exportUrl = function(exportType) {
             if (self.printJobHistoryTableHelper.items().length > 0) {
+                if (self.printJobHistoryTableHelper.includeFarm()){
+                    // all printers, filtered like the table
+                    return self.apiClient.getFarmExportUrl(exportType, self.printJobHistoryTableHelper.getTableQuery());
+                }
                 var defaultURL =  self.apiClient.getExportUrl(exportType)
                 return defaultURL;
             } else {
@@ -1146,6 +1224,14 @@ $(function() {
             self.printJobHistoryTableHelper.reloadItems();
         };
 
+        self.clearSlicerSettingsFilter = function () {
+            self.printJobHistoryTableHelper.slicerSettingsFilter("");
+        };
+
+        self.printJobHistoryTableHelper.slicerSettingsFilter.subscribe(function(newValue){
+            self.printJobHistoryTableHelper.reloadItems();
+        });
+
         self.printJobHistoryTableHelper.searchQuery.subscribe(function(newValue){
                 self.printJobHistoryTableHelper.reloadItems();
                     // if (newValue != null && newValue.length > 2){
@@ -30,9 +30,20 @@
     self.queryStartDate = ko.observable(null);
     self.queryEndDate = ko.observable(null);
     self.searchQuery = ko.observable("")
+    // parsed slicer settings, e.g. "layer_height = 0.2 AND infill_sparse_density > 30%"
+    self.slicerSettingsFilter = ko.observable("")
+    // also the old jobs of the archive file
+    self.includeArchive = ko.observable(false);
+    // also the jobs of the other printers (farm databases), read only
+    self.includeFarm = ko.observable(false);
 
     self.isInitialLoadDone = false;
 
+    // cursor (keyset) paging, next/previous page is loaded with constant costs from the server
+    self.nextCursor = null;
+    self.previousCursor = null;
+    self.pendingCursorDirection = null;
+
     self.selectAll = function(checkedValue){
         if (checkedValue == false){
             self.selectedTableItems.removeAll();
@@ -55,7 +66,22 @@
     // ############################################################################################### private functions
     self._loadItems = function(){
         var tableQuery = self.getTableQuery();
-        self.loadItemsFunction( tableQuery, self.items, self.totalItemCount, self.currentItemCount );
+        // use the cursor of the current page, if we just move one page forward/backward
+        tableQuery["pagingMode"] = "cursor";
+        if (self.pendingCursorDirection == "next" && self.nextCursor != null){
+            tableQuery["cursor"] = self.nextCursor;
+            tableQuery["cursorDirection"] = "next";
+        } else if (self.pendingCursorDirection == "previous" && self.previousCursor != null){
+            tableQuery["cursor"] = self.previousCursor;
+            tableQuery["cursorDirection"] = "previous";
+        }
+        self.pendingCursorDirection = null;
+        self.loadItemsFunction( tableQuery, self.items, self.totalItemCount, self.currentItemCount, self._updateCursors );
+    }
+
+    self._updateCursors = function(nextCursor, previousCursor){
+        self.nextCursor = nextCursor === undefined ? null : nextCursor;
+        self.previousCursor = previousCursor === undefined ? null : previousCursor;
     }
 
     self.getTableQuery = function(){
@@ -74,6 +100,9 @@
             "startDate": self.queryStartDate() == null ? "" : self.queryStartDate(),
             "endDate": self.queryEndDate() == null ? "" : self.queryEndDate(),
             "searchQuery": self.searchQuery() == null ? "" : self.searchQuery(),
+            "slicerSettingsFilter": self.slicerSettingsFilter() == null ? "" : self.slicerSettingsFilter(),
+            "includeArchive": self.includeArchive() ? "true" : "false",
+            "includeFarm": self.includeFarm() ? "true" : "false",
         };
         return tableQuery;
     }
@@ -155,22 +184,41 @@
         return self.selectedFilterName() == filterName;
     };
 
+    self.toggleIncludeArchive = function() {
+        self.includeArchive(!self.includeArchive());
+        self.currentPage(0);
+        self._loadItems();
+    };
+
+    self.toggleIncludeFarm = function() {
+        self.includeFarm(!self.includeFarm());
+        self.currentPage(0);
+        self._loadItems();
+    };
+
 
 
     // ############################################## PAGING
     self.changePage = function(newPage) {
         if (newPage < 0 || newPage > self.lastPage())
             return;
+        if (newPage == self.currentPage() + 1){
+            self.pendingCursorDirection = "next";
+        } else if (newPage == self.currentPage() - 1){
+            self.pendingCursorDirection = "previous";
+        }
         self.currentPage(newPage);
     };
 
     self.prevPage = function() {
         if (self.currentPage() > 0) {
+            self.pendingCursorDirection = "previous";
             self.currentPage(self.currentPage() - 1);
         }
     };
     self.nextPage = function() {
         if (self.currentPage() < self.lastPage()) {
+            self.pendingCursorDirection = "next";
             self.currentPage(self.currentPage() + 1);
         }
     };
@@ -0,0 +1,146 @@
+import datetime
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+import unittest
+
+from octoprint_PrintJobHistory import DatabaseManager
+from octoprint_PrintJobHistory.DatabaseManager import CURRENT_DATABASE_SCHEME_VERSION
+from octoprint_PrintJobHistory.DatabaseMigrator import DatabaseMigrator
+from octoprint_PrintJobHistory.models.CostModel import CostModel
+from octoprint_PrintJobHistory.models.FilamentModel import FilamentModel
+from octoprint_PrintJobHistory.models.PrintJobModel import PrintJobModel
+from octoprint_PrintJobHistory.models.TemperatureModel import TemperatureModel
+
+# Not part of the unit-tests (file without test_ prefix), run manually:
+#   PJH_BENCHMARK_JOBS=50000 python -m unittest octoprint_PrintJobHistory.test.benchmark_DatabaseManager
+BENCHMARK_JOBS = int(os.environ.get("PJH_BENCHMARK_JOBS", "5000"))
+BENCHMARK_MIGRATION_JOBS = int(os.environ.get("PJH_BENCHMARK_MIGRATION_JOBS", "100000"))
+
+# database scheme of the first plugin release
+SCHEME_V1_SQL = """
+	CREATE TABLE "pjh_pluginmetadatamodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY, "created" DATETIME NOT NULL, "key" VARCHAR(255) NOT NULL, "value" VARCHAR(255) NOT NULL);
+	CREATE TABLE "pjh_printjobmodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY, "created" DATETIME NOT NULL, "userName" VARCHAR(255), "fileName" VARCHAR(255),
+		"filePathName" VARCHAR(255), "fileSize" INTEGER, "printStartDateTime" DATETIME, "printEndDateTime" DATETIME, "duration" INTEGER, "printStatusResult" VARCHAR(255),
+		"noteText" VARCHAR(255), "noteDeltaFormat" VARCHAR(255), "noteHtml" VARCHAR(255), "printedLayers" VARCHAR(255), "printedHeight" VARCHAR(255));
+	CREATE TABLE "pjh_filamentmodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY, "created" DATETIME NOT NULL, "printJob_id" INTEGER NOT NULL, "profileVendor" VARCHAR(255),
+		"diameter" REAL, "density" REAL, "material" VARCHAR(255), "spoolName" VARCHAR(255), "spoolCost" VARCHAR(255), "spoolCostUnit" VARCHAR(255), "spoolWeight" REAL,
+		"usedLength" REAL, "calculatedLength" REAL, "usedWeight" REAL, "usedCost" REAL,
+		FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE);
+	CREATE TABLE "pjh_temperaturemodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY, "created" DATETIME NOT NULL, "printJob_id" INTEGER NOT NULL, "sensorName" VARCHAR(255) NOT NULL,
+		"sensorValue" VARCHAR(255) NOT NULL, FOREIGN KEY ("printJob_id") REFERENCES "pjh_printjobmodel" ("databaseId") ON DELETE CASCADE);
+	INSERT INTO "pjh_pluginmetadatamodel" (created, key, value) VALUES ('2020-08-01 10:00:00', 'databaseSchemeVersion', '1');
+"""
+
+
+class BenchmarkDatabaseManager(unittest.TestCase):
+
+	def setUp(self):
+		self.databaselocation = tempfile.mkdtemp()
+		self.databaseManager = DatabaseManager(logging.getLogger("benchmarkLogger"), False)
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+
+	def tearDown(self):
+		self.databaseManager._database.close()
+		shutil.rmtree(self.databaselocation, ignore_errors=True)
+
+	def _clientOutput(self, message1, message2):
+		print(message1)
+		print(message2)
+
+	# like a line of the CSV import: job, total+tool filament, two temperatures and costs
+	def _buildPrintJobs(self, jobCount):
+		allPrintJobs = []
+		for index in range(jobCount):
+			printJob = PrintJobModel()
+			printJob.fileName = "Benchmark" + str(index) + ".gcode"
+			printJob.printStartDateTime = datetime.datetime(2018, 1, 1) + datetime.timedelta(hours=index)
+			printJob.printEndDateTime = printJob.printStartDateTime + datetime.timedelta(minutes=50)
+			printJob.duration = 3000
+			printJob.printStatusResult = "success" if index % 10 else "failed"
+			for toolId in ["total", "tool0"]:
+				filamentModel = FilamentModel()
+				filamentModel.toolId = toolId
+				filamentModel.material = "PLA"
+				filamentModel.usedLength = 1000.0 + index
+				printJob.addFilamentModel(filamentModel)
+			for sensorName, sensorValue in [("bed", 60.0), ("tool0", 215.0)]:
+				temperatureModel = TemperatureModel()
+				temperatureModel.sensorName = sensorName
+				temperatureModel.sensorValue = sensorValue
+				printJob.addTemperatureModel(temperatureModel)
+			costModel = CostModel()
+			costModel.totalCosts = 1.23
+			printJob.setCosts(costModel)
+			allPrintJobs.append(printJob)
+		return allPrintJobs
+
+	def _printResult(self, name, jobCount, duration):
+		print("{:<40} {:>8} jobs {:>8.2f}s {:>10.0f} jobs/s".format(name, jobCount, duration, jobCount / max(duration, 0.001)))
+
+	def test_csvImportInsert(self):
+		# - current path, one transaction per job
+		allPrintJobs = self._buildPrintJobs(BENCHMARK_JOBS)
+		startTime = time.time()
+		for printJob in allPrintJobs:
+			self.databaseManager.insertPrintJob(printJob)
+		self._printResult("insertPrintJob (per row)", BENCHMARK_JOBS, time.time() - startTime)
+		self.assertEqual(PrintJobModel.select().count(), BENCHMARK_JOBS)
+
+		# - bulk path
+		for chunkSize in [100, 500, 2000]:
+			self.databaseManager.reCreateDatabase()
+			allPrintJobs = self._buildPrintJobs(BENCHMARK_JOBS)
+			startTime = time.time()
+			self.databaseManager.insertPrintJobs(allPrintJobs, chunkSize)
+			self._printResult("insertPrintJobs (chunkSize " + str(chunkSize) + ")", BENCHMARK_JOBS, time.time() - startTime)
+			self.assertEqual(PrintJobModel.select().count(), BENCHMARK_JOBS)
+
+	def _createSchemeV1Database(self, jobCount):
+		databaseFileLocation = os.path.join(self.databaselocation, "printJobHistory.db")
+		if (os.path.exists(databaseFileLocation)):
+			os.remove(databaseFileLocation)
+		connection = sqlite3.connect(databaseFileLocation)
+		connection.executescript(SCHEME_V1_SQL)
+		startDateTime = datetime.datetime(2018, 1, 1)
+		connection.executemany("INSERT INTO pjh_printjobmodel VALUES (?, ?, 'Olli', ?, ?, 123456, ?, ?, 3000, ?, 'Stringing', '{\"ops\": []}', '<p>Stringing</p>', '45 / 45', '0.4 / 23.8')",
+							   [(index, str(startDateTime), "Benchmark" + str(index) + ".gcode", "/Benchmark" + str(index) + ".gcode",
+								 str(startDateTime + datetime.timedelta(hours=index, microseconds=123456)), str(startDateTime + datetime.timedelta(hours=index, minutes=50)),
+								 "success" if index % 10 else "failed") for index in range(1, jobCount + 1)])
+		connection.executemany("INSERT INTO pjh_filamentmodel (created, printJob_id, profileVendor, diameter, density, material, spoolName, spoolCost, spoolWeight, usedLength, usedWeight, usedCost) "
+							   "VALUES (?, ?, 'Ollis-Factory', 1.75, 1.24, 'PLA', 'My best spool', '20', 1000, 1345.0, 4.0, 0.08)",
+							   [(str(startDateTime), index) for index in range(1, jobCount + 1)])
+		connection.executemany("INSERT INTO pjh_temperaturemodel (created, printJob_id, sensorName, sensorValue) VALUES (?, ?, ?, ?)",
+							   [(str(startDateTime), index, sensorName, sensorValue) for index in range(1, jobCount + 1) for sensorName, sensorValue in [("bed", "60"), ("tool0", "215")]])
+		connection.commit()
+		connection.close()
+		return databaseFileLocation
+
+	def test_migrateFromSchemeV1(self):
+		self.databaseManager._database.close()
+		# - one chunk for the whole table is the former single transaction per step
+		for chunkSize in [BENCHMARK_MIGRATION_JOBS, 5000, 1000]:
+			databaseFileLocation = self._createSchemeV1Database(BENCHMARK_MIGRATION_JOBS)
+			allProgressTimes = [time.time()]
+			databaseMigrator = DatabaseMigrator(logging.getLogger("benchmarkLogger"), databaseFileLocation, chunkSize=chunkSize,
+												progressCallback=lambda migrationStatus: allProgressTimes.append(time.time()))
+			startTime = time.time()
+			databaseMigrator.migrate(1, self.databaseManager._buildMigrationSteps(1, CURRENT_DATABASE_SCHEME_VERSION))
+			duration = time.time() - startTime
+			# longest time between two commits, other writers wait that long for the lock
+			longestTransaction = max([allProgressTimes[index] - allProgressTimes[index - 1] for index in range(1, len(allProgressTimes))])
+			self._printResult("migrate V1 -> V" + str(CURRENT_DATABASE_SCHEME_VERSION) + " (chunkSize " + str(chunkSize) + ")", BENCHMARK_MIGRATION_JOBS, duration)
+			print("{:<40} {:>8.3f}s".format("  longest transaction", longestTransaction))
+
+			connection = sqlite3.connect(databaseFileLocation)
+			self.assertEqual(connection.execute("SELECT value FROM pjh_pluginmetadatamodel WHERE key='databaseSchemeVersion'").fetchone()[0], str(CURRENT_DATABASE_SCHEME_VERSION))
+			self.assertEqual(connection.execute("SELECT COUNT(*) FROM pjh_printjobmodel").fetchone()[0], BENCHMARK_MIGRATION_JOBS)
+			self.assertEqual(connection.execute("SELECT SUM(jobCount) FROM pjh_dailyrollupmodel").fetchone()[0], BENCHMARK_MIGRATION_JOBS)
+			connection.close()
+
+
+if __name__ == '__main__':
+	unittest.main()
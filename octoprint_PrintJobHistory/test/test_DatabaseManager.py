@@ -1,16 +1,37 @@
+import base64
+import datetime
+import os
 import pprint
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 
 import peewee
+from peewee import fn
 
 from octoprint_PrintJobHistory import DatabaseManager, CostModel
+from octoprint_PrintJobHistory.DatabaseMigrator import DatabaseMigrator
+from octoprint_PrintJobHistory.DatabaseWriter import DatabaseWriter
+from octoprint_PrintJobHistory.DatabaseManager import CURRENT_DATABASE_SCHEME_VERSION, DatabaseNotWritableError, FARM_ATTACH_BATCH_SIZE, SEARCH_INDEX_TABLE, SEARCH_INDEX_CONTENT_VIEW, SEARCH_INDEX_TRIGGERS
 from octoprint_PrintJobHistory.api import TransformPrintJob2JSON, TransformSlicerSettings2JSON
-from octoprint_PrintJobHistory.common import StringUtils
+from octoprint_PrintJobHistory.common import StringUtils, TextCompression
 from octoprint_PrintJobHistory.common import CSVExportImporter
 import logging
 
+from octoprint_PrintJobHistory.models.DailyRollupModel import DailyRollupModel
+from octoprint_PrintJobHistory.models.FileRollupModel import FileRollupModel
+from octoprint_PrintJobHistory.models.PluginMetaDataModel import PluginMetaDataModel
 from octoprint_PrintJobHistory.models.PrintJobModel import PrintJobModel
+from octoprint_PrintJobHistory.models.PrintJobTextModel import PrintJobTextModel
+from octoprint_PrintJobHistory.models.SlicerSettingKeyModel import SlicerSettingKeyModel
+from octoprint_PrintJobHistory.models.SlicerSettingValueModel import SlicerSettingValueModel
+from octoprint_PrintJobHistory.models.SlicerSettingsBlobModel import SlicerSettingsBlobModel
 from octoprint_PrintJobHistory.models.FilamentModel import FilamentModel
+from octoprint_PrintJobHistory.models.TemperatureModel import TemperatureModel
 from octoprint_PrintJobHistory.services.SlicerSettingsService import SlicerSettingsService
 
 
@@ -85,7 +106,7 @@ class TestDatabase(unittest.TestCase):
 
 	def _test_loadSelected(self):
 		selectedDatabaseIds = "17,3,21,23,20"
-		allJobsModels = self.databaseManager.loadSelectedPrintJobs(selectedDatabaseIds)
+		allJobsModels = self.databaseManager.loadSelectedPrintJobs(selectedDatabaseIds, withTexts=True)
 		print(allJobsModels)
 		allJobsAsList = TransformPrintJob2JSON.transformAllPrintJobModels(allJobsModels)
 
@@ -107,7 +128,7 @@ class TestDatabase(unittest.TestCase):
 			settingsForCompare = SlicerSettingsService.SlicerSettingsJob()
 			settingsForCompare.databaseId = job.databaseId
 			settingsForCompare.fileName = job.fileName
-			settingsForCompare.slicerSettingsAsText = job.slicerSettingsAsText
+			settingsForCompare.slicerSettingsAsText = job.getTexts().slicerSettingsAsText if job.getTexts() != None else None
 
 			# print(settingsForCompare.slicerSettingsAsText)
 
@@ -212,6 +233,1464 @@ class TestDatabase(unittest.TestCase):
 
 		print("ende")
 
+# Tests against a fresh database in a temp-folder
+class TestDatabaseWithTempFolder(unittest.TestCase):
+
+	def setUp(self):
+		self.databaselocation = tempfile.mkdtemp()
+		testLogger = logging.getLogger("testLogger")
+		self.databaseManager = DatabaseManager(testLogger, False)
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+
+	def tearDown(self):
+		self.databaseManager._database.close()
+		shutil.rmtree(self.databaselocation, ignore_errors=True)
+
+	def _clientOutput(self, message1, message2):
+		print(message1)
+		print(message2)
+
+	def _createPrintJob(self, *args, **kwargs):
+		printJob = self._buildPrintJob(*args, **kwargs)
+		self.databaseManager.insertPrintJob(printJob)
+		return printJob
+
+	def _buildPrintJob(self, fileName="OllisBenchy.gcode", printStatusResult="success", printStartDateTime=None, duration=3600, material="PLA", spoolName="My best spool", usedLength=1345.0, usedWeight=4.2, bedTemperature=60.0, toolTemperature=215.0):
+		if (printStartDateTime == None):
+			printStartDateTime = datetime.datetime(2021, 3, 12, 14, 45)
+		printJob = PrintJobModel()
+		printJob.userName = "Olli"
+		printJob.fileOrigin = "local"
+		printJob.fileName = fileName
+		printJob.filePathName = fileName
+		printJob.fileSize = 1234
+		printJob.printStartDateTime = printStartDateTime
+		printJob.printEndDateTime = printStartDateTime + datetime.timedelta(seconds=duration)
+		printJob.duration = duration
+		printJob.printStatusResult = printStatusResult
+
+		for toolId in ["total", "tool0"]:
+			filamentModel = FilamentModel()
+			filamentModel.toolId = toolId
+			filamentModel.material = material
+			filamentModel.spoolName = spoolName
+			filamentModel.usedLength = usedLength
+			filamentModel.usedWeight = usedWeight
+			printJob.addFilamentModel(filamentModel)
+
+		for sensorName, sensorValue in [("bed", bedTemperature), ("tool0", toolTemperature)]:
+			temperatureModel = TemperatureModel()
+			temperatureModel.sensorName = sensorName
+			temperatureModel.sensorValue = sensorValue
+			printJob.addTemperatureModel(temperatureModel)
+
+		costModel = CostModel()
+		costModel.filamentCost = 1.23
+		costModel.totalCosts = 1.23
+		printJob.setCosts(costModel)
+		return printJob
+
+	def _createTableQuery(self, **kwargs):
+		tableQuery = {
+			"from": 0,
+			"to": 25,
+			"sortColumn": "printStartDateTime",
+			"sortOrder": "desc",
+			"filterName": "all",
+			"startDate": "",
+			"endDate": "",
+			"searchQuery": "",
+		}
+		tableQuery.update(kwargs)
+		return tableQuery
+
+	def _countQueries(self, function):
+		database = self.databaseManager._database
+		with mock.patch.object(database, "execute_sql", wraps=database.execute_sql) as executeSql:
+			result = function()
+			return (result, executeSql.call_count)
+
+	def test_loadPrintJobsByQueryPrefetchesRelations(self):
+		for index in range(30):
+			self._createPrintJob("benchy" + str(index) + ".gcode", printStartDateTime=datetime.datetime(2021, 1, 1) + datetime.timedelta(hours=index))
+
+		def loadAndTransformPage():
+			allJobModels = self.databaseManager.loadPrintJobsByQuery(self._createTableQuery())
+			for job in allJobModels:
+				self.assertEqual(len(job.getFilamentModels()), 2)
+				self.assertEqual(len(job.getTemperatureModels()), 2)
+				self.assertIsNotNone(job.getCosts())
+			return allJobModels
+
+		allJobModels, queryCount = self._countQueries(loadAndTransformPage)
+		self.assertEqual(len(allJobModels), 25)
+		# one query for the jobs, one for each relation-table
+		self.assertEqual(queryCount, 4)
+
+		allJobModels, queryCount = self._countQueries(self.databaseManager.loadAllPrintJobs)
+		self.assertEqual(len(allJobModels), 30)
+		self.assertEqual(queryCount, 4)
+
+	# the python loop of the previous statistic implementation, used as reference for the sql aggregation
+	def _calculateStatisticWithPythonLoop(self, tableQuery):
+		printJobCount = 0
+		duration = 0
+		length = 0.0
+		weight = 0.0
+		fileSize = 0
+		statusDict = dict()
+		materialDict = dict()
+		spoolDict = dict()
+		firstDate = None
+		lastDate = None
+		newTableQuery = tableQuery.copy()
+		newTableQuery["sortColumn"] = "printStartDateTime"
+		newTableQuery["sortOrder"] = "asc"
+		newTableQuery["from"] = 0
+		newTableQuery["to"] = 999999
+		for job in self.databaseManager.loadPrintJobsByQuery(newTableQuery):
+			printJobCount = printJobCount + 1
+			if (firstDate == None):
+				firstDate = job.printStartDateTime
+			if (job.printEndDateTime != None):
+				lastDate = job.printEndDateTime
+			fileSize = fileSize + (job.fileSize if job.fileSize != None else 0)
+			duration = duration + job.duration
+			statusDict[job.printStatusResult] = statusDict.get(job.printStatusResult, 0) + 1
+			for filla in job.getFilamentModels():
+				if filla.toolId == "total":
+					continue
+				if (StringUtils.isEmpty(filla.usedLength) == False):
+					length = length + filla.usedLength
+				if (StringUtils.isEmpty(filla.usedWeight) == False):
+					weight = weight + filla.usedWeight
+				if (StringUtils.isEmpty(filla.spoolName) == False):
+					spoolDict[filla.spoolName] = spoolDict.get(filla.spoolName, 0) + 1
+				if (StringUtils.isEmpty(filla.material) == False):
+					materialDict[filla.material] = materialDict.get(filla.material, 0) + 1
+
+		lastDateString = ""
+		if (lastDate != None):
+			lastDateString = lastDate.strftime('%d.%m.%Y %H:%M')
+		return {
+			"printJobCount": printJobCount,
+			"query": self.databaseManager._buildQueryString(tableQuery),
+			"fromToDate": firstDate.strftime('%d.%m.%Y %H:%M') + " - " + lastDateString,
+			"duration": StringUtils.secondsToText(duration),
+			"usedLength": self.databaseManager._buildLengthString(length),
+			"usedWeight": self.databaseManager._buildWeightString(weight),
+			"fileSize": StringUtils.get_formatted_size(fileSize),
+			"printStatus": self.databaseManager._buildStatusString(statusDict),
+			"material": self.databaseManager._buildDictlString(materialDict),
+			"spools": self.databaseManager._buildDictlString(spoolDict)
+		}
+
+	def test_calculatePrintJobsStatisticByQueryMatchesPythonLoop(self):
+		allStatus = ["success", "failed", "canceled"]
+		allMaterials = ["PLA", "PETG", "ABS", ""]
+		allSpools = ["Black", "Red", None]
+		for index in range(40):
+			self._createPrintJob("part" + str(index % 7) + ".gcode",
+								 printStatusResult=allStatus[index % 3],
+								 printStartDateTime=datetime.datetime(2021, 1, 1) + datetime.timedelta(days=index),
+								 duration=600 + index * 60,
+								 material=allMaterials[index % 4],
+								 spoolName=allSpools[index % 3],
+								 usedLength=1000.0 + index,
+								 usedWeight=3.0 + index / 10.0)
+
+		allTableQueries = [
+			self._createTableQuery(),
+			self._createTableQuery(filterName="onlySuccess"),
+			self._createTableQuery(filterName="onlyFailed"),
+			self._createTableQuery(startDate="05.01.2021", endDate="20.01.2021"),
+			self._createTableQuery(searchQuery="part3"),
+		]
+		for tableQuery in allTableQueries:
+			self.assertEqual(self.databaseManager.calculatePrintJobsStatisticByQuery(tableQuery),
+							 self._calculateStatisticWithPythonLoop(tableQuery))
+
+	def _explainQueryPlan(self, query):
+		sql, params = query.sql()
+		cursor = self.databaseManager._database.execute_sql("EXPLAIN QUERY PLAN " + sql, params)
+		return " | ".join([str(row[-1]) for row in cursor.fetchall()])
+
+	def test_tableQueriesUseIndexes(self):
+		self._createPrintJob()
+
+		pageQuery = PrintJobModel.select().limit(25)
+		queryPlan = self._explainQueryPlan(self.databaseManager._addTableQueryToSelect(pageQuery, self._createTableQuery()))
+		self.assertIn("USING INDEX printjobmodel_printStartDateTime", queryPlan)
+		self.assertNotIn("TEMP B-TREE", queryPlan)
+
+		queryPlan = self._explainQueryPlan(self.databaseManager._addTableQueryToSelect(pageQuery, self._createTableQuery(sortColumn="fileName", sortOrder="asc")))
+		self.assertIn("USING INDEX printjobmodel_lower_fileName", queryPlan)
+		self.assertNotIn("TEMP B-TREE", queryPlan)
+
+		queryPlan = self._explainQueryPlan(self.databaseManager._addTableQueryToSelect(pageQuery, self._createTableQuery(filterName="onlySuccess")))
+		self.assertIn("USING INDEX printjobmodel_printStatusResult_printStartDateTime (printStatusResult=?)", queryPlan)
+		self.assertNotIn("TEMP B-TREE", queryPlan)
+
+		queryPlan = self._explainQueryPlan(self.databaseManager._addTableQueryToSelect(pageQuery, self._createTableQuery(startDate="01.03.2021", endDate="31.03.2021")))
+		self.assertIn("USING INDEX printjobmodel_printStartDateTime (printStartDateTime>? AND printStartDateTime<?)", queryPlan)
+
+		for relationModel in [FilamentModel, TemperatureModel, CostModel]:
+			relationQuery = relationModel.select().where(relationModel.printJob << [1, 2, 3])
+			self.assertIn("USING INDEX " + relationModel._meta.name + "_printJob_id (printJob_id=?)", self._explainQueryPlan(relationQuery))
+
+	# the current database back in the layout of V11 (texts in the printjob table, no search index)
+	def _downgradeToScheme11(self):
+		database = self.databaseManager._database
+		self._downgradeToScheme17()
+		for columnName in ["noteDeltaFormat", "slicerSettingsAsText", "technicalLog"]:
+			database.execute_sql('ALTER TABLE "pjh_printjobmodel" ADD "' + columnName + '" TEXT')
+			database.execute_sql('UPDATE "pjh_printjobmodel" SET "' + columnName + '" = (SELECT "' + columnName + '" FROM "pjh_printjobtextmodel" WHERE "printJob_id" = "pjh_printjobmodel"."databaseId")')
+		database.execute_sql('DROP TABLE "pjh_printjobtextmodel"')
+		database.execute_sql('DROP TABLE "pjh_dailyrollupmodel"')
+		self._dropSlicerSettingTables()
+		PluginMetaDataModel.update(value=11).where(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION).execute()
+
+	# without the file rollup
+	def _downgradeToScheme18(self):
+		self.databaseManager._database.execute_sql('DROP TABLE "pjh_filerollupmodel"')
+		PluginMetaDataModel.update(value=18).where(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION).execute()
+
+	# slicer settings text back in the text table, without the full-text index (created again by the upgrade)
+	def _downgradeToScheme17(self):
+		database = self.databaseManager._database
+		self._downgradeToScheme18()
+		for triggerName in SEARCH_INDEX_TRIGGERS:
+			database.execute_sql("DROP TRIGGER " + triggerName)
+		database.execute_sql("DROP TABLE " + SEARCH_INDEX_TABLE)
+		database.execute_sql("DROP VIEW " + SEARCH_INDEX_CONTENT_VIEW)
+		database.execute_sql('ALTER TABLE "pjh_printjobtextmodel" ADD "slicerSettingsAsText" TEXT')
+		database.execute_sql('UPDATE "pjh_printjobtextmodel" SET "slicerSettingsAsText" = (SELECT "slicerSettingsAsText" FROM "pjh_slicersettingsblobmodel" WHERE "contentHash" = "pjh_printjobtextmodel"."slicerSettingsHash")')
+		database.execute_sql('DROP INDEX "printjobtextmodel_slicerSettingsHash"')
+		database.execute_sql('ALTER TABLE "pjh_printjobtextmodel" DROP COLUMN "slicerSettingsHash"')
+		database.execute_sql('DROP TABLE "pjh_slicersettingsblobmodel"')
+		PluginMetaDataModel.update(value=17).where(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION).execute()
+
+	# tables of V17
+	def _dropSlicerSettingTables(self):
+		self.databaseManager._database.execute_sql('DROP TABLE "pjh_slicersettingvaluemodel"')
+		self.databaseManager._database.execute_sql('DROP TABLE "pjh_slicersettingkeymodel"')
+
+	def _setTexts(self, printJob, **textValues):
+		textModel = printJob.getTexts()
+		if (textModel == None):
+			textModel = PrintJobTextModel()
+			printJob.setTexts(textModel)
+		for textName, textValue in textValues.items():
+			setattr(textModel, textName, textValue)
+		self.databaseManager.updatePrintJob(printJob)
+
+	def test_upgradeFrom10To11(self):
+		printJob = self._createPrintJob(printStartDateTime=datetime.datetime(2021, 3, 12, 14, 45, 10, 123456))
+		self._downgradeToScheme11()
+		# downgrade to V10
+		for indexName in ["printjobmodel_printStartDateTime", "printjobmodel_printStatusResult_printStartDateTime", "printjobmodel_lower_fileName", "filamentmodel_printJob_id"]:
+			self.databaseManager._database.execute_sql('DROP INDEX "' + indexName + '"')
+		PluginMetaDataModel.update(value=10).where(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION).execute()
+		self.databaseManager._database.close()
+
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+
+		schemeVersion = PluginMetaDataModel.get(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION)
+		self.assertEqual(int(schemeVersion.value), CURRENT_DATABASE_SCHEME_VERSION)
+		allIndexNames = [row[0] for row in self.databaseManager._database.execute_sql("SELECT name FROM sqlite_master WHERE type='index'").fetchall()]
+		for indexName in ["printjobmodel_printStartDateTime", "printjobmodel_printStatusResult_printStartDateTime", "printjobmodel_lower_fileName", "filamentmodel_printJob_id"]:
+			self.assertIn(indexName, allIndexNames)
+		storedStartDateTime = self.databaseManager._database.execute_sql('SELECT printStartDateTime FROM pjh_printjobmodel').fetchone()[0]
+		self.assertEqual(storedStartDateTime, "2021-03-12 14:45:10")
+		self.assertEqual(self.databaseManager.loadPrintJob(printJob.databaseId).printStartDateTime, datetime.datetime(2021, 3, 12, 14, 45, 10))
+
+	def _searchFileNames(self, searchQuery):
+		allPrintJobs = self.databaseManager.loadPrintJobsByQuery(self._createTableQuery(to=100, searchQuery=searchQuery))
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery(searchQuery=searchQuery)), len(allPrintJobs))
+		return sorted([printJob.fileName for printJob in allPrintJobs])
+
+	def test_searchQueryUsesFullTextIndex(self):
+		self.assertEqual(self.databaseManager._searchIndexTokenizer, "trigram")
+		benchy = self._createPrintJob("OllisBenchy.gcode")
+		benchy.noteText = "Stringing at the chimney"
+		self._setTexts(benchy, slicerSettingsAsText="; filament_type = PETG\n; layer_height = 0.28\n")
+		calibrationCube = self._createPrintJob("CalibrationCube.gcode")
+		self._setTexts(calibrationCube, slicerSettingsAsText="; filament_type = PLA\n; layer_height = 0.2\n")
+		self._createPrintJob("Vase.gcode")
+
+		self.assertEqual(self._searchFileNames("benchy"), ["OllisBenchy.gcode"])
+		self.assertEqual(self._searchFileNames("chimney"), ["OllisBenchy.gcode"])
+		self.assertEqual(self._searchFileNames("petg 0.28"), ["OllisBenchy.gcode"])
+		self.assertEqual(self._searchFileNames("layer_height"), ["CalibrationCube.gcode", "OllisBenchy.gcode"])
+		self.assertEqual(self._searchFileNames("petg cube"), [])
+		# short terms and quotes
+		self.assertEqual(self._searchFileNames("ca"), ["CalibrationCube.gcode"])
+		self.assertEqual(self._searchFileNames('"vase'), [])
+
+		searchQuery = self.databaseManager._addTableQueryFilterToSelect(PrintJobModel.select(), self._createTableQuery(searchQuery="chimney"))
+		self.assertIn("VIRTUAL TABLE INDEX", self._explainQueryPlan(searchQuery))
+
+		# index follows updates and deletes
+		benchy.noteText = "Perfect"
+		self.databaseManager.updatePrintJob(benchy)
+		self.assertEqual(self._searchFileNames("chimney"), [])
+		self.assertEqual(self._searchFileNames("perfect"), ["OllisBenchy.gcode"])
+		self._setTexts(benchy, slicerSettingsAsText="; filament_type = PLA\n")
+		self.assertEqual(self._searchFileNames("petg"), [])
+		self.assertEqual(self._searchFileNames("pla"), ["CalibrationCube.gcode", "OllisBenchy.gcode"])
+		self.databaseManager.deletePrintJob(calibrationCube.databaseId)
+		self.assertEqual(self._searchFileNames("filament_type"), ["OllisBenchy.gcode"])
+		self.assertEqual(self.databaseManager._database.execute_sql("INSERT INTO " + SEARCH_INDEX_TABLE + "(" + SEARCH_INDEX_TABLE + ") VALUES ('integrity-check')").rowcount, 1)
+
+	def test_compressedTexts(self):
+		database = self.databaseManager._database
+		slicerSettings = "".join(["; setting_" + str(index) + " = " + str(index * 0.1) + "\n" for index in range(500)]) + "; filament_type = PETG\n"
+		benchy = self._createPrintJob("OllisBenchy.gcode")
+		self._setTexts(benchy, slicerSettingsAsText=slicerSettings, technicalLog="Print started")
+		storedTypes = database.execute_sql("SELECT typeof(b.slicerSettingsAsText), typeof(t.technicalLog) FROM pjh_printjobtextmodel t JOIN pjh_slicersettingsblobmodel b ON b.contentHash = t.slicerSettingsHash").fetchone()
+		# the short log is not compressed
+		self.assertEqual(storedTypes, ("blob", "text"))
+		texts = self.databaseManager.loadPrintJob(benchy.databaseId).getTexts()
+		self.assertEqual(texts.slicerSettingsAsText, slicerSettings)
+		self.assertEqual(texts.technicalLog, "Print started")
+		self.assertEqual(self._searchFileNames("petg"), ["OllisBenchy.gcode"])
+
+		# texts stored before V16, copied as they are by the migration to V18
+		calibrationCube = self._createPrintJob("CalibrationCube.gcode")
+		cubeSlicerSettings = slicerSettings.replace("PETG", "PLA")
+		database.execute_sql("INSERT INTO pjh_slicersettingsblobmodel (created, contentHash, slicerSettingsAsText) VALUES (?, ?, ?)",
+							 (datetime.datetime.now(), TextCompression.contentHash(cubeSlicerSettings), cubeSlicerSettings))
+		database.execute_sql("INSERT INTO pjh_printjobtextmodel (created, printJob_id, slicerSettingsHash, technicalLog) VALUES (?, ?, ?, ?)",
+							 (datetime.datetime.now(), calibrationCube.databaseId, TextCompression.contentHash(cubeSlicerSettings), "Send: G1 X10 Y10\n" * 1000))
+		statisticBefore = self.databaseManager.getTextStorageStatistic()
+		self.assertEqual(statisticBefore["compressedCount"], 1)
+		compressionResult = self.databaseManager.compressPrintJobTexts(batchSize=1)
+		self.assertEqual(compressionResult["rowCount"], 2)
+		self.assertLess(compressionResult["bytesAfter"] * 5, compressionResult["bytesBefore"])
+		self.assertEqual(self.databaseManager.compressPrintJobTexts()["rowCount"], 0)
+		statisticAfter = self.databaseManager.getTextStorageStatistic()
+		self.assertEqual(statisticAfter["compressedCount"], 3)
+		self.assertEqual(statisticAfter["textBytes"], statisticBefore["textBytes"])
+		self.assertGreater(statisticAfter["savedPercent"], 80)
+		self.assertEqual(self.databaseManager.loadPrintJob(calibrationCube.databaseId).getTexts().technicalLog, "Send: G1 X10 Y10\n" * 1000)
+		self.assertEqual(self._searchFileNames("pla"), ["CalibrationCube.gcode"])
+		self.assertEqual(database.execute_sql("INSERT INTO " + SEARCH_INDEX_TABLE + "(" + SEARCH_INDEX_TABLE + ") VALUES ('integrity-check')").rowcount, 1)
+
+	def test_slicerSettingsDeduplication(self):
+		slicerSettings = "".join(["; setting_" + str(index) + " = " + str(index) + "\n" for index in range(300)]) + "; filament_type = PETG\n"
+		benchy = self._createPrintJob("OllisBenchy.gcode")
+		self._setTexts(benchy, slicerSettingsAsText=slicerSettings)
+		# printed again, same gcode
+		benchyAgain = self._createPrintJob("OllisBenchy2.gcode")
+		self._setTexts(benchyAgain, slicerSettingsAsText=slicerSettings)
+		calibrationCube = self._createPrintJob("CalibrationCube.gcode")
+		self._setTexts(calibrationCube, slicerSettingsAsText=slicerSettings.replace("PETG", "PLA"))
+		importJob = self._buildPrintJob("Import.gcode")
+		importJob.setTexts(PrintJobTextModel(slicerSettingsAsText=slicerSettings))
+		self.databaseManager.insertPrintJobs([importJob])
+
+		self.assertEqual(SlicerSettingsBlobModel.select().count(), 2)
+		self.assertEqual(PrintJobTextModel.select().where(PrintJobTextModel.slicerSettingsHash == TextCompression.contentHash(slicerSettings)).count(), 3)
+		self.assertEqual(self.databaseManager.loadPrintJob(importJob.databaseId).getTexts().slicerSettingsAsText, slicerSettings)
+		storageStatistic = self.databaseManager.getTextStorageStatistic()
+		self.assertEqual((storageStatistic["slicerSettingsBlobCount"], storageStatistic["slicerSettingsReferenceCount"]), (2, 4))
+		self.assertEqual(storageStatistic["deduplicatedBytes"], 2 * len(slicerSettings))
+		# - full-text index and the LIKE search
+		self.assertEqual(self._searchFileNames("petg"), ["Import.gcode", "OllisBenchy.gcode", "OllisBenchy2.gcode"])
+		self.databaseManager._searchIndexTokenizer = None
+		self.assertEqual(self._searchFileNames("PLA"), ["CalibrationCube.gcode"])
+		self.databaseManager._searchIndexTokenizer = "trigram"
+
+		# - compare of jobs with the same hash, no value is different
+		slicerSettingsService = SlicerSettingsService(logging.getLogger("testLogger"))
+		allCompareJobs = []
+		for printJob in [benchy, benchyAgain]:
+			compareJob = SlicerSettingsService.SlicerSettingsJob()
+			compareJob.slicerSettingsAsText = slicerSettings
+			compareJob.slicerSettingsHash = TextCompression.contentHash(slicerSettings)
+			allCompareJobs.append(compareJob)
+		compareResult = slicerSettingsService.compareSlicerSettings(allCompareJobs, ";(.*)=(.*)\n")
+		self.assertEqual(len(compareResult.allKeys), 301)
+		self.assertEqual(set([keyValue["isDifferent"] for keyValue in allCompareJobs[1].keyValuesSettings.values()]), set(["no"]))
+
+		# - the blob is removed with the last job
+		self.databaseManager.deletePrintJobs([benchy.databaseId, benchyAgain.databaseId])
+		self.assertEqual(SlicerSettingsBlobModel.select().count(), 2)
+		self.databaseManager.deletePrintJob(importJob.databaseId)
+		self.assertEqual(SlicerSettingsBlobModel.select().count(), 1)
+		self.assertEqual(self._searchFileNames("petg"), [])
+
+	def test_compareParsedAndUnparsedSlicerSettings(self):
+		parsedJob = self._buildPrintJob("Parsed.gcode")
+		parsedJob.setTexts(PrintJobTextModel(slicerSettingsAsText="; filament_type = PETG  \n; layer_height = 0.2\n"))
+		parsedJob.setSlicerSettingsAsDict({"filament_type": "PETG  ", "layer_height": "0.2"})
+		allUnparsedJobs = []
+		for index in range(5):
+			unparsedJob = self._buildPrintJob("Unparsed" + str(index) + ".gcode")
+			unparsedJob.setTexts(PrintJobTextModel(slicerSettingsAsText=";filament_type =  PETG \t\n;layer_height= 0." + str(index) + "\n"))
+			allUnparsedJobs.append(unparsedJob)
+		self.databaseManager.insertPrintJobs([parsedJob] + allUnparsedJobs)
+		SlicerSettingValueModel.delete().where(SlicerSettingValueModel.printJob != parsedJob.databaseId).execute()
+
+		# same as the compare endpoint: the texts of all jobs are loaded together, not one query per job
+		selectedDatabaseIds = ",".join([str(printJob.databaseId) for printJob in [parsedJob] + allUnparsedJobs])
+		def loadCompareJobs():
+			allPrintJobModels = self.databaseManager.loadSelectedPrintJobs(selectedDatabaseIds, withTexts=True)
+			allParsedSlicerSettings = self.databaseManager.loadSlicerSettings([printJob.databaseId for printJob in allPrintJobModels])
+			allCompareJobs = []
+			for printJob in allPrintJobModels:
+				compareJob = SlicerSettingsService.SlicerSettingsJob()
+				compareJob.parsedSettings = allParsedSlicerSettings.get(printJob.databaseId)
+				if (compareJob.parsedSettings == None):
+					compareJob.slicerSettingsAsText = printJob.getTexts().slicerSettingsAsText
+				allCompareJobs.append(compareJob)
+			return allCompareJobs
+		allCompareJobs, queryCount = self._countQueries(loadCompareJobs)
+		self.assertLess(queryCount, 10)
+
+		# - the stored values and the values parsed out of the text differ only by whitespace
+		SlicerSettingsService(logging.getLogger("testLogger")).compareSlicerSettings(allCompareJobs, ";(.*)=(.*)\n")
+		self.assertEqual(allCompareJobs[0].parsedSettings, {"filament_type": "PETG", "layer_height": "0.2"})
+		self.assertEqual([compareJob.keyValuesSettings["filament_type"]["value"] for compareJob in allCompareJobs], ["PETG"] * 6)
+		self.assertEqual([compareJob.keyValuesSettings["filament_type"].get("isDifferent") for compareJob in allCompareJobs[1:]], ["no"] * 5)
+		self.assertEqual([compareJob.keyValuesSettings["layer_height"]["isDifferent"] for compareJob in allCompareJobs[1:]], ["yes", "yes", "no", "yes", "yes"])
+
+	def _filterFileNames(self, slicerSettingsFilter):
+		allPrintJobs = self.databaseManager.loadPrintJobsByQuery(self._createTableQuery(slicerSettingsFilter=slicerSettingsFilter))
+		return sorted([printJob.fileName for printJob in allPrintJobs])
+
+	def test_slicerSettingsFilter(self):
+		benchy = self._buildPrintJob("OllisBenchy.gcode")
+		benchy.setSlicerSettingsAsDict({"layer_height": "0.2", "infill_sparse_density": "30%", "material_type": "PLA"})
+		self.databaseManager.insertPrintJob(benchy)
+		allImportJobs = []
+		for fileName, layerHeight, infill in [("CalibrationCube.gcode", "0.28", "40%"), ("Vase.gcode", "0.2", "0")]:
+			printJob = self._buildPrintJob(fileName)
+			printJob.setSlicerSettingsAsDict({"layer_height": layerHeight, "infill_sparse_density": infill, "material_type": "PETG"})
+			allImportJobs.append(printJob)
+		self.databaseManager.insertPrintJobs(allImportJobs)
+		self.assertEqual(SlicerSettingKeyModel.select().count(), 3)
+		self.assertEqual(sorted(SlicerSettingValueModel.select(SlicerSettingValueModel.valueType, SlicerSettingValueModel.numberValue).where(SlicerSettingValueModel.textValue.endswith("%")).tuples()),
+						 [("int", 30.0), ("int", 40.0)])
+
+		self.assertEqual(self._filterFileNames("layer_height = 0.2"), ["OllisBenchy.gcode", "Vase.gcode"])
+		self.assertEqual(self._filterFileNames("layer_height = 0.2 AND infill_sparse_density > 10%"), ["OllisBenchy.gcode"])
+		self.assertEqual(self._filterFileNames("infill_sparse_density >= 30 and material_type = PETG"), ["CalibrationCube.gcode"])
+		self.assertEqual(self._filterFileNames("material_type != 'PLA'"), ["CalibrationCube.gcode", "Vase.gcode"])
+		self.assertEqual(self._filterFileNames("layer_height = 0.3"), [])
+		self.assertRaises(ValueError, self._filterFileNames, "material_type > PLA")
+		self.assertRaises(ValueError, self._filterFileNames, "layer_height")
+		filterQuery = self.databaseManager._addTableQueryFilterToSelect(PrintJobModel.select(), self._createTableQuery(slicerSettingsFilter="infill_sparse_density > 10"))
+		self.assertIn("slicersettingvaluemodel_settingKey_id_numberValue", self._explainQueryPlan(filterQuery))
+		# compare without parsing the text again
+		self.assertEqual(self.databaseManager.loadSlicerSettings([benchy.databaseId]), {benchy.databaseId: {"layer_height": "0.2", "infill_sparse_density": "30%", "material_type": "PLA"}})
+
+		# jobs of the older releases are parsed out of the stored text
+		oldJob = self._createPrintJob("OldJob.gcode")
+		self._setTexts(oldJob, slicerSettingsAsText="; layer_height = 0.12\n; infill_sparse_density = 15\n")
+		self.assertEqual(self.databaseManager.parseStoredSlicerSettings(";(.*)=(.*)\n"), 1)
+		self.assertEqual(self.databaseManager.parseStoredSlicerSettings(";(.*)=(.*)\n"), 0)
+		self.assertEqual(self._filterFileNames("layer_height < 0.15"), ["OldJob.gcode"])
+		self.databaseManager.deletePrintJob(oldJob.databaseId)
+		self.assertEqual(SlicerSettingValueModel.select().where(SlicerSettingValueModel.printJob == oldJob.databaseId).count(), 0)
+
+	def test_upgradeFrom11To13(self):
+		printJob = self._createPrintJob("OllisBenchy.gcode")
+		printJob.noteText = "Stringing at the chimney"
+		self._setTexts(printJob, noteDeltaFormat='{"ops": []}', slicerSettingsAsText="; filament_type = PETG\n", technicalLog="Print started")
+		self._createPrintJob("CalibrationCube.gcode")
+		self._downgradeToScheme11()
+		self.databaseManager._database.close()
+
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+
+		schemeVersion = PluginMetaDataModel.get(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION)
+		self.assertEqual(int(schemeVersion.value), CURRENT_DATABASE_SCHEME_VERSION)
+		printJobColumns = [column.name for column in self.databaseManager._database.get_columns("pjh_printjobmodel")]
+		self.assertEqual(printJobColumns, [field.column_name for field in PrintJobModel._meta.sorted_fields])
+		self.assertEqual(PrintJobTextModel.select().count(), 1)
+		texts = self.databaseManager.loadPrintJob(printJob.databaseId).getTexts()
+		self.assertEqual(texts.noteDeltaFormat, '{"ops": []}')
+		self.assertEqual(texts.slicerSettingsAsText, "; filament_type = PETG\n")
+		self.assertEqual(texts.technicalLog, "Print started")
+
+		self.assertEqual(self.databaseManager._searchIndexTokenizer, "trigram")
+		self.assertEqual(self._searchFileNames("chimney"), ["OllisBenchy.gcode"])
+		self.assertEqual(self._searchFileNames("petg"), ["OllisBenchy.gcode"])
+		self._createPrintJob("Vase.gcode")
+		self.assertEqual(self._searchFileNames("vase"), ["Vase.gcode"])
+		# relations still point to the rebuild printjob table
+		self.assertEqual(len(self.databaseManager.loadPrintJob(printJob.databaseId).getFilamentModels()), 2)
+		# rollup created from the existing jobs
+		self.assertEqual(DailyRollupModel.get().jobCount, 3)
+
+	def test_upgradeFrom14To15(self):
+		printJob = self._createPrintJob()
+		self._createPrintJob("CalibrationCube.gcode")
+		# downgrade to V14, temperatures as text
+		database = self.databaseManager._database
+		self._downgradeToScheme17()
+		self._dropSlicerSettingTables()
+		database.execute_sql('DROP TABLE "pjh_temperaturemodel"')
+		database.execute_sql('CREATE TABLE "pjh_temperaturemodel" ("databaseId" INTEGER NOT NULL PRIMARY KEY, "created" DATETIME NOT NULL, "printJob_id" INTEGER NOT NULL, "sensorName" VARCHAR(255) NOT NULL, "sensorValue" VARCHAR(255) NOT NULL)')
+		database.execute_sql("INSERT INTO pjh_temperaturemodel (created, printJob_id, sensorName, sensorValue) VALUES "
+							 "('2021-03-12', 1, ' Bed', '60'), ('2021-03-12', 1, 'tool0', '215.5'), ('2021-03-12', 2, 'bed', '-'), ('2021-03-12', 2, 'Tool0', '')")
+		PluginMetaDataModel.update(value=14).where(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION).execute()
+		database.close()
+
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+
+		schemeVersion = PluginMetaDataModel.get(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION)
+		self.assertEqual(int(schemeVersion.value), CURRENT_DATABASE_SCHEME_VERSION)
+		storedTemperatures = self.databaseManager._database.execute_sql("SELECT printJob_id, sensorName, sensorValue, typeof(sensorValue) FROM pjh_temperaturemodel ORDER BY databaseId").fetchall()
+		self.assertEqual(storedTemperatures, [(1, "bed", 60.0, "real"), (1, "tool0", 215.5, "real"), (2, "bed", None, "null"), (2, "tool0", None, "null")])
+		allIndexNames = [row[0] for row in self.databaseManager._database.execute_sql("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='pjh_temperaturemodel'").fetchall()]
+		self.assertEqual(sorted(allIndexNames), ["temperaturemodel_printJob_id", "temperaturemodel_sensorName_sensorValue_printJob_id"])
+		self.assertEqual([temperature.sensorValue for temperature in self.databaseManager.loadPrintJob(printJob.databaseId).getTemperatureModels()], [60.0, 215.5])
+		# the field stores the same name as the migration, otherwise the sensor filter misses the migrated rows
+		for sensorName in [" Bed ", "Tool0", "\tChamber", "Kammer Ä"]:
+			migratedName = self.databaseManager._database.execute_sql("SELECT lower(trim(?))", (sensorName,)).fetchone()[0]
+			self.assertEqual(TemperatureModel.sensorName.db_value(sensorName), migratedName)
+
+	def test_upgradeFrom17To18(self):
+		slicerSettings = "".join(["; setting_" + str(index) + " = " + str(index) + "\n" for index in range(300)])
+		for fileName in ["OllisBenchy.gcode", "OllisBenchy2.gcode", "CalibrationCube.gcode"]:
+			printJob = self._createPrintJob(fileName)
+			self._setTexts(printJob, slicerSettingsAsText=slicerSettings + "; file = " + fileName[:5] + "\n", technicalLog="Print started")
+		self._createPrintJob("WithoutTexts.gcode")
+		self._downgradeToScheme17()
+		# a text stored before V16, not compressed
+		self.databaseManager._database.execute_sql("UPDATE pjh_printjobtextmodel SET slicerSettingsAsText = ? WHERE printJob_id = 3", ("; filament_type = PLA\n",))
+		self.databaseManager._database.close()
+
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+
+		schemeVersion = PluginMetaDataModel.get(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION)
+		self.assertEqual(int(schemeVersion.value), CURRENT_DATABASE_SCHEME_VERSION)
+		textColumns = [column.name for column in self.databaseManager._database.get_columns("pjh_printjobtextmodel")]
+		self.assertEqual(textColumns, [field.column_name for field in PrintJobTextModel._meta.sorted_fields])
+		self.assertEqual(SlicerSettingsBlobModel.select().count(), 2)
+		self.assertEqual(self.databaseManager.loadPrintJob(2).getTexts().slicerSettingsAsText, slicerSettings + "; file = Ollis\n")
+		self.assertEqual(self.databaseManager.loadPrintJob(3).getTexts().slicerSettingsAsText, "; filament_type = PLA\n")
+		self.assertEqual(self.databaseManager.loadPrintJob(3).getTexts().technicalLog, "Print started")
+		self.assertEqual(self._searchFileNames("ollis"), ["OllisBenchy.gcode", "OllisBenchy2.gcode"])
+		self.assertEqual(self._searchFileNames("filament_type"), ["CalibrationCube.gcode"])
+
+	def test_temperatureStatistic(self):
+		self._createPrintJob("Benchy1.gcode", material="PLA", bedTemperature=60, toolTemperature=201)
+		self._createPrintJob("Benchy2.gcode", material="PLA", bedTemperature=65, toolTemperature=208, printStatusResult="failed")
+		self._createPrintJob("Benchy3.gcode", material="PETG", bedTemperature=80, toolTemperature=236)
+		self._createPrintJob("Benchy4.gcode", material="PETG", bedTemperature=None, toolTemperature=239)
+		# sensor names are normalized
+		self.assertEqual(TemperatureModel.select().where(TemperatureModel.sensorName == "BED ").count(), 4)
+
+		bedPerMaterial = self.databaseManager.calculateTemperatureStatisticByQuery(self._createTableQuery(), "bed", "material")
+		self.assertEqual([(row["group"], row["jobCount"], row["averageTemperature"], row["successRate"]) for row in bedPerMaterial],
+						 [("PETG", 1, 80.0, 100.0), ("PLA", 2, 62.5, 50.0)])
+
+		nozzleBands = self.databaseManager.calculateTemperatureStatisticByQuery(self._createTableQuery(), "tool", "band", 10)
+		self.assertEqual([(row["group"], row["bandEnd"], row["jobCount"], row["successCount"]) for row in nozzleBands],
+						 [(200.0, 210.0, 2, 1), (230.0, 240.0, 2, 2)])
+		nozzleBands = self.databaseManager.calculateTemperatureStatisticByQuery(self._createTableQuery(filterName="onlySuccess"), "tool0", "band", 5)
+		self.assertEqual([(row["group"], row["jobCount"]) for row in nozzleBands], [(200.0, 1), (235.0, 2)])
+		with self.assertRaises(ValueError):
+			self.databaseManager.calculateTemperatureStatisticByQuery(self._createTableQuery(), "bed", "spool")
+
+		# filter of the table query
+		tableQuery = self._createTableQuery(temperatureSensor="tool", minTemperature="205", maxTemperature="237")
+		self.assertEqual(sorted([printJob.fileName for printJob in self.databaseManager.loadPrintJobsByQuery(tableQuery)]), ["Benchy2.gcode", "Benchy3.gcode"])
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(tableQuery), 2)
+
+	def test_resumeInterruptedMigration(self):
+		for index in range(7):
+			printJob = self._createPrintJob("Benchy" + str(index) + ".gcode")
+			self._setTexts(printJob, technicalLog="Print started " + str(index))
+		self._downgradeToScheme11()
+		self.databaseManager._database.close()
+
+		# - interrupted (e.g. power loss) after the second chunk of the printjob copy
+		allProgress = []
+		def _progressUntilInterrupted(migrationStatus):
+			allProgress.append(migrationStatus)
+			if (len(allProgress) == 5):
+				raise KeyboardInterrupt()
+		databaseMigrator = DatabaseMigrator(logging.getLogger("testLogger"), self.databaselocation + "/printJobHistory.db", chunkSize=3, progressCallback=_progressUntilInterrupted)
+		with self.assertRaises(KeyboardInterrupt):
+			databaseMigrator.migrate(11, self.databaseManager._buildMigrationSteps(11, CURRENT_DATABASE_SCHEME_VERSION))
+		self.assertTrue(databaseMigrator.hasInterruptedMigration())
+		self.assertEqual([(status["tableName"], status["progress"]) for status in allProgress], [(None, 100), ("pjh_printjobmodel", 42), ("pjh_printjobmodel", 85), ("pjh_printjobmodel", 100), ("pjh_printjobmodel", 42)])
+
+		# - resumed in the background with the next chunk, no row copied twice
+		self.databaseManager._migrationChunkSize = 3
+		allMigrationStatus = []
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput, migrationStatusCallback=allMigrationStatus.append, migrateInBackground=True)
+		self.assertTrue(self.databaseManager.waitForMigration(30))
+		self.assertFalse(self.databaseManager.isMigrationRunning())
+		self.assertEqual(allMigrationStatus[-1]["status"], "finished")
+
+		schemeVersion = PluginMetaDataModel.get(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION)
+		self.assertEqual(int(schemeVersion.value), CURRENT_DATABASE_SCHEME_VERSION)
+		self.assertFalse(databaseMigrator.hasInterruptedMigration())
+		self.assertEqual(PrintJobModel.select().count(), 7)
+		self.assertEqual(PrintJobTextModel.select().count(), 7)
+		self.assertEqual(self.databaseManager.loadPrintJob(7).getTexts().technicalLog, "Print started 6")
+		self.assertEqual(DailyRollupModel.select(fn.SUM(DailyRollupModel.jobCount)).scalar(), 7)
+		self.assertEqual(self.databaseManager._searchIndexTokenizer, "trigram")
+		self.assertEqual(self._searchFileNames("benchy6"), ["Benchy6.gcode"])
+
+	def test_writesDuringMigration(self):
+		# - still running after the timeout, the write is rejected instead of blocking the caller forever
+		self.databaseManager._migrationWriteTimeout = 0.1
+		self.databaseManager._migrationDoneEvent.clear()
+		with self.assertRaises(DatabaseNotWritableError):
+			self.databaseManager.insertPrintJob(self._buildPrintJob())
+		self.databaseManager._migrationDoneEvent.set()
+		self._createPrintJob()
+
+		# - failed, no writes into the old scheme
+		self._downgradeToScheme17()
+		self.databaseManager._database.close()
+		allMigrationStatus = []
+		with mock.patch.object(DatabaseMigrator, "migrate", side_effect=sqlite3.OperationalError("disk I/O error")):
+			self.databaseManager.initDatabase(self.databaselocation, self._clientOutput, migrationStatusCallback=allMigrationStatus.append, migrateInBackground=True)
+			self.assertTrue(self.databaseManager.waitForMigration(30))
+		self.assertEqual(allMigrationStatus[-1]["status"], "failed")
+		self.assertTrue(self.databaseManager.isMigrationFailed())
+		startTime = time.time()
+		with self.assertRaises(DatabaseNotWritableError):
+			self.databaseManager.deletePrintJob(1)
+		self.assertLess(time.time() - startTime, 1)
+
+		# - a new database has the current scheme
+		self.databaseManager.reCreateDatabase()
+		self.assertFalse(self.databaseManager.isMigrationFailed())
+		self._createPrintJob()
+		self.assertEqual(PrintJobModel.select().count(), 1)
+
+	def test_loadPrintJobsWithoutTexts(self):
+		printJob = self._createPrintJob()
+		self._setTexts(printJob, slicerSettingsAsText="; layer_height = 0.2\n" * 1000, technicalLog="Print started")
+
+		tableJob = list(self.databaseManager.loadPrintJobsByQuery(self._createTableQuery()))[0]
+		self.assertNotIn("slicerSettingsAsText", tableJob.__data__)
+		self.assertNotIn("technicalLog", tableJob.__data__)
+
+		allJobs, queryCount = self._countQueries(lambda: list(self.databaseManager.loadSelectedPrintJobs(str(printJob.databaseId), withTexts=True)))
+		# the slicer settings text with one query for all jobs
+		self.assertEqual(queryCount, 6)
+		self.assertEqual(allJobs[0].getTexts().technicalLog, "Print started")
+		allJobs, queryCount = self._countQueries(lambda: list(self.databaseManager.loadPrintJobsByQuery(self._createTableQuery(), withTexts=True)))
+		self.assertEqual(queryCount, 6)
+		self.assertEqual(allJobs[0].getTexts().slicerSettingsAsText, "; layer_height = 0.2\n" * 1000)
+
+	def test_loadPrintJobsPageWithCount(self):
+		for index in range(12):
+			self._createPrintJob("Benchy" + str(index) + ".gcode", "success" if index % 3 else "failed",
+								 printStartDateTime=datetime.datetime(2021, 3, 1) + datetime.timedelta(days=index))
+		for tableQuery in [self._createTableQuery(to=5),
+						   self._createTableQuery(**{"from": 5, "to": 5, "sortColumn": "fileName", "sortOrder": "asc"}),
+						   self._createTableQuery(filterName="onlyFailed", searchQuery="benchy", startDate="02.03.2021", endDate="10.03.2021"),
+						   self._createTableQuery(**{"from": 25})]:
+			expectedIds = [job.databaseId for job in self.databaseManager._loadPrintJobsByQuery(tableQuery)]
+			expectedCount = self.databaseManager._countPrintJobsByQuery(tableQuery)
+			(allJobs, totalItemCount), queryCount = self._countQueries(lambda: self.databaseManager._loadPrintJobsPageByQuery(tableQuery))
+			self.assertEqual(([job.databaseId for job in allJobs], totalItemCount), (expectedIds, expectedCount))
+			# page with count, then the relations by id, the count only behind the last page
+			self.assertEqual(queryCount, 4 if len(allJobs) > 0 else 2)
+		self.assertEqual(totalItemCount, 12)
+		allJobs, totalItemCount = self.databaseManager.loadPrintJobsPageByQuery(self._createTableQuery(filterName="onlyFailed"))
+		self.assertEqual(totalItemCount, 4)
+		self.assertEqual(allJobs[0].getFilamentModelByToolId("total").material, "PLA")
+		self.assertEqual(sorted([temperature.sensorName for temperature in allJobs[0].getTemperatureModels()]), ["bed", "tool0"])
+		self.assertEqual(allJobs[0].getCosts().totalCosts, 1.23)
+
+		with mock.patch("octoprint_PrintJobHistory.DatabaseManager.SQLITE_WINDOW_FUNCTIONS", False):
+			allJobs, totalItemCount = self.databaseManager._loadPrintJobsPageByQuery(self._createTableQuery(to=5, filterName="onlySuccess"))
+		self.assertEqual((len(allJobs), totalItemCount), (5, 8))
+
+	def test_queryResultCache(self):
+		self._createPrintJob("Benchy.gcode")
+		self._createPrintJob("Cube.gcode", "failed")
+		tableQuery = self._createTableQuery()
+		allJobs, queryCount = self._countQueries(lambda: self.databaseManager.loadPrintJobsByQuery(tableQuery))
+		self.assertEqual(queryCount, 4)
+		self.assertEqual(len(allJobs[0].getTemperatureModels()), 2)
+
+		# same query, other parameter order and without the default values -> from memory, not shared with the first caller
+		sameTableQuery = dict(reversed(list(tableQuery.items())))
+		del sameTableQuery["filterName"]
+		cachedJobs, queryCount = self._countQueries(lambda: self.databaseManager.loadPrintJobsByQuery(sameTableQuery))
+		self.assertEqual(queryCount, 0)
+		self.assertEqual([job.fileName for job in cachedJobs], [job.fileName for job in allJobs])
+		self.assertEqual(len(cachedJobs[0].getTemperatureModels()), 2)
+		self.assertEqual(cachedJobs[0].getFilamentModelByToolId("total").material, "PLA")
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(tableQuery), 2)
+		# the count of the filter is shared by all pages
+		(jobCount, queryCount) = self._countQueries(lambda: self.databaseManager.countPrintJobsByQuery(self._createTableQuery(**{"from": 25})))
+		self.assertEqual((jobCount, queryCount), (2, 0))
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery(filterName="onlyFailed")), 1)
+
+		# each write starts a new generation
+		self._createPrintJob("Vase.gcode")
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(tableQuery), 3)
+		self.databaseManager.deletePrintJobs([allJobs[0].databaseId])
+		self.assertEqual(len(self.databaseManager.loadPrintJobsByQuery(tableQuery)), 2)
+		cacheStatistic = self.databaseManager.getQueryCacheStatistic()
+		self.assertEqual((cacheStatistic["hits"], cacheStatistic["misses"]), (2, 5))
+
+		# a result loaded during an older generation is not cached
+		loadedDuringWrite = self.databaseManager._queryCache.getOrLoad(("stale",), lambda: self.databaseManager._queryCache.invalidate() or "old rows")
+		self.assertEqual(loadedDuringWrite, "old rows")
+		self.assertEqual(self.databaseManager._queryCache.getOrLoad(("stale",), lambda: "new rows"), "new rows")
+
+	def _loadDailyRollup(self):
+		allRollupRows = DailyRollupModel.select().order_by(DailyRollupModel.day, DailyRollupModel.printStatusResult, DailyRollupModel.material, DailyRollupModel.spoolName).dicts()
+		return [(row["day"], row["printStatusResult"], row["material"], row["spoolName"], row["jobCount"], row["duration"],
+				 round(row["usedLength"], 6), round(row["usedWeight"], 6), round(row["filamentCost"], 6), round(row["totalCosts"], 6)) for row in allRollupRows]
+
+	def test_dailyRollupIsMaintained(self):
+		benchy = self._createPrintJob("Benchy.gcode", printStartDateTime=datetime.datetime(2021, 3, 1, 10), material="PLA", usedLength=1000.0, usedWeight=3.0)
+		self._createPrintJob("Cube.gcode", printStartDateTime=datetime.datetime(2021, 3, 1, 20), material="PLA", usedLength=500.0, usedWeight=1.5)
+		vase = self._createPrintJob("Vase.gcode", "failed", printStartDateTime=datetime.datetime(2021, 3, 9, 8), material="PETG", spoolName=None)
+		self.assertEqual(self._loadDailyRollup(), [
+			(datetime.date(2021, 3, 1), "success", "PLA", "My best spool", 2, 7200, 1500.0, 4.5, 0.0, 2.46),
+			(datetime.date(2021, 3, 9), "failed", "PETG", "", 1, 3600, 1345.0, 4.2, 0.0, 1.23)
+		])
+
+		# move a job to an other day/status/material
+		benchy.printStartDateTime = datetime.datetime(2021, 3, 9, 9)
+		benchy.printStatusResult = "failed"
+		benchy.getFilamentModelByToolId("total").material = "PETG"
+		benchy.getFilamentModelByToolId("total").spoolName = None
+		self.databaseManager.updatePrintJob(benchy)
+		self.databaseManager.deletePrintJob(vase.databaseId)
+		self._createPrintJob("Import.gcode", printStartDateTime=datetime.datetime(2021, 4, 2, 9))
+
+		maintainedRollup = self._loadDailyRollup()
+		self.assertEqual(maintainedRollup, [
+			(datetime.date(2021, 3, 1), "success", "PLA", "My best spool", 1, 3600, 500.0, 1.5, 0.0, 1.23),
+			(datetime.date(2021, 3, 9), "failed", "PETG", "", 1, 3600, 1000.0, 3.0, 0.0, 1.23),
+			(datetime.date(2021, 4, 2), "success", "PLA", "My best spool", 1, 3600, 1345.0, 4.2, 0.0, 1.23)
+		])
+		self.assertTrue(self.databaseManager.rebuildDailyRollup())
+		self.assertEqual(self._loadDailyRollup(), maintainedRollup)
+
+	def test_fileRollupIsMaintained(self):
+		benchy = self._createPrintJob("Benchy.gcode", duration=3000, usedLength=1000.0, usedWeight=3.0)
+		self._createPrintJob("Benchy.gcode", duration=4000, usedLength=1200.0, usedWeight=3.6)
+		failedBenchy = self._createPrintJob("Benchy.gcode", "failed", duration=600, usedLength=100.0, usedWeight=0.3)
+		withoutPath = self._buildPrintJob("Cube.gcode")
+		withoutPath.filePathName = None
+		self.databaseManager.insertPrintJobs([withoutPath, self._buildPrintJob("Vase.gcode", "failed")])
+
+		fileStatistics, queryCount = self._countQueries(lambda: self.databaseManager.loadFileStatistics([benchy.getFileRollupKey(), "Cube.gcode", "Unknown.gcode"]))
+		self.assertEqual(queryCount, 1)
+		self.assertEqual(sorted(fileStatistics.keys()), ["Benchy.gcode", "Cube.gcode"])
+		self.assertEqual(fileStatistics["Benchy.gcode"], {
+			"jobCount": 3, "successCount": 2, "successRate": 66.7,
+			# failed jobs are not part of the averages
+			"averageDuration": 3500, "averageDurationFormatted": StringUtils.secondsToText(3500),
+			"averageUsedLength": 1100.0, "averageUsedWeight": 3.3, "averageCosts": 1.23
+		})
+		allFileStatistics = self.databaseManager.loadFileStatistics()
+		self.assertEqual(list(allFileStatistics.keys()), ["Benchy.gcode", "Cube.gcode", "Vase.gcode"])
+		self.assertEqual(allFileStatistics["Vase.gcode"]["averageDuration"], None)
+
+		# update/delete move the job between the files
+		failedBenchy.printStatusResult = "success"
+		failedBenchy.fileName = failedBenchy.filePathName = "Vase.gcode"
+		self.databaseManager.updatePrintJob(failedBenchy)
+		self.databaseManager.deletePrintJob(benchy.databaseId)
+		maintainedStatistics = self.databaseManager.loadFileStatistics()
+		self.assertEqual((maintainedStatistics["Benchy.gcode"]["jobCount"], maintainedStatistics["Benchy.gcode"]["successRate"]), (1, 100.0))
+		self.assertEqual((maintainedStatistics["Vase.gcode"]["jobCount"], maintainedStatistics["Vase.gcode"]["averageDuration"]), (2, 600))
+		self.assertTrue(self.databaseManager.rebuildFileRollup())
+		self.assertEqual(self.databaseManager.loadFileStatistics(), maintainedStatistics)
+
+		# the migration fills the rollup with the existing jobs
+		self._downgradeToScheme18()
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+		self.assertEqual(self.databaseManager.loadFileStatistics(), maintainedStatistics)
+
+	def _createFarmDatabase(self, allPrintJobs):
+		farmDatabaseLocation = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, farmDatabaseLocation, True)
+		farmDatabaseManager = DatabaseManager(logging.getLogger("testLogger"), False)
+		farmDatabaseManager.initDatabase(farmDatabaseLocation, self._clientOutput)
+		farmDatabaseManager.insertPrintJobs(allPrintJobs)
+		farmDatabaseManager._database.close()
+		return farmDatabaseManager._databaseFileLocation
+
+	def test_farmAggregation(self):
+		# local: 1., 3., 5.3. / prusa: 2., 4.3. / ender: 6.3. failed
+		for day in [1, 3, 5]:
+			self._createPrintJob("Local" + str(day) + ".gcode", printStartDateTime=datetime.datetime(2021, 3, day, 12))
+		prusaDatabase = self._createFarmDatabase([self._buildPrintJob("Prusa" + str(day) + ".gcode", printStartDateTime=datetime.datetime(2021, 3, day, 12), material="PETG") for day in [2, 4]])
+		enderDatabase = self._createFarmDatabase([self._buildPrintJob("Ender6.gcode", "failed", printStartDateTime=datetime.datetime(2021, 3, 6, 12))])
+		oldDatabase = self._createFarmDatabase([self._buildPrintJob("Old.gcode")])
+		oldDatabaseManager = DatabaseManager(logging.getLogger("testLogger"), False)
+		oldDatabaseManager.initDatabase(os.path.dirname(oldDatabase), self._clientOutput)
+		PluginMetaDataModel.update(value=str(CURRENT_DATABASE_SCHEME_VERSION - 1)).where(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION).execute()
+		oldDatabaseManager._database.close()
+		self.databaseManager.setFarmDatabases("mk3", [
+			{"printerName": "prusa", "databaseFileLocation": prusaDatabase},
+			{"printerName": "ender", "databaseFileLocation": enderDatabase},
+			{"printerName": "old", "databaseFileLocation": oldDatabase},
+			{"printerName": "missing", "databaseFileLocation": os.path.join(self.databaselocation, "missing.db")},
+			# the own database is not counted twice
+			{"printerName": "self", "databaseFileLocation": self.databaseManager._databaseFileLocation}
+		])
+		# the models are bound to the last initialized database
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+
+		# - table: merged in the sort order, skipped printers are reported
+		allPrintJobs, totalItemCount, allSkippedPrinterNames = self.databaseManager.loadFarmPrintJobsPageByQuery(self._createTableQuery())
+		self.assertEqual([(printJob.printerName, printJob.fileName) for printJob in allPrintJobs], [
+			("ender", "Ender6.gcode"), ("mk3", "Local5.gcode"), ("prusa", "Prusa4.gcode"), ("mk3", "Local3.gcode"), ("prusa", "Prusa2.gcode"), ("mk3", "Local1.gcode")
+		])
+		self.assertEqual(totalItemCount, 6)
+		self.assertEqual(allSkippedPrinterNames, ["missing", "old"])
+		self.assertFalse(os.path.exists(os.path.join(self.databaselocation, "missing.db")))
+		secondPage = self.databaseManager.loadFarmPrintJobsPageByQuery(self._createTableQuery(**{"from": 2, "to": 2, "sortOrder": "asc"}))[0]
+		self.assertEqual([printJob.fileName for printJob in secondPage], ["Local3.gcode", "Prusa4.gcode"])
+		failedJobs = self.databaseManager.loadFarmPrintJobsByQuery(self._createTableQuery(filterName="onlyFailed"))[0]
+		self.assertEqual([(printJob.printerName, printJob.fileName) for printJob in failedJobs], [("ender", "Ender6.gcode")])
+		# the farm databases are detached again
+		self.assertEqual([row[1] for row in self.databaseManager._database.execute_sql("PRAGMA database_list").fetchall() if row[1] != "temp"], ["main"])
+
+		# - statistic and series: added up over the printers
+		statistic = self.databaseManager.calculateFarmPrintJobsStatisticByQuery(self._createTableQuery())
+		self.assertEqual(statistic["printJobCount"], 6)
+		self.assertEqual(statistic["printers"], "mk3(3), prusa(2), ender(1)")
+		self.assertEqual(statistic["skippedPrinters"], ["missing", "old"])
+		monthSeries = self.databaseManager.calculateFarmStatisticSeriesByQuery(self._createTableQuery(), "month")[0]
+		self.assertEqual([(values["bucket"], values["jobCount"], values["duration"]) for values in monthSeries], [("2021-03-01", 6, 6 * 3600)])
+		printerSeries = self.databaseManager.calculateFarmStatisticSeriesByQuery(self._createTableQuery(), "week", "printer")[0]
+		self.assertEqual([(values["bucket"], values["group"], values["jobCount"]) for values in printerSeries], [
+			("2021-03-01", "ender", 1), ("2021-03-01", "mk3", 3), ("2021-03-01", "prusa", 2)
+		])
+
+		# - more databases than attached at once
+		allFarmDatabases = []
+		for index in range(FARM_ATTACH_BATCH_SIZE + 2):
+			copiedDatabase = os.path.join(self.databaselocation, "printer" + str(index) + ".db")
+			shutil.copy(prusaDatabase, copiedDatabase)
+			allFarmDatabases.append({"printerName": "printer" + str(index), "databaseFileLocation": copiedDatabase})
+		self.databaseManager.setFarmDatabases("mk3", allFarmDatabases)
+		allFarmDatabaseStatus = self.databaseManager.getFarmDatabaseStatus()
+		self.assertEqual(len(allFarmDatabaseStatus), len(allFarmDatabases) + 1)
+		self.assertEqual(sum([farmDatabaseStatus["printJobCount"] for farmDatabaseStatus in allFarmDatabaseStatus]), 3 + 2 * len(allFarmDatabases))
+
+	def test_farmSortByNonAsciiFileNames(self):
+		# lower() of SQLite only changes A-Z: "Ébc" (U+00C9) is sorted before "éab" (U+00E9)
+		for fileName in ["Ébc.gcode", "éab.gcode", "Zoo.gcode"]:
+			self._createPrintJob(fileName)
+		prusaDatabase = self._createFarmDatabase([self._buildPrintJob(fileName) for fileName in ["éaz.gcode", "Éca.gcode", "apple.gcode"]])
+		self.databaseManager.setFarmDatabases("mk3", [{"printerName": "prusa", "databaseFileLocation": prusaDatabase}])
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput)
+
+		for sortOrder in ["asc", "desc"]:
+			allPrintJobs = self.databaseManager.loadFarmPrintJobsPageByQuery(self._createTableQuery(sortColumn="fileName", sortOrder=sortOrder))[0]
+			expectedFileNames = ["apple.gcode", "Zoo.gcode", "Ébc.gcode", "Éca.gcode", "éab.gcode", "éaz.gcode"]
+			self.assertEqual([printJob.fileName for printJob in allPrintJobs], expectedFileNames if sortOrder == "asc" else list(reversed(expectedFileNames)))
+
+	def test_loadStatisticSeries(self):
+		# monday 1.3., sunday 7.3., monday 8.3.
+		for day, printStatusResult in [(1, "success"), (7, "failed"), (8, "success"), (31, "success")]:
+			self._createPrintJob(printStatusResult=printStatusResult, printStartDateTime=datetime.datetime(2021, 3, day, 12))
+		self._createPrintJob(printStartDateTime=datetime.datetime(2021, 4, 1, 12))
+
+		daySeries = self.databaseManager.loadStatisticSeries("day", "02.03.2021", "31.03.2021")
+		self.assertEqual([(values["bucket"], values["jobCount"]) for values in daySeries], [("2021-03-07", 1), ("2021-03-08", 1), ("2021-03-31", 1)])
+		weekSeries = self.databaseManager.loadStatisticSeries("week", groupBy="status")
+		self.assertEqual([(values["bucket"], values["group"], values["jobCount"], values["duration"]) for values in weekSeries], [
+			("2021-03-01", "failed", 1, 3600),
+			("2021-03-01", "success", 1, 3600),
+			("2021-03-08", "success", 1, 3600),
+			("2021-03-29", "success", 2, 7200)
+		])
+		monthSeries = self.databaseManager.loadStatisticSeries("month")
+		self.assertEqual([(values["bucket"], values["jobCount"], round(values["usedLength"], 6)) for values in monthSeries], [("2021-03-01", 4, 5380.0), ("2021-04-01", 1, 1345.0)])
+		self.assertRaises(ValueError, self.databaseManager.loadStatisticSeries, "year")
+
+	def test_statisticSeriesByQuery(self):
+		# synthetic history over three years: a job every 5 days, every 7th failed, PLA/PETG/ASA
+		allPrintJobs = []
+		for index in range(220):
+			printStartDateTime = datetime.datetime(2019, 1, 1, 9, 30) + datetime.timedelta(days=index * 5)
+			allPrintJobs.append(self._buildPrintJob("Job" + str(index) + ".gcode", "failed" if index % 7 == 0 else "success",
+													printStartDateTime=printStartDateTime, duration=600 + index,
+													material=["PLA", "PETG", "ASA"][index % 3], usedLength=100.0 + index))
+		self.databaseManager.insertPrintJobs(allPrintJobs)
+
+		# - computed by one statement, no job loaded
+		monthSeries, queryCount = self._countQueries(lambda: self.databaseManager.calculateStatisticSeriesByQuery(self._createTableQuery(), "month"))
+		self.assertEqual(queryCount, 1)
+		expectedMonthCounts = {}
+		for printJob in allPrintJobs:
+			monthBucket = printJob.printStartDateTime.strftime("%Y-%m-01")
+			expectedMonthCounts[monthBucket] = expectedMonthCounts.get(monthBucket, 0) + 1
+		self.assertEqual([(values["bucket"], values["jobCount"]) for values in monthSeries], sorted(expectedMonthCounts.items()))
+		self.assertEqual(monthSeries[0]["duration"], sum([printJob.duration for printJob in allPrintJobs if printJob.printStartDateTime.month == 1 and printJob.printStartDateTime.year == 2019]))
+		# without a filter the same as the rollup
+		for bucketSize, groupBy in [("day", None), ("week", "material"), ("month", "status")]:
+			querySeries = self.databaseManager.calculateStatisticSeriesByQuery(self._createTableQuery(), bucketSize, groupBy)
+			rollupSeries = self.databaseManager.loadStatisticSeries(bucketSize, groupBy=groupBy)
+			self.assertEqual([(values["bucket"], values.get("group"), values["jobCount"], round(values["usedLength"], 6)) for values in querySeries],
+							 [(values["bucket"], values.get("group"), values["jobCount"], round(values["usedLength"], 6)) for values in rollupSeries])
+
+		# - weeks start on monday
+		weekSeries = self.databaseManager.calculateStatisticSeriesByQuery(self._createTableQuery(), "week")
+		self.assertEqual(set([datetime.datetime.strptime(values["bucket"], "%Y-%m-%d").weekday() for values in weekSeries]), set([0]))
+		self.assertEqual(sum([values["jobCount"] for values in weekSeries]), 220)
+
+		# - with the filters of the table query
+		tableQuery = self._createTableQuery(filterName="onlyFailed", startDate="01.01.2020", endDate="31.12.2020")
+		failedSeries = self.databaseManager.calculateStatisticSeriesByQuery(tableQuery, "month", "material")
+		expectedFailed = {}
+		for printJob in allPrintJobs:
+			if (printJob.printStatusResult == "failed" and printJob.printStartDateTime.year == 2020):
+				groupKey = (printJob.printStartDateTime.strftime("%Y-%m-01"), printJob.getFilamentModelByToolId("total").material)
+				expectedFailed[groupKey] = expectedFailed.get(groupKey, 0) + 1
+		self.assertEqual([((values["bucket"], values["group"]), values["jobCount"]) for values in failedSeries], sorted(expectedFailed.items()))
+		self.assertEqual(self.databaseManager.calculateStatisticSeriesByQuery(self._createTableQuery(searchQuery="Job12.gcode"), "day"),
+						 [{"bucket": "2019-03-02", "jobCount": 1, "duration": 612, "usedLength": 112.0, "usedWeight": 4.2, "filamentCost": 0, "totalCosts": 1.23}])
+		self.assertRaises(ValueError, self.databaseManager.calculateStatisticSeriesByQuery, self._createTableQuery(), "year")
+		self.assertRaises(ValueError, self.databaseManager.calculateStatisticSeriesByQuery, self._createTableQuery(), "day", "printer")
+
+	def test_connectionSettings(self):
+		database = self.databaseManager._database
+		self.assertEqual(database.execute_sql("PRAGMA journal_mode").fetchone()[0], "wal")
+		self.assertEqual(database.execute_sql("PRAGMA busy_timeout").fetchone()[0], 5000)
+		self.assertEqual(database.execute_sql("PRAGMA cache_size").fetchone()[0], -8192)
+		self._createPrintJob()
+		busy, logFrames, checkpointedFrames = self.databaseManager.checkpointDatabase("TRUNCATE")
+		self.assertEqual(busy, 0)
+		self.assertEqual(os.path.getsize(os.path.join(self.databaselocation, "printJobHistory.db-wal")), 0)
+
+	def _createAndDeleteLargePrintJobs(self):
+		allPrintJobs = self._buildImportPrintJobs()
+		for printJob in allPrintJobs:
+			textModel = PrintJobTextModel()
+			# not compressible
+			textModel.technicalLog = base64.b64encode(os.urandom(64000)).decode("ascii")
+			printJob.setTexts(textModel)
+		self.databaseManager.insertPrintJobs(allPrintJobs)
+		self.databaseManager.deletePrintJobs([printJob.databaseId for printJob in allPrintJobs[1:]])
+
+	def test_databaseMaintenance(self):
+		database = self.databaseManager._database
+		# a new database is created with auto_vacuum INCREMENTAL
+		self.assertEqual(database.execute_sql("PRAGMA auto_vacuum").fetchone()[0], 2)
+		self._createAndDeleteLargePrintJobs()
+		maintenanceResult = self.databaseManager.runDatabaseMaintenance()
+		self.assertEqual(maintenanceResult["vacuumMode"], "incremental")
+		self.assertEqual(maintenanceResult["integrity"], "ok")
+		self.assertGreater(maintenanceResult["reclaimedBytes"], 1000000)
+		self.assertEqual(database.execute_sql("PRAGMA freelist_count").fetchone()[0], 0)
+		self.assertGreater(database.execute_sql("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0], 0)
+
+		# an old database is converted once with a full vacuum
+		database.execute_sql("PRAGMA auto_vacuum=NONE")
+		database.execute_sql("VACUUM")
+		self._createAndDeleteLargePrintJobs()
+		maintenanceResult = self.databaseManager.runDatabaseMaintenance()
+		self.assertEqual(maintenanceResult["vacuumMode"], "full")
+		self.assertGreater(maintenanceResult["reclaimedBytes"], 1000000)
+		self.assertEqual(database.execute_sql("PRAGMA auto_vacuum").fetchone()[0], 2)
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery()), 2)
+		self.assertIsNone(self.databaseManager.runDatabaseMaintenance()["vacuumMode"])
+
+	def _loadStoredPrintJobs(self):
+		allPrintJobs = []
+		for printJob in self.databaseManager.loadAllPrintJobs():
+			texts = printJob.getTexts()
+			allPrintJobs.append((printJob.fileName, printJob.printStatusResult, printJob.printStartDateTime, printJob.noteText,
+								 sorted([(filament.toolId, filament.material, filament.usedLength) for filament in printJob.getFilamentModels()]),
+								 sorted([(temperature.sensorName, temperature.sensorValue) for temperature in printJob.getTemperatureModels()]),
+								 printJob.getCosts().totalCosts,
+								 None if texts == None else texts.slicerSettingsAsText))
+		return allPrintJobs
+
+	def _buildImportPrintJobs(self):
+		allPrintJobs = []
+		for index in range(23):
+			printJob = self._buildPrintJob("Import" + str(index) + ".gcode", "success" if index % 3 else "failed",
+										   printStartDateTime=datetime.datetime(2021, 2, 1) + datetime.timedelta(hours=index * 7),
+										   material="PLA" if index % 2 else "PETG", usedLength=100.0 + index)
+			if (index % 4 == 0):
+				printJob.noteText = "note " + str(index)
+				textModel = PrintJobTextModel()
+				textModel.slicerSettingsAsText = "; layer_height = 0." + str(index)
+				printJob.setTexts(textModel)
+			allPrintJobs.append(printJob)
+		return allPrintJobs
+
+	def test_insertPrintJobsInChunks(self):
+		for printJob in self._buildImportPrintJobs():
+			self.databaseManager.insertPrintJob(printJob)
+		singleInsertedJobs = self._loadStoredPrintJobs()
+		singleInsertedRollup = self._loadDailyRollup()
+		self.databaseManager.reCreateDatabase()
+
+		allProgress = []
+		importPrintJobs = self._buildImportPrintJobs()
+		(insertedJobCount, queryCount) = self._countQueries(lambda: self.databaseManager.insertPrintJobs(importPrintJobs, 10, allProgress.append))
+		self.assertEqual(insertedJobCount, 23)
+		self.assertEqual(allProgress, [10, 20, 23])
+		self.assertEqual(sorted([printJob.databaseId for printJob in importPrintJobs]), [printJob.databaseId for printJob in PrintJobModel.select().order_by(PrintJobModel.databaseId)])
+		# per chunk: jobs, slicer settings blobs, 4 relation tables and the rollup, not per job
+		self.assertLess(queryCount, 3 * 10)
+		self.assertEqual(self._loadStoredPrintJobs(), singleInsertedJobs)
+		self.assertEqual(self._loadDailyRollup(), singleInsertedRollup)
+		self.assertEqual(self._searchFileNames("layer_height = 0.8"), ["Import8.gcode"])
+
+	def test_insertPrintJobsWithinVariableLimit(self):
+		# limit of SQLite < 3.32, one statement for the 80 jobs of the chunk would need more than 1000 bind-variables
+		self.databaseManager._database.connection().setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)
+		importPrintJobs = [self._buildPrintJob("Import" + str(index) + ".gcode") for index in range(80)]
+		insertedJobCount = self.databaseManager.insertPrintJobs(importPrintJobs, 500)
+		self.assertEqual(insertedJobCount, 80)
+		self.assertEqual([printJob.databaseId for printJob in importPrintJobs], [printJob.databaseId for printJob in PrintJobModel.select().order_by(PrintJobModel.databaseId)])
+		self.assertEqual([printJob.fileName for printJob in PrintJobModel.select().order_by(PrintJobModel.databaseId)], [printJob.fileName for printJob in importPrintJobs])
+		self.assertEqual(FilamentModel.select().where(FilamentModel.printJob == importPrintJobs[-1].databaseId).count(), 2)
+
+	def test_insertPrintJobsStopsAtFailedChunk(self):
+		importPrintJobs = self._buildImportPrintJobs()
+		with mock.patch.object(self.databaseManager, "_updateDailyRollup", side_effect=[None, peewee.OperationalError("disk I/O error")]):
+			insertedJobCount = self.databaseManager.insertPrintJobs(importPrintJobs, 10)
+		self.assertEqual(insertedJobCount, 10)
+		self.assertEqual(PrintJobModel.select().count(), 10)
+		self.assertEqual(FilamentModel.select().count(), 20)
+		self.assertIsNone(importPrintJobs[10].databaseId)
+
+	def test_deletePrintJobsSetBased(self):
+		importPrintJobs = self._buildImportPrintJobs()
+		self.databaseManager.insertPrintJobs(importPrintJobs)
+		deletePrintJobs = importPrintJobs[:20]
+		# more ids than bind-variables per statement, invalid ids are skipped
+		deleteIds = [printJob.databaseId for printJob in deletePrintJobs] + list(range(10000, 11500)) + ["no-id"]
+		(allStartDateTimes, queryCount) = self._countQueries(lambda: self.databaseManager.deletePrintJobs(deleteIds))
+		self.assertEqual(sorted(allStartDateTimes), sorted([printJob.printStartDateTime for printJob in deletePrintJobs]))
+		self.assertLess(queryCount, 25)
+
+		remainingIds = [printJob.databaseId for printJob in importPrintJobs[20:]]
+		self.assertEqual([printJob.databaseId for printJob in PrintJobModel.select().order_by(PrintJobModel.databaseId)], remainingIds)
+		for relationModelClass in [FilamentModel, TemperatureModel, CostModel]:
+			self.assertEqual(set([row.printJob_id for row in relationModelClass.select()]), set(remainingIds))
+		self.assertEqual([row.printJob_id for row in PrintJobTextModel.select()], [importPrintJobs[20].databaseId])
+		self.assertEqual(sum([row[4] for row in self._loadDailyRollup()]), 3)
+		self.assertEqual(self._searchFileNames("layer_height"), ["Import20.gcode"])
+
+	def test_onlineBackupDuringWrites(self):
+		for index in range(20):
+			self._createPrintJob("Before" + str(index) + ".gcode")
+		allErrors = []
+		backupStarted = threading.Event()
+
+		def writePrintJobs():
+			try:
+				backupStarted.wait(5)
+				for index in range(20):
+					self._createPrintJob("During" + str(index) + ".gcode")
+			except Exception as e:
+				allErrors.append(e)
+			finally:
+				self.databaseManager._database.close()
+
+		writerThread = threading.Thread(target=writePrintJobs)
+		writerThread.start()
+		backupFilePath = os.path.join(self.databaselocation, "backup.db")
+		with mock.patch("octoprint_PrintJobHistory.DatabaseManager.BACKUP_PAGES_PER_STEP", 1):
+			backupStarted.set()
+			self.databaseManager.createDatabaseBackup(backupFilePath)
+		writerThread.join()
+		self.assertEqual(allErrors, [])
+
+		# a consistent snapshot, every job complete with its relations
+		backupDatabase = peewee.SqliteDatabase(backupFilePath)
+		self.assertEqual(backupDatabase.execute_sql("PRAGMA integrity_check").fetchone()[0], "ok")
+		self.assertEqual(backupDatabase.execute_sql("PRAGMA journal_mode").fetchone()[0], "delete")
+		jobCount = backupDatabase.execute_sql("SELECT COUNT(*) FROM pjh_printjobmodel").fetchone()[0]
+		self.assertTrue(20 <= jobCount <= 40)
+		self.assertEqual(backupDatabase.execute_sql("SELECT COUNT(*) FROM pjh_filamentmodel").fetchone()[0], 2 * jobCount)
+		self.assertEqual(backupDatabase.execute_sql("SELECT SUM(jobCount) FROM pjh_dailyrollupmodel").fetchone()[0], jobCount)
+		backupDatabase.close()
+
+		backupFilePath = self.databaseManager.backupDatabaseFile(self.databaselocation)
+		self.assertTrue(os.path.exists(backupFilePath))
+		self.assertFalse(os.path.exists(backupFilePath + "-wal"))
+
+	def test_concurrentReadersAndWriters(self):
+		writerCount = 4
+		jobsPerWriter = 15
+		allErrors = []
+		writersDone = threading.Event()
+
+		def writePrintJobs(writerIndex):
+			try:
+				for jobIndex in range(jobsPerWriter):
+					printJob = self._createPrintJob("Writer" + str(writerIndex) + "-" + str(jobIndex) + ".gcode",
+													printStartDateTime=datetime.datetime(2021, 1, 1) + datetime.timedelta(minutes=writerIndex * 100 + jobIndex))
+					if (printJob.databaseId == None):
+						allErrors.append("insert failed")
+						continue
+					printJob.noteText = "updated by writer " + str(writerIndex)
+					self.databaseManager.updatePrintJob(printJob)
+			except Exception as e:
+				allErrors.append(e)
+			finally:
+				self.databaseManager._database.close()
+
+		def readPrintJobs():
+			try:
+				while (writersDone.is_set() == False):
+					tableQuery = self._createTableQuery(to=10)
+					self.databaseManager.loadPrintJobsByQuery(tableQuery)
+					self.databaseManager.countPrintJobsByQuery(tableQuery)
+					self.databaseManager.calculatePrintJobsStatisticByQuery(tableQuery)
+			except Exception as e:
+				allErrors.append(e)
+			finally:
+				self.databaseManager._database.close()
+
+		readerThreads = [threading.Thread(target=readPrintJobs) for readerIndex in range(4)]
+		writerThreads = [threading.Thread(target=writePrintJobs, args=(writerIndex,)) for writerIndex in range(writerCount)]
+		for thread in readerThreads + writerThreads:
+			thread.start()
+		for thread in writerThreads:
+			thread.join()
+		writersDone.set()
+		for thread in readerThreads:
+			thread.join()
+
+		self.assertEqual(allErrors, [])
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery()), writerCount * jobsPerWriter)
+		self.assertEqual(PrintJobModel.select().where(PrintJobModel.noteText.startswith("updated by writer")).count(), writerCount * jobsPerWriter)
+
+	def test_loadPrintJobsByCursor(self):
+		for index in range(30):
+			# duplicate filenames and start dates, the databaseId makes the cursor unique
+			self._createPrintJob("Benchy" + str(index % 4) + ".gcode", printStartDateTime=datetime.datetime(2021, 1, 1) + datetime.timedelta(hours=index // 2))
+
+		for sortColumn in ["printStartDateTime", "fileName"]:
+			for sortOrder in ["asc", "desc"]:
+				offsetIds = [job.databaseId for job in self.databaseManager.loadPrintJobsByQuery(self._createTableQuery(to=100, sortColumn=sortColumn, sortOrder=sortOrder))]
+				self.assertEqual(len(offsetIds), 30)
+				# offset pagination has no tie-breaker, compare the sort values only
+				offsetSortValues = [self._sortValue(PrintJobModel.get_by_id(databaseId), sortColumn) for databaseId in offsetIds]
+
+				cursorTableQuery = self._createTableQuery(to=7, sortColumn=sortColumn, sortOrder=sortOrder, pagingMode="cursor")
+				allPages = []
+				allJobs, nextCursor, previousCursor = self.databaseManager.loadPrintJobsByCursor(cursorTableQuery)
+				self.assertIsNone(previousCursor)
+				allPages.append(allJobs)
+				while (nextCursor != None):
+					allJobs, nextCursor, previousCursor = self.databaseManager.loadPrintJobsByCursor(dict(cursorTableQuery, cursor=nextCursor, cursorDirection="next"))
+					self.assertIsNotNone(previousCursor)
+					allPages.append(allJobs)
+				self.assertEqual([len(page) for page in allPages], [7, 7, 7, 7, 2])
+				allCursorJobs = [job for page in allPages for job in page]
+				self.assertEqual(len(set([job.databaseId for job in allCursorJobs])), 30)
+				self.assertEqual([self._sortValue(job, sortColumn) for job in allCursorJobs], offsetSortValues)
+
+				# and back again
+				for pageIndex in [3, 2, 1, 0]:
+					allJobs, nextCursor, previousCursor = self.databaseManager.loadPrintJobsByCursor(dict(cursorTableQuery, cursor=previousCursor, cursorDirection="previous"))
+					self.assertEqual([job.databaseId for job in allJobs], [job.databaseId for job in allPages[pageIndex]])
+					self.assertIsNotNone(nextCursor)
+				self.assertIsNone(previousCursor)
+
+		# jump to a page by offset and go back from there with the cursor
+		allJobs, nextCursor, previousCursor = self.databaseManager.loadPrintJobsByCursor(self._createTableQuery(**{"from": 14, "to": 7, "pagingMode": "cursor"}))
+		offsetIds = [job.databaseId for job in self.databaseManager.loadPrintJobsByQuery(self._createTableQuery(**{"from": 7, "to": 7}))]
+		allJobs, nextCursor, previousCursor = self.databaseManager.loadPrintJobsByCursor(self._createTableQuery(to=7, pagingMode="cursor", cursor=previousCursor, cursorDirection="previous"))
+		self.assertEqual([job.databaseId for job in allJobs], offsetIds)
+
+		# cursor of another sorting is ignored -> first page
+		allJobs, nextCursor, previousCursor = self.databaseManager.loadPrintJobsByCursor(self._createTableQuery(to=7, sortColumn="fileName", pagingMode="cursor", cursor=nextCursor))
+		self.assertIsNone(previousCursor)
+		allJobs, nextCursor, previousCursor = self.databaseManager.loadPrintJobsByCursor(self._createTableQuery(to=7, pagingMode="cursor", cursor="no-valid-cursor"))
+		self.assertEqual(len(allJobs), 7)
+
+	def _sortValue(self, printJobModel, sortColumn):
+		if ("fileName" == sortColumn):
+			return printJobModel.fileName.lower()
+		return printJobModel.printStartDateTime
+
+	# the writer thread waits until the returned event is set
+	def _blockDatabaseWriter(self, databaseWriter):
+		writerStarted = threading.Event()
+		writerBlocked = threading.Event()
+		def waitForRelease():
+			writerStarted.set()
+			writerBlocked.wait(5)
+		databaseWriter.submit(waitForRelease)
+		writerStarted.wait(5)
+		return writerBlocked
+
+	def test_databaseWriterGroupCommit(self):
+		databaseWriter = DatabaseWriter(logging.getLogger("testLogger"), self.databaseManager, os.path.join(self.databaselocation, "spill"))
+		databaseWriter.start()
+		writerBlocked = self._blockDatabaseWriter(databaseWriter)
+
+		# the burst waits in the queue and is stored with one transaction
+		with mock.patch.object(self.databaseManager, "insertPrintJobs", wraps=self.databaseManager.insertPrintJobs) as insertPrintJobsMock:
+			allInsertFutures = [databaseWriter.insertPrintJob(self._buildPrintJob("Burst" + str(index) + ".gcode")) for index in range(5)]
+			countFuture = databaseWriter.submit(self.databaseManager.countPrintJobsByQuery, self._createTableQuery())
+			self.assertFalse(allInsertFutures[0].done())
+			writerBlocked.set()
+			allDatabaseIds = [insertFuture.result(5) for insertFuture in allInsertFutures]
+			self.assertEqual(countFuture.result(5), 5)
+		self.assertEqual(insertPrintJobsMock.call_count, 1)
+		self.assertEqual(allDatabaseIds, [printJob.databaseId for printJob in PrintJobModel.select().order_by(PrintJobModel.databaseId)])
+		databaseWriter.stop(5)
+
+	def test_databaseWriterGroupCommitWithinVariableLimit(self):
+		databaseWriter = DatabaseWriter(logging.getLogger("testLogger"), self.databaseManager, os.path.join(self.databaselocation, "spill"), queueSize=200, groupCommitSize=100)
+		databaseWriter.start()
+		# limit of SQLite < 3.32 for the connection of the writer thread
+		databaseWriter.submit(lambda: self.databaseManager._database.connection().setlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER, 999)).result(5)
+		writerBlocked = self._blockDatabaseWriter(databaseWriter)
+
+		allInsertFutures = [databaseWriter.insertPrintJob(self._buildPrintJob("Burst" + str(index) + ".gcode")) for index in range(80)]
+		writerBlocked.set()
+		allDatabaseIds = [insertFuture.result(5) for insertFuture in allInsertFutures]
+		databaseWriter.stop(5)
+		self.assertEqual(databaseWriter.getSpilledPrintJobCount(), 0)
+		self.assertEqual(allDatabaseIds, [printJob.databaseId for printJob in PrintJobModel.select().order_by(PrintJobModel.databaseId)])
+
+	def test_databaseWriterSpillsPrintJobs(self):
+		spillFolder = os.path.join(self.databaselocation, "spill")
+		databaseWriter = DatabaseWriter(logging.getLogger("testLogger"), self.databaseManager, spillFolder, queueSize=2, spillRetryInterval=0.1)
+		databaseWriter.start()
+		writerBlocked = self._blockDatabaseWriter(databaseWriter)
+
+		# - queue full, spilled by the caller at once
+		queuedFuture = databaseWriter.insertPrintJob(self._buildPrintJob("Queued.gcode"))
+		databaseWriter.insertPrintJob(self._buildPrintJob("Queued2.gcode"))
+		fullQueueJob = self._buildPrintJob("FullQueue.gcode", material="PETG")
+		textModel = PrintJobTextModel()
+		textModel.technicalLog = "Print started"
+		fullQueueJob.setTexts(textModel)
+		fullQueueFuture = databaseWriter.insertPrintJob(fullQueueJob)
+		self.assertTrue(fullQueueFuture.done())
+		self.assertIsNone(fullQueueFuture.result())
+		self.assertEqual(databaseWriter.getSpilledPrintJobCount(), 1)
+
+		# - database locked, spilled by the writer and inserted with the next retry
+		with mock.patch.object(self.databaseManager, "_updateDailyRollup", side_effect=peewee.OperationalError("database is locked")):
+			writerBlocked.set()
+			self.assertIsNone(queuedFuture.result(5))
+			databaseWriter.submit(lambda: None).result(5)
+		startTime = time.time()
+		while (databaseWriter.getSpilledPrintJobCount() > 0 and time.time() - startTime < 5):
+			time.sleep(0.05)
+		databaseWriter.stop(5)
+
+		self.assertEqual(databaseWriter.getSpilledPrintJobCount(), 0)
+		self.assertEqual(sorted([printJob.fileName for printJob in PrintJobModel.select()]), ["FullQueue.gcode", "Queued.gcode", "Queued2.gcode"])
+		spilledJob = self.databaseManager.loadPrintJob(PrintJobModel.get(PrintJobModel.fileName == "FullQueue.gcode").databaseId)
+		self.assertEqual(spilledJob.getFilamentModelByToolId("total").material, "PETG")
+		# the reason of the spill is part of the technical log, the log lines of the store step are not in the spill file
+		self.assertTrue(spilledJob.getTexts().technicalLog.startswith("Print started"))
+		self.assertIn("Not stored in the database (writer queue is full)", spilledJob.getTexts().technicalLog)
+		lockedJob = self.databaseManager.loadPrintJob(PrintJobModel.get(PrintJobModel.fileName == "Queued.gcode").databaseId)
+		self.assertIn("insert failed, database is locked", lockedJob.getTexts().technicalLog)
+		# - log lines after the insert (callback of the capture)
+		self.assertTrue(self.databaseManager.appendTechnicalLog(lockedJob.databaseId, "Stored after retry\n"))
+		self.assertTrue(self.databaseManager.loadPrintJob(lockedJob.databaseId).getTexts().technicalLog.endswith("spilled to a file and inserted later\nStored after retry\n"))
+		self.assertEqual(spilledJob.getCosts().totalCosts, 1.23)
+		self.assertEqual(sorted([(temperature.sensorName, temperature.sensorValue) for temperature in spilledJob.getTemperatureModels()]), [("bed", 60.0), ("tool0", 215.0)])
+		self.assertTrue(isinstance(spilledJob.printStartDateTime, datetime.datetime))
+		self.assertEqual(DailyRollupModel.select(fn.SUM(DailyRollupModel.jobCount)).scalar(), 3)
+		withoutTexts = self._createPrintJob("WithoutTexts.gcode")
+		self.assertTrue(self.databaseManager.appendTechnicalLog(withoutTexts.databaseId, "Stored\n"))
+		self.assertEqual(self.databaseManager.loadPrintJob(withoutTexts.databaseId).getTexts().technicalLog, "Stored\n")
+
+	def test_archiveOldPrintJobs(self):
+		now = datetime.datetime.now()
+		for index in range(5):
+			printJob = self._createPrintJob("Old" + str(index) + ".gcode", printStartDateTime=now - datetime.timedelta(days=400 + index), material="PETG")
+			self._setTexts(printJob, technicalLog="Print started " + str(index), slicerSettingsAsText="; filament_type = PETG\n")
+		for index in range(3):
+			self._createPrintJob("New" + str(index) + ".gcode", printStartDateTime=now - datetime.timedelta(days=index))
+		# the newest databaseId stays in the main file, even if it is old
+		self._createPrintJob("Import.gcode", printStartDateTime=now - datetime.timedelta(days=500))
+		allStatistic = self.databaseManager.calculatePrintJobsStatisticByQuery(self._createTableQuery())
+		rollupBeforeArchive = self._loadDailyRollup()
+
+		self.assertEqual(self.databaseManager.archivePrintJobs(12), 5)
+		self.assertTrue(self.databaseManager.hasArchive())
+		self.assertEqual(PrintJobModel.select().count(), 4)
+		self.assertEqual(FilamentModel.select().count(), 8)
+		self.assertEqual(PrintJobTextModel.select().count(), 0)
+		# the shared slicer settings text once in the archive, none left in the main file
+		self.assertEqual(SlicerSettingsBlobModel.select().count(), 0)
+		self.assertEqual(self._loadDailyRollup(), rollupBeforeArchive)
+		self.assertEqual(self.databaseManager.archivePrintJobs(12), 0)
+
+		# default only the main file, with "includeArchive" both files
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery()), 4)
+		archiveTableQuery = self._createTableQuery(to=100, includeArchive="true")
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(archiveTableQuery), 9)
+		allJobs = list(self.databaseManager.loadPrintJobsByQuery(archiveTableQuery, withTexts=True))
+		self.assertEqual(len(allJobs), 9)
+		oldJob = [job for job in allJobs if job.fileName == "Old2.gcode"][0]
+		self.assertEqual(oldJob.getFilamentModelByToolId("total").material, "PETG")
+		self.assertEqual(oldJob.getTexts().technicalLog, "Print started 2")
+		self.assertEqual(oldJob.getTexts().slicerSettingsAsText, "; filament_type = PETG\n")
+		self.assertEqual(self.databaseManager.calculatePrintJobsStatisticByQuery(archiveTableQuery), allStatistic)
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery(includeArchive="true", searchQuery="old3")), 1)
+		self.assertEqual(self.databaseManager.calculateTemperatureStatisticByQuery(archiveTableQuery, "bed")[0]["jobCount"], 5)
+		# the views/attach are only active during the call
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery()), 4)
+		self.assertTrue(self.databaseManager.rebuildDailyRollup())
+		self.assertEqual(self._loadDailyRollup(), rollupBeforeArchive)
+
+	def _loadArchivedFileNames(self, archiveFileLocation):
+		connection = sqlite3.connect(archiveFileLocation)
+		try:
+			return sorted([fileName for (fileName,) in connection.execute("SELECT fileName FROM pjh_printjobmodel")])
+		finally:
+			connection.close()
+
+	def test_archiveAfterReCreateDatabase(self):
+		oldDateTime = datetime.datetime.now() - datetime.timedelta(days=400)
+		for index in range(3):
+			self._createPrintJob("Old" + str(index) + ".gcode", printStartDateTime=oldDateTime)
+		self._createPrintJob("Newest.gcode")
+		self.assertEqual(self.databaseManager.archivePrintJobs(12), 3)
+		archiveFileLocation = self.databaseManager.getArchiveFileLocation()
+
+		# the new jobs start again with databaseId 1, the archive is moved aside
+		self.databaseManager.reCreateDatabase()
+		self.assertFalse(self.databaseManager.hasArchive())
+		allRotatedFileNames = [fileName for fileName in os.listdir(self.databaselocation) if fileName.startswith("printJobHistory-archive-")]
+		self.assertEqual(len(allRotatedFileNames), 1)
+		rotatedFileLocation = os.path.join(self.databaselocation, allRotatedFileNames[0])
+		self.assertEqual(self._loadArchivedFileNames(rotatedFileLocation), ["Old0.gcode", "Old1.gcode", "Old2.gcode"])
+		for index in range(4):
+			self._createPrintJob("Fresh" + str(index) + ".gcode", printStartDateTime=oldDateTime + datetime.timedelta(days=index))
+
+		# - an archive with other jobs of the same ids (e.g. restored file) is never overwritten
+		shutil.copy(rotatedFileLocation, archiveFileLocation)
+		self.assertIsNone(self.databaseManager.archivePrintJobs(12))
+		self.assertEqual(self._loadArchivedFileNames(archiveFileLocation), ["Old0.gcode", "Old1.gcode", "Old2.gcode"])
+		self.assertEqual(PrintJobModel.select().count(), 4)
+		os.remove(archiveFileLocation)
+
+		self.assertEqual(self.databaseManager.archivePrintJobs(12), 3)
+		allJobs = self.databaseManager.loadPrintJobsByQuery(self._createTableQuery(includeArchive="true"))
+		self.assertEqual(sorted([(job.databaseId, job.fileName) for job in allJobs]), [(1, "Fresh0.gcode"), (2, "Fresh1.gcode"), (3, "Fresh2.gcode"), (4, "Fresh3.gcode")])
+		self.assertEqual(self._loadArchivedFileNames(rotatedFileLocation), ["Old0.gcode", "Old1.gcode", "Old2.gcode"])
+
+		# - the same job already in the archive (interrupted run) is replaced
+		self._createPrintJob("Fresh6.gcode", printStartDateTime=oldDateTime)
+		self._createPrintJob("Newest.gcode")
+		connection = sqlite3.connect(archiveFileLocation)
+		connection.execute("ATTACH DATABASE ? AS main_file", (self.databaseManager._databaseFileLocation,))
+		connection.execute("INSERT INTO pjh_printjobmodel SELECT * FROM main_file.pjh_printjobmodel WHERE fileName = 'Fresh6.gcode'")
+		connection.commit()
+		connection.close()
+		self.assertEqual(self.databaseManager.archivePrintJobs(12), 2)
+		self.assertEqual(self._loadArchivedFileNames(archiveFileLocation), ["Fresh0.gcode", "Fresh1.gcode", "Fresh2.gcode", "Fresh3.gcode", "Fresh6.gcode"])
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery(includeArchive="true")), 6)
+
+
+# Runs against a PostgreSQL server, e.g. the container of the docker-compose.yml:
+#   docker-compose up -d postgres
+#   PJH_TEST_POSTGRES_HOST=localhost python -m unittest octoprint_PrintJobHistory.test.test_DatabaseManager.TestDatabaseWithPostgres
+# ATTENTION: all tables of the plugin in that database are dropped
+@unittest.skipUnless(os.environ.get("PJH_TEST_POSTGRES_HOST"), "PJH_TEST_POSTGRES_HOST not set, no PostgreSQL server for the test")
+class TestDatabaseWithPostgres(unittest.TestCase):
+
+	def setUp(self):
+		self.databaselocation = tempfile.mkdtemp()
+		testLogger = logging.getLogger("testLogger")
+		self.databaseManager = DatabaseManager(testLogger, False)
+		self.databaseManager.initDatabase(self.databaselocation, self._clientOutput, {
+			"databaseType": "postgres",
+			"host": os.environ.get("PJH_TEST_POSTGRES_HOST"),
+			"port": int(os.environ.get("PJH_TEST_POSTGRES_PORT", "5432")),
+			"databaseName": os.environ.get("PJH_TEST_POSTGRES_DATABASE", "printjobhistory_database"),
+			"user": os.environ.get("PJH_TEST_POSTGRES_USER", "Olli"),
+			"password": os.environ.get("PJH_TEST_POSTGRES_PASSWORD", "illO")
+		})
+		self.databaseManager.reCreateDatabase()
+
+	def tearDown(self):
+		self.databaseManager._database.close_all()
+		shutil.rmtree(self.databaselocation, ignore_errors=True)
+
+	_clientOutput = TestDatabaseWithTempFolder._clientOutput
+	_createPrintJob = TestDatabaseWithTempFolder._createPrintJob
+	_createTableQuery = TestDatabaseWithTempFolder._createTableQuery
+
+	def test_createSchemeAndLoadPrintJobs(self):
+		self.assertTrue(self.databaseManager.isExternalDatabase())
+		self.assertEqual(int(PluginMetaDataModel.get(PluginMetaDataModel.key == PluginMetaDataModel.KEY_DATABASE_SCHEME_VERSION).value), CURRENT_DATABASE_SCHEME_VERSION)
+		longNote = "A note longer than a VARCHAR(255) " * 20
+		benchy = self._createPrintJob("Benchy.gcode")
+		benchy.noteText = longNote
+		self.databaseManager.updatePrintJob(benchy)
+		self._createPrintJob("Cube.gcode", "failed")
+
+		allJobs = list(self.databaseManager.loadPrintJobsByQuery(self._createTableQuery(sortColumn="fileName", sortOrder="asc")))
+		self.assertEqual([job.fileName for job in allJobs], ["Benchy.gcode", "Cube.gcode"])
+		self.assertEqual(allJobs[0].noteText, longNote)
+		self.assertEqual(len(allJobs[0].getFilamentModels()), 2)
+		# without full-text index, case insensitive ILIKE
+		self.assertEqual([job.fileName for job in self.databaseManager.loadPrintJobsByQuery(self._createTableQuery(searchQuery="CUBE"))], ["Cube.gcode"])
+
+		self.databaseManager.deletePrintJob(benchy.databaseId)
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery()), 1)
+		self.assertIsNone(self.databaseManager.backupDatabaseFile(self.databaselocation))
+
+	def test_aggregationsOnServer(self):
+		# monday 1.3., sunday 7.3., monday 8.3.
+		for day, printStatusResult in [(1, "success"), (7, "failed"), (8, "success")]:
+			self._createPrintJob(printStatusResult=printStatusResult, printStartDateTime=datetime.datetime(2021, 3, day, 12))
+
+		statistic = self.databaseManager.calculatePrintJobsStatisticByQuery(self._createTableQuery())
+		self.assertEqual(statistic["printJobCount"], 3)
+		self.assertEqual(statistic["printStatus"], "success(2), failed(1)")
+		self.assertEqual(statistic["duration"], StringUtils.secondsToText(3 * 3600))
+
+		weekSeries = self.databaseManager.loadStatisticSeries("week", groupBy="status")
+		self.assertEqual([(values["bucket"], values["group"], values["jobCount"]) for values in weekSeries], [
+			("2021-03-01", "failed", 1),
+			("2021-03-01", "success", 1),
+			("2021-03-08", "success", 1)
+		])
+		self.assertEqual([(values["bucket"], values["jobCount"]) for values in self.databaseManager.loadStatisticSeries("month")], [("2021-03-01", 3)])
+		self.assertTrue(self.databaseManager.rebuildDailyRollup())
+		self.assertEqual(DailyRollupModel.select().count(), 3)
+
+	def test_pooledConnectionsOfSeveralThreads(self):
+		allErrors = []
+
+		def writePrintJobs(writerIndex):
+			try:
+				for jobIndex in range(10):
+					self._createPrintJob("Writer" + str(writerIndex) + "-" + str(jobIndex) + ".gcode")
+			except Exception as e:
+				allErrors.append(e)
+			finally:
+				# back into the pool
+				self.databaseManager._database.close()
+
+		writerThreads = [threading.Thread(target=writePrintJobs, args=(writerIndex,)) for writerIndex in range(4)]
+		for thread in writerThreads:
+			thread.start()
+		for thread in writerThreads:
+			thread.join()
+
+		self.assertEqual(allErrors, [])
+		self.assertEqual(self.databaseManager.countPrintJobsByQuery(self._createTableQuery()), 40)
+		self.assertEqual(DailyRollupModel.get().jobCount, 40)
+
+
 if __name__ == '__main__':
 	print("Start DatabaseManager Test")
 	unittest.main()
@@ -3,7 +3,7 @@ import unittest
 from octoprint_PrintJobHistory.common import StringUtils, DateTimeUtils
 from octoprint_PrintJobHistory.services.PrintJobService import PrintJobService
 import logging
-from octoprint_PrintJobHistory import DatabaseManager, FilamentModel, TemperatureModel
+from octoprint_PrintJobHistory import DatabaseManager, FilamentModel, TemperatureModel, PrintJobTextModel
 
 
 class PrintJobServiceTestCase(unittest.TestCase):
@@ -48,11 +48,13 @@ class PrintJobServiceTestCase(unittest.TestCase):
 		newPrintJob.duration = DateTimeUtils.calcDurationInSeconds(newPrintJob.printEndDateTime, newPrintJob.printStartDateTime)
 		newPrintJob.printStatusResult = "failed"
 		newPrintJob.noteText = "Hello World"
-		newPrintJob.noteDeltaFormat = "Something"
 		newPrintJob.noteHtml = "<p>Hello World</p>"
 		newPrintJob.printedLayers = "10 / 133"
 		newPrintJob.printedHeight = "1.3 / 143.3"
-		newPrintJob.slicerSettingsAsText = "dummy slicer settings"
+		newPrintJobTexts = PrintJobTextModel()
+		newPrintJobTexts.noteDeltaFormat = "Something"
+		newPrintJobTexts.slicerSettingsAsText = "dummy slicer settings"
+		newPrintJob.setTexts(newPrintJobTexts)
 
 		newFilamentModel = FilamentModel()
 		newFilamentModel.toolId = "tool0"
@@ -81,10 +83,10 @@ class PrintJobServiceTestCase(unittest.TestCase):
 		self.assertEqual(loadedPrintJobModel.duration, newPrintJob.duration)
 		self.assertEqual(loadedPrintJobModel.printStatusResult, newPrintJob.printStatusResult)
 		self.assertEqual(loadedPrintJobModel.noteText, newPrintJob.noteText)
-		self.assertEqual(loadedPrintJobModel.noteDeltaFormat, newPrintJob.noteDeltaFormat)
+		self.assertEqual(loadedPrintJobModel.getTexts().noteDeltaFormat, newPrintJobTexts.noteDeltaFormat)
 		self.assertEqual(loadedPrintJobModel.noteHtml, newPrintJob.noteHtml)
 		self.assertEqual(loadedPrintJobModel.printedLayers, newPrintJob.printedLayers)
-		self.assertEqual(loadedPrintJobModel.slicerSettingsAsText, newPrintJob.slicerSettingsAsText)
+		self.assertEqual(loadedPrintJobModel.getTexts().slicerSettingsAsText, newPrintJobTexts.slicerSettingsAsText)
 		# check-assos
 		# - allFilaments
 		allFilamentModels = loadedPrintJobModel.getFilamentModels()